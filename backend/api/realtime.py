@@ -2,7 +2,8 @@
 Real-time log streaming endpoints using WebSockets and Watchdog.
 
 Provides two modes:
-- Tail mode: watches a file for appends (classic tail -f)
+- Tail mode: watches a file for appends (classic tail -f), keeping running
+  statistics for the appended lines in a log_analyzer AnalysisState
 - Replay mode: streams an uploaded log file line-by-line at configurable speed,
   with each line parsed through the detected format parser for structured display.
 """
@@ -24,7 +25,10 @@ from watchdog.observers import Observer
 from backend.constants import UPLOAD_DIRECTORY
 from backend.db import crud
 from backend.db.database import SessionLocal
+from log_analyzer.aggregators import AnalysisState
 from log_analyzer.analyzer import AVAILABLE_PARSERS
+from log_analyzer.constants import DEFAULT_MAX_ERRORS
+from log_analyzer.index import LineIndex
 from log_analyzer.parsers import UniversalFallbackParser
 
 router = APIRouter(prefix="/realtime", tags=["realtime"])
@@ -51,9 +55,13 @@ class LogFileEventHandler(FileSystemEventHandler):
 class LogTailer:
     """
     Manages tailing of a single log file for a WebSocket connection.
+
+    With a parser, every appended line (filtered or not) is also folded into
+    an AnalysisState, and a ``{"type": "stats", ...}`` message follows each
+    batch of new lines.
     """
 
-    def __init__(self, websocket: WebSocket, file_path: str, filter_regex: Optional[str] = None):
+    def __init__(self, websocket: WebSocket, file_path: str, filter_regex: Optional[str] = None, parser=None):
         self.websocket = websocket
         self.file_path = Path(file_path).resolve()
         # Validate filter regex to prevent ReDoS
@@ -66,6 +74,8 @@ class LogTailer:
         self.observer = None
         self._stop_event = asyncio.Event()
         self.last_pos = 0
+        self.parser = parser
+        self.state = AnalysisState.create(DEFAULT_MAX_ERRORS) if parser is not None else None
 
     async def start(self):
         """Start tailing the file."""
@@ -138,10 +148,39 @@ class LogTailer:
                 if new_content:
                     self.last_pos = await f.tell()
                     for line in new_content.splitlines():
+                        self._aggregate_line(line)
                         await self._send_line(line)
+                    if self.state is not None:
+                        await self.websocket.send_json(self._stats_message())
         except Exception as e:
             logger.error(f"Error processing new lines: {e}")
 
+    def _aggregate_line(self, line: str):
+        """Fold an appended line into the running statistics."""
+        if self.state is None:
+            return
+        if not line.strip():
+            self.state.total_lines += 1
+            return
+        self.state.update(self.parser.parse(line))
+
+    def _stats_message(self) -> dict:
+        """Summarize the lines appended since the connection opened."""
+        results = self.state.results()
+        return {
+            "type": "stats",
+            "total_lines": results["total_lines"],
+            "parsed_lines": results["parsed_lines"],
+            "failed_lines": results["failed_lines"],
+            "level_counts": dict(results["level_counts"]),
+            "status_codes": {str(status): count for status, count in results["status_codes"].items()},
+            "top_sources": results["source_counts"].most_common(5),
+            "top_errors": results["error_messages"].most_common(5),
+            "distinct_counts": results["distinct_counts"],
+            "earliest": results["earliest"].isoformat() if results["earliest"] else None,
+            "latest": results["latest"].isoformat() if results["latest"] else None,
+        }
+
     async def _send_line(self, line: str):
         """Send a line to the websocket if it matches the filter."""
         if not line.strip():
@@ -208,16 +247,16 @@ async def websocket_tail_logs(
         await websocket.close()
         return
 
-    tailer = LogTailer(websocket, file_path, filter)
+    tailer = LogTailer(websocket, file_path, filter, parser=_resolve_parser(analysis.detected_format, file_path))
     await tailer.start()
 
 
-def _resolve_parser(detected_format: str):
-    """Find the parser instance matching a detected format name."""
+def _resolve_parser(detected_format: str, file_path: str):
+    """Get a parser of the detected format set up for the file (see BaseParser.for_file)."""
     for parser in AVAILABLE_PARSERS:
         if parser.name == detected_format:
-            return parser
-    return UniversalFallbackParser()
+            return parser.for_file(file_path)
+    return UniversalFallbackParser().for_file(file_path)
 
 
 def _parse_line(parser, line: str) -> dict:
@@ -284,6 +323,7 @@ class LogReplayer:
         self._stop = False
         self._current_line = 0
         self._jump_target = None
+        self._line_index: Optional[LineIndex] = None
 
     async def start(self):
         """Start replaying the file."""
@@ -291,11 +331,16 @@ class LogReplayer:
             await self.websocket.send_json({"type": "error", "error": f"File not found: {self.file_path}"})
             return
 
-        # Count total lines and send metadata
-        total_lines = 0
-        async with aiofiles.open(self.file_path, errors="replace") as f:
-            async for _ in f:
-                total_lines += 1
+        # Line totals and jumps come from the sparse line index when one was
+        # built at upload time; otherwise count by reading the whole file
+        self._line_index = LineIndex.load_for(str(self.file_path))
+        if self._line_index is not None:
+            total_lines = self._line_index.total_lines
+        else:
+            total_lines = 0
+            async with aiofiles.open(self.file_path, "rb") as f:
+                async for _ in f:
+                    total_lines += 1
 
         await self.websocket.send_json(
             {
@@ -343,19 +388,33 @@ class LogReplayer:
         except (WebSocketDisconnect, Exception):
             self._stop = True
 
+    def _seek_point(self, line_number: int) -> tuple[int, int]:
+        """Return (byte offset, line number) of the closest indexed position at or before a line."""
+        if self._line_index is None:
+            return 0, 0
+        return self._line_index.locate(line_number)
+
     async def _replay_lines(self, total_lines: int):
         """Read and stream the file line by line."""
-        async with aiofiles.open(self.file_path, errors="replace") as f:
-            line_num = 0
+        offset, line_num = self._seek_point(self._jump_target or 0)
+        restart = False
+        async with aiofiles.open(self.file_path, "rb") as f:
+            await f.seek(offset)
             async for raw_line in f:
                 if self._stop:
                     return
 
-                # Handle jump: skip lines until we reach the target
-                if self._jump_target is not None:
-                    if line_num < self._jump_target:
+                # Handle jump: skip forward a few lines if the target is within
+                # the current index block, otherwise restart from the nearest
+                # indexed position (or the top of the file without an index)
+                target = self._jump_target
+                if target is not None:
+                    if line_num < target and self._seek_point(target)[1] <= line_num:
                         line_num += 1
                         continue
+                    if line_num != target:
+                        restart = True
+                        break
                     self._jump_target = None
 
                 # Wait while paused
@@ -368,12 +427,12 @@ class LogReplayer:
                 if self._stop:
                     return
 
-                # If jump was requested while paused, restart from the top
+                # If jump was requested while paused, restart from the nearest seek point
                 if self._jump_target is not None:
-                    # We need to restart the file read — send a signal and break
+                    restart = True
                     break
 
-                line = raw_line.rstrip("\n\r")
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\n\r")
                 if not line.strip():
                     line_num += 1
                     continue
@@ -406,10 +465,12 @@ class LogReplayer:
                     # Max speed: yield every 50 lines to keep the event loop responsive
                     await asyncio.sleep(0)
 
-        # If we broke out for a jump, restart
-        if self._jump_target is not None:
+        # If we broke out for a jump, restart. A target past the end of the
+        # file simply runs to completion.
+        if restart:
             await self._replay_lines(total_lines)
             return
+        self._jump_target = None
 
         # Send completion
         with contextlib.suppress(Exception):
@@ -474,6 +535,6 @@ async def websocket_replay_logs(
         await websocket.close()
         return
 
-    parser = _resolve_parser(analysis.detected_format)
+    parser = _resolve_parser(analysis.detected_format, file_path)
     replayer = LogReplayer(websocket, file_path, parser, filter)
     await replayer.start()
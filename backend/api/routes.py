@@ -6,6 +6,8 @@ Provides REST API endpoints for log analysis and triage.
 
 import logging
 import uuid as uuid_module
+from datetime import datetime
+from itertools import islice
 from typing import Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
@@ -27,7 +29,9 @@ from backend.rate_limit import limiter
 from backend.services.analyzer_service import AnalyzerService
 from backend.services.triage_service import TriageService
 from log_analyzer.ai_providers.base import ProviderNotAvailableError
-from log_analyzer.analyzer import AVAILABLE_PARSERS
+from log_analyzer.analyzer import AVAILABLE_PARSERS, get_parser
+from log_analyzer.index import LineIndex, iter_time_range, timestamp_to_epoch
+from log_analyzer.reader import LogReader
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +202,7 @@ def delete_analysis(
 def get_log_preview(
     analysis_id: str,
     lines: int = Query(50, ge=1, le=500, description="Number of lines to return (1-500)"),
+    offset: int = Query(0, ge=0, description="0-based line number to start from"),
     db: Session = Depends(get_db),
 ):
     """
@@ -206,9 +211,10 @@ def get_log_preview(
     **Parameters:**
     - **analysis_id**: UUID of the analysis
     - **lines**: Number of lines to return (default: 50, max: 500)
+    - **offset**: Line number to start from (default: 0)
 
     **Returns:**
-    - First N lines of the original log file
+    - N lines of the original log file starting at offset
     """
     _validate_uuid(analysis_id, "analysis_id")
     analysis = crud.get_analysis(db, analysis_id)
@@ -222,23 +228,95 @@ def get_log_preview(
         raise HTTPException(status_code=404, detail="Log file no longer exists on disk")
 
     try:
-        result_lines = []
-        with open(file_path, errors="replace") as f:
-            for i, line in enumerate(f):
-                if i >= lines:
-                    break
-                result_lines.append(line.rstrip("\n\r"))
+        # Seek via the sparse line index when available; otherwise read from the
+        # start (LogReader transparently decompresses gzip/bz2/xz/zstd uploads)
+        index = LineIndex.load_for(str(file_path))
+        if index is not None:
+            result_lines = list(islice(index.iter_lines(str(file_path), offset), lines))
+        else:
+            result_lines = list(islice(LogReader(str(file_path)).read_lines(), offset, offset + lines))
 
         return schemas.LogPreviewResponse(
             analysis_id=analysis_id,
             lines=result_lines,
             total_lines_returned=len(result_lines),
+            offset=offset,
+            total_lines=index.total_lines if index is not None else None,
         )
     except Exception as e:
         logger.error(f"Error reading log file for preview: {e}")
         raise HTTPException(status_code=500, detail="Failed to read log file") from e
 
 
+@router.get("/analysis/{analysis_id}/range", response_model=schemas.TimeRangeResponse)
+def get_time_range(
+    analysis_id: str,
+    since: Optional[datetime] = Query(None, description="Window start (inclusive, ISO 8601; naive = UTC)"),
+    until: Optional[datetime] = Query(None, description="Window end (inclusive, ISO 8601; naive = UTC)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum entries to return (1-10000)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the parsed log lines whose timestamps fall inside a time window.
+
+    **Parameters:**
+    - **analysis_id**: UUID of the analysis
+    - **since**: Window start (inclusive)
+    - **until**: Window end (inclusive)
+    - **limit**: Maximum entries to return (default: 1000, max: 10000)
+
+    **Returns:**
+    - Matching lines in file order, parsed with the detected format. Uses the
+      timestamp index built during analysis to read only the relevant part
+      of the file when available.
+    """
+    _validate_uuid(analysis_id, "analysis_id")
+    if since and until and timestamp_to_epoch(since) > timestamp_to_epoch(until):
+        raise HTTPException(status_code=400, detail="'since' must not be after 'until'")
+
+    analysis = crud.get_analysis(db, analysis_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail=f"Analysis {analysis_id} not found")
+
+    from pathlib import Path
+
+    file_path = Path(analysis.file_path)
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Log file no longer exists on disk")
+
+    parser = get_parser(analysis.detected_format)
+    if parser is None:
+        raise HTTPException(status_code=409, detail=f"Analysis is not complete (format: {analysis.detected_format})")
+
+    try:
+        index = LineIndex.load_for(str(file_path))
+        matches = iter_time_range(str(file_path), parser, since, until, index=index)
+        entries = [
+            schemas.TimeRangeEntry(
+                line_num=line_num,
+                line=line,
+                timestamp=entry.timestamp,
+                level=entry.level,
+                message=entry.message,
+                source=entry.source,
+            )
+            for line_num, line, entry in islice(matches, limit + 1)
+        ]
+    except Exception as e:
+        logger.error(f"Error reading time range for {analysis_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read log file") from e
+
+    return schemas.TimeRangeResponse(
+        analysis_id=analysis_id,
+        since=since,
+        until=until,
+        entries=entries[:limit],
+        total_entries_returned=min(len(entries), limit),
+        truncated=len(entries) > limit,
+        indexed=index is not None and index.has_timestamps,
+    )
+
+
 # ==================== Triage Endpoints ====================
 
 
@@ -38,6 +38,7 @@ class AnalysisCreate(BaseModel):
     top_errors: list[list[Any]]
     top_sources: list[list[Any]]
     status_codes: dict[int, int]
+    distinct_counts: Optional[dict[str, int]] = None
     earliest_timestamp: Optional[datetime] = None
     latest_timestamp: Optional[datetime] = None
     time_span: Optional[str] = None
@@ -61,6 +62,7 @@ class AnalysisResponse(BaseModel):
     top_errors: list[list[Any]]
     top_sources: list[list[Any]]
     status_codes: dict[int, int]
+    distinct_counts: Optional[dict[str, int]] = None
     earliest_timestamp: Optional[datetime] = None
     latest_timestamp: Optional[datetime] = None
     time_span: Optional[str] = None
@@ -83,6 +85,31 @@ class LogPreviewResponse(BaseModel):
     analysis_id: str
     lines: list[str]
     total_lines_returned: int
+    offset: int = 0
+    total_lines: Optional[int] = None
+
+
+class TimeRangeEntry(BaseModel):
+    """Schema for a single parsed log line inside a time window."""
+
+    line_num: int
+    line: str
+    timestamp: datetime
+    level: Optional[str] = None
+    message: str
+    source: Optional[str] = None
+
+
+class TimeRangeResponse(BaseModel):
+    """Schema for a time-range query over an analyzed log file."""
+
+    analysis_id: str
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    entries: list[TimeRangeEntry]
+    total_entries_returned: int
+    truncated: bool
+    indexed: bool
 
 
 # ==================== Triage Schemas ====================
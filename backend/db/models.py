@@ -44,6 +44,7 @@ class Analysis(Base):
     top_errors = Column(JSON)  # [[message, count], ...]
     top_sources = Column(JSON)  # [[source, count], ...]
     status_codes = Column(JSON)  # {200: 1000, 404: 50, ...} for HTTP logs
+    distinct_counts = Column(JSON, nullable=True)  # {"sources": 1200, "users": 40, ...} (estimates)
 
     # Time range
     earliest_timestamp = Column(DateTime, nullable=True)
@@ -0,0 +1,28 @@
+"""Add distinct counts to analyses
+
+Revision ID: 4b9e1c7d2a61
+Revises: 787f2208a33c
+Create Date: 2026-10-16 09:12:44.318207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4b9e1c7d2a61"
+down_revision: Union[str, Sequence[str], None] = "787f2208a33c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add the distinct_counts column to analyses."""
+    op.add_column("analyses", sa.Column("distinct_counts", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the distinct_counts column from analyses."""
+    op.drop_column("analyses", "distinct_counts")
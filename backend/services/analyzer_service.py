@@ -7,6 +7,8 @@ Wraps the existing LogAnalyzer from CLI tool and adapts it for API use.
 import logging
 import os
 import uuid
+from dataclasses import replace
+from typing import Optional
 
 import aiofiles
 from fastapi import UploadFile
@@ -15,6 +17,8 @@ from sqlalchemy.orm import Session
 from backend.constants import DEFAULT_MAX_ERRORS, UPLOAD_DIRECTORY
 from backend.db import crud, models
 from log_analyzer.analyzer import AnalysisResult, LogAnalyzer
+from log_analyzer.index import LineIndex, LineIndexBuilder, index_path_for
+from log_analyzer.reader import detect_compression
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +36,8 @@ class AnalyzerService:
 
     def __init__(self):
         """Initialize analyzer service."""
-        self.analyzer = LogAnalyzer()
+        # Collect the line index in the analysis pass (see save_line_index)
+        self.analyzer = LogAnalyzer(aggregators=[LineIndexBuilder])
 
     async def save_uploaded_file(self, file: UploadFile) -> str:
         """
@@ -121,6 +126,7 @@ class AnalyzerService:
             "top_errors": result.top_errors,
             "top_sources": result.top_sources,
             "status_codes": result.status_codes,
+            "distinct_counts": result.distinct_counts,
             "earliest_timestamp": result.earliest_timestamp,
             "latest_timestamp": result.latest_timestamp,
             "time_span": str(result.time_span) if result.time_span else None,
@@ -202,6 +208,7 @@ class AnalyzerService:
             "top_errors": [],
             "top_sources": [],
             "status_codes": {},
+            "distinct_counts": {},
             "file_path": file_path,
         }
         analysis = crud.create_analysis(db, analysis_data)
@@ -221,8 +228,10 @@ class AnalyzerService:
 
         db = SessionLocal()
         try:
+            stat = os.stat(file_path)
             result = self.analyze_file(file_path, max_errors=max_errors)
             analysis_data = self.analysis_result_to_dict(result, file_path, "")
+            self.save_line_index(file_path, result.aggregates.get(LineIndexBuilder.name), stat)
 
             analysis = crud.get_analysis(db, analysis_id)
             if not analysis:
@@ -254,6 +263,39 @@ class AnalyzerService:
         finally:
             db.close()
 
+    def save_line_index(
+        self, file_path: str, index: Optional[LineIndex], stat: os.stat_result
+    ) -> Optional[LineIndex]:
+        """
+        Store the sparse line-offset index collected during analysis next to an uploaded file.
+
+        The index lets replay jumps, line counts and previews at any offset
+        seek directly instead of re-reading the file, and its block
+        timestamps serve time-range queries. LineIndexBuilder collects it in
+        the analysis pass, so the file is read once. Failure is not fatal:
+        consumers fall back to sequential reads.
+
+        Args:
+            file_path: Path to the uploaded log file
+            index: The analysis's line_index aggregate (None if it could not be collected)
+            stat: File status taken before the analysis, so a file changed
+                  during the analysis gets a stale index
+
+        Returns:
+            LineIndex if stored, None if the file cannot be indexed
+        """
+        if index is None or detect_compression(file_path):
+            logger.debug(f"Skipping line index for {file_path}: no raw byte offsets")
+            return None
+        index = replace(index, file_size=stat.st_size, file_mtime_ns=stat.st_mtime_ns)
+        try:
+            index.save(index_path_for(file_path))
+        except OSError as e:
+            logger.warning(f"Skipping line index for {file_path}: {e}")
+            return None
+        logger.debug(f"Stored line index for {file_path} ({index.total_lines:,} lines)")
+        return index
+
     def delete_file(self, file_path: str) -> bool:
         """
         Delete a log file from disk.
@@ -264,6 +306,13 @@ class AnalyzerService:
         Returns:
             bool: True if deleted, False if file doesn't exist
         """
+        index_path = index_path_for(file_path)
+        if index_path.exists():
+            try:
+                index_path.unlink()
+            except OSError as e:
+                logger.warning(f"Failed to delete line index {index_path}: {e}")
+
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
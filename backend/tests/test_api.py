@@ -140,6 +140,111 @@ def test_analyze_log_file(client, sample_log_file):
     assert cleanup_response.status_code == 200
 
 
+def test_analyze_gzip_upload_and_preview(client, sample_log_file):
+    """Test that gzip-compressed uploads are analyzed and previewed transparently."""
+    import gzip
+    import time
+
+    compressed = BytesIO(gzip.compress(sample_log_file.getvalue()))
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("access.log.gz", compressed, "application/gzip")}
+    )
+    assert response.status_code == 202
+    analysis_id = response.json()["id"]
+
+    for _ in range(10):
+        data = client.get(f"/api/v1/analysis/{analysis_id}").json()
+        if data["detected_format"] != "pending":
+            break
+        time.sleep(0.1)
+
+    assert data["detected_format"] == "apache_access"
+    assert data["total_lines"] == 5
+
+    preview = client.get(f"/api/v1/analysis/{analysis_id}/preview?lines=2").json()
+    assert preview["total_lines_returned"] == 2
+    assert preview["lines"][0].startswith("192.168.1.1 - -")
+
+    client.delete(f"/api/v1/analysis/{analysis_id}")
+
+
+def test_preview_at_offset_uses_line_index(client, sample_log_file):
+    """Test that processing stores a line index and previews can start at any line."""
+    import time
+
+    from log_analyzer.index import index_path_for
+
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("test.log", sample_log_file, "text/plain")}
+    )
+    analysis_id = response.json()["id"]
+    for _ in range(10):
+        data = client.get(f"/api/v1/analysis/{analysis_id}").json()
+        if data["detected_format"] != "pending":
+            break
+        time.sleep(0.1)
+
+    from backend.db import crud
+    from backend.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        file_path = crud.get_analysis(db, analysis_id).file_path
+    finally:
+        db.close()
+    assert index_path_for(file_path).exists()
+
+    preview = client.get(f"/api/v1/analysis/{analysis_id}/preview?offset=3&lines=10").json()
+    assert preview["offset"] == 3
+    assert preview["total_lines"] == 5
+    assert preview["total_lines_returned"] == 2
+    assert "/api/data" in preview["lines"][0]
+
+    client.delete(f"/api/v1/analysis/{analysis_id}")
+    assert not index_path_for(file_path).exists()
+
+
+def test_time_range_query(client, sample_log_file):
+    """Test querying the parsed lines inside a time window."""
+    import time
+
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("test.log", sample_log_file, "text/plain")}
+    )
+    analysis_id = response.json()["id"]
+    for _ in range(10):
+        data = client.get(f"/api/v1/analysis/{analysis_id}").json()
+        if data["detected_format"] != "pending":
+            break
+        time.sleep(0.1)
+
+    response = client.get(
+        f"/api/v1/analysis/{analysis_id}/range",
+        params={"since": "2023-10-10T13:55:37Z", "until": "2023-10-10T13:55:39"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["indexed"] is True
+    assert data["truncated"] is False
+    assert [e["line_num"] for e in data["entries"]] == [1, 2, 3]
+    assert data["entries"][2]["level"] == "ERROR"
+
+    response = client.get(f"/api/v1/analysis/{analysis_id}/range", params={"limit": 2})
+    assert response.json()["truncated"] is True
+    assert response.json()["total_entries_returned"] == 2
+
+    response = client.get(
+        f"/api/v1/analysis/{analysis_id}/range",
+        params={"since": "2023-10-10T14:00:00", "until": "2023-10-10T13:00:00"},
+    )
+    assert response.status_code == 400
+
+    client.delete(f"/api/v1/analysis/{analysis_id}")
+
+
 def test_analyze_with_parameters(client, sample_log_file):
     """Test analyze endpoint with custom parameters."""
     response = client.post(
@@ -440,3 +545,37 @@ def test_invalid_max_errors(client, sample_log_file):
         files={"file": ("test.log", sample_log_file, "text/plain")}
     )
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_tailer_keeps_running_stats(tmp_path):
+    """Test that the realtime tailer aggregates appended lines."""
+    from backend.api.realtime import LogTailer
+    from log_analyzer.parsers import ApacheAccessParser
+
+    class FakeWebSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, data):
+            self.sent.append(data)
+
+    log_path = tmp_path / "access.log"
+    log_path.write_text("")
+    websocket = FakeWebSocket()
+    tailer = LogTailer(websocket, str(log_path), parser=ApacheAccessParser())
+
+    with open(log_path, "a") as f:
+        f.write('10.0.0.1 - - [10/Oct/2023:13:55:36 -0700] "GET / HTTP/1.1" 200 12\n')
+        f.write('10.0.0.2 - - [10/Oct/2023:13:55:37 -0700] "GET /x HTTP/1.1" 500 0\n')
+        f.write("garbage\n")
+    await tailer._process_new_lines()
+
+    stats = websocket.sent[-1]
+    assert stats["type"] == "stats"
+    assert stats["total_lines"] == 3
+    assert stats["failed_lines"] == 1
+    assert stats["level_counts"] == {"INFO": 1, "ERROR": 1}
+    assert stats["status_codes"] == {"200": 1, "500": 1}
+    assert stats["distinct_counts"]["paths"] == 2
+    assert [line["line"] for line in websocket.sent[:-1]][0].startswith("10.0.0.1")
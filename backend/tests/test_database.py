@@ -50,6 +50,7 @@ def test_create_analysis(test_db):
         "top_errors": [["Connection timeout", 15], ["Database error", 10]],
         "top_sources": [["192.168.1.1", 500], ["192.168.1.2", 450]],
         "status_codes": {200: 900, 404: 50, 500: 50},
+        "distinct_counts": {"sources": 2, "users": 0, "paths": 12, "error_messages": 2},
         "file_path": "/tmp/test.log"
     }
 
@@ -64,6 +65,7 @@ def test_create_analysis(test_db):
     assert analysis.error_rate == 2.5
     assert analysis.level_counts == {"ERROR": 25, "WARNING": 10, "INFO": 915}
     assert len(analysis.top_errors) == 2
+    assert analysis.distinct_counts["paths"] == 12
     assert analysis.created_at is not None
 
 
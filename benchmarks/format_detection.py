@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark format detection with and without the combined classifier.
+
+For every line of the bundled LogHub samples, times finding the parsers
+that accept it two ways: trying prefilter() and try_parse() of every
+registered parser, and trying only the candidates FormatClassifier selects
+(the way LogAnalyzer scores formats). The classifier's own match time is
+shown separately, and both ways must accept exactly the same parsers.
+
+Usage:
+    python benchmarks/format_detection.py [--repeat N] [FILE ...]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from log_analyzer.analyzer import AVAILABLE_PARSERS
+from log_analyzer.classifier import FormatClassifier
+
+DATASETS = Path(__file__).resolve().parent.parent / "datasets" / "real_logs"
+
+
+def _best(function, repeat: int) -> tuple[float, list]:
+    best, result = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("files", nargs="*", type=Path, help="log files (default: the bundled *_2k.log samples)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (the best is kept)")
+    args = arg_parser.parse_args()
+
+    parsers = list(AVAILABLE_PARSERS)
+    classifier = FormatClassifier(parsers)
+    files = args.files or sorted(DATASETS.glob("*_2k.log"))
+
+    print(f"{'file':<24}{'try_parse all':>16}{'classified':>18}{'match only':>14}")
+    totals = [0.0, 0.0]
+    for path in files:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = [line.rstrip("\n") for line in f]
+
+        def plain(lines=lines):
+            return [[p for p in parsers if p.prefilter(line) and p.try_parse(line)] for line in lines]
+
+        def classified(lines=lines):
+            return [[p for p in classifier.candidates(line) if p.prefilter(line) and p.try_parse(line)] for line in lines]
+
+        def match_only(lines=lines):
+            return [classifier.candidates(line) for line in lines]
+
+        plain_seconds, expected = _best(plain, args.repeat)
+        classified_seconds, accepted = _best(classified, args.repeat)
+        match_seconds, _ = _best(match_only, args.repeat)
+        if accepted != expected:
+            raise SystemExit(f"{path.name}: the classifier dropped a parser that accepts a line")
+        totals[0] += plain_seconds
+        totals[1] += classified_seconds
+        print(
+            f"{path.name:<24}{plain_seconds * 1000:>14.1f}ms"
+            f"{classified_seconds * 1000:>10.1f}ms ({plain_seconds / classified_seconds:.2f}x)"
+            f"{match_seconds * 1000:>12.1f}ms"
+        )
+    if totals[1]:
+        print(f"{'total':<24}{totals[0] * 1000:>14.1f}ms{totals[1] * 1000:>10.1f}ms ({totals[0] / totals[1]:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON decoding backends used by the JSON-based parsers.
+
+Generates structured application logs, Kubernetes-style records with large
+metadata, and GCP and Azure exports, then times each parser with every
+installed backend (msgspec, orjson) against the standard library, checking
+that all backends produce identical entries.
+
+Usage:
+    python benchmarks/json_decoding.py [--lines N] [--repeat N]
+
+Install the optional backends with ``pip install -e ".[msgspec]"`` or
+``pip install -e ".[orjson]"``.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from log_analyzer import jsondecode
+from log_analyzer.parsers import AzureMonitorParser, DockerJSONParser, GCPCloudLoggingParser, JSONLogParser
+
+
+def _timestamp(i: int) -> str:
+    return f"2024-03-05T{i // 72000 % 24:02d}:{i // 1200 % 60:02d}:{i // 20 % 60:02d}.{i % 1000:03d}Z"
+
+
+def generate(count: int) -> dict[str, tuple[type, list[str]]]:
+    """Build the benchmark corpora: name -> (parser class, lines)."""
+    rng = random.Random(7)
+    levels = ["info", "info", "info", "warn", "error", "debug"]
+
+    app = [
+        json.dumps(
+            {
+                "time": _timestamp(i),
+                "level": rng.choice(levels),
+                "logger": "app.worker",
+                "msg": f"request {rng.randrange(10**6)} done",
+                "hostname": f"web-{rng.randrange(8)}",
+                "status": rng.choice([200, 200, 404, 500]),
+                "duration_ms": rng.randrange(900),
+            }
+        )
+        for i in range(count)
+    ]
+    kubernetes = [
+        json.dumps(
+            {
+                "@timestamp": _timestamp(i),
+                "level": rng.choice(levels),
+                "message": f"GET /api/items/{rng.randrange(1000)} completed",
+                "kubernetes": {
+                    "pod_name": f"api-{rng.randrange(50)}-7d9f",
+                    "namespace_name": "prod",
+                    "labels": {f"label{k}": f"value-{rng.randrange(100)}" for k in range(12)},
+                    "annotations": {f"annotation{k}": "x" * 40 for k in range(8)},
+                },
+                "http": {"headers": {f"header{k}": "y" * 30 for k in range(15)}},
+                "status": rng.choice([200, 404, 500]),
+            }
+        )
+        for i in range(count)
+    ]
+    docker = [
+        json.dumps({"log": f"worker {rng.randrange(64)} ERROR retrying\n", "stream": "stderr", "time": _timestamp(i)})
+        for i in range(count)
+    ]
+    gcp = [
+        json.dumps(
+            {
+                "insertId": f"{i:012x}",
+                "jsonPayload": {"message": f"handled request {i}", "latency_ms": rng.randrange(900)},
+                "httpRequest": {"requestMethod": "GET", "requestUrl": "https://example.com/" + "p" * 60, "status": 200},
+                "resource": {"type": "k8s_container", "labels": {"pod_name": "api-1", "namespace_name": "prod"}},
+                "timestamp": _timestamp(i),
+                "severity": rng.choice(["INFO", "WARNING", "ERROR"]),
+                "logName": "projects/demo/logs/stdout",
+                "sourceLocation": {"file": "handler.py", "line": str(rng.randrange(500)), "function": "handle"},
+            }
+        )
+        for i in range(count)
+    ]
+    azure = [
+        json.dumps(
+            {
+                "time": _timestamp(i),
+                "level": rng.choice(["Information", "Warning", "Error"]),
+                "category": "AppServiceHTTPLogs",
+                "operationName": "Microsoft.Web/sites/log",
+                "properties": {"CsHost": "demo.azurewebsites.net", "ScStatus": 200, "TimeTaken": rng.randrange(900)},
+                "message": f"request {i}",
+            }
+        )
+        for i in range(count)
+    ]
+    return {
+        "json (app)": (JSONLogParser, app),
+        "json (kubernetes)": (JSONLogParser, kubernetes),
+        "docker_json": (DockerJSONParser, docker),
+        "gcp_logging": (GCPCloudLoggingParser, gcp),
+        "azure_monitor": (AzureMonitorParser, azure),
+    }
+
+
+def _use_backend(name: str) -> None:
+    jsondecode.MSGSPEC_AVAILABLE = name == "msgspec"
+    jsondecode.ORJSON_AVAILABLE = name == "orjson"
+
+
+def _run(parser_class: type, lines: list[str], repeat: int) -> tuple[float, list]:
+    best, entries = float("inf"), []
+    for _ in range(repeat):
+        parser = parser_class()
+        start = time.perf_counter()
+        entries = [parser.parse(line) for line in lines]
+        best = min(best, time.perf_counter() - start)
+    return best, entries
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("--lines", type=int, default=50_000, help="lines per corpus")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (the best is kept)")
+    args = arg_parser.parse_args()
+
+    backends = ["json"]
+    if jsondecode.MSGSPEC_AVAILABLE:
+        backends.append("msgspec")
+    if jsondecode.ORJSON_AVAILABLE:
+        backends.append("orjson")
+    installed = (jsondecode.MSGSPEC_AVAILABLE, jsondecode.ORJSON_AVAILABLE)
+
+    print(f"{'corpus':<20}" + "".join(f"{name:>18}" for name in backends))
+    try:
+        for corpus, (parser_class, lines) in generate(args.lines).items():
+            row, baseline, expected = [], None, None
+            for name in backends:
+                _use_backend(name)
+                seconds, entries = _run(parser_class, lines, args.repeat)
+                if baseline is None:
+                    baseline, expected = seconds, entries
+                    row.append(f"{seconds:>9.3f}s       ")
+                else:
+                    if entries != expected:
+                        raise SystemExit(f"{corpus}: {name} entries differ from the standard library")
+                    row.append(f"{seconds:>9.3f}s ({baseline / seconds:.1f}x)")
+            print(f"{corpus:<20}" + "".join(f"{cell:>18}" for cell in row))
+    finally:
+        jsondecode.MSGSPEC_AVAILABLE, jsondecode.ORJSON_AVAILABLE = installed
+
+
+if __name__ == "__main__":
+    main()
@@ -219,12 +219,13 @@ export function useApi() {
      * Get a preview of raw log file lines for an analysis.
      * @param {string} analysisId - Analysis UUID
      * @param {number} lines - Number of lines to return (default: 50)
+     * @param {number} offset - 0-based line number to start from (default: 0)
      * @returns {Promise<Object>} Log preview with lines array
      */
-    const getLogPreview = async (analysisId, lines = 50) => {
+    const getLogPreview = async (analysisId, lines = 50, offset = 0) => {
         try {
             const response = await apiClient.get(`/api/v1/analysis/${analysisId}/preview`, {
-                params: { lines }
+                params: { lines, offset }
             })
             return response.data
         } catch (err) {
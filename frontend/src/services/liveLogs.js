@@ -58,6 +58,8 @@ export class LiveLogService {
                     this._notify({ type: 'complete', payload: data });
                 } else if (data.type === 'log') {
                     this._notify({ type: 'log', payload: data });
+                } else if (data.type === 'stats') {
+                    this._notify({ type: 'stats', payload: data });
                 } else if (data.error) {
                     // Legacy tail format
                     this._notify({ type: 'error', payload: data.error });
@@ -0,0 +1,931 @@
+"""
+Mergeable streaming aggregators for log analysis.
+
+Every analysis path (single-threaded, the threaded chunk pipeline, byte
+ranges in worker threads or processes, and incremental checkpoints)
+reduces parsed lines to an AnalysisState: line counters plus a set of
+Aggregator objects. An aggregator sees each parsed entry once, merges with
+the aggregator for the lines that follow, and can be written to and read
+back from a checkpoint, so the same state objects work everywhere.
+
+Callers can run their own aggregators (per-source error rates, size
+histograms, ...) in the same pass as the built-in ones by handing
+factories to ``LogAnalyzer(aggregators=[...])``. Their finalize() output
+ends up in AnalysisResult.aggregates.
+"""
+
+import heapq
+from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import zip_longest
+from operator import itemgetter
+from typing import Any, Callable, Optional
+
+from .columnar import (
+    ERROR_LEVELS,
+    NO_ID,
+    TIMESTAMP_MISSING,
+    VALUE_FIELDS,
+    WARNING_LEVELS,
+    ParsedBatch,
+    count_ids,
+    count_statuses,
+    count_time_buckets,
+    entry_path,
+    entry_user,
+    epoch_micros,
+    rows_with,
+    to_number,
+    values_by_status_class,
+)
+from .constants import DEFAULT_MAX_ERRORS, HEAVY_HITTERS_CAPACITY, HLL_PRECISION, TIME_SERIES_BUCKET_SECONDS
+from .parsers import LogEntry
+from .sketches import DDSketch, HyperLogLog, SpaceSaving, WeightedReservoir
+from .templates import TemplateMiner, mask_message
+
+__all__ = [
+    "DEFAULT_AGGREGATOR_NAMES",
+    "EXTRA_QUANTILES_NAME",
+    "QUANTILES",
+    "Aggregator",
+    "AggregatorFactory",
+    "AnalysisState",
+    "CounterAggregator",
+    "DistinctCounts",
+    "ErrorMessageCounts",
+    "ErrorSamples",
+    "ErrorTemplates",
+    "FieldQuantiles",
+    "HeavyHitters",
+    "LevelCounts",
+    "LevelTimeSeries",
+    "SampleAggregator",
+    "SourceCounts",
+    "StatusCodeCounts",
+    "TimeRange",
+    "WarningSamples",
+    "default_aggregators",
+]
+
+
+def _encode_timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _decode_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _encode_entry(entry: LogEntry) -> dict:
+    return {
+        "raw": entry.raw,
+        "timestamp": _encode_timestamp(entry.timestamp),
+        "level": entry.level,
+        "message": entry.message,
+        "source": entry.source,
+        "metadata": entry.metadata,
+    }
+
+
+def _decode_entry(data: dict) -> LogEntry:
+    return LogEntry(**{**data, "timestamp": _decode_timestamp(data.get("timestamp"))})
+
+
+class Aggregator(ABC):
+    """
+    Streaming reduction over parsed log entries.
+
+    An aggregator starts empty, is fed entries with update() (or whole
+    columnar batches with update_batch()), and is combined with the
+    aggregator for the following lines with merge(). finalize() turns it
+    into named results. to_state() and load_state() round-trip it through
+    JSON for checkpoints.
+
+    Each chunk or byte range gets a fresh instance from the aggregator's
+    factory (usually the class itself), possibly in another process, so
+    factories must be picklable to use the process executor.
+
+    Attributes:
+        name: Unique name within an analysis; keys the checkpointed state
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def update(self, entry: LogEntry) -> None:
+        """Account for one parsed entry."""
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        """
+        Account for every row of a columnar batch.
+
+        The default feeds each row's entry to update(), rebuilding entries
+        the batch did not keep. Override it to read the columns directly,
+        which lets the analyzer skip building a LogEntry per line.
+        """
+        for row in range(len(batch)):
+            self.update(batch.entry(row))
+
+    @property
+    def batched(self) -> bool:
+        """Whether update_batch() reads the batch columns directly."""
+        return type(self).update_batch is not Aggregator.update_batch
+
+    @abstractmethod
+    def merge(self, other: "Aggregator") -> None:
+        """
+        Fold in another aggregator of the same kind, in place.
+
+        Args:
+            other: Aggregator for the lines that follow the ones this one saw
+        """
+
+    @abstractmethod
+    def finalize(self) -> dict[str, Any]:
+        """
+        Get the aggregated results.
+
+        Returns:
+            Result values by name
+        """
+
+    @abstractmethod
+    def to_state(self) -> Any:
+        """Convert the aggregated state to JSON-safe data."""
+
+    @abstractmethod
+    def load_state(self, state: Any) -> None:
+        """Replace the aggregated state with the output of to_state()."""
+
+
+# Zero-argument callable returning a fresh aggregator, e.g. an Aggregator subclass
+AggregatorFactory = Callable[[], Aggregator]
+
+
+class CounterAggregator(Aggregator):
+    """
+    Counts one value per entry exactly.
+
+    Subclasses implement key().
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+
+    @abstractmethod
+    def key(self, entry: LogEntry) -> Any:
+        """Get the value to count for an entry, or None to skip it."""
+
+    def update(self, entry: LogEntry) -> None:
+        key = self.key(entry)
+        if key is not None:
+            self.counts[key] += 1
+
+    def merge(self, other: "CounterAggregator") -> None:
+        self.counts.update(other.counts)
+
+    def finalize(self) -> dict[str, Any]:
+        return {self.name: self.counts}
+
+    def to_state(self) -> list:
+        # [key, count] pairs so int keys survive JSON
+        return [[key, count] for key, count in self.counts.items()]
+
+    def load_state(self, state: list) -> None:
+        self.counts = Counter({key: count for key, count in state})
+
+
+class LevelCounts(CounterAggregator):
+    """Entries per log level."""
+
+    name = "level_counts"
+
+    def key(self, entry: LogEntry) -> Optional[str]:
+        return entry.level or None
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        self.counts.update(count_ids(batch.levels, batch.level_names))
+
+
+class StatusCodeCounts(CounterAggregator):
+    """Entries per HTTP status code."""
+
+    name = "status_codes"
+
+    def key(self, entry: LogEntry) -> Any:
+        return entry.get("status") or None
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        self.counts.update(count_statuses(batch))
+
+
+class HeavyHitters(CounterAggregator):
+    """
+    Counts one value per entry in a bounded SpaceSaving summary.
+
+    For high-cardinality values (client addresses, error messages); counts
+    are exact until more than ``capacity`` distinct values have been seen,
+    and within SpaceSaving's error bound after that.
+    """
+
+    def __init__(self, capacity: int = HEAVY_HITTERS_CAPACITY):
+        """
+        Args:
+            capacity: Maximum number of distinct values to track
+        """
+        self.counts = SpaceSaving(capacity)
+
+    def update(self, entry: LogEntry) -> None:
+        key = self.key(entry)
+        if key is not None:
+            self.counts.add(key)
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.counts.merge(other.counts)
+
+    def to_state(self) -> dict:
+        return self.counts.to_state()
+
+    def load_state(self, state: dict) -> None:
+        self.counts = SpaceSaving.from_state(state)
+
+
+class SourceCounts(HeavyHitters):
+    """Entries per source."""
+
+    name = "source_counts"
+
+    def key(self, entry: LogEntry) -> Optional[str]:
+        return entry.source or None
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        self.counts.update(count_ids(batch.sources, batch.source_names))
+
+
+class ErrorMessageCounts(HeavyHitters):
+    """Occurrences of each ERROR/CRITICAL message."""
+
+    name = "error_messages"
+
+    def key(self, entry: LogEntry) -> Optional[str]:
+        return entry.message if entry.level in ERROR_LEVELS else None
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        messages = batch.messages
+        self.counts.update(messages[row] for row in rows_with(batch.levels, batch.level_names, ERROR_LEVELS))
+
+
+class ErrorTemplates(Aggregator):
+    """
+    ERROR/CRITICAL messages clustered into templates (see log_analyzer.templates).
+
+    Messages that differ only in IDs, addresses or numbers share a template,
+    so the top templates stay meaningful where exact messages are all unique.
+    """
+
+    name = "error_templates"
+
+    def __init__(self):
+        self.miner = TemplateMiner()
+
+    def update(self, entry: LogEntry) -> None:
+        if entry.level in ERROR_LEVELS:
+            self.miner.add(entry.message)
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        messages = batch.messages
+        add = self.miner.add
+        for message, count in Counter(
+            messages[row] for row in rows_with(batch.levels, batch.level_names, ERROR_LEVELS)
+        ).items():
+            add(message, count)
+
+    def merge(self, other: "ErrorTemplates") -> None:
+        self.miner.merge(other.miner)
+
+    def finalize(self) -> dict[str, Any]:
+        return {self.name: self.miner}
+
+    def to_state(self) -> dict:
+        return self.miner.to_state()
+
+    def load_state(self, state: dict) -> None:
+        self.miner = TemplateMiner.from_state(state)
+
+
+class DistinctCounts(Aggregator):
+    """
+    Estimated number of distinct sources, users, request paths and ERROR/CRITICAL messages.
+
+    Each field has its own HyperLogLog sketch of fixed size (2**precision
+    bytes), so memory stays the same for any file size.
+    """
+
+    name = "distinct_counts"
+    fields = ("sources", "users", "paths", "error_messages")
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        """
+        Args:
+            precision: HyperLogLog precision for every field
+        """
+        self.sketches = {field: HyperLogLog(precision) for field in self.fields}
+
+    def update(self, entry: LogEntry) -> None:
+        sketches = self.sketches
+        user, path = entry_user(entry), entry_path(entry)
+        if entry.source:
+            sketches["sources"].add(entry.source)
+        if user:
+            sketches["users"].add(user)
+        if path:
+            sketches["paths"].add(path)
+        if entry.level in ERROR_LEVELS:
+            sketches["error_messages"].add(entry.message)
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        # Sketches ignore repeats, so only hash each distinct value in the batch once
+        sketches = self.sketches
+        messages = batch.messages
+        sketches["sources"].update(batch.source_names)
+        sketches["users"].update(batch.users)
+        sketches["paths"].update(batch.paths)
+        sketches["error_messages"].update(
+            {messages[row] for row in rows_with(batch.levels, batch.level_names, ERROR_LEVELS)}
+        )
+
+    def merge(self, other: "DistinctCounts") -> None:
+        for field, sketch in self.sketches.items():
+            sketch.merge(other.sketches[field])
+
+    def finalize(self) -> dict[str, Any]:
+        return {self.name: {field: sketch.count() for field, sketch in self.sketches.items()}}
+
+    def to_state(self) -> dict:
+        return {field: sketch.to_state() for field, sketch in self.sketches.items()}
+
+    def load_state(self, state: dict) -> None:
+        self.sketches = {field: HyperLogLog.from_state(state[field]) for field in self.fields}
+
+
+# Quantiles reported for every summarized field, by result key
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+# Name of the FieldQuantiles aggregator LogAnalyzer(quantile_fields=...) adds
+EXTRA_QUANTILES_NAME = "extra_quantiles"
+
+
+def _status_class(status: Any) -> Optional[str]:
+    if status.__class__ is int and 100 <= status < 600:
+        return f"{status // 100}xx"
+    return None
+
+
+def _summarize(sketch: DDSketch) -> dict[str, Any]:
+    summary = {"count": sketch.count, "min": sketch.min, "max": sketch.max}
+    for key, q in QUANTILES:
+        summary[key] = sketch.quantile(q)
+    return summary
+
+
+class FieldQuantiles(Aggregator):
+    """
+    Quantiles of numeric fields, overall and per HTTP status class.
+
+    Each field gets a DDSketch for all values plus one per status class
+    (``"2xx"`` ... ``"5xx"``) of the entries that have an integer status.
+    The default fields (VALUE_FIELDS: response sizes and Squid's elapsed
+    time) are read from batch columns; any other field (e.g. a JSON
+    ``latency_ms`` key) makes the aggregator read each entry's metadata.
+    """
+
+    name = "quantiles"
+
+    def __init__(self, fields: Iterable[str] = VALUE_FIELDS, name: Optional[str] = None):
+        """
+        Args:
+            fields: Metadata fields to summarize
+            name: Result name, to run several instances in one analysis
+        """
+        self.fields = tuple(fields)
+        if name:
+            self.name = name
+        # field -> "all" or status class -> sketch
+        self.sketches: dict[str, dict[str, DDSketch]] = {}
+
+    @property
+    def batched(self) -> bool:
+        return all(field in VALUE_FIELDS for field in self.fields)
+
+    def _sketch(self, field: str, group: str) -> DDSketch:
+        groups = self.sketches.setdefault(field, {})
+        sketch = groups.get(group)
+        if sketch is None:
+            sketch = groups[group] = DDSketch()
+        return sketch
+
+    def update(self, entry: LogEntry) -> None:
+        status_class = None
+        for field in self.fields:
+            value = to_number(entry.get(field))
+            if value is None:
+                continue
+            self._sketch(field, "all").add(value)
+            if status_class is None:
+                status_class = _status_class(entry.get("status")) or ""
+            if status_class:
+                self._sketch(field, status_class).add(value)
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        for field in self.fields:
+            column = batch.values.get(field)
+            if column is None:
+                continue
+            self._sketch(field, "all").update(column[1])
+            for status_class, values in values_by_status_class(batch, field).items():
+                self._sketch(field, status_class).update(values)
+
+    def merge(self, other: "FieldQuantiles") -> None:
+        for field, groups in other.sketches.items():
+            for group, sketch in groups.items():
+                self._sketch(field, group).merge(sketch)
+
+    def finalize(self) -> dict[str, Any]:
+        results = {}
+        for field in self.fields:
+            groups = self.sketches.get(field)
+            if groups:
+                results[field] = {
+                    **_summarize(groups["all"]),
+                    "by_status_class": {group: _summarize(groups[group]) for group in sorted(groups) if group != "all"},
+                }
+        return {self.name: results}
+
+    def to_state(self) -> dict:
+        return {
+            field: {group: sketch.to_state() for group, sketch in groups.items()}
+            for field, groups in self.sketches.items()
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.sketches = {
+            field: {group: DDSketch.from_state(sketch) for group, sketch in groups.items()}
+            for field, groups in state.items()
+        }
+
+
+def _encode_sample(sample: tuple[int, LogEntry]) -> list:
+    return [sample[0], _encode_entry(sample[1])]
+
+
+def _decode_sample(data: list) -> tuple[int, LogEntry]:
+    return data[0], _decode_entry(data[1])
+
+
+def _sample_identity(
+    position: int, timestamp: int, level: str, source: Optional[str], message: Optional[str]
+) -> str:
+    """
+    Identity of an entry for sampling, from fields available both as entries and as batch columns.
+
+    The position (the line's byte offset when known) keeps repeated lines
+    apart, so each occurrence is a candidate of its own.
+    """
+    return f"{position}\x1f{timestamp}\x1f{level}\x1f{source or ''}\x1f{message or ''}"
+
+
+class SampleAggregator(Aggregator):
+    """
+    Weighted random sample of the entries at the given levels.
+
+    Entries are sampled with WeightedReservoir, so every part of the file is
+    equally represented however the work was split. Each entry's key hashes
+    its fields together with the byte offset of its line (ParsedBatch.offsets),
+    so repeated lines are separate candidates; merging samples keeps the
+    entries with the largest keys over all parts, and every split of a file
+    draws the same sample. Entries fed one at a time, or in batches without
+    offsets, use their position in the part that saw them instead. Samples
+    are returned in file order.
+
+    With ``stratify``, entries are grouped by message template (their message
+    with numbers, IP addresses and IDs masked) and each of up to
+    ``max_samples`` templates keeps its own sample; the result takes one
+    entry per template in turn, so rare errors are not crowded out by a
+    frequent one.
+
+    Subclasses set ``levels`` and may weight levels with ``level_weights``.
+    """
+
+    levels: tuple[str, ...] = ()
+    level_weights: dict[str, float] = {}
+
+    def __init__(
+        self,
+        max_samples: int = DEFAULT_MAX_ERRORS,
+        stratify: bool = False,
+        weights: Optional[dict[str, float]] = None,
+    ):
+        """
+        Args:
+            max_samples: Maximum number of entries to keep
+            stratify: Sample each message template separately
+            weights: Sampling weight per level, overriding level_weights (default 1)
+        """
+        self.max_samples = max_samples
+        self.stratify = stratify
+        self.weights = {**self.level_weights, **(weights or {})}
+        # Template -> sample of (position, entry); a single "" stratum unless stratified
+        self.strata: dict[str, WeightedReservoir] = {}
+        # Entries at the sampled levels seen so far; positions order the samples
+        self.seen = 0
+
+    def _reservoir(self, stratum: str, key: float) -> Optional[WeightedReservoir]:
+        """Get the sample for a stratum, making room for a new one if its best key earns a place."""
+        reservoir = self.strata.get(stratum)
+        if reservoir is not None:
+            return reservoir
+        if len(self.strata) >= self.max_samples:
+            weakest = min(self.strata, key=lambda name: self.strata[name].best)
+            if key <= self.strata[weakest].best:
+                return None
+            del self.strata[weakest]
+        reservoir = self.strata[stratum] = WeightedReservoir(self.max_samples)
+        return reservoir
+
+    def update(self, entry: LogEntry) -> None:
+        if entry.level not in self.levels:
+            return
+        timestamp = epoch_micros(entry.timestamp) if entry.timestamp else TIMESTAMP_MISSING
+        identity = _sample_identity(self.seen, timestamp, entry.level, entry.source, entry.message)
+        key = WeightedReservoir.key(identity, self.weights.get(entry.level, 1.0))
+        reservoir = self._reservoir(mask_message(entry.message or "") if self.stratify else "", key)
+        if reservoir is not None:
+            reservoir.offer(key, self.seen, (self.seen, entry))
+        self.seen += 1
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        rows = rows_with(batch.levels, batch.level_names, self.levels)
+        if not rows:
+            return
+        timestamps, levels, sources, messages = batch.timestamps, batch.levels, batch.sources, batch.messages
+        level_names, source_names = batch.level_names, batch.source_names
+        offsets, line_indexes = batch.offsets, batch.line_indexes
+        weights = [self.weights.get(name, 1.0) for name in level_names]
+        # Stratum -> (key, row, position) per candidate
+        strata: dict[str, list[tuple[float, int, int]]] = {}
+        masked: dict[str, str] = {}
+        sample_key = WeightedReservoir.key
+        for position, row in enumerate(rows, self.seen):
+            level = levels[row]
+            source = sources[row]
+            message = messages[row]
+            identity = _sample_identity(
+                position if offsets is None else offsets[line_indexes[row]],
+                timestamps[row],
+                level_names[level],
+                source_names[source] if source != NO_ID else None,
+                message,
+            )
+            stratum = ""
+            if self.stratify:
+                message = message or ""
+                stratum = masked.get(message)
+                if stratum is None:
+                    stratum = masked[message] = mask_message(message)
+            strata.setdefault(stratum, []).append((sample_key(identity, weights[level]), row, position))
+        self.seen += len(rows)
+
+        for stratum, candidates in strata.items():
+            # Only the batch's best candidates can be kept; build entries for those alone
+            for key, row, position in heapq.nlargest(self.max_samples, candidates):
+                reservoir = self._reservoir(stratum, key)
+                if reservoir is None or key <= reservoir.threshold:
+                    break
+                reservoir.offer(key, position, (position, batch.entry(row)))
+
+    def merge(self, other: "SampleAggregator") -> None:
+        for stratum, sample in other.strata.items():
+            if not sample:
+                continue
+            reservoir = self._reservoir(stratum, sample.best)
+            if reservoir is not None:
+                # The other part follows this one; positions identify entries across parts
+                for key, _, (position, entry) in sample.entries():
+                    reservoir.offer(key, self.seen + position, (self.seen + position, entry))
+        self.seen += other.seen
+
+    def finalize(self) -> dict[str, Any]:
+        # Strata with the largest keys first, which favours templates with more entries
+        ranked = [sample.items() for _, sample in sorted(self.strata.items(), key=lambda item: -item[1].best)]
+        samples = [item for items in zip_longest(*ranked) for item in items if item is not None]
+        return {self.name: [entry for _, entry in sorted(samples[: self.max_samples], key=itemgetter(0))]}
+
+    def to_state(self) -> dict:
+        return {
+            "stratify": self.stratify,
+            "seen": self.seen,
+            "strata": {stratum: sample.to_state(_encode_sample) for stratum, sample in self.strata.items()},
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.stratify = state["stratify"]
+        self.seen = state["seen"]
+        self.strata = {
+            stratum: WeightedReservoir.from_state(sample, _decode_sample) for stratum, sample in state["strata"].items()
+        }
+
+
+class ErrorSamples(SampleAggregator):
+    """A sample of ERROR and CRITICAL entries, CRITICAL ones twice as likely to be picked."""
+
+    name = "errors"
+    levels = ERROR_LEVELS
+    level_weights = {"CRITICAL": 2.0}
+
+
+class WarningSamples(SampleAggregator):
+    """A sample of WARNING entries."""
+
+    name = "warnings"
+    levels = WARNING_LEVELS
+
+
+class TimeRange(Aggregator):
+    """Earliest and latest entry timestamps."""
+
+    name = "time_range"
+
+    def __init__(self):
+        self.earliest: Optional[datetime] = None
+        self.latest: Optional[datetime] = None
+
+    def _include(self, earliest: Optional[datetime], latest: Optional[datetime]) -> None:
+        if earliest and (self.earliest is None or earliest < self.earliest):
+            self.earliest = earliest
+        if latest and (self.latest is None or latest > self.latest):
+            self.latest = latest
+
+    def update(self, entry: LogEntry) -> None:
+        self._include(entry.timestamp, entry.timestamp)
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        self._include(batch.earliest, batch.latest)
+
+    def merge(self, other: "TimeRange") -> None:
+        self._include(other.earliest, other.latest)
+
+    def finalize(self) -> dict[str, Any]:
+        return {"earliest": self.earliest, "latest": self.latest}
+
+    def to_state(self) -> dict:
+        return {"earliest": _encode_timestamp(self.earliest), "latest": _encode_timestamp(self.latest)}
+
+    def load_state(self, state: dict) -> None:
+        self.earliest = _decode_timestamp(state["earliest"])
+        self.latest = _decode_timestamp(state["latest"])
+
+
+class LevelTimeSeries(Aggregator):
+    """
+    Entries per level per fixed time bucket, for every parsed entry.
+
+    Buckets are ``bucket_seconds`` wide and keyed by their start in Unix
+    seconds (UTC; naive timestamps are taken to be UTC). Analytics roll them
+    up into coarser buckets, so the series covers the whole file however
+    many samples are kept.
+    """
+
+    name = "time_series"
+
+    def __init__(self, bucket_seconds: int = TIME_SERIES_BUCKET_SECONDS):
+        """
+        Args:
+            bucket_seconds: Bucket width in seconds
+        """
+        self.bucket_seconds = bucket_seconds
+        self.counts: dict[str, Counter] = {}
+
+    def _counter(self, level: str) -> Counter:
+        counter = self.counts.get(level)
+        if counter is None:
+            counter = self.counts[level] = Counter()
+        return counter
+
+    def update(self, entry: LogEntry) -> None:
+        if entry.level is None or entry.timestamp is None:
+            return
+        bucket = epoch_micros(entry.timestamp) // (self.bucket_seconds * 1_000_000) * self.bucket_seconds
+        self._counter(entry.level)[bucket] += 1
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        for level, counts in count_time_buckets(batch, self.bucket_seconds).items():
+            self._counter(level).update(counts)
+
+    def merge(self, other: "LevelTimeSeries") -> None:
+        for level, counts in other.counts.items():
+            self._counter(level).update(counts)
+
+    def finalize(self) -> dict[str, Any]:
+        return {self.name: {level: dict(sorted(counts.items())) for level, counts in self.counts.items()}}
+
+    def to_state(self) -> dict:
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "counts": {
+                level: [[bucket, count] for bucket, count in counts.items()] for level, counts in self.counts.items()
+            },
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.bucket_seconds = state["bucket_seconds"]
+        self.counts = {level: Counter(dict(pairs)) for level, pairs in state["counts"].items()}
+
+
+def default_aggregators(max_errors: int = DEFAULT_MAX_ERRORS, stratify_samples: bool = False) -> list[Aggregator]:
+    """
+    Create the aggregators behind the standard AnalysisResult fields.
+
+    Args:
+        max_errors: Maximum errors/warnings to keep as samples
+        stratify_samples: Sample errors/warnings per message template
+
+    Returns:
+        Fresh, empty aggregators
+    """
+    return [
+        LevelCounts(),
+        StatusCodeCounts(),
+        SourceCounts(),
+        ErrorMessageCounts(),
+        ErrorTemplates(),
+        DistinctCounts(),
+        FieldQuantiles(),
+        ErrorSamples(max_errors, stratify=stratify_samples),
+        WarningSamples(max_errors, stratify=stratify_samples),
+        TimeRange(),
+        LevelTimeSeries(),
+    ]
+
+
+# Names of the aggregators default_aggregators() creates
+DEFAULT_AGGREGATOR_NAMES = tuple(aggregator.name for aggregator in default_aggregators())
+
+
+class AnalysisState:
+    """
+    Line counters plus aggregators for one part of a log file.
+
+    States for consecutive parts combine with merge(). Indexing a state by
+    result name (``state["level_counts"]``, ``state["total_lines"]``,
+    ``state["earliest"]``, ...) reads the finalized results.
+
+    Attributes:
+        total_lines: Lines read, including blank and unparsed lines
+        parsed_lines: Lines the parser accepted
+        failed_lines: Non-blank lines the parser rejected
+        format_counts: Parsed lines per format when lines are routed between
+            formats (see log_analyzer.router), empty otherwise
+        aggregators: Aggregators by name
+    """
+
+    def __init__(self, aggregators: Iterable[Aggregator]):
+        """
+        Create an empty state.
+
+        Args:
+            aggregators: Fresh aggregators to feed
+
+        Raises:
+            ValueError: If two aggregators share a name
+        """
+        self.total_lines = 0
+        self.parsed_lines = 0
+        self.failed_lines = 0
+        self.format_counts: Counter = Counter()
+        self.aggregators: dict[str, Aggregator] = {}
+        for aggregator in aggregators:
+            if aggregator.name in self.aggregators:
+                raise ValueError(f"Duplicate aggregator name: '{aggregator.name}'")
+            self.aggregators[aggregator.name] = aggregator
+
+    @classmethod
+    def create(
+        cls, max_errors: int, extra: Iterable[AggregatorFactory] = (), stratify_samples: bool = False
+    ) -> "AnalysisState":
+        """
+        Create an empty state with the default aggregators and any extra ones.
+
+        Args:
+            max_errors: Maximum errors/warnings to keep as samples
+            extra: Factories for additional aggregators
+            stratify_samples: Sample errors/warnings per message template
+
+        Returns:
+            The new AnalysisState
+        """
+        return cls([*default_aggregators(max_errors, stratify_samples), *(factory() for factory in extra)])
+
+    def entry_aggregators(self) -> list[Aggregator]:
+        """Get the aggregators that need LogEntry objects rather than batch columns."""
+        return [aggregator for aggregator in self.aggregators.values() if not aggregator.batched]
+
+    def update(self, entry: Optional[LogEntry]) -> None:
+        """
+        Account for one non-blank line.
+
+        Args:
+            entry: The parsed entry, or None if the parser rejected the line
+        """
+        self.total_lines += 1
+        if entry is None:
+            self.failed_lines += 1
+            return
+        self.parsed_lines += 1
+        for aggregator in self.aggregators.values():
+            aggregator.update(entry)
+
+    def update_batch(self, batch: ParsedBatch, entries_seen: bool = False) -> None:
+        """
+        Account for a columnar batch.
+
+        Args:
+            batch: Parsed batch
+            entries_seen: The aggregators from entry_aggregators() were already
+                fed every entry in the batch (ParsedBatch.from_lines(on_entry=...))
+        """
+        self.total_lines += batch.total_lines
+        self.parsed_lines += len(batch)
+        self.failed_lines += batch.failed_lines
+        self.format_counts.update(batch.format_counts)
+        for aggregator in self.aggregators.values():
+            if not entries_seen or aggregator.batched:
+                aggregator.update_batch(batch)
+
+    def merge(self, other: "AnalysisState") -> None:
+        """
+        Fold in the state for the lines that follow this one's, in place.
+
+        Raises:
+            ValueError: If the states were created with different aggregators
+        """
+        if other.aggregators.keys() != self.aggregators.keys():
+            raise ValueError("Cannot merge analysis states with different aggregators")
+        self.total_lines += other.total_lines
+        self.parsed_lines += other.parsed_lines
+        self.failed_lines += other.failed_lines
+        self.format_counts.update(other.format_counts)
+        for name, aggregator in self.aggregators.items():
+            aggregator.merge(other.aggregators[name])
+
+    def results(self) -> dict[str, Any]:
+        """Get line counts and every aggregator's finalized results."""
+        results = {
+            "total_lines": self.total_lines,
+            "parsed_lines": self.parsed_lines,
+            "failed_lines": self.failed_lines,
+            "format_counts": dict(self.format_counts),
+        }
+        for aggregator in self.aggregators.values():
+            results.update(aggregator.finalize())
+        return results
+
+    def extra_results(self) -> dict[str, Any]:
+        """Get the finalized results of the aggregators beyond the default ones."""
+        results = {}
+        for name, aggregator in self.aggregators.items():
+            if name not in DEFAULT_AGGREGATOR_NAMES:
+                results.update(aggregator.finalize())
+        return results
+
+    def __getitem__(self, key: str) -> Any:
+        return self.results()[key]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the state to JSON-safe data for a checkpoint."""
+        return {
+            "total_lines": self.total_lines,
+            "parsed_lines": self.parsed_lines,
+            "failed_lines": self.failed_lines,
+            "format_counts": dict(self.format_counts),
+            "aggregators": {name: aggregator.to_state() for name, aggregator in self.aggregators.items()},
+        }
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """
+        Restore the output of to_dict() into this state's aggregators.
+
+        Raises:
+            ValueError: If the data has no state for one of the aggregators
+        """
+        stored = data["aggregators"]
+        missing = [name for name in self.aggregators if name not in stored]
+        if missing:
+            raise ValueError(f"No saved state for aggregators: {', '.join(missing)}")
+        self.total_lines = data["total_lines"]
+        self.parsed_lines = data["parsed_lines"]
+        self.failed_lines = data["failed_lines"]
+        self.format_counts = Counter(data["format_counts"])
+        for name, aggregator in self.aggregators.items():
+            aggregator.load_state(stored[name])
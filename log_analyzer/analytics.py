@@ -8,9 +8,11 @@ and pattern mining capabilities for log data.
 import logging
 import statistics
 from collections import Counter
-from datetime import datetime, timedelta
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from .columnar import ERROR_LEVELS, WARNING_LEVELS
 from .constants import (
     DEFAULT_TIME_BUCKET_SIZE,
 )
@@ -26,6 +28,8 @@ __all__ = [
     "compute_hourly_distribution",
     "detect_trend",
     "identify_peak_period",
+    "rollup_time_series",
+    "time_series_hourly_distribution",
 ]
 
 
@@ -52,19 +56,7 @@ def compute_temporal_distribution(entries: list[LogEntry], bucket_size: str = "1
         {'2024-02-09T14:00:00': 45, '2024-02-09T15:00:00': 52, ...}
     """
     bucket_counts = Counter()
-
-    # Parse bucket size
-    if bucket_size == "5min":
-        delta = timedelta(minutes=5)
-    elif bucket_size == "15min":
-        delta = timedelta(minutes=15)
-    elif bucket_size == "1h":
-        delta = timedelta(hours=1)
-    elif bucket_size == "1day":
-        delta = timedelta(days=1)
-    else:
-        logger.warning(f"Unknown bucket size '{bucket_size}', defaulting to 1h")
-        delta = timedelta(hours=1)
+    delta = _bucket_delta(bucket_size)
 
     for entry in entries:
         if entry.timestamp is None:
@@ -78,6 +70,33 @@ def compute_temporal_distribution(entries: list[LogEntry], bucket_size: str = "1
     return dict(bucket_counts)
 
 
+def _bucket_delta(bucket_size: str) -> timedelta:
+    """
+    Parse a bucket size name.
+
+    Args:
+        bucket_size: '5min', '15min', '1h' or '1day'
+
+    Returns:
+        Bucket size as timedelta (1 hour for unknown names)
+    """
+    if bucket_size == "5min":
+        return timedelta(minutes=5)
+    if bucket_size == "15min":
+        return timedelta(minutes=15)
+    if bucket_size == "1h":
+        return timedelta(hours=1)
+    if bucket_size == "1day":
+        return timedelta(days=1)
+    logger.warning(f"Unknown bucket size '{bucket_size}', defaulting to 1h")
+    return timedelta(hours=1)
+
+
+def _bucket_start(seconds: int) -> datetime:
+    """Convert a time-series bucket key (Unix seconds) to a naive UTC datetime."""
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
 def _round_to_bucket(timestamp: datetime, delta: timedelta) -> datetime:
     """
     Round timestamp down to the nearest bucket boundary.
@@ -132,6 +151,65 @@ def compute_hourly_distribution(entries: list[LogEntry]) -> dict[int, int]:
     return dict(hourly_counts)
 
 
+def rollup_time_series(counts: dict[int, int], bucket_size: str = "1h") -> dict[str, int]:
+    """
+    Sum a fine-grained time series into coarser time buckets.
+
+    Unlike compute_temporal_distribution(), buckets without entries between
+    the first and the last one are included with a count of 0, so trends
+    and peaks see the quiet periods too.
+
+    Args:
+        counts: Entries per bucket start (Unix seconds, UTC), as in
+            AnalysisResult.time_series[level]
+        bucket_size: Bucket size - '5min', '15min', '1h', '1day'
+
+    Returns:
+        Dictionary mapping time bucket (ISO format string, UTC) to count, in time order
+
+    Example:
+        >>> rollup_time_series({1707487200: 3, 1707487500: 4, 1707494400: 1}, '1h')
+        {'2024-02-09T14:00:00': 7, '2024-02-09T15:00:00': 0, '2024-02-09T16:00:00': 1}
+    """
+    if not counts:
+        return {}
+    delta = _bucket_delta(bucket_size)
+    totals = Counter()
+    for seconds, count in counts.items():
+        totals[_round_to_bucket(_bucket_start(seconds), delta)] += count
+
+    bucket, last = min(totals), max(totals)
+    series = {}
+    while bucket <= last:
+        series[bucket.isoformat()] = totals[bucket]
+        bucket += delta
+    return series
+
+
+def time_series_hourly_distribution(counts: dict[int, int]) -> dict[int, int]:
+    """
+    Compute distribution by hour of day (0-23, UTC) from a time series.
+
+    Args:
+        counts: Entries per bucket start (Unix seconds, UTC)
+
+    Returns:
+        Dictionary mapping hour (0-23) to count
+    """
+    hourly_counts = Counter()
+    for seconds, count in counts.items():
+        hourly_counts[_bucket_start(seconds).hour] += count
+    return dict(hourly_counts)
+
+
+def _sum_levels(time_series: dict[str, dict[int, int]], levels: Iterable[str]) -> Counter:
+    """Add up the series of several levels."""
+    total = Counter()
+    for level in levels:
+        total.update(time_series.get(level, {}))
+    return total
+
+
 def detect_trend(temporal_dist: dict[str, int]) -> str:
     """
     Detect overall trend in temporal distribution.
@@ -235,6 +313,7 @@ def compute_analytics(
     level_counts: dict,
     source_counts: dict,
     config: Optional[dict] = None,
+    time_series: Optional[dict[str, dict[int, int]]] = None,
 ) -> AnalyticsData:
     """
     Compute advanced analytics from log analysis data.
@@ -253,6 +332,9 @@ def compute_analytics(
             - enable_statistics: bool (default: True)
             - enable_anomaly_detection: bool (default: False)
             - enable_pattern_mining: bool (default: False)
+        time_series: Per-level counts for the whole file (AnalysisResult.time_series).
+            When given, time-series analytics use it instead of the errors and
+            warnings lists, which only hold samples.
 
     Returns:
         AnalyticsData object with computed analytics
@@ -283,8 +365,16 @@ def compute_analytics(
         bucket_size = config.get("time_bucket_size", DEFAULT_TIME_BUCKET_SIZE)
 
         logger.debug(f"Computing time-series analytics (bucket_size={bucket_size})")
-        analytics.temporal_distribution = compute_temporal_distribution(all_entries, bucket_size)
-        analytics.hourly_distribution = compute_hourly_distribution(all_entries)
+        if time_series is not None:
+            problems = _sum_levels(time_series, ERROR_LEVELS + WARNING_LEVELS)
+            analytics.temporal_distribution = rollup_time_series(problems, bucket_size)
+            analytics.hourly_distribution = time_series_hourly_distribution(problems)
+            analytics.level_distribution = {
+                level: rollup_time_series(counts, bucket_size) for level, counts in time_series.items()
+            }
+        else:
+            analytics.temporal_distribution = compute_temporal_distribution(all_entries, bucket_size)
+            analytics.hourly_distribution = compute_hourly_distribution(all_entries)
         analytics.trend_direction = detect_trend(analytics.temporal_distribution)
         analytics.peak_period = identify_peak_period(analytics.temporal_distribution)
 
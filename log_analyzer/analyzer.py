@@ -6,18 +6,42 @@ including error detection, pattern recognition, and statistics.
 """
 
 import logging
+import math
 import os
 import time
 from collections import Counter
-from collections.abc import Iterator
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from threading import Lock
-from typing import Any, Optional
+from functools import partial
+from itertools import chain, islice, tee
+from operator import itemgetter
+from typing import Any, Optional, Union
 
+from .aggregators import EXTRA_QUANTILES_NAME, AggregatorFactory, AnalysisState, FieldQuantiles
 from .analytics import compute_analytics
-from .constants import COUNTER_PRUNE_TO, DEFAULT_MAX_ERRORS, DEFAULT_SAMPLE_SIZE, MAX_COUNTER_SIZE
+from .checkpoint import AnalysisCheckpoint, checkpoint_path_for, committed_length
+from .classifier import classifier_for
+from .columnar import ParsedBatch
+from .constants import (
+    DEFAULT_BYTE_RANGE_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_ERRORS,
+    DEFAULT_SAMPLE_SIZE,
+    DETECTION_CONFIDENCE_Z,
+    DETECTION_MIN_SAMPLES,
+    PIPELINE_QUEUE_DEPTH_PER_WORKER,
+)
+from .index import LineIndex, iter_time_range
 from .parsers import (
     AndroidParser,
     ApacheAccessParser,
@@ -45,7 +69,8 @@ from .parsers import (
     UniversalFallbackParser,
     WindowsEventParser,
 )
-from .reader import LogReader
+from .reader import LogReader, detect_compression
+from .router import MixedFormatParser
 
 logger = logging.getLogger(__name__)
 
@@ -82,15 +107,36 @@ AVAILABLE_PARSERS = [
 # Full parser list including universal fallback (for use when no format detected)
 ALL_PARSERS_WITH_FALLBACK = AVAILABLE_PARSERS + [UniversalFallbackParser()]
 
+# Parallel execution backends accepted by LogAnalyzer(executor=...)
+EXECUTOR_TYPES = ("thread", "process")
+
 
 __all__ = [
     "AVAILABLE_PARSERS",
     "ALL_PARSERS_WITH_FALLBACK",
+    "EXECUTOR_TYPES",
     "AnalysisResult",
     "LogAnalyzer",
+    "get_parser",
 ]
 
 
+def get_parser(name: str) -> Optional[BaseParser]:
+    """
+    Look up a registered parser (including the universal fallback) by name.
+
+    Args:
+        name: Parser name, e.g. "apache_access" or "universal"
+
+    Returns:
+        The registered parser instance, or None if no parser has that name
+    """
+    for parser in ALL_PARSERS_WITH_FALLBACK:
+        if parser.name == name:
+            return parser
+    return None
+
+
 @dataclass
 class AnalysisResult:
     """
@@ -117,10 +163,27 @@ class AnalysisResult:
     # Pattern analysis
     top_sources: list = field(default_factory=list)
     top_errors: list = field(default_factory=list)
+    # (template, count, example message) for ERROR/CRITICAL messages clustered by template
+    top_error_templates: list = field(default_factory=list)
 
     # HTTP specific (for access logs)
     status_codes: dict = field(default_factory=dict)
 
+    # Lines parsed per format when analyze(mixed_formats=True) routed each line
+    format_counts: dict = field(default_factory=dict)
+
+    # Estimated distinct sources, users, paths and error messages (HyperLogLog)
+    distinct_counts: dict = field(default_factory=dict)
+
+    # p50/p90/p99/p999 of numeric fields (size, duration_ms, ...), overall and per status class
+    quantiles: dict = field(default_factory=dict)
+
+    # Entries per level per TIME_SERIES_BUCKET_SECONDS bucket, keyed by bucket start (Unix seconds, UTC)
+    time_series: dict = field(default_factory=dict)
+
+    # Results of extra aggregators passed to LogAnalyzer(aggregators=...)
+    aggregates: dict = field(default_factory=dict)
+
     # Advanced analytics (optional, Phase 3B)
     analytics: Optional[Any] = None  # AnalyticsData when computed
 
@@ -154,18 +217,50 @@ class LogAnalyzer:
     Handles format detection, parsing, and comprehensive analysis.
     """
 
-    def __init__(self, parsers: list[BaseParser] = None, max_workers: Optional[int] = None):
+    def __init__(
+        self,
+        parsers: list[BaseParser] = None,
+        max_workers: Optional[int] = None,
+        executor: str = "thread",
+        aggregators: Optional[list[AggregatorFactory]] = None,
+        quantile_fields: Optional[list[str]] = None,
+        stratify_samples: bool = False,
+    ):
         """
         Initialize the analyzer.
 
         Args:
             parsers: List of parsers to use. Defaults to all available parsers.
-            max_workers: Maximum number of worker threads. If None, uses config value
-                        or CPU count.
+            max_workers: Maximum number of worker threads or processes. If None,
+                        uses config value or CPU count.
+            executor: Parallel backend, "thread" (default) or "process". Parsing is
+                     pure-Python and GIL-bound, so "process" scales with cores on
+                     large files; it always uses byte-range mode.
+            aggregators: Factories for extra aggregators (see log_analyzer.aggregators)
+                        to run in the same pass as the built-in ones. Each chunk or
+                        worker calls them for fresh instances, so they must be picklable
+                        for the process executor. Results go to AnalysisResult.aggregates.
+            quantile_fields: Extra numeric metadata fields (e.g. JSON keys such as
+                            "latency_ms") to report quantiles for in AnalysisResult.quantiles,
+                            besides the built-in response size and elapsed time fields.
+            stratify_samples: Sample errors and warnings per message template, so a
+                             frequent error does not crowd rarer ones out of
+                             AnalysisResult.errors/warnings.
+
+        Raises:
+            ValueError: If executor is not a known backend
         """
         from .config import get_config
 
+        if executor not in EXECUTOR_TYPES:
+            raise ValueError(f"Unknown executor '{executor}', expected one of: {', '.join(EXECUTOR_TYPES)}")
+
         self.parsers = parsers or AVAILABLE_PARSERS
+        self.executor = executor
+        self.aggregators = list(aggregators or [])
+        if quantile_fields:
+            self.aggregators.append(partial(FieldQuantiles, tuple(quantile_fields), name=EXTRA_QUANTILES_NAME))
+        self.stratify_samples = stratify_samples
 
         # Determine max_workers: explicit param > config > CPU count
         if max_workers is not None:
@@ -174,26 +269,7 @@ class LogAnalyzer:
             config = get_config()
             self.max_workers = config.max_workers or os.cpu_count() or 4
 
-        logger.debug(f"LogAnalyzer initialized with max_workers={self.max_workers}")
-
-    @staticmethod
-    def _prune_counter(counter: Counter, max_size: int = MAX_COUNTER_SIZE, prune_to: int = COUNTER_PRUNE_TO) -> None:
-        """
-        Prune a Counter to prevent unbounded memory growth.
-
-        Keeps only the most common items when counter exceeds max_size.
-
-        Args:
-            counter: Counter to prune (modified in-place)
-            max_size: Maximum size before pruning
-            prune_to: Number of items to keep after pruning
-        """
-        if len(counter) > max_size:
-            # Keep only the most common items
-            top_items = counter.most_common(prune_to)
-            counter.clear()
-            counter.update(dict(top_items))
-            logger.debug(f"Pruned Counter from {max_size}+ items to {len(counter)} items")
+        logger.debug(f"LogAnalyzer initialized with max_workers={self.max_workers}, executor={self.executor}")
 
     def _analyze_multithreaded(
         self,
@@ -222,63 +298,333 @@ class LogAnalyzer:
         Returns:
             AnalysisResult with all analysis data
         """
-        reader = LogReader(filepath)
+        reader = LogReader(filepath, decompress_workers=self.max_workers)
+
+        # Reader stage (this thread) -> bounded set of in-flight chunks -> parser pool.
+        # Once max_in_flight chunks are queued or parsing, reading waits for one to
+        # finish, so at most ~max_in_flight * chunk_size lines are held at a time.
+        max_in_flight = self.max_workers * PIPELINE_QUEUE_DEPTH_PER_WORKER
+        logger.debug(f"Streaming chunks of {chunk_size} lines, at most {max_in_flight} in flight")
+
+        merged = AnalysisState.create(max_errors, self.aggregators, self.stratify_samples)
+        pending: dict[Future, int] = {}
+        # Results that finished ahead of an earlier chunk, folded once the gap closes
+        finished: dict[int, AnalysisState] = {}
+        next_to_fold = 0
+        chunk_count = 0
+
+        def collect(drain_all: bool) -> None:
+            """Wait for at least one pending chunk (every pending chunk if drain_all) and fold what is ready."""
+            nonlocal next_to_fold
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=ALL_COMPLETED if drain_all else FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing chunk: {e}", exc_info=True)
+                    raise
+                finished[index] = result
+
+                # Progress follows parsing, not reading
+                if progress_callback and hasattr(progress_callback, "update"):
+                    progress_callback.update(advance=result.total_lines)
+
+            # Fold in file order so errors/warnings keep the order they appear in
+            while next_to_fold in finished:
+                merged.merge(finished.pop(next_to_fold))
+                next_to_fold += 1
 
-        # Read file into chunks
-        chunks = []
-        current_chunk = []
-        total_lines = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                try:
+                    for chunk, offsets in _iter_chunks(reader.read_blocks(), chunk_size):
+                        if len(pending) >= max_in_flight:
+                            collect(drain_all=False)
+                        pending[executor.submit(self._process_chunk, chunk, parser, max_errors, offsets)] = chunk_count
+                        chunk_count += 1
+
+                    collect(drain_all=True)
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
 
-        logger.debug("Reading file into chunks for parallel processing")
-        for line in reader.read_lines():
-            total_lines += 1
-            current_chunk.append(line)
+        except KeyboardInterrupt:
+            logger.info("Analysis cancelled by user during multithreaded processing")
+            raise
 
-            if len(current_chunk) >= chunk_size:
-                chunks.append(current_chunk)
-                current_chunk = []
+        logger.info(f"Processed {merged.total_lines:,} lines in {chunk_count} chunks of ~{chunk_size} lines")
 
-        # Add remaining lines
-        if current_chunk:
-            chunks.append(current_chunk)
+        return self._merge_chunk_results(
+            filepath=filepath,
+            parser=parser,
+            total_lines=merged.total_lines,
+            chunk_results=[merged],
+            max_errors=max_errors,
+            start_time=start_time,
+            enable_analytics=enable_analytics,
+            analytics_config=analytics_config,
+        )
 
-        logger.info(f"Split {total_lines:,} lines into {len(chunks)} chunks of ~{chunk_size} lines")
+    def _collect_byte_ranges(
+        self,
+        filepath: str,
+        parser: BaseParser,
+        max_errors: int,
+        progress_callback: Optional[Any],
+        byte_range_size: int,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AnalysisState:
+        """
+        Aggregate a span of the file in parallel, one newline-aligned byte range per task.
+
+        Like the chunk pipeline in _analyze_multithreaded, at most
+        max_workers * PIPELINE_QUEUE_DEPTH_PER_WORKER ranges are submitted at
+        a time, and finished ranges are folded in file order as soon as the
+        ranges before them are, so memory does not grow with the number of
+        ranges.
+
+        Args:
+            filepath: Path to log file
+            parser: Parser to use
+            max_errors: Maximum errors/warnings to collect per range
+            progress_callback: Optional progress callback
+            byte_range_size: Approximate number of bytes per range
+            start: Byte offset where the span starts (must be at a line start)
+            end: Byte offset where the span ends (default: end of file)
+
+        Returns:
+            Combined aggregate of every range (see _aggregate_lines)
+        """
+        reader = LogReader(filepath)
+        ranges = reader.split_byte_ranges(byte_range_size, start=start, end=end)
+        max_in_flight = self.max_workers * PIPELINE_QUEUE_DEPTH_PER_WORKER
+        logger.info(
+            f"Split {len(ranges)} byte ranges of ~{byte_range_size:,} bytes, at most {max_in_flight} in flight"
+        )
 
-        # Process chunks in parallel
-        chunk_results = []
-        progress_lock = Lock()
-        lines_processed = 0
+        # Process workers get the parser by name; thread workers share the instance
+        parser_ref: Union[BaseParser, str] = parser
+        pool_class: type[Executor] = ThreadPoolExecutor
+        if self.executor == "process":
+            pool_class = ProcessPoolExecutor
+            registered = get_parser(parser.name)
+            if registered is not None and type(registered) is type(parser):
+                parser_ref = parser.name
+
+        merged = AnalysisState.create(max_errors, self.aggregators, self.stratify_samples)
+        pending: dict[Future, int] = {}
+        # Results that finished ahead of an earlier range, folded once the gap closes
+        finished: dict[int, AnalysisState] = {}
+        next_to_fold = 0
+
+        def collect(drain_all: bool) -> None:
+            """Wait for at least one pending range (every pending range if drain_all) and fold what is ready."""
+            nonlocal next_to_fold
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=ALL_COMPLETED if drain_all else FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing byte range: {e}", exc_info=True)
+                    raise
+                finished[index] = result
+
+                if progress_callback and hasattr(progress_callback, "update"):
+                    progress_callback.update(advance=result.total_lines)
+
+            # Fold in file order so errors/warnings keep the order they appear in
+            while next_to_fold in finished:
+                merged.merge(finished.pop(next_to_fold))
+                next_to_fold += 1
 
         try:
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Submit all chunks
-                future_to_chunk = {
-                    executor.submit(self._process_chunk, chunk, parser, max_errors): i for i, chunk in enumerate(chunks)
-                }
-
-                # Collect results as they complete
-                for future in as_completed(future_to_chunk):
-                    try:
-                        result = future.result()
-                        chunk_results.append(result)
-
-                        # Update progress
-                        if progress_callback and hasattr(progress_callback, "update"):
-                            with progress_lock:
-                                lines_in_chunk = result["parsed_lines"] + result["failed_lines"]
-                                progress_callback.update(advance=lines_in_chunk)
-                                lines_processed += lines_in_chunk
-
-                    except Exception as e:
-                        logger.error(f"Error processing chunk: {e}", exc_info=True)
-                        raise
+            with pool_class(max_workers=self.max_workers) as executor:
+                try:
+                    for i, (range_start, range_end) in enumerate(ranges):
+                        if len(pending) >= max_in_flight:
+                            collect(drain_all=False)
+                        future = executor.submit(
+                            _process_byte_range,
+                            str(reader.filepath),
+                            parser_ref,
+                            range_start,
+                            range_end,
+                            max_errors,
+                            reader.encoding,
+                            self.aggregators,
+                            self.stratify_samples,
+                        )
+                        pending[future] = i
+
+                    collect(drain_all=True)
+                except BaseException:
+                    for future in pending:
+                        future.cancel()
+                    raise
 
         except KeyboardInterrupt:
-            logger.info("Analysis cancelled by user during multithreaded processing")
+            logger.info("Analysis cancelled by user during byte-range processing")
             raise
 
-        # Merge results from all chunks
-        logger.debug("Merging results from all worker threads")
+        return merged
+
+    def _analyze_byte_ranges(
+        self,
+        filepath: str,
+        parser: BaseParser,
+        max_errors: int,
+        progress_callback: Optional[Any],
+        byte_range_size: int,
+        start_time: float,
+        enable_analytics: bool = False,
+        analytics_config: Optional[dict] = None,
+    ) -> AnalysisResult:
+        """
+        Analyze log file by handing each worker its own newline-aligned byte range.
+
+        Unlike _analyze_multithreaded, the main thread never reads lines: it
+        only computes range boundaries, and every worker streams its own
+        range from disk. Only a bounded number of ranges are in flight and
+        results are folded as they finish, so peak memory depends on the
+        worker count rather than the file size.
+
+        With the process executor, workers receive only the parser name and
+        byte offsets, and send back their AnalysisState.
+
+        Args:
+            filepath: Path to log file
+            parser: Parser to use
+            max_errors: Maximum errors/warnings to collect
+            progress_callback: Optional progress callback
+            byte_range_size: Approximate number of bytes per worker range
+            start_time: Analysis start time
+            enable_analytics: Whether to compute analytics
+            analytics_config: Optional analytics configuration
+
+        Returns:
+            AnalysisResult with all analysis data
+        """
+        state = self._collect_byte_ranges(filepath, parser, max_errors, progress_callback, byte_range_size)
+
+        return self._merge_chunk_results(
+            filepath=filepath,
+            parser=parser,
+            total_lines=state.total_lines,
+            chunk_results=[state],
+            max_errors=max_errors,
+            start_time=start_time,
+            enable_analytics=enable_analytics,
+            analytics_config=analytics_config,
+        )
+
+    def _analyze_incremental(
+        self,
+        filepath: str,
+        parser: BaseParser,
+        max_errors: int,
+        progress_callback: Optional[Any],
+        use_threading: bool,
+        byte_range_size: int,
+        start_time: float,
+        checkpoint: Optional[AnalysisCheckpoint] = None,
+        enable_analytics: bool = False,
+        analytics_config: Optional[dict] = None,
+    ) -> AnalysisResult:
+        """
+        Analyze only the bytes appended since the last checkpoint.
+
+        Complete lines after the checkpoint offset are aggregated (in byte
+        ranges when threading is enabled), combined with the checkpointed
+        state and written back as the new checkpoint. A trailing line without
+        a newline is included in the result but not in the checkpoint, since
+        it may still be being written.
+
+        Args:
+            filepath: Path to an uncompressed log file
+            parser: Parser to use
+            max_errors: Maximum errors/warnings to collect
+            progress_callback: Optional progress callback
+            use_threading: Whether to aggregate new bytes in parallel
+            byte_range_size: Approximate number of bytes per worker range
+            start_time: Analysis start time
+            checkpoint: Valid checkpoint to resume from, or None for a full scan
+            enable_analytics: Whether to compute analytics
+            analytics_config: Optional analytics configuration
+
+        Returns:
+            AnalysisResult for the whole file
+        """
+        reader = LogReader(filepath)
+        size = os.stat(reader.filepath).st_size
+        committed = committed_length(str(reader.filepath), size)
+
+        parts = []
+        start = 0
+        if checkpoint is not None:
+            start = checkpoint.offset
+            parts.append(checkpoint.state)
+            logger.info(f"Resuming from checkpoint at byte {start:,} ({checkpoint.state.total_lines:,} lines)")
+            if progress_callback and hasattr(progress_callback, "update"):
+                progress_callback.update(advance=checkpoint.state.total_lines)
+
+        if start < committed:
+            if use_threading:
+                parts.append(
+                    self._collect_byte_ranges(
+                        filepath,
+                        parser,
+                        max_errors,
+                        progress_callback,
+                        byte_range_size,
+                        start=start,
+                        end=committed,
+                    )
+                )
+            else:
+                part = _process_byte_range(
+                    str(reader.filepath),
+                    parser,
+                    start,
+                    committed,
+                    max_errors,
+                    aggregators=self.aggregators,
+                    stratify_samples=self.stratify_samples,
+                )
+                parts.append(part)
+                if progress_callback and hasattr(progress_callback, "update"):
+                    progress_callback.update(advance=part.total_lines)
+
+        state = _combine_aggregates(parts, max_errors, self.aggregators, self.stratify_samples)
+        try:
+            AnalysisCheckpoint.capture(filepath, parser.name, committed, max_errors, state, self.stratify_samples).save(
+                checkpoint_path_for(filepath)
+            )
+        except OSError as e:
+            logger.warning(f"Could not save checkpoint for {filepath}: {e}")
+
+        chunk_results = [state]
+        if committed < size:
+            chunk_results.append(
+                _process_byte_range(
+                    str(reader.filepath),
+                    parser,
+                    committed,
+                    size,
+                    max_errors,
+                    aggregators=self.aggregators,
+                    stratify_samples=self.stratify_samples,
+                )
+            )
+        total_lines = sum(result.total_lines for result in chunk_results)
+
         return self._merge_chunk_results(
             filepath=filepath,
             parser=parser,
@@ -295,7 +641,7 @@ class LogAnalyzer:
         filepath: str,
         parser: BaseParser,
         total_lines: int,
-        chunk_results: list[dict],
+        chunk_results: list[AnalysisState],
         max_errors: int,
         start_time: float,
         enable_analytics: bool = False,
@@ -308,7 +654,7 @@ class LogAnalyzer:
             filepath: Path to log file
             parser: Parser used
             total_lines: Total lines in file
-            chunk_results: List of results from each chunk
+            chunk_results: Aggregated state of each chunk, in file order
             max_errors: Maximum errors/warnings to keep
             start_time: Analysis start time
             enable_analytics: Whether to compute analytics
@@ -317,46 +663,20 @@ class LogAnalyzer:
         Returns:
             Merged AnalysisResult
         """
-        # Aggregate counters
-        parsed_lines = 0
-        failed_lines = 0
-        level_counts = Counter()
-        status_codes = Counter()
-        source_counts = Counter()
-        error_messages = Counter()
-
-        errors = []
-        warnings = []
-
-        earliest = None
-        latest = None
-
-        for result in chunk_results:
-            parsed_lines += result["parsed_lines"]
-            failed_lines += result["failed_lines"]
-
-            level_counts.update(result["level_counts"])
-            status_codes.update(result["status_codes"])
-            source_counts.update(result["source_counts"])
-            error_messages.update(result["error_messages"])
-
-            errors.extend(result["errors"])
-            warnings.extend(result["warnings"])
-
-            # Track earliest/latest timestamps
-            if result["earliest"] and (earliest is None or result["earliest"] < earliest):
-                earliest = result["earliest"]
-            if result["latest"] and (latest is None or result["latest"] > latest):
-                latest = result["latest"]
-
-        # Prune counters to prevent unbounded size
-        self._prune_counter(source_counts)
-        self._prune_counter(error_messages)
-
-        # Limit errors/warnings to max_errors
-        errors = errors[:max_errors]
-        warnings = warnings[:max_errors]
-
+        combined = _combine_aggregates(chunk_results, max_errors, self.aggregators, self.stratify_samples)
+        values = combined.results()
+        parsed_lines = values["parsed_lines"]
+        failed_lines = values["failed_lines"]
+        level_counts = values["level_counts"]
+        status_codes = values["status_codes"]
+        source_counts = values["source_counts"]
+        error_messages = values["error_messages"]
+        errors = values["errors"]
+        warnings = values["warnings"]
+        earliest = values["earliest"]
+        latest = values["latest"]
+
+        extra = combined.extra_results()
         elapsed = time.time() - start_time
 
         result = AnalysisResult(
@@ -365,6 +685,7 @@ class LogAnalyzer:
             total_lines=total_lines,
             parsed_lines=parsed_lines,
             failed_lines=failed_lines,
+            format_counts=values["format_counts"],
             level_counts=dict(level_counts),
             earliest_timestamp=earliest,
             latest_timestamp=latest,
@@ -372,22 +693,28 @@ class LogAnalyzer:
             warnings=warnings,
             top_sources=source_counts.most_common(10),
             top_errors=error_messages.most_common(10),
+            top_error_templates=values["error_templates"].most_common(10),
             status_codes=dict(status_codes),
+            distinct_counts=values["distinct_counts"],
+            quantiles={**values["quantiles"], **extra.pop(EXTRA_QUANTILES_NAME, {})},
+            time_series=values["time_series"],
+            aggregates=extra,
         )
 
         # Compute advanced analytics if enabled
         if enable_analytics:
-            logger.debug("Computing advanced analytics (multithreaded)")
+            logger.debug("Computing advanced analytics")
             result.analytics = compute_analytics(
                 errors=errors,
                 warnings=warnings,
                 level_counts=dict(level_counts),
                 source_counts=dict(source_counts),
                 config=analytics_config or {},
+                time_series=values["time_series"],
             )
 
         logger.info(
-            f"Multithreaded analysis completed in {elapsed:.2f}s: "
+            f"Analysis completed in {elapsed:.2f}s: "
             f"{parsed_lines:,} lines parsed ({result.parse_success_rate:.1f}% success), "
             f"{failed_lines:,} failed, "
             f"{result.error_rate:.1f}% error rate, "
@@ -396,86 +723,162 @@ class LogAnalyzer:
 
         return result
 
-    def _process_chunk(self, lines: list[str], parser: BaseParser, max_errors: int) -> dict:
+    def _process_chunk(
+        self, lines: Iterable[str], parser: BaseParser, max_errors: int, offsets: Optional[Iterable[int]] = None
+    ) -> AnalysisState:
         """
         Process a chunk of lines in a worker thread.
 
         Args:
-            lines: List of lines to process
+            lines: Lines to process (a list, or a lazy iterator over a byte range)
             parser: Parser to use for this chunk
             max_errors: Maximum errors/warnings to collect
+            offsets: Byte offset of each line in the file
 
         Returns:
-            Dictionary containing chunk results
+            Aggregated state for the chunk
+        """
+        return _aggregate_lines(
+            lines,
+            parser,
+            max_errors,
+            aggregators=self.aggregators,
+            stratify_samples=self.stratify_samples,
+            offsets=offsets,
+        )
+
+    def _analyze_sequential(
+        self,
+        filepath: str,
+        parser: Optional[BaseParser],
+        max_errors: int,
+        progress_callback: Optional[Any],
+        use_fallback: bool,
+        chunk_size: int,
+        start_time: float,
+        enable_analytics: bool = False,
+        analytics_config: Optional[dict] = None,
+    ) -> AnalysisResult:
         """
-        # Initialize local counters
-        parsed_lines = 0
-        failed_lines = 0
+        Analyze log file in the calling thread, one chunk of lines at a time.
 
-        level_counts = Counter()
-        status_codes = Counter()
-        source_counts = Counter()
-        error_messages = Counter()
+        Without a parser, the format is detected from the first
+        DEFAULT_SAMPLE_SIZE non-blank lines, which are then aggregated
+        along with the rest of the file (the file is read once).
 
-        errors = []
-        warnings = []
+        Args:
+            filepath: Path to log file
+            parser: Parser to use, or None to detect the format inline
+            max_errors: Maximum errors/warnings to collect
+            progress_callback: Optional progress callback
+            use_fallback: Use the universal fallback parser if no format is detected
+            chunk_size: Number of lines per chunk
+            start_time: Analysis start time
+            enable_analytics: Whether to compute analytics
+            analytics_config: Optional analytics configuration
 
-        earliest = None
-        latest = None
+        Returns:
+            AnalysisResult with all analysis data
 
-        for line in lines:
-            if not line.strip():
-                continue
+        Raises:
+            ValueError: If no format is detected and use_fallback is False
+        """
+        reader = LogReader(filepath)
+        blocks = iter(reader.read_blocks())
 
-            entry = parser.parse(line)
+        if parser is None:
+            head = []
+            sample_lines = []
+            for block in blocks:
+                head.append(block)
+                sample_lines.extend(islice(filter(str.strip, block[0]), DEFAULT_SAMPLE_SIZE - len(sample_lines)))
+                if len(sample_lines) >= DEFAULT_SAMPLE_SIZE:
+                    break
+            parser = self._detect_inline(filepath, sample_lines, use_fallback).for_file(filepath)
+            blocks = chain(head, blocks)
+
+        state = AnalysisState.create(max_errors, self.aggregators, self.stratify_samples)
+        for chunk, offsets in _iter_chunks(blocks, chunk_size):
+            result = self._process_chunk(chunk, parser, max_errors, offsets)
+            state.merge(result)
+            if progress_callback and hasattr(progress_callback, "update"):
+                progress_callback.update(advance=result.total_lines)
 
-            if entry is None:
-                failed_lines += 1
-                continue
+        return self._merge_chunk_results(
+            filepath=filepath,
+            parser=parser,
+            total_lines=state.total_lines,
+            chunk_results=[state],
+            max_errors=max_errors,
+            start_time=start_time,
+            enable_analytics=enable_analytics,
+            analytics_config=analytics_config,
+        )
+
+    def _detect_inline(self, filepath: str, sample_lines: list[str], use_fallback: bool) -> BaseParser:
+        """
+        Pick a parser from lines already read during analysis.
+
+        Args:
+            filepath: Path to log file (for messages)
+            sample_lines: Non-blank lines from the start of the file
+            use_fallback: Use the universal fallback parser if no format is detected
 
-            parsed_lines += 1
-
-            # Count levels
-            if entry.level:
-                level_counts[entry.level] += 1
-
-            # Track timestamps
-            if entry.timestamp:
-                if earliest is None or entry.timestamp < earliest:
-                    earliest = entry.timestamp
-                if latest is None or entry.timestamp > latest:
-                    latest = entry.timestamp
-
-            # Count sources
-            if entry.source:
-                source_counts[entry.source] += 1
-
-            # Track HTTP status codes
-            status = entry.metadata.get("status")
-            if status:
-                status_codes[status] += 1
-
-            # Collect errors and warnings
-            if entry.level in ("ERROR", "CRITICAL"):
-                error_messages[entry.message] += 1
-                if len(errors) < max_errors:
-                    errors.append(entry)
-            elif entry.level == "WARNING":
-                if len(warnings) < max_errors:
-                    warnings.append(entry)
-
-        return {
-            "parsed_lines": parsed_lines,
-            "failed_lines": failed_lines,
-            "level_counts": level_counts,
-            "status_codes": status_codes,
-            "source_counts": source_counts,
-            "error_messages": error_messages,
-            "errors": errors,
-            "warnings": warnings,
-            "earliest": earliest,
-            "latest": latest,
-        }
+        Returns:
+            Best matching parser
+
+        Raises:
+            ValueError: If no format is detected and use_fallback is False
+        """
+        logger.debug(f"Running inline format detection on {len(sample_lines)} sample lines")
+        parse_counts = self._score_formats(sample_lines, len(sample_lines))
+
+        if parse_counts:
+            best_format = parse_counts.most_common(1)[0][0]
+            for parser in self.parsers:
+                if parser.name == best_format:
+                    logger.info(f"Detected format '{parser.name}' inline (parse_counts={dict(parse_counts)})")
+                    return parser
+
+        if not use_fallback:
+            logger.error(f"Could not detect log format for {filepath}")
+            raise ValueError(f"Could not detect log format for: {filepath}")
+        logger.info(f"No specific format detected inline for {filepath}, using universal fallback parser")
+        return UniversalFallbackParser()
+
+    def _score_formats(self, lines: Iterable[str], sample_size: int) -> Counter:
+        """
+        Count how many sample lines each parser accepts.
+
+        One combined regex match selects the parsers that may accept each
+        line, and those whose prefilter() rejects it are skipped as well, so
+        most parsers never run on a line. Sampling stops early once one
+        format leads the runner-up by a clear margin (see
+        _has_clear_leader()), after at least DETECTION_MIN_SAMPLES lines.
+
+        Args:
+            lines: Lines to sample from
+            sample_size: Maximum number of lines to examine
+
+        Returns:
+            Counter of successful parses by parser name
+        """
+        parse_counts = Counter()
+        classifier = classifier_for(self.parsers)
+
+        for i, line in enumerate(lines):
+            if i >= sample_size:
+                break
+
+            for parser in classifier.candidates(line):
+                if parser.prefilter(line) and parser.try_parse(line):
+                    parse_counts[parser.name] += 1
+
+            if i + 1 >= DETECTION_MIN_SAMPLES and _has_clear_leader(parse_counts):
+                logger.debug(f"Format detection stopped early after {i + 1} lines")
+                break
+
+        return parse_counts
 
     def detect_format(self, filepath: str, sample_size: int = DEFAULT_SAMPLE_SIZE) -> Optional[BaseParser]:
         """
@@ -494,17 +897,7 @@ class LogAnalyzer:
         reader = LogReader(filepath)
 
         # Count successful parses per parser
-        parse_counts = Counter()
-
-        for i, line in enumerate(reader.read_lines()):
-            if i >= sample_size:
-                break
-
-            for parser in self.parsers:
-                if parser.can_parse(line):
-                    result = parser.parse(line)
-                    if result:
-                        parse_counts[parser.name] += 1
+        parse_counts = self._score_formats(reader.read_lines(), sample_size)
 
         elapsed = time.time() - start_time
 
@@ -525,6 +918,29 @@ class LogAnalyzer:
 
         return None
 
+    def build_router(
+        self, filepath: str, use_fallback: bool = True, sample_size: int = DEFAULT_SAMPLE_SIZE
+    ) -> MixedFormatParser:
+        """
+        Build a per-line router for a file that mixes several formats.
+
+        Formats are ranked by how many sample lines they accept, so the
+        router tries the file's common formats first.
+
+        Args:
+            filepath: Path to log file
+            use_fallback: Parse lines no format accepts with the universal fallback parser
+            sample_size: Number of lines to sample for ranking
+
+        Returns:
+            MixedFormatParser over this analyzer's parsers
+        """
+        parse_counts = self._score_formats(LogReader(filepath).read_lines(), sample_size)
+        logger.info(f"Routing mixed formats for {filepath} (parse_counts={dict(parse_counts)})")
+        return MixedFormatParser.from_counts(
+            self.parsers, parse_counts, UniversalFallbackParser() if use_fallback else None
+        )
+
     def analyze(
         self,
         filepath: str,
@@ -534,9 +950,13 @@ class LogAnalyzer:
         use_fallback: bool = True,
         detect_inline: bool = True,
         use_threading: bool = True,
-        chunk_size: int = 10000,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
         enable_analytics: bool = False,
         analytics_config: Optional[dict] = None,
+        use_byte_ranges: bool = False,
+        byte_range_size: int = DEFAULT_BYTE_RANGE_SIZE,
+        incremental: bool = False,
+        mixed_formats: bool = False,
     ) -> AnalysisResult:
         """
         Perform comprehensive analysis of a log file.
@@ -557,6 +977,20 @@ class LogAnalyzer:
                 - time_bucket_size: '5min', '15min', '1h', '1day' (default: '1h')
                 - enable_time_series: bool (default: True)
                 - enable_statistics: bool (default: False)
+            use_byte_ranges: If True (and threading is enabled), split the file into
+                            newline-aligned byte ranges that each worker reads itself,
+                            instead of reading all lines into memory first.
+            byte_range_size: Approximate bytes per range in byte-range mode (default: 8 MiB).
+            incremental: If True, resume from the checkpoint stored next to the file
+                        (see log_analyzer.checkpoint) and parse only bytes appended since,
+                        then save a new checkpoint. Falls back to a full scan when the file
+                        was rotated or truncated, or was checkpointed with another parser.
+                        Ignored for compressed files.
+            mixed_formats: If True (and no parser is given), parse each line with
+                          whichever format accepts it instead of one parser for the
+                          whole file (see log_analyzer.router). The detected_format is
+                          "mixed" and format_counts holds the lines parsed per format;
+                          with use_fallback, lines in no known format count as "universal".
 
         Returns:
             AnalysisResult with all analysis data
@@ -575,11 +1009,35 @@ class LogAnalyzer:
         )
         start_time = time.time()
 
+        if mixed_formats and parser is None:
+            parser = self.build_router(filepath, use_fallback)
+
         # If using threading, we must detect format first (can't defer)
         if use_threading and parser is None and detect_inline:
             logger.debug("Multithreading enabled - forcing separate format detection pass")
             detect_inline = False
 
+        # Incremental mode: look for a checkpoint, which also remembers the parser
+        checkpoint = None
+        if incremental and detect_compression(filepath):
+            logger.info("Compressed input cannot be analyzed incrementally, running a full analysis")
+            incremental = False
+        if incremental:
+            checkpoint = AnalysisCheckpoint.load_for(filepath, self.aggregators)
+            if checkpoint is not None:
+                if parser is None:
+                    parser = get_parser(checkpoint.parser_name)
+                if parser is None or parser.name != checkpoint.parser_name:
+                    logger.info("Checkpoint was made with a different parser, re-scanning from the start")
+                    checkpoint = None
+                elif checkpoint.max_errors < max_errors:
+                    logger.info("Checkpoint holds fewer error samples than requested, re-scanning from the start")
+                    checkpoint = None
+                elif checkpoint.stratify_samples != self.stratify_samples:
+                    logger.info("Checkpoint samples errors differently, re-scanning from the start")
+                    checkpoint = None
+            detect_inline = False
+
         # Detect format if not specified
         if parser is None:
             if detect_inline:
@@ -598,6 +1056,48 @@ class LogAnalyzer:
                         raise ValueError(f"Could not detect log format for: {filepath}")
                 logger.debug(f"Using parser: {parser.name}")
 
+        # Date year-less timestamps by this file, not by whatever the parser saw before
+        if parser is not None:
+            parser = parser.for_file(filepath)
+
+        if incremental:
+            return self._analyze_incremental(
+                filepath=filepath,
+                parser=parser,
+                max_errors=max_errors,
+                progress_callback=progress_callback,
+                use_threading=use_threading,
+                byte_range_size=byte_range_size,
+                start_time=start_time,
+                checkpoint=checkpoint,
+                enable_analytics=enable_analytics,
+                analytics_config=analytics_config,
+            )
+
+        # Byte-range mode: workers read their own slice of the file.
+        # The process backend always uses it so workers never receive line lists.
+        # Compressed files have no seekable line offsets, so they use line chunks.
+        use_byte_ranges = use_byte_ranges or self.executor == "process"
+        if use_threading and use_byte_ranges and parser is not None and detect_compression(filepath):
+            logger.info("Compressed input cannot be split into byte ranges, using threaded line chunks")
+            use_byte_ranges = False
+
+        if use_threading and use_byte_ranges and parser is not None:
+            logger.info(
+                f"Using byte-range analysis with {self.max_workers} {self.executor} workers, "
+                f"byte_range_size={byte_range_size:,}"
+            )
+            return self._analyze_byte_ranges(
+                filepath=filepath,
+                parser=parser,
+                max_errors=max_errors,
+                progress_callback=progress_callback,
+                byte_range_size=byte_range_size,
+                start_time=start_time,
+                enable_analytics=enable_analytics,
+                analytics_config=analytics_config,
+            )
+
         # Use multithreaded implementation if enabled and parser is known
         if use_threading and parser is not None:
             logger.info(f"Using multithreaded analysis with {self.max_workers} workers, chunk_size={chunk_size}")
@@ -613,203 +1113,17 @@ class LogAnalyzer:
             )
 
         # Fall back to single-threaded implementation
-        reader = LogReader(filepath)
-
-        # Initialize counters
-        total_lines = 0
-        parsed_lines = 0
-        failed_lines = 0
-
-        level_counts = Counter()
-        status_codes = Counter()
-        source_counts = Counter()
-        error_messages = Counter()
-
-        errors = []
-        warnings = []
-
-        earliest = None
-        latest = None
-
-        # Inline detection state
-        sample_lines = []
-        inline_detected = False
-
-        # Process each line
-        for line in reader.read_lines():
-            total_lines += 1
-
-            # Update progress
-            if progress_callback and hasattr(progress_callback, "update"):
-                progress_callback.update(advance=1)
-
-            if not line.strip():
-                continue
-
-            # Inline format detection - collect samples until we have enough
-            if parser is None and not inline_detected:
-                sample_lines.append(line)
-
-                # Once we have enough samples, detect format
-                if len(sample_lines) >= DEFAULT_SAMPLE_SIZE:
-                    logger.debug(f"Running inline format detection on {len(sample_lines)} sample lines")
-                    parse_counts = Counter()
-
-                    # Test each parser against samples
-                    for sample_line in sample_lines:
-                        for candidate_parser in self.parsers:
-                            if candidate_parser.can_parse(sample_line):
-                                result = candidate_parser.parse(sample_line)
-                                if result:
-                                    parse_counts[candidate_parser.name] += 1
-
-                    # Select best parser
-                    if parse_counts:
-                        best_format = parse_counts.most_common(1)[0][0]
-                        for p in self.parsers:
-                            if p.name == best_format:
-                                parser = p
-                                break
-                        logger.info(f"Detected format '{parser.name}' inline (parse_counts={dict(parse_counts)})")
-                    else:
-                        # No format detected
-                        if use_fallback:
-                            logger.info(
-                                f"No specific format detected inline for {filepath}, using universal fallback parser"
-                            )
-                            parser = UniversalFallbackParser()
-                        else:
-                            logger.error(f"Could not detect log format for {filepath}")
-                            raise ValueError(f"Could not detect log format for: {filepath}")
-
-                    inline_detected = True
-
-                    # Process collected sample lines with detected parser
-                    for sample_line in sample_lines:
-                        entry = parser.parse(sample_line)
-
-                        if entry is None:
-                            failed_lines += 1
-                            continue
-
-                        parsed_lines += 1
-
-                        # Count levels
-                        if entry.level:
-                            level_counts[entry.level] += 1
-
-                        # Track timestamps
-                        if entry.timestamp:
-                            if earliest is None or entry.timestamp < earliest:
-                                earliest = entry.timestamp
-                            if latest is None or entry.timestamp > latest:
-                                latest = entry.timestamp
-
-                        # Count sources
-                        if entry.source:
-                            source_counts[entry.source] += 1
-
-                        # Track HTTP status codes
-                        status = entry.metadata.get("status")
-                        if status:
-                            status_codes[status] += 1
-
-                        # Collect errors and warnings
-                        if entry.level in ("ERROR", "CRITICAL"):
-                            error_messages[entry.message] += 1
-                            if len(errors) < max_errors:
-                                errors.append(entry)
-                        elif entry.level == "WARNING":
-                            if len(warnings) < max_errors:
-                                warnings.append(entry)
-
-                    # Clear samples
-                    sample_lines = []
-
-                # Skip to next line while collecting samples
-                continue
-
-            entry = parser.parse(line)
-
-            if entry is None:
-                failed_lines += 1
-                continue
-
-            parsed_lines += 1
-
-            # Count levels
-            if entry.level:
-                level_counts[entry.level] += 1
-
-            # Track timestamps
-            if entry.timestamp:
-                if earliest is None or entry.timestamp < earliest:
-                    earliest = entry.timestamp
-                if latest is None or entry.timestamp > latest:
-                    latest = entry.timestamp
-
-            # Count sources
-            if entry.source:
-                source_counts[entry.source] += 1
-
-            # Track HTTP status codes
-            status = entry.metadata.get("status")
-            if status:
-                status_codes[status] += 1
-
-            # Collect errors and warnings
-            if entry.level in ("ERROR", "CRITICAL"):
-                error_messages[entry.message] += 1
-                if len(errors) < max_errors:
-                    errors.append(entry)
-            elif entry.level == "WARNING":
-                if len(warnings) < max_errors:
-                    warnings.append(entry)
-
-            # Periodically prune counters to prevent unbounded memory growth
-            if parsed_lines % 1000 == 0:
-                self._prune_counter(source_counts)
-                self._prune_counter(error_messages)
-
-        result = AnalysisResult(
+        return self._analyze_sequential(
             filepath=filepath,
-            detected_format=parser.name,
-            total_lines=total_lines,
-            parsed_lines=parsed_lines,
-            failed_lines=failed_lines,
-            level_counts=dict(level_counts),
-            earliest_timestamp=earliest,
-            latest_timestamp=latest,
-            errors=errors,
-            warnings=warnings,
-            top_sources=source_counts.most_common(10),
-            top_errors=error_messages.most_common(10),
-            status_codes=dict(status_codes),
-        )
-
-        # Compute advanced analytics if enabled
-        if enable_analytics:
-            logger.debug("Computing advanced analytics")
-            result.analytics = compute_analytics(
-                errors=errors,
-                warnings=warnings,
-                level_counts=dict(level_counts),
-                source_counts=dict(source_counts),
-                config=analytics_config or {},
-            )
-        elapsed = time.time() - start_time
-        logger.info(
-            f"Analysis completed in {elapsed:.2f}s: "
-            f"{parsed_lines:,} lines parsed ({result.parse_success_rate:.1f}% success), "
-            f"{failed_lines:,} failed, "
-            f"{result.error_rate:.1f}% error rate, "
-            f"throughput={parsed_lines/elapsed:.0f} lines/sec"
+            parser=parser,
+            max_errors=max_errors,
+            progress_callback=progress_callback,
+            use_fallback=use_fallback,
+            chunk_size=chunk_size,
+            start_time=start_time,
+            enable_analytics=enable_analytics,
+            analytics_config=analytics_config,
         )
-        logger.debug(f"Level counts: {dict(level_counts)}")
-        logger.debug(f"Top sources: {len(source_counts)} unique sources")
-        logger.debug(f"Top errors: {len(error_messages)} unique error messages")
-
-        return result
 
     def parse_file(self, filepath: str, parser: BaseParser = None) -> Iterator[LogEntry]:
         """
@@ -827,6 +1141,7 @@ class LogAnalyzer:
             if parser is None:
                 raise ValueError(f"Could not detect log format for: {filepath}")
 
+        parser = parser.for_file(filepath)
         reader = LogReader(filepath)
 
         for line in reader.read_lines():
@@ -836,3 +1151,219 @@ class LogAnalyzer:
             entry = parser.parse(line)
             if entry:
                 yield entry
+
+    def parse_time_range(
+        self,
+        filepath: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        parser: BaseParser = None,
+    ) -> Iterator[LogEntry]:
+        """
+        Parse only the entries whose timestamps fall inside a time window.
+
+        If the file has a current sidecar index with block timestamps (see
+        log_analyzer.index), only the part of the file that can overlap the
+        window is read; otherwise the whole file is scanned.
+
+        Args:
+            filepath: Path to log file
+            since: Window start (inclusive); naive datetimes are treated as UTC
+            until: Window end (inclusive); naive datetimes are treated as UTC
+            parser: Specific parser to use. Auto-detects if None.
+
+        Yields:
+            Parsed LogEntry objects with timestamps inside the window
+        """
+        if parser is None:
+            parser = self.detect_format(filepath)
+            if parser is None:
+                raise ValueError(f"Could not detect log format for: {filepath}")
+
+        index = LineIndex.load_for(filepath)
+        logger.debug(f"Time range query on {filepath} ({'indexed' if index else 'full scan'})")
+        for _, _, entry in iter_time_range(filepath, parser, since, until, index=index):
+            yield entry
+
+
+# ============================================================================
+# Worker functions
+# ============================================================================
+#
+# These live at module level so they can be pickled and run in a
+# ProcessPoolExecutor as well as in worker threads.
+
+
+def _aggregate_lines(
+    lines: Iterable[str],
+    parser: BaseParser,
+    max_errors: int,
+    parse_line: Optional[Callable[[Any], Optional[LogEntry]]] = None,
+    aggregators: Iterable[AggregatorFactory] = (),
+    stratify_samples: bool = False,
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+    offsets: Optional[Iterable[int]] = None,
+) -> AnalysisState:
+    """
+    Parse lines and fold them into a partial aggregate.
+
+    Lines are parsed once, batch_size lines at a time, and each batch is
+    folded before the next is read, so a whole byte range is never held as
+    one batch. Aggregators that read batch columns get the batch; the others
+    are fed each LogEntry as it is parsed. Lines are parsed with
+    parser.fresh(), so every call (one per chunk or byte range) starts with
+    nothing learned and worker threads never share learned state.
+
+    Args:
+        lines: Lines to process
+        parser: Parser to use
+        max_errors: Maximum errors/warnings to collect
+        parse_line: Callable that turns one line into a LogEntry. Defaults to parser.parse.
+        aggregators: Factories for extra aggregators to run
+        stratify_samples: Sample errors/warnings per message template
+        batch_size: Lines per columnar batch
+        offsets: Byte offset of each line in the file. Error/warning samples
+            are keyed on them, so every split of a file draws the same sample.
+
+    Returns:
+        AnalysisState that LogAnalyzer._merge_chunk_results can combine
+    """
+    parser = parser.fresh()
+    state = AnalysisState.create(max_errors, aggregators, stratify_samples)
+    entry_aggregators = state.entry_aggregators()
+
+    def feed(entry: LogEntry) -> None:
+        for aggregator in entry_aggregators:
+            aggregator.update(entry)
+
+    lines = iter(lines)
+    if offsets is not None:
+        offsets = iter(offsets)
+    while True:
+        batch_lines = islice(lines, batch_size)
+        if parse_line is None and not entry_aggregators:
+            batch = parser.parse_batch(batch_lines)
+            entries_seen = False
+        elif parse_line is None and isinstance(parser, MixedFormatParser):
+            batch = parser.parse_batch(batch_lines, feed)
+            entries_seen = True
+        else:
+            batch = ParsedBatch.from_lines(batch_lines, parse_line or parser.parse, feed if entry_aggregators else None)
+            entries_seen = True
+        if offsets is not None:
+            batch.offsets = list(islice(offsets, batch.total_lines))
+        if batch.total_lines:
+            state.update_batch(batch, entries_seen=entries_seen)
+        if batch.total_lines < batch_size:
+            return state
+
+
+def _has_clear_leader(parse_counts: Counter) -> bool:
+    """
+    Check whether the top format leads the runner-up by a clear margin.
+
+    The lead equals the difference between the lines only the leader
+    accepted and the lines only the runner-up accepted. Under the hypothesis
+    that neither format is better, each of those disagreeing lines is a coin
+    flip, so a sign test would bound the lead by DETECTION_CONFIDENCE_Z
+    times the square root of their number. Per-pair disagreements are not
+    tracked, so leader + runner_up stands in for it: lines both accept only
+    widen the bound, which makes the check stricter than the sign test,
+    never looser.
+
+    Args:
+        parse_counts: Successful parses by parser name
+
+    Returns:
+        True if more samples are very unlikely to change the winner
+    """
+    top = parse_counts.most_common(2)
+    if not top:
+        return False
+    leader = top[0][1]
+    runner_up = top[1][1] if len(top) > 1 else 0
+    return leader - runner_up >= DETECTION_CONFIDENCE_Z * math.sqrt(leader + runner_up)
+
+
+def _combine_aggregates(
+    results: Iterable[AnalysisState],
+    max_errors: int,
+    aggregators: Iterable[AggregatorFactory] = (),
+    stratify_samples: bool = False,
+) -> AnalysisState:
+    """
+    Combine partial aggregates from consecutive parts of a file.
+
+    Args:
+        results: Partial aggregates (see _aggregate_lines), in file order
+        max_errors: Maximum errors/warnings to keep
+        aggregators: Factories for the extra aggregators the results hold
+        stratify_samples: Whether the results sample errors/warnings per message template
+
+    Returns:
+        A single state, with error/warning samples of at most max_errors entries
+    """
+    combined = AnalysisState.create(max_errors, aggregators, stratify_samples)
+    for result in results:
+        combined.merge(result)
+    return combined
+
+
+def _iter_chunks(
+    blocks: Iterable[tuple[list[str], list[int]]], chunk_size: int
+) -> Iterator[tuple[list[str], list[int]]]:
+    """Regroup (lines, offsets) blocks from LogReader.read_blocks() into chunks of up to chunk_size lines."""
+    lines: list[str] = []
+    offsets: list[int] = []
+    for block_lines, block_offsets in blocks:
+        lines += block_lines
+        offsets += block_offsets
+        while len(lines) >= chunk_size:
+            yield lines[:chunk_size], offsets[:chunk_size]
+            del lines[:chunk_size], offsets[:chunk_size]
+    if lines:
+        yield lines, offsets
+
+
+def _unzip_blocks(blocks: Iterable[tuple[list[str], list[int]]]) -> tuple[Iterator[str], Iterator[int]]:
+    """Split (lines, offsets) blocks into a stream of lines and a stream of their offsets."""
+    line_blocks, offset_blocks = tee(blocks)
+    return chain.from_iterable(map(itemgetter(0), line_blocks)), chain.from_iterable(map(itemgetter(1), offset_blocks))
+
+
+def _process_byte_range(
+    filepath: str,
+    parser: Union[BaseParser, str],
+    start: int,
+    end: int,
+    max_errors: int,
+    encoding: str = "utf-8",
+    aggregators: Iterable[AggregatorFactory] = (),
+    stratify_samples: bool = False,
+) -> AnalysisState:
+    """
+    Read and aggregate one newline-aligned byte range of a file.
+
+    Args:
+        filepath: Path to log file
+        parser: Parser instance, or the name of a registered parser
+                (used by the process backend so parsers are not pickled)
+        start: Byte offset of the first line in the range
+        end: Byte offset where the range stops (exclusive)
+        max_errors: Maximum errors/warnings to collect
+        encoding: File encoding
+        aggregators: Factories for extra aggregators to run
+        stratify_samples: Sample errors/warnings per message template
+
+    Returns:
+        Partial aggregate for the range (see _aggregate_lines)
+    """
+    if isinstance(parser, str):
+        resolved = get_parser(parser)
+        if resolved is None:
+            raise ValueError(f"Unknown parser: {parser}")
+        parser = resolved.for_file(filepath)
+    lines, offsets = _unzip_blocks(LogReader(filepath, encoding=encoding).read_blocks(start, end))
+    return _aggregate_lines(
+        lines, parser, max_errors, aggregators=aggregators, stratify_samples=stratify_samples, offsets=offsets
+    )
@@ -0,0 +1,252 @@
+"""
+Checkpointed aggregate state for incremental re-analysis.
+
+A checkpoint records how far into a log file an analysis got (the byte
+offset just past the last complete line) together with the partial
+aggregate for everything before that offset. A later run over the same,
+grown file resumes from the offset and parses only the appended bytes.
+
+A checkpoint is only trusted while the file is the same file that was
+analyzed: same inode, not shorter than when the checkpoint was written,
+and with identical leading bytes. Rotation (a new file at the same path)
+or truncation fails one of these checks and triggers a full re-scan.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from .aggregators import AggregatorFactory, AnalysisState
+from .constants import CHECKPOINT_HEAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "CHECKPOINT_SUFFIX",
+    "AnalysisCheckpoint",
+    "checkpoint_path_for",
+    "committed_length",
+]
+
+
+# Sidecar file suffix appended to the log file name
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+# Bumped whenever the on-disk layout changes; older checkpoints are ignored
+CHECKPOINT_VERSION = 6
+
+
+def checkpoint_path_for(filepath: str) -> Path:
+    """
+    Get the sidecar checkpoint path for a log file.
+
+    Args:
+        filepath: Path to the log file
+
+    Returns:
+        Path of the checkpoint file stored next to it
+    """
+    return Path(f"{filepath}{CHECKPOINT_SUFFIX}")
+
+
+def committed_length(filepath: str, size: Optional[int] = None) -> int:
+    """
+    Find the byte offset just past the last newline in a file.
+
+    Bytes after it belong to a line that may still be being written, so
+    they are analyzed but never checkpointed.
+
+    Args:
+        filepath: Path to the log file
+        size: Number of leading bytes to consider (default: current file size)
+
+    Returns:
+        Offset of the end of the last complete line, or 0 if there is none
+    """
+    if size is None:
+        size = os.stat(filepath).st_size
+    block_size = 64 * 1024
+    end = size
+    with open(filepath, "rb") as f:
+        while end > 0:
+            start = max(end - block_size, 0)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def _head_digest(filepath: str, length: int) -> str:
+    """Hash the first min(length, CHECKPOINT_HEAD_BYTES) bytes of a file."""
+    with open(filepath, "rb") as f:
+        return hashlib.sha256(f.read(min(length, CHECKPOINT_HEAD_BYTES))).hexdigest()
+
+
+@dataclass
+class AnalysisCheckpoint:
+    """
+    Aggregate state for the first ``offset`` bytes of a log file.
+
+    Attributes:
+        parser_name: Name of the parser the state was produced with
+        offset: Byte offset just past the last line included in the state
+        inode: Inode of the file when the checkpoint was written
+        size: Size of the file when the checkpoint was written
+        head_digest: SHA-256 of the first min(offset, CHECKPOINT_HEAD_BYTES) bytes
+        max_errors: Error/warning sample limit the state was collected with
+        stratify_samples: Whether errors/warnings were sampled per message template
+        state: Aggregated state for bytes [0, offset)
+    """
+
+    parser_name: str
+    offset: int = 0
+    inode: int = 0
+    size: int = 0
+    head_digest: str = ""
+    max_errors: int = 0
+    stratify_samples: bool = False
+    state: Optional[AnalysisState] = None
+
+    @classmethod
+    def capture(
+        cls,
+        filepath: str,
+        parser_name: str,
+        offset: int,
+        max_errors: int,
+        state: AnalysisState,
+        stratify_samples: bool = False,
+    ) -> "AnalysisCheckpoint":
+        """
+        Create a checkpoint for the current contents of a file.
+
+        Args:
+            filepath: Path to the log file
+            parser_name: Name of the parser used
+            offset: Byte offset just past the last line included in state
+            max_errors: Error/warning sample limit used
+            state: Aggregated state covering bytes [0, offset)
+            stratify_samples: Whether errors/warnings were sampled per message template
+
+        Returns:
+            The new AnalysisCheckpoint
+        """
+        stat = os.stat(filepath)
+        return cls(
+            parser_name=parser_name,
+            offset=offset,
+            inode=stat.st_ino,
+            size=stat.st_size,
+            head_digest=_head_digest(filepath, offset),
+            max_errors=max_errors,
+            stratify_samples=stratify_samples,
+            state=state,
+        )
+
+    def is_valid_for(self, filepath: str) -> bool:
+        """
+        Check whether the file still starts with the bytes this checkpoint covers.
+
+        Args:
+            filepath: Path to the log file
+
+        Returns:
+            False if the file was replaced (rotated), truncated or rewritten
+        """
+        try:
+            stat = os.stat(filepath)
+            if stat.st_ino != self.inode:
+                logger.debug(f"Checkpoint for {filepath} is for another file (rotated?)")
+                return False
+            if stat.st_size < self.size or stat.st_size < self.offset:
+                logger.debug(f"Checkpoint for {filepath} is past the end of the file (truncated?)")
+                return False
+            if _head_digest(filepath, self.offset) != self.head_digest:
+                logger.debug(f"Checkpoint for {filepath} does not match the start of the file")
+                return False
+        except OSError:
+            return False
+        return True
+
+    def save(self, path: str) -> Path:
+        """
+        Write the checkpoint to a JSON file.
+
+        Args:
+            path: Destination path (usually checkpoint_path_for(log file))
+
+        Returns:
+            Path where the checkpoint was written
+        """
+        path = Path(path)
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "parser_name": self.parser_name,
+            "offset": self.offset,
+            "inode": self.inode,
+            "size": self.size,
+            "head_digest": self.head_digest,
+            "max_errors": self.max_errors,
+            "stratify_samples": self.stratify_samples,
+            "state": self.state.to_dict(),
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"), default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, aggregators: Iterable[AggregatorFactory] = ()) -> "AnalysisCheckpoint":
+        """
+        Read a checkpoint written by save().
+
+        Args:
+            path: Checkpoint file
+            aggregators: Factories for the extra aggregators the state must hold
+
+        Raises:
+            ValueError: If the file is not a compatible checkpoint, or has no
+                state for one of the aggregators
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.pop("version", None) != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint format: {path}")
+        state = AnalysisState.create(data["max_errors"], aggregators, data["stratify_samples"])
+        state.load_dict(data["state"])
+        data["state"] = state
+        return cls(**data)
+
+    @classmethod
+    def load_for(cls, filepath: str, aggregators: Iterable[AggregatorFactory] = ()) -> Optional["AnalysisCheckpoint"]:
+        """
+        Load the sidecar checkpoint for a log file if it exists and still applies.
+
+        Args:
+            filepath: Path to the log file
+            aggregators: Factories for the extra aggregators the state must hold
+
+        Returns:
+            AnalysisCheckpoint, or None if there is no usable checkpoint
+        """
+        path = checkpoint_path_for(filepath)
+        if not path.exists():
+            return None
+        try:
+            checkpoint = cls.load(path, aggregators)
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+            return None
+        if not checkpoint.is_valid_for(filepath):
+            logger.info(f"Ignoring checkpoint {path}: file was rotated or truncated, re-scanning")
+            return None
+        return checkpoint
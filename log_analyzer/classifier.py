@@ -0,0 +1,193 @@
+"""
+Combined format pre-classification for regex-based parsers.
+
+FormatClassifier compiles the LINE_PATTERNS of every parser in a registry
+into one pattern, so a single ``match`` call from Python tells which formats
+a line may be in. The pattern is not one first-match alternation: formats
+overlap (an Apache access line is also an nginx access line) and format
+detection counts every parser that accepts a line, so each format sits in
+its own optional lookahead branch with an empty named group that records
+whether it matched. The regex engine still tries every format's patterns
+in turn; what a line saves is the try_parse() calls of the formats ruled out.
+
+Parsers without LINE_PATTERNS, such as the JSON-based ones, are classified
+by their FIRST_CHARS instead. Either way a match is only a necessary
+condition, since parsers apply further checks in try_parse(). The
+classifier therefore narrows the parsers to try, and the candidates still
+run try_parse(); it never accepts a line on their behalf.
+benchmarks/format_detection.py measures detection with and without it.
+"""
+
+import re
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Optional
+
+from .parsers import BaseParser
+
+__all__ = [
+    "FormatClassifier",
+    "classifier_for",
+]
+
+
+def _without_groups(pattern: str) -> str:
+    """Turn every capturing group of a regex into a non-capturing one."""
+    out = []
+    i, in_class = 0, False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            out.append(pattern[i : i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # A "]" right after "[" or "[^" is a literal, not the end of the class
+            out.append(char)
+            i += 1
+            if pattern.startswith("^", i):
+                out.append("^")
+                i += 1
+            if pattern.startswith("]", i):
+                out.append("]")
+                i += 1
+            continue
+        elif char == "(":
+            if pattern.startswith("?P<", i + 1):
+                out.append("(?:")
+                i = pattern.index(">", i) + 1
+                continue
+            if not pattern.startswith("?", i + 1):
+                out.append("(?:")
+                i += 1
+                continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _combinable(pattern: re.Pattern) -> Optional[str]:
+    """
+    Rewrite a parser pattern for the combined classifier.
+
+    Returns:
+        The pattern source without capturing groups, or None if it cannot be
+        combined (bytes patterns, flags other than the default, or syntax
+        such as backreferences that needs its groups)
+    """
+    if not isinstance(pattern.pattern, str) or pattern.flags != re.UNICODE:
+        return None
+    source = _without_groups(pattern.pattern)
+    try:
+        if re.compile(source).groups:
+            return None
+    except re.error:
+        return None
+    return source
+
+
+def _first_chars(chars: str) -> str:
+    """Regex for the line starts prefilter() lets through for FIRST_CHARS."""
+    # Like prefilter(), skip leading whitespace and let non-ASCII through
+    return rf"\s*(?:[{re.escape(chars)}]|[^\x00-\x7f])"
+
+
+def _sources(parser: BaseParser) -> Optional[list[str]]:
+    """Pattern sources covering every line a parser may accept, if known."""
+    if parser.LINE_PATTERNS:
+        sources = [_combinable(pattern) for pattern in parser.LINE_PATTERNS]
+        if None not in sources:
+            return sources
+    if parser.FIRST_CHARS:
+        return [_first_chars(parser.FIRST_CHARS)]
+    return None
+
+
+class FormatClassifier:
+    """
+    Narrow a line's candidate parsers with one call to a combined regex.
+
+    Parsers with neither LINE_PATTERNS that can be combined nor FIRST_CHARS
+    are candidates for every line.
+    """
+
+    def __init__(self, parsers: Sequence[BaseParser]):
+        """
+        Compile the classifier for a parser registry.
+
+        Args:
+            parsers: Parsers in registry order
+        """
+        self.parsers = tuple(parsers)
+        self.formats: list[str] = []
+        # For each parser: the index of its group, or None if always tried
+        self._groups: list[Optional[int]] = []
+        branches = []
+        for parser in self.parsers:
+            sources = _sources(parser)
+            if sources is None:
+                self._groups.append(None)
+                continue
+            group = len(self.formats)
+            self._groups.append(group)
+            self.formats.append(parser.name)
+            # The empty group after the lookahead records whether it matched
+            branches.append(f"(?:(?={'|'.join(f'(?:{source})' for source in sources)})(?P<f{group}>)|)")
+        self.pattern = re.compile("".join(branches))
+        self._candidates: dict[tuple[Optional[str], ...], tuple[BaseParser, ...]] = {}
+
+    def match(self, line: str) -> list[str]:
+        """
+        Name the formats whose patterns match a line.
+
+        Args:
+            line: Raw log line
+
+        Returns:
+            Format names in registry order
+        """
+        groups = self.pattern.match(line).groups()
+        return [name for name, group in zip(self.formats, groups) if group is not None]
+
+    def candidates(self, line: str) -> tuple[BaseParser, ...]:
+        """
+        Select the parsers whose try_parse() may accept a line.
+
+        Args:
+            line: Raw log line
+
+        Returns:
+            Parsers in registry order, skipping those whose patterns all fail
+        """
+        key = self.pattern.match(line).groups()
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = tuple(
+                parser for parser, group in zip(self.parsers, self._groups) if group is None or key[group] is not None
+            )
+            self._candidates[key] = candidates
+        return candidates
+
+
+@lru_cache(maxsize=8)
+def _build(parsers: tuple[BaseParser, ...]) -> FormatClassifier:
+    return FormatClassifier(parsers)
+
+
+def classifier_for(parsers: Sequence[BaseParser]) -> FormatClassifier:
+    """
+    Get the classifier for a parser registry, compiling it on first use.
+
+    The classifier is cached by the registry's current contents, so adding a
+    parser to a registry list builds a new one the next time it is requested.
+
+    Args:
+        parsers: Parsers in registry order
+
+    Returns:
+        FormatClassifier for exactly these parsers
+    """
+    return _build(tuple(parsers))
@@ -7,8 +7,10 @@ beautiful terminal output using the Rich library.
 
 import logging
 import sys
+from datetime import datetime
 from pathlib import Path
 from types import SimpleNamespace
+from typing import Optional
 
 import click
 from rich import box
@@ -19,7 +21,7 @@ from rich.table import Table
 from rich.text import Text
 
 from . import __version__
-from .analyzer import AVAILABLE_PARSERS, AnalysisResult, LogAnalyzer
+from .analyzer import AVAILABLE_PARSERS, EXECUTOR_TYPES, AnalysisResult, LogAnalyzer
 from .constants import (
     DEFAULT_MAX_ERRORS,
     LEVEL_COLORS,
@@ -30,6 +32,9 @@ from .constants import (
 console = Console()
 logger = logging.getLogger(__name__)
 
+# Accepted formats for --since/--until
+TIME_RANGE_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M"]
+
 
 def setup_logging(verbose: bool = False, log_file: str = None):
     """Configure logging based on user preferences."""
@@ -105,8 +110,43 @@ def cli(ctx, verbose: bool, log_file: str):
     help="Log format (default: auto-detect)",
 )
 @click.option("--max-errors", "-e", default=DEFAULT_MAX_ERRORS, help="Maximum errors to display")
-@click.option("--workers", "-w", "max_workers", type=int, help="Number of worker threads (default: CPU count)")
+@click.option(
+    "--workers", "--max-workers", "-w", "max_workers", type=int, help="Number of parallel workers (default: CPU count)"
+)
+@click.option(
+    "--executor",
+    type=click.Choice(EXECUTOR_TYPES),
+    default="thread",
+    help="Parallel backend: threads, or processes to use every core for parsing (default: thread)",
+)
 @click.option("--no-threading", is_flag=True, help="Disable multithreaded processing")
+@click.option(
+    "--byte-ranges",
+    is_flag=True,
+    help="Split the file into byte ranges read by each worker (flat memory on very large files)",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Resume from the checkpoint saved next to the file and parse only appended lines",
+)
+@click.option(
+    "--mixed-formats",
+    is_flag=True,
+    help="Pick a parser per line for files that interleave several formats (e.g. Docker JSON and syslog)",
+)
+@click.option(
+    "--quantile-field",
+    "quantile_fields",
+    multiple=True,
+    metavar="FIELD",
+    help="Numeric field (e.g. a JSON key) to report p50/p90/p99/p999 for, besides response size; repeatable",
+)
+@click.option(
+    "--stratify-samples",
+    is_flag=True,
+    help="Sample errors and warnings per message template so frequent errors do not crowd out rare ones",
+)
 @click.option("--enable-analytics", is_flag=True, help="Enable advanced analytics (time-series, pattern analysis)")
 @click.option(
     "--time-bucket",
@@ -123,7 +163,13 @@ def analyze(
     log_format: str,
     max_errors: int,
     max_workers: int,
+    executor: str,
     no_threading: bool,
+    byte_ranges: bool,
+    incremental: bool,
+    mixed_formats: bool,
+    quantile_fields: tuple[str, ...],
+    stratify_samples: bool,
     enable_analytics: bool,
     time_bucket: str,
     report: str,
@@ -137,12 +183,17 @@ def analyze(
     logger.info(f"Starting analysis of {filepath}")
     logger.debug(
         f"Parameters: log_format={log_format}, max_errors={max_errors}, "
-        f"max_workers={max_workers}, no_threading={no_threading}"
+        f"max_workers={max_workers}, executor={executor}, no_threading={no_threading}, byte_ranges={byte_ranges}"
     )
 
     console.print()
 
-    analyzer = LogAnalyzer(max_workers=max_workers)
+    analyzer_options = {"max_workers": max_workers, "executor": executor}
+    if quantile_fields:
+        analyzer_options["quantile_fields"] = list(quantile_fields)
+    if stratify_samples:
+        analyzer_options["stratify_samples"] = True
+    analyzer = LogAnalyzer(**analyzer_options)
 
     # Get parser
     parser = None
@@ -187,6 +238,9 @@ def analyze(
                 max_errors=max_errors,
                 progress_callback=SimpleNamespace(update=lambda advance=1: progress.update(task, advance=advance)),
                 use_threading=not no_threading,
+                use_byte_ranges=byte_ranges,
+                incremental=incremental,
+                mixed_formats=mixed_formats,
                 enable_analytics=enable_analytics,
                 analytics_config=analytics_config if enable_analytics else None,
             )
@@ -280,6 +334,16 @@ def _display_analysis(result: AnalysisResult):
     console.print(overview)
     console.print()
 
+    # Lines per format (mixed-format routing)
+    if result.format_counts:
+        formats = Table(title="Formats", box=box.ROUNDED)
+        formats.add_column("Format", style="bold")
+        formats.add_column("Lines", justify="right")
+        for name, count in sorted(result.format_counts.items(), key=lambda item: -item[1]):
+            formats.add_row(name, f"{count:,}")
+        console.print(formats)
+        console.print()
+
     # Severity breakdown
     if result.level_counts:
         severity = Table(title="Severity Breakdown", box=box.ROUNDED)
@@ -319,6 +383,24 @@ def _display_analysis(result: AnalysisResult):
         console.print(status)
         console.print()
 
+    # Quantiles of numeric fields (response size, latency, ...)
+    if result.quantiles:
+        quantiles = Table(title="Percentiles", box=box.ROUNDED)
+        quantiles.add_column("Field", style="bold")
+        quantiles.add_column("Count", justify="right")
+        for label in ("p50", "p90", "p99", "p999"):
+            quantiles.add_column(label, justify="right")
+
+        for name, summary in result.quantiles.items():
+            quantiles.add_row(
+                name,
+                f"{summary['count']:,}",
+                *(f"{summary[label]:,.1f}" for label in ("p50", "p90", "p99", "p999")),
+            )
+
+        console.print(quantiles)
+        console.print()
+
     # Top Error Messages
     if result.top_errors:
         errors = Table(title="Top Error Messages", box=box.ROUNDED)
@@ -332,6 +414,19 @@ def _display_analysis(result: AnalysisResult):
         console.print(errors)
         console.print()
 
+    # Top error templates, when messages with varying parameters were grouped
+    if any(template != example for template, _, example in result.top_error_templates):
+        templates = Table(title="Top Error Templates", box=box.ROUNDED)
+        templates.add_column("Count", justify="right", style="red")
+        templates.add_column("Template")
+
+        for template, count, _ in result.top_error_templates[:MAX_DISPLAY_ENTRIES]:
+            truncated = template[:MAX_MESSAGE_LENGTH] + "..." if len(template) > MAX_MESSAGE_LENGTH else template
+            templates.add_row(f"{count:,}", truncated)
+
+        console.print(templates)
+        console.print()
+
     # Top Sources
     if result.top_sources:
         sources = Table(title="Top Sources", box=box.ROUNDED)
@@ -461,11 +556,15 @@ def detect(filepath: str):
     help="Minimum level to show",
 )
 @click.option("--limit", "-n", default=20, help="Maximum entries to show")
-def errors(filepath: str, level: str, limit: int):
+@click.option("--since", type=click.DateTime(TIME_RANGE_FORMATS), help="Only entries at or after this time (UTC)")
+@click.option("--until", type=click.DateTime(TIME_RANGE_FORMATS), help="Only entries at or before this time (UTC)")
+def errors(filepath: str, level: str, limit: int, since: Optional[datetime], until: Optional[datetime]):
     """
     Show errors and warnings from a log file.
 
     FILEPATH is the path to the log file to analyze.
+    With --since/--until only that time window is parsed; run
+    'log-analyzer index' first so large files can be seeked instead of scanned.
     """
     level_order = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
     min_level_idx = level_order.index(level)
@@ -476,7 +575,12 @@ def errors(filepath: str, level: str, limit: int):
     console.print(f"[bold]Errors from {Path(filepath).name}[/bold]")
     console.print()
 
-    for entry in analyzer.parse_file(filepath):
+    if since or until:
+        entries = analyzer.parse_time_range(filepath, since=since, until=until)
+    else:
+        entries = analyzer.parse_file(filepath)
+
+    for entry in entries:
         if entry.level and level_order.index(entry.level) >= min_level_idx:
             ts = entry.timestamp.strftime("%H:%M:%S") if entry.timestamp else "---"
             console.print(f"[dim]{ts}[/dim] ", end="")
@@ -492,6 +596,35 @@ def errors(filepath: str, level: str, limit: int):
         console.print(f"[green]No entries at {level} level or above[/green]")
 
 
+@cli.command()
+@click.argument("filepath", type=click.Path(exists=True))
+def index(filepath: str):
+    """
+    Build a line/timestamp index next to a log file.
+
+    FILEPATH is the path to the log file to index. The index speeds up
+    'errors --since/--until' and is ignored once the file changes.
+    """
+    from .index import LineIndex, index_path_for
+
+    analyzer = LogAnalyzer()
+    parser = analyzer.detect_format(filepath)
+
+    try:
+        with console.status("[dim]Indexing..."):
+            line_index = LineIndex.build(filepath, parser=parser)
+            path = line_index.save(index_path_for(filepath))
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        sys.exit(1)
+
+    stamped = sum(ts is not None for ts in line_index.timestamps)
+    console.print(
+        f"[green]Indexed {line_index.total_lines:,} lines[/green] "
+        f"({len(line_index.offsets):,} entries, {stamped:,} with timestamps) -> {path}"
+    )
+
+
 @cli.command()
 def formats():
     """List all supported log formats."""
@@ -0,0 +1,498 @@
+"""
+Columnar (struct-of-arrays) batches of parsed log lines.
+
+BaseParser.parse_batch() turns a chunk of lines into a ParsedBatch that
+holds one array per field (epoch timestamps, level codes, interned source
+ids, status codes, message references) instead of one LogEntry per line,
+plus sparse numeric columns (response sizes, durations) and the distinct
+user names and request paths seen.
+The reductions below (count_ids, count_statuses, rows_with,
+values_by_status_class) are what the
+built-in aggregators (see log_analyzer.aggregators) run over a batch. They
+use NumPy when it is installed and the standard library ``array``/``Counter``
+otherwise; both give identical results.
+
+Parsers that override parse_batch() never build a LogEntry for most
+lines. Entries are only created for the rows kept as error and warning
+samples.
+"""
+
+import math
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from .parsers import LogEntry
+
+# Optional NumPy for vectorized aggregation
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+__all__ = [
+    "NUMPY_AVAILABLE",
+    "NO_ID",
+    "TIMESTAMP_MISSING",
+    "VALUE_FIELDS",
+    "ParsedBatch",
+    "count_ids",
+    "count_statuses",
+    "count_time_buckets",
+    "entry_path",
+    "entry_user",
+    "epoch_micros",
+    "request_path",
+    "rows_with",
+    "to_number",
+    "values_by_status_class",
+]
+
+
+# Value in the timestamps column for rows without a timestamp
+TIMESTAMP_MISSING = -(2**63)
+
+# Value in the levels and sources columns for rows without one
+NO_ID = -1
+
+# Levels whose rows are collected as error or warning samples
+ERROR_LEVELS = ("ERROR", "CRITICAL")
+WARNING_LEVELS = ("WARNING",)
+
+# Numeric metadata fields every batch records in ParsedBatch.values:
+# response sizes (access logs, nginx, Squid) and Squid's elapsed time
+VALUE_FIELDS = ("size", "bytes", "duration_ms")
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Status codes outside this range go to ParsedBatch.other_statuses
+_STATUS_MAX = 2**31
+
+_HTTP_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH"))
+
+
+def epoch_micros(timestamp: datetime) -> int:
+    """
+    Convert a datetime to integer microseconds since the Unix epoch.
+
+    Naive datetimes are taken to be UTC, as log timestamps without an
+    offset usually are.
+    """
+    return (timestamp - (_EPOCH_UTC if timestamp.tzinfo is not None else _EPOCH)) // _MICROSECOND
+
+
+def request_path(request: str) -> Optional[str]:
+    """
+    Get the path from an HTTP request line, without its query string.
+
+    Args:
+        request: Request line such as ``GET /index.html?q=1 HTTP/1.1``
+
+    Returns:
+        The path (``/index.html``), or None if the text is not a request line
+    """
+    method, _, rest = request.partition(" ")
+    if method not in _HTTP_METHODS:
+        return None
+    return rest.partition(" ")[0].partition("?")[0] or None
+
+
+def to_number(value: Any) -> Optional[float]:
+    """
+    Convert a metadata value to a float.
+
+    Args:
+        value: int, float or numeric string (as captured by regex parsers)
+
+    Returns:
+        The number, or None for missing, non-numeric ("-") and non-finite values
+    """
+    if value is None or value.__class__ is bool:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def entry_user(entry: "LogEntry") -> Optional[str]:
+    """Get an entry's authenticated user, treating the access log placeholder ``-`` as none."""
+    user = entry.get("user")
+    # Structured user objects (JSON logs) have no single name to count
+    if not user or user == "-" or isinstance(user, (dict, list)):
+        return None
+    return str(user)
+
+
+def entry_path(entry: "LogEntry") -> Optional[str]:
+    """Get an entry's request path, from its ``path`` field or an HTTP request line message."""
+    path = entry.get("path")
+    if path and isinstance(path, str):
+        return path
+    return request_path(entry.message) if entry.message else None
+
+
+class ParsedBatch:
+    """
+    Parsed fields for a chunk of lines, one array per field.
+
+    Row ``i`` describes the ``i``-th successfully parsed line. Blank lines
+    only count towards total_lines; lines the parser rejects count towards
+    failed_lines.
+
+    Attributes:
+        total_lines: Lines read, including blank and unparsed lines
+        failed_lines: Non-blank lines the parser rejected
+        timestamps: Epoch microseconds per row, TIMESTAMP_MISSING if absent
+        levels: Index into level_names per row, NO_ID if absent
+        sources: Index into source_names per row, NO_ID if absent
+        statuses: HTTP status per row, 0 if absent
+        messages: Message per row (references, not copies)
+        level_names: Distinct levels in first-seen order
+        source_names: Distinct sources in first-seen order
+        users: Distinct authenticated users in the batch
+        paths: Distinct request paths in the batch
+        values: Numeric fields (VALUE_FIELDS) by name, as (rows, values) arrays
+            holding only the rows that have the field
+        other_statuses: Counts of status values that are not plain integers
+        format_counts: Rows per format name, filled by parsers that route lines
+            between formats (empty otherwise)
+        earliest: Earliest timestamp in the batch
+        latest: Latest timestamp in the batch
+        line_indexes: Index of each row's line among the lines read
+        offsets: Byte offset of every line read (not only rows) when the
+            caller knows them, else None; see LogReader.read_blocks()
+    """
+
+    def __init__(self, build_entry: Callable[[Any], Optional["LogEntry"]]):
+        """
+        Create an empty batch.
+
+        Args:
+            build_entry: Turns one line back into a LogEntry; used for rows kept
+                as samples that were added without their entry
+        """
+        self.total_lines = 0
+        self.failed_lines = 0
+        self.timestamps = array("q")
+        self.levels = array("i")
+        self.sources = array("i")
+        self.statuses = array("i")
+        self.messages: list[str] = []
+        self.level_names: list[str] = []
+        self.source_names: list[str] = []
+        self.users: set[str] = set()
+        self.paths: set[str] = set()
+        self.values: dict[str, tuple[array, array]] = {}
+        self.other_statuses: Counter = Counter()
+        self.format_counts: Counter = Counter()
+        self.earliest: Optional[datetime] = None
+        self.latest: Optional[datetime] = None
+        self.line_indexes = array("i")
+        self.offsets: Optional[Sequence[int]] = None
+        self._level_ids: dict[str, int] = {}
+        self._source_ids: dict[str, int] = {}
+        self._lines: list = []
+        self._entries: dict[int, "LogEntry"] = {}
+        self._last_timestamp: Optional[datetime] = None
+        self._last_epoch = TIMESTAMP_MISSING
+        self._build_entry = build_entry
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines: Iterable[Any],
+        parse_line: Callable[[Any], Optional["LogEntry"]],
+        on_entry: Optional[Callable[["LogEntry"], None]] = None,
+    ) -> "ParsedBatch":
+        """
+        Build a batch by parsing each line into a LogEntry.
+
+        This is the generic path behind BaseParser.parse_batch(); parsers
+        with a cheaper way to fill the columns override parse_batch().
+
+        Args:
+            lines: Lines to parse
+            parse_line: Callable that turns one line into a LogEntry or None
+            on_entry: Called with every parsed entry, for consumers that need
+                whole entries rather than columns
+
+        Returns:
+            The filled batch
+        """
+        batch = cls(parse_line)
+        add_entry = batch.add_entry
+        for line in lines:
+            batch.total_lines += 1
+            if not line.strip():
+                continue
+            entry = parse_line(line)
+            if entry is None:
+                batch.failed_lines += 1
+                continue
+            add_entry(line, entry)
+            if on_entry is not None:
+                on_entry(entry)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def add(
+        self,
+        line: Any,
+        timestamp: Optional[datetime],
+        level: Optional[str],
+        source: Optional[str],
+        status: Any,
+        message: str,
+        entry: Optional["LogEntry"] = None,
+        user: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        """
+        Append one parsed line, after it has been counted in total_lines.
+
+        Args:
+            line: The original line, kept to rebuild its entry if it becomes a sample
+            timestamp: Parsed timestamp or None
+            level: Level or None
+            source: Source or None
+            status: HTTP status (int, other value, or None)
+            message: Message text
+            entry: The line's LogEntry if one was already built
+            user: Authenticated user or None
+            path: Request path or None
+        """
+        if timestamp:
+            # Consecutive lines usually share one (cached) datetime object
+            if timestamp is not self._last_timestamp:
+                self._last_timestamp = timestamp
+                self._last_epoch = epoch_micros(timestamp)
+                if self.earliest is None or timestamp < self.earliest:
+                    self.earliest = timestamp
+                if self.latest is None or timestamp > self.latest:
+                    self.latest = timestamp
+            self.timestamps.append(self._last_epoch)
+        else:
+            self.timestamps.append(TIMESTAMP_MISSING)
+
+        if level:
+            level_id = self._level_ids.get(level)
+            if level_id is None:
+                level_id = self._level_ids[level] = len(self.level_names)
+                self.level_names.append(level)
+            self.levels.append(level_id)
+        else:
+            self.levels.append(NO_ID)
+
+        if source:
+            source_id = self._source_ids.get(source)
+            if source_id is None:
+                source_id = self._source_ids[source] = len(self.source_names)
+                self.source_names.append(source)
+            self.sources.append(source_id)
+        else:
+            self.sources.append(NO_ID)
+
+        # bool is an int subclass but must not be counted as a status code
+        if status.__class__ is int and status and -_STATUS_MAX <= status < _STATUS_MAX:
+            self.statuses.append(status)
+        else:
+            if status:
+                self.other_statuses[status] += 1
+            self.statuses.append(0)
+
+        if user:
+            self.users.add(user)
+        if path:
+            self.paths.add(path)
+
+        self.messages.append(message)
+        self.line_indexes.append(self.total_lines - 1)
+        self._lines.append(line)
+        if entry is not None:
+            self._entries[len(self._lines) - 1] = entry
+
+    def add_value(self, field: str, row: int, value: float) -> None:
+        """Record a numeric field for a row already added."""
+        column = self.values.get(field)
+        if column is None:
+            column = self.values[field] = (array("i"), array("d"))
+        column[0].append(row)
+        column[1].append(value)
+
+    def add_entry(self, line: Any, entry: "LogEntry") -> None:
+        """Append one parsed line from its LogEntry."""
+        # Only sample rows ever need their entry again
+        sample = entry.level in ERROR_LEVELS or entry.level in WARNING_LEVELS
+        self.add(
+            line,
+            entry.timestamp,
+            entry.level,
+            entry.source,
+            entry.get("status"),
+            entry.message,
+            entry if sample else None,
+            entry_user(entry),
+            entry_path(entry),
+        )
+        row = len(self.levels) - 1
+        for field in VALUE_FIELDS:
+            value = to_number(entry.get(field))
+            if value is not None:
+                self.add_value(field, row, value)
+
+    def entry(self, row: int) -> "LogEntry":
+        """Get the LogEntry for a row, rebuilding it from its line if needed."""
+        entry = self._entries.get(row)
+        if entry is None:
+            entry = self._entries[row] = self._build_entry(self._lines[row])
+        return entry
+
+
+def _first_seen_counts(names: list, counts: Iterable[int]) -> Counter:
+    """Build a Counter keyed by name, in id (first-seen) order, skipping zero counts."""
+    return Counter({name: int(n) for name, n in zip(names, counts) if n})
+
+
+def count_ids(ids: array, names: list[str]) -> Counter:
+    """
+    Count the rows of an interned column (levels or sources).
+
+    Args:
+        ids: Column of indexes into names, NO_ID for rows without a value
+        names: Distinct values in first-seen order
+
+    Returns:
+        Counter keyed by value, in first-seen order like sequential counting
+    """
+    if not names:
+        return Counter()
+    if NUMPY_AVAILABLE:
+        column = np.frombuffer(ids, dtype=np.int32)
+        return _first_seen_counts(names, np.bincount(column[column != NO_ID], minlength=len(names)).tolist())
+    counts = Counter(ids)
+    return _first_seen_counts(names, [counts[i] for i in range(len(names))])
+
+
+def count_statuses(batch: ParsedBatch) -> Counter:
+    """
+    Count the status codes in a batch, including non-integer values.
+
+    Returns:
+        Counter keyed by status, in first-seen order for integer codes
+    """
+    if NUMPY_AVAILABLE and len(batch):
+        statuses = np.frombuffer(batch.statuses, dtype=np.int32)
+        # np.unique sorts; reorder by first occurrence to match sequential counting
+        values, first, counts = np.unique(statuses[statuses != 0], return_index=True, return_counts=True)
+        order = np.argsort(first, kind="stable")
+        status_codes = Counter(dict(zip(values[order].tolist(), counts[order].tolist())))
+    else:
+        status_codes = Counter(status for status in batch.statuses if status)
+    status_codes.update(batch.other_statuses)
+    return status_codes
+
+
+def count_time_buckets(batch: ParsedBatch, bucket_seconds: int) -> dict[str, Counter]:
+    """
+    Count the rows of a batch per level and time bucket.
+
+    Rows without a timestamp or a level are skipped. Buckets are aligned
+    to the Unix epoch, so counts from different batches line up.
+
+    Args:
+        batch: Parsed batch
+        bucket_seconds: Bucket width in seconds
+
+    Returns:
+        Counter of bucket start (Unix seconds, UTC) per level
+    """
+    names = batch.level_names
+    counts: dict[str, Counter] = {}
+    if not names:
+        return counts
+    bucket_micros = bucket_seconds * 1_000_000
+    if NUMPY_AVAILABLE:
+        timestamps = np.frombuffer(batch.timestamps, dtype=np.int64)
+        levels = np.frombuffer(batch.levels, dtype=np.int32)
+        keep = (timestamps != TIMESTAMP_MISSING) & (levels != NO_ID)
+        # One integer per (bucket, level) pair, counted in a single pass
+        keys = timestamps[keep] // bucket_micros * len(names) + levels[keep]
+        values, totals = np.unique(keys, return_counts=True)
+        pairs = zip(values.tolist(), totals.tolist())
+    else:
+        pairs = Counter(
+            timestamp // bucket_micros * len(names) + level
+            for timestamp, level in zip(batch.timestamps, batch.levels)
+            if timestamp != TIMESTAMP_MISSING and level != NO_ID
+        ).items()
+    for key, total in pairs:
+        bucket, level = divmod(key, len(names))
+        counter = counts.get(names[level])
+        if counter is None:
+            counter = counts[names[level]] = Counter()
+        counter[bucket * bucket_seconds] += total
+    return counts
+
+
+def rows_with(ids: array, names: list[str], wanted: Iterable[str], limit: Optional[int] = None) -> list[int]:
+    """
+    Find the rows of an interned column whose value is one of ``wanted``.
+
+    Args:
+        ids: Column of indexes into names
+        names: Distinct values in first-seen order
+        wanted: Values to look for
+        limit: Return at most this many rows
+
+    Returns:
+        Row numbers in ascending order
+    """
+    wanted_ids = [i for i, name in enumerate(names) if name in wanted]
+    if not wanted_ids:
+        return []
+    if NUMPY_AVAILABLE:
+        rows = np.flatnonzero(np.isin(np.frombuffer(ids, dtype=np.int32), wanted_ids))
+        return rows[:limit].tolist()
+    wanted_set = set(wanted_ids)
+    return [row for row, value in enumerate(ids) if value in wanted_set][:limit]
+
+
+def values_by_status_class(batch: ParsedBatch, field: str) -> dict[str, Any]:
+    """
+    Split a numeric column by the HTTP status class (``"2xx"``, ...) of its rows.
+
+    Rows without an integer status code in 100-599 are left out.
+
+    Args:
+        batch: Parsed batch
+        field: Name of a column in batch.values
+
+    Returns:
+        Values (a NumPy array or a list) by status class, in class order
+    """
+    column = batch.values.get(field)
+    if column is None:
+        return {}
+    rows, values = column
+    if NUMPY_AVAILABLE:
+        classes = np.frombuffer(batch.statuses, dtype=np.int32)[np.frombuffer(rows, dtype=np.int32)] // 100
+        numbers = np.frombuffer(values, dtype=np.float64)
+        return {f"{c}xx": numbers[classes == c] for c in np.unique(classes).tolist() if 1 <= c <= 5}
+    statuses = batch.statuses
+    groups: dict[int, list[float]] = {}
+    for row, value in zip(rows, values):
+        c = statuses[row] // 100
+        if 1 <= c <= 5:
+            groups.setdefault(c, []).append(value)
+    return {f"{c}xx": groups[c] for c in sorted(groups)}
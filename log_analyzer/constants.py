@@ -12,11 +12,34 @@ MAX_DISPLAY_ENTRIES = 5  # Default number of top entries to display (errors, sou
 
 # File processing limits
 DEFAULT_SAMPLE_SIZE = 100  # Number of lines to sample for format detection
+DEFAULT_CHUNK_SIZE = 10_000  # Lines per chunk, and per columnar batch parsed and folded at a time
+DETECTION_MIN_SAMPLES = 20  # Lines sampled before format detection may stop early
+DETECTION_CONFIDENCE_Z = 3.0  # Standard deviations the leading format must be ahead by to stop early
 DEFAULT_MAX_ERRORS = 50  # Default maximum errors/warnings to collect during analysis
+PIPELINE_QUEUE_DEPTH_PER_WORKER = 2  # Chunks queued or parsing per worker before the reader waits
+DEFAULT_BYTE_RANGE_SIZE = 8 * 1024 * 1024  # Bytes per worker range in byte-range parallel analysis
+GZIP_PARALLEL_SEGMENT_SIZE = 4 * 1024 * 1024  # Compressed bytes per worker when inflating multi-member gzip
+DECOMPRESS_READ_SIZE = 1024 * 1024  # Bytes per read when streaming or counting compressed files
+RANGE_READ_SIZE = 1024 * 1024  # Bytes read and decoded at a time when iterating over a byte range
+LINE_INDEX_INTERVAL = 1000  # Lines between entries in the sparse line-offset index
+TIME_INDEX_PROBE_LINES = 16  # Lines parsed at the start of each index block to find its timestamp
+CHECKPOINT_HEAD_BYTES = 4096  # Leading bytes hashed to recognise the same file when resuming from a checkpoint
+TIMESTAMP_CACHE_SIZE = 4096  # Distinct seconds-resolution timestamps memoized before the cache is reset
+FALLBACK_LEARN_MATCHES = 8  # Consecutive same-layout timestamps before the fallback parser tries that layout first
+JSON_PARTIAL_DECODE_MIN_LENGTH = 256  # Shorter JSON lines are decoded whole; longer ones only for the keys a parser reads
 
 # Memory optimization limits
-MAX_COUNTER_SIZE = 10_000  # Maximum unique items in Counter before pruning (prevents unbounded memory growth)
-COUNTER_PRUNE_TO = 5_000  # When pruning Counter, keep only this many most common items
+HEAVY_HITTERS_CAPACITY = 10_000  # Distinct sources/error messages tracked by each Space-Saving summary
+HLL_PRECISION = 12  # HyperLogLog index bits: 4096 one-byte registers (4 KB), ~1.6% standard error
+DDSKETCH_RELATIVE_ACCURACY = 0.01  # Quantile estimates are within 1% of the true value
+DDSKETCH_MAX_BUCKETS = 2048  # Buckets per DDSketch before the smallest are collapsed
+
+# Log template mining (Drain)
+TEMPLATE_TREE_DEPTH = 4  # Prefix tree depth: root, token-count level, leading-token level, leaf templates
+TEMPLATE_MAX_CHILDREN = 100  # Distinct tokens per tree node before new ones share the wildcard branch
+TEMPLATE_SIMILARITY = 0.4  # Fraction of matching tokens for a message to join an existing template
+TEMPLATE_MAX_CLUSTERS = 1_000  # Templates kept before the least recently matched is evicted
+TEMPLATE_CACHE_SIZE = 10_000  # Exact messages remembered with their template to skip the tree search
 
 # Log level colors for display
 LEVEL_COLORS = {
@@ -32,3 +55,4 @@ CHARS_PER_TOKEN = 4  # Approximate characters per token for prompt size estimati
 
 # Analytics configuration
 DEFAULT_TIME_BUCKET_SIZE = "1h"  # Default time bucket size: '5min', '15min', '1h', '1day'
+TIME_SERIES_BUCKET_SECONDS = 300  # Per-level counts are kept per 5 minutes; coarser time buckets are sums of these
@@ -0,0 +1,491 @@
+"""
+Sparse line-offset index for log files.
+
+Records the byte offset of at least every Nth line so that any line can be
+reached with one seek and at most N-1 line reads, independent of file
+size. When built with a parser, each entry also records the timestamp of
+the first timestamped line in its block, so time windows can be located
+by binary search. The index is stored as a small JSON sidecar next to the
+log file and is considered stale as soon as the file's size or
+modification time changes.
+
+LineIndex.build() scans a file on its own; LineIndexBuilder collects the
+same index as an aggregator during an analysis (see
+log_analyzer.aggregators), so the file is read only once.
+"""
+
+import bisect
+import json
+import logging
+import os
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from .aggregators import Aggregator
+from .columnar import TIMESTAMP_MISSING, ParsedBatch
+from .constants import LINE_INDEX_INTERVAL, TIME_INDEX_PROBE_LINES
+from .parsers import BaseParser, LogEntry
+from .reader import LogReader
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "INDEX_SUFFIX",
+    "LineIndex",
+    "LineIndexBuilder",
+    "index_path_for",
+    "iter_time_range",
+    "timestamp_to_epoch",
+]
+
+
+# Sidecar file suffix appended to the log file name
+INDEX_SUFFIX = ".idx.json"
+
+# Bumped whenever the on-disk layout changes; older sidecars are ignored
+INDEX_VERSION = 3
+
+
+def timestamp_to_epoch(timestamp: datetime) -> float:
+    """
+    Convert a timestamp to POSIX seconds, treating naive datetimes as UTC.
+
+    Args:
+        timestamp: Timezone-aware or naive datetime
+
+    Returns:
+        Seconds since the epoch
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def index_path_for(filepath: str) -> Path:
+    """
+    Get the sidecar index path for a log file.
+
+    Args:
+        filepath: Path to the log file
+
+    Returns:
+        Path of the index file stored next to it
+    """
+    return Path(f"{filepath}{INDEX_SUFFIX}")
+
+
+@dataclass
+class LineIndex:
+    """
+    Sparse mapping from line numbers to byte offsets.
+
+    Lines are numbered from 0 and delimited by ``\\n`` in the raw file,
+    matching LogReader.count_lines(). The file is cut into blocks of at
+    most interval lines; build() makes every block but the last exactly
+    interval lines long, while an index collected by LineIndexBuilder also
+    starts a block wherever a chunk or byte range of the analysis started.
+
+    Attributes:
+        interval: Maximum number of lines per block
+        offsets: offsets[k] is the byte offset where block k starts
+        lines: lines[k] is the number of the line that starts block k
+        total_lines: Total number of lines in the file
+        file_size: Size of the file when the index was built
+        file_mtime_ns: Modification time of the file when the index was built
+        timestamps: timestamps[k] is the epoch time of the first timestamped line
+                    among the first few lines of block k (None if not found).
+                    Empty when the index was built without a parser.
+    """
+
+    interval: int = LINE_INDEX_INTERVAL
+    offsets: list[int] = field(default_factory=list)
+    lines: list[int] = field(default_factory=list)
+    total_lines: int = 0
+    file_size: int = 0
+    file_mtime_ns: int = 0
+    timestamps: list[Optional[float]] = field(default_factory=list)
+
+    @classmethod
+    def build(
+        cls,
+        filepath: str,
+        interval: int = LINE_INDEX_INTERVAL,
+        parser: Optional[BaseParser] = None,
+        encoding: str = "utf-8",
+    ) -> "LineIndex":
+        """
+        Build an index by scanning the file once.
+
+        Args:
+            filepath: Path to an uncompressed log file
+            interval: Number of lines between index entries
+            parser: If given, record block timestamps using this parser. Only
+                   the first TIME_INDEX_PROBE_LINES lines of each block are parsed.
+            encoding: Character encoding used to decode probed lines
+
+        Returns:
+            The built LineIndex
+
+        Raises:
+            ValueError: If interval is not positive or the file is compressed
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        reader = LogReader(filepath)
+        if reader.is_compressed:
+            raise ValueError(f"Cannot index {reader.compression}-compressed file: {filepath}")
+
+        if parser is not None:
+            parser = parser.for_file(filepath)
+        offsets = []
+        lines = []
+        timestamps = []
+        probe_lines = min(TIME_INDEX_PROBE_LINES, interval)
+        offset = 0
+        line_number = 0
+        with open(reader.filepath, "rb") as f:
+            stat = os.fstat(f.fileno())
+            for raw in f:
+                position = line_number % interval
+                if position == 0:
+                    offsets.append(offset)
+                    lines.append(line_number)
+                    if parser is not None:
+                        timestamps.append(None)
+                if parser is not None and position < probe_lines and timestamps[-1] is None:
+                    entry = _parse_raw(parser, raw, encoding)
+                    if entry is not None and entry.timestamp is not None:
+                        timestamps[-1] = timestamp_to_epoch(entry.timestamp)
+                offset += len(raw)
+                line_number += 1
+
+        logger.debug(f"Built line index for {filepath}: {line_number:,} lines, {len(offsets):,} entries")
+        return cls(
+            interval=interval,
+            offsets=offsets,
+            lines=lines,
+            total_lines=line_number,
+            file_size=stat.st_size,
+            file_mtime_ns=stat.st_mtime_ns,
+            timestamps=timestamps,
+        )
+
+    @property
+    def has_timestamps(self) -> bool:
+        """Whether any block has a recorded timestamp."""
+        return any(ts is not None for ts in self.timestamps)
+
+    def time_window(self, since: Optional[datetime], until: Optional[datetime]) -> tuple[int, int, Optional[int]]:
+        """
+        Locate the part of the file that can contain entries in a time window.
+
+        Block timestamps are assumed to be (roughly) non-decreasing; blocks
+        without a timestamp inherit the previous block's. Scanning starts one
+        block before the first block stamped at or after ``since`` and stops
+        at the first block stamped after ``until``.
+
+        Args:
+            since: Window start (inclusive), or None for the start of the file
+            until: Window end (inclusive), or None for the end of the file
+
+        Returns:
+            Tuple of (start byte offset, line number at that offset, end byte
+            offset or None for end of file)
+        """
+        keys = []
+        last = float("-inf")
+        for ts in self.timestamps:
+            if ts is not None:
+                last = max(last, ts)
+            keys.append(last)
+
+        start_block = 0
+        if since is not None and keys:
+            start_block = max(bisect.bisect_left(keys, timestamp_to_epoch(since)) - 1, 0)
+
+        end_offset = None
+        if until is not None:
+            end_block = bisect.bisect_right(keys, timestamp_to_epoch(until))
+            if end_block < len(self.offsets):
+                end_offset = self.offsets[end_block]
+
+        if not self.offsets:
+            return 0, 0, end_offset
+        return self.offsets[start_block], self.lines[start_block], end_offset
+
+    def locate(self, line_number: int) -> tuple[int, int]:
+        """
+        Find the closest indexed position at or before a line.
+
+        Args:
+            line_number: 0-based line number
+
+        Returns:
+            Tuple of (byte offset, line number at that offset). Reading forward
+            from the offset reaches line_number after skipping the difference.
+            Lines past the end map to the last indexed position.
+        """
+        if not self.offsets or line_number <= 0:
+            return 0, 0
+        block = bisect.bisect_right(self.lines, line_number) - 1
+        return self.offsets[block], self.lines[block]
+
+    def iter_lines(self, filepath: str, start_line: int = 0, encoding: str = "utf-8") -> Iterator[str]:
+        """
+        Iterate over lines starting at a given line number.
+
+        Args:
+            filepath: Path to the indexed log file
+            start_line: 0-based line number to start from
+            encoding: Character encoding used to decode lines
+
+        Yields:
+            Each line from start_line onwards, stripped of trailing newlines.
+        """
+        offset, line_number = self.locate(start_line)
+        with open(filepath, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if line_number >= start_line:
+                    yield raw.decode(encoding, errors="replace").rstrip("\n\r")
+                line_number += 1
+
+    def is_current(self, filepath: str) -> bool:
+        """Check whether the file is unchanged since the index was built."""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return False
+        return stat.st_size == self.file_size and stat.st_mtime_ns == self.file_mtime_ns
+
+    def save(self, path: str) -> Path:
+        """
+        Write the index to a JSON file.
+
+        Args:
+            path: Destination path (usually index_path_for(log file))
+
+        Returns:
+            Path where the index was written
+        """
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, **asdict(self)}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "LineIndex":
+        """
+        Read an index written by save().
+
+        Raises:
+            ValueError: If the file is not a compatible index
+        """
+        with open(path) as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.pop("version", None) != INDEX_VERSION:
+            raise ValueError(f"Unsupported line index format: {path}")
+        return cls(**data)
+
+    @classmethod
+    def load_for(cls, filepath: str) -> Optional["LineIndex"]:
+        """
+        Load the sidecar index for a log file if it exists and is current.
+
+        Args:
+            filepath: Path to the log file
+
+        Returns:
+            LineIndex, or None if there is no usable index
+        """
+        path = index_path_for(filepath)
+        if not path.exists():
+            return None
+        try:
+            index = cls.load(path)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable line index {path}: {e}")
+            return None
+        if not index.is_current(filepath):
+            logger.debug(f"Ignoring stale line index {path}")
+            return None
+        return index
+
+
+class LineIndexBuilder(Aggregator):
+    """
+    Collects a LineIndex during an analysis instead of in a separate scan.
+
+    Reads the line offsets that LogReader.read_blocks() hands each batch
+    (ParsedBatch.offsets) and the parsed timestamps of the first
+    TIME_INDEX_PROBE_LINES lines of every block. Each chunk or byte range
+    starts a new block, since its first line number in the file is only
+    known once the parts are merged.
+
+    The result is None when some lines came without offsets (entries fed
+    one at a time). Offsets of compressed files count decompressed bytes,
+    so their index must not be saved. The caller fills in file_size and
+    file_mtime_ns before saving.
+    """
+
+    name = "line_index"
+
+    def __init__(self, interval: int = LINE_INDEX_INTERVAL):
+        """
+        Args:
+            interval: Maximum number of lines per block
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        self.interval = interval
+        self.probe_lines = min(TIME_INDEX_PROBE_LINES, interval)
+        # Lines seen by this part; lines are numbered from the part's first line
+        self.total_lines = 0
+        self.complete = True
+        self.offsets: list[int] = []
+        self.lines: list[int] = []
+        self.timestamps: list[Optional[float]] = []
+
+    def update(self, entry: LogEntry) -> None:
+        # Entries carry no byte offset
+        self.complete = False
+
+    def update_batch(self, batch: ParsedBatch) -> None:
+        base = self.total_lines
+        self.total_lines += batch.total_lines
+        if batch.offsets is None:
+            self.complete = False
+        if not self.complete:
+            return
+
+        for index in range(-base % self.interval, batch.total_lines, self.interval):
+            self.offsets.append(batch.offsets[index])
+            self.lines.append(base + index)
+            self.timestamps.append(None)
+
+        # Stamp the blocks whose first probe_lines lines overlap this batch
+        timestamps, line_indexes = batch.timestamps, batch.line_indexes
+        block = len(self.lines) - 1
+        while block >= 0 and self.lines[block] + self.probe_lines > base:
+            if self.timestamps[block] is None:
+                row = bisect.bisect_left(line_indexes, self.lines[block] - base)
+                probe_end = self.lines[block] + self.probe_lines - base
+                while row < len(line_indexes) and line_indexes[row] < probe_end:
+                    if timestamps[row] != TIMESTAMP_MISSING:
+                        self.timestamps[block] = timestamps[row] / 1_000_000
+                        break
+                    row += 1
+            block -= 1
+
+    def merge(self, other: "LineIndexBuilder") -> None:
+        self.complete = self.complete and other.complete
+        self.offsets += other.offsets
+        self.lines += [line + self.total_lines for line in other.lines]
+        self.timestamps += other.timestamps
+        self.total_lines += other.total_lines
+
+    def finalize(self) -> dict[str, Any]:
+        if not self.complete:
+            return {self.name: None}
+        index = LineIndex(
+            interval=self.interval,
+            offsets=list(self.offsets),
+            lines=list(self.lines),
+            total_lines=self.total_lines,
+            timestamps=list(self.timestamps),
+        )
+        return {self.name: index}
+
+    def to_state(self) -> dict:
+        return {
+            "interval": self.interval,
+            "total_lines": self.total_lines,
+            "complete": self.complete,
+            "offsets": self.offsets,
+            "lines": self.lines,
+            "timestamps": self.timestamps,
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.interval = state["interval"]
+        self.probe_lines = min(TIME_INDEX_PROBE_LINES, self.interval)
+        self.total_lines = state["total_lines"]
+        self.complete = state["complete"]
+        self.offsets = state["offsets"]
+        self.lines = state["lines"]
+        self.timestamps = state["timestamps"]
+
+
+def _parse_raw(parser: BaseParser, raw: bytes, encoding: str) -> Optional[LogEntry]:
+    """Decode and parse one raw line, treating blank lines as unparseable."""
+    line = raw.decode(encoding, errors="replace").rstrip("\n\r")
+    if not line.strip():
+        return None
+    return parser.parse(line)
+
+
+def iter_time_range(
+    filepath: str,
+    parser: BaseParser,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    index: Optional[LineIndex] = None,
+    encoding: str = "utf-8",
+) -> Iterator[tuple[int, str, LogEntry]]:
+    """
+    Stream the parsed entries whose timestamps fall inside a time window.
+
+    With a timestamped index only the blocks that can overlap the window are
+    read; otherwise the whole file is scanned. Naive datetimes are treated
+    as UTC on both sides of the comparison.
+
+    Args:
+        filepath: Path to the log file
+        parser: Parser for the file's format
+        since: Window start (inclusive), or None for no lower bound
+        until: Window end (inclusive), or None for no upper bound
+        index: Line index for the file (ignored unless it has timestamps)
+        encoding: Character encoding
+
+    Yields:
+        Tuples of (0-based line number, line, LogEntry) in file order
+    """
+    parser = parser.for_file(filepath)
+    low = timestamp_to_epoch(since) if since is not None else float("-inf")
+    high = timestamp_to_epoch(until) if until is not None else float("inf")
+
+    def in_window(line: str) -> Optional[LogEntry]:
+        if not line.strip():
+            return None
+        entry = parser.parse(line)
+        if entry is None or entry.timestamp is None:
+            return None
+        return entry if low <= timestamp_to_epoch(entry.timestamp) <= high else None
+
+    if index is None or not index.has_timestamps:
+        # No usable index: full scan (LogReader also handles compressed files)
+        for line_number, line in enumerate(LogReader(filepath, encoding=encoding).read_lines()):
+            entry = in_window(line)
+            if entry is not None:
+                yield line_number, line, entry
+        return
+
+    offset, line_number, end_offset = index.time_window(since, until)
+    with open(filepath, "rb") as f:
+        f.seek(offset)
+        position = offset
+        for raw in f:
+            if end_offset is not None and position >= end_offset:
+                break
+            position += len(raw)
+            line = raw.decode(encoding, errors="replace").rstrip("\n\r")
+            entry = in_window(line)
+            if entry is not None:
+                yield line_number, line, entry
+            line_number += 1
@@ -0,0 +1,141 @@
+"""
+Pluggable JSON decoding for the JSON-based parsers.
+
+loads() decodes with ``msgspec`` or ``orjson`` when one of them is installed
+and with the standard library otherwise. Results are always exactly those of
+``json.loads()``: documents the fast backends read differently (NaN and
+Infinity, lone surrogates, integers beyond 64 bits for orjson) or reject are
+decoded again by the standard library, which also raises the usual
+``json.JSONDecodeError`` for invalid input.
+
+KeyDecoder decodes only the top-level keys a parser reads. With msgspec,
+large objects are decoded straight into a struct of those keys, so nested
+payloads the parser never looks at are validated but not built.
+"""
+
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from .constants import JSON_PARTIAL_DECODE_MIN_LENGTH
+
+# Try to import the fast decoders, but make them optional
+try:
+    import msgspec
+
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+__all__ = [
+    "KeyDecoder",
+    "json_backend",
+    "loads",
+]
+
+
+# orjson reads integers outside the 64-bit range as floats. Mapping every ASCII
+# digit to "0" and everything else to a space finds 19-digit runs in C code.
+_DIGIT_TABLE = bytes(48 if 48 <= byte <= 57 else 32 for byte in range(256))
+_LONG_DIGIT_RUN = b"0" * 19
+
+
+def json_backend() -> str:
+    """Name of the library loads() decodes with: "msgspec", "orjson" or "json"."""
+    if MSGSPEC_AVAILABLE:
+        return "msgspec"
+    if ORJSON_AVAILABLE:
+        return "orjson"
+    return "json"
+
+
+def _orjson_loads(text: str) -> Any:
+    raw = text.encode()
+    if _LONG_DIGIT_RUN in raw.translate(_DIGIT_TABLE):
+        raise ValueError("number may not fit in 64 bits")
+    return orjson.loads(raw)
+
+
+def loads(text: str) -> Any:
+    """
+    Decode a JSON document exactly like ``json.loads()``, only faster.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        The decoded value
+
+    Raises:
+        json.JSONDecodeError: If the text is not valid JSON
+    """
+    # Decode and encode errors are ValueErrors in every backend
+    if MSGSPEC_AVAILABLE:
+        try:
+            return msgspec.json.decode(text)
+        except ValueError:
+            pass
+    elif ORJSON_AVAILABLE:
+        try:
+            return _orjson_loads(text)
+        except ValueError:
+            pass
+    return json.loads(text)
+
+
+class KeyDecoder:
+    """
+    Decoder for JSON objects of which only some top-level keys are read.
+
+    decode() returns a dict that holds at least the requested keys the object
+    has, with the values json.loads() would give. Other keys may or may not
+    be present, so callers must only look up the keys they asked for.
+    Documents that are not objects are decoded whole.
+    """
+
+    def __init__(self, keys: Iterable[str], min_length: int = JSON_PARTIAL_DECODE_MIN_LENGTH):
+        """
+        Create a decoder for a set of keys.
+
+        Args:
+            keys: Top-level keys the caller reads
+            min_length: Shorter documents are decoded whole, which is faster
+                than building a struct and converting it back to a dict
+        """
+        self.keys = tuple(dict.fromkeys(keys))
+        self.min_length = min_length
+        self._decoder = None
+        if MSGSPEC_AVAILABLE:
+            fields = [
+                (f"field{index}", Any, msgspec.field(default=msgspec.UNSET, name=key))
+                for index, key in enumerate(self.keys)
+            ]
+            self._decoder = msgspec.json.Decoder(msgspec.defstruct("Record", fields))
+
+    def __reduce__(self):
+        # Structs and decoders are rebuilt rather than pickled
+        return (type(self), (self.keys, self.min_length))
+
+    def decode(self, text: str) -> Any:
+        """
+        Decode a JSON document, keeping only the requested keys of an object.
+
+        Raises:
+            json.JSONDecodeError: If the text is not valid JSON
+        """
+        if self._decoder is not None and MSGSPEC_AVAILABLE and len(text) >= self.min_length:
+            try:
+                # Absent keys are left UNSET, which to_builtins() drops
+                return msgspec.to_builtins(self._decoder.decode(text))
+            except ValueError:
+                # Not an object, or something only the full decode handles
+                pass
+        return loads(text)
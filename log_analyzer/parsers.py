@@ -6,15 +6,26 @@ nginx, JSON, and syslog.
 """
 
 import contextlib
+import copy
 import json
+import os
 import re
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from array import array
+from collections.abc import Iterable
 from datetime import datetime, timezone
-from typing import Any, Optional
+from functools import partial
+from typing import Any, Callable, Optional, Union
+
+from .columnar import VALUE_FIELDS, ParsedBatch, request_path
+from .constants import FALLBACK_LEARN_MATCHES
+from .jsondecode import KeyDecoder
+from .jsondecode import loads as json_loads
+from .timestamps import parse_clf, parse_iso8601, parse_syslog, parse_with_format
 
 __all__ = [
     "LogEntry",
+    "PROJECTED_METADATA_KEYS",
     "BaseParser",
     "AWSCloudWatchParser",
     "GCPCloudLoggingParser",
@@ -42,11 +53,25 @@ __all__ = [
 ]
 
 
-@dataclass
+# Month names by number, for year-less layouts parsed with the syslog helper
+_MONTH_ABBREVIATIONS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Metadata keys the analyzer reads on every line. Entries whose metadata is
+# built lazily carry these eagerly so reading them never builds the full dict.
+PROJECTED_METADATA_KEYS = ("status", "user", "path", *VALUE_FIELDS)
+
+
 class LogEntry:
     """
     Represents a single parsed log entry.
 
+    Entries use ``__slots__`` and build ``metadata`` only when it is first
+    accessed: parsers that attach metadata can pass ``metadata_factory``
+    instead of a dict, along with any PROJECTED_METADATA_KEYS values as
+    ``metadata``. ``get()`` reads those projected keys without calling the
+    factory. The ``metadata`` attribute behaves like a plain dict field for
+    existing callers.
+
     Attributes:
         raw: The original raw log line (optional, defaults to empty for memory efficiency)
         timestamp: Parsed timestamp (if available)
@@ -56,16 +81,81 @@ class LogEntry:
         metadata: Additional parsed fields
     """
 
-    raw: str = ""
-    timestamp: Optional[datetime] = None
-    level: Optional[str] = None
-    message: str = ""
-    source: Optional[str] = None
-    metadata: dict = None
+    __slots__ = ("raw", "timestamp", "level", "message", "source", "_metadata", "_metadata_factory")
+
+    def __init__(
+        self,
+        raw: str = "",
+        timestamp: Optional[datetime] = None,
+        level: Optional[str] = None,
+        message: str = "",
+        source: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        metadata_factory: Optional[Callable[[], dict]] = None,
+    ):
+        self.raw = raw
+        self.timestamp = timestamp
+        self.level = level
+        self.message = message
+        self.source = source
+        self._metadata = metadata
+        self._metadata_factory = metadata_factory
+
+    @property
+    def metadata(self) -> dict:
+        """Additional parsed fields, built on first access."""
+        if self._metadata_factory is not None:
+            self._metadata = self._metadata_factory()
+            self._metadata_factory = None
+        elif self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Optional[dict]) -> None:
+        self._metadata = value
+        self._metadata_factory = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Read a single metadata field.
+
+        Projected keys are answered without building lazy metadata.
+
+        Args:
+            key: Metadata key
+            default: Value returned when the key is absent
+
+        Returns:
+            The field value, or default
+        """
+        if self._metadata_factory is not None and key not in PROJECTED_METADATA_KEYS:
+            return self.metadata.get(key, default)
+        if self._metadata is None:
+            return default
+        return self._metadata.get(key, default)
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(raw={self.raw!r}, timestamp={self.timestamp!r}, level={self.level!r}, "
+            f"message={self.message!r}, source={self.source!r}, metadata={self.metadata!r})"
+        )
+
+    def __getstate__(self) -> tuple:
+        # Factories are often closures; ship the built metadata instead
+        return self._astuple()
 
-    def __post_init__(self):
-        if self.metadata is None:
-            self.metadata = {}
+    def __setstate__(self, state: tuple) -> None:
+        self.raw, self.timestamp, self.level, self.message, self.source, self._metadata = state
+        self._metadata_factory = None
+
+    def _astuple(self) -> tuple:
+        return (self.raw, self.timestamp, self.level, self.message, self.source, self.metadata)
 
 
 # Cloud provider severity mapping
@@ -116,6 +206,11 @@ def parse_cloud_timestamp(timestamp_str: str) -> Optional[datetime]:
         except (ValueError, OSError):
             pass
 
+    # Fast path for well-formed RFC3339; anything else takes the strptime route below
+    dt = parse_iso8601(timestamp_str)
+    if dt is not None and dt.tzinfo is not None:
+        return dt
+
     # Handle RFC3339Nano (nanoseconds) - truncate to microseconds
     if "." in timestamp_str and "Z" in timestamp_str:
         try:
@@ -187,11 +282,100 @@ def extract_level_from_message(message: str) -> Optional[str]:
     return None
 
 
+class _FieldSchema:
+    """
+    Field names a JSON-family parser resolved for one decoded record.
+
+    For each role (timestamp, level, message, ...) the parser probes a list of
+    candidate keys and uses the first one present. A schema remembers the key
+    chosen for each role (None if there was none) and the earlier candidates
+    the record lacked. Any record that also lacks those and has the chosen keys
+    resolves to the same fields, so parsers look them up directly; a missing
+    key means the schema changed and the parser probes and learns again.
+
+    Structured logs from one service share a schema, so in practice a parser
+    learns once per file.
+    """
+
+    __slots__ = ("fields", "absent", "timestamp")
+
+    def __init__(
+        self,
+        data: dict,
+        roles: Iterable[Iterable[str]],
+        timestamp: Optional[Callable[[Any], Optional[datetime]]] = None,
+    ):
+        """
+        Learn the schema of a record.
+
+        Args:
+            data: Decoded record
+            roles: Candidate keys for each role, in priority order
+            timestamp: Converter that handled the record's timestamp value, if any
+        """
+        fields = []
+        absent = []
+        for candidates in roles:
+            field = None
+            for candidate in candidates:
+                if candidate in data:
+                    field = candidate
+                    break
+                absent.append(candidate)
+            fields.append(field)
+        self.fields = tuple(fields)
+        self.absent = frozenset(absent)
+        self.timestamp = timestamp
+
+    def matches(self, data: dict) -> bool:
+        """Check that no higher-priority candidate appeared (the chosen keys are checked on lookup)."""
+        return self.absent.isdisjoint(data)
+
+
+def _epoch_timestamp(value: Any) -> Optional[datetime]:
+    """Convert Unix seconds to a naive local datetime, like JSONLogParser."""
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value)
+        except (ValueError, OSError):
+            pass
+    return None
+
+
+def _iso_timestamp(value: Any) -> Optional[datetime]:
+    """Convert ISO 8601 text, with ``Z`` read as naive like strptime, like JSONLogParser."""
+    return parse_iso8601(value, z_is_utc=False) if isinstance(value, str) else None
+
+
+def _format_timestamp(fmt: str, value: Any) -> Optional[datetime]:
+    """Convert text in a strptime layout."""
+    return parse_with_format(value, fmt) if isinstance(value, str) else None
+
+
 class BaseParser(ABC):
     """Abstract base class for log format parsers."""
 
     name: str = "base"
 
+    # When the parsed log was last written. Timestamps without a year (BSD
+    # syslog, MM-DD) take theirs from it (see timestamps.parse_syslog) and
+    # are left as None without it. Set by for_file().
+    reference_time: Optional[datetime] = None
+
+    # Cheap necessary conditions checked by prefilter() before any regex or
+    # JSON decode during format detection. FIRST_CHARS lists the characters
+    # a line can start with (after leading whitespace); REQUIRED_LITERAL is a
+    # substring every line of the format contains. They must never be
+    # stricter than try_parse() itself.
+    FIRST_CHARS: Optional[str] = None
+    REQUIRED_LITERAL: Optional[str] = None
+
+    # Anchored patterns, one of which must match (re.match) the raw line for
+    # try_parse() to accept it. The format classifier combines them across
+    # parsers to find a line's candidate formats in a single match. Parsers
+    # that leave this empty are tried on every line.
+    LINE_PATTERNS: tuple[re.Pattern, ...] = ()
+
     @abstractmethod
     def parse(self, line: str) -> Optional[LogEntry]:
         """
@@ -218,6 +402,138 @@ class BaseParser(ABC):
         """
         pass
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """
+        Parse a line only if it belongs to this format, in a single pass.
+
+        Equivalent to ``self.parse(line) if self.can_parse(line) else None``,
+        which is the default implementation. Built-in parsers override it so
+        the line is matched or decoded once, instead of once in can_parse()
+        and again in parse(). Format detection uses this method.
+
+        Args:
+            line: Raw log line to parse
+
+        Returns:
+            LogEntry if the line is in this format and parses, None otherwise
+        """
+        if not self.can_parse(line):
+            return None
+        return self.parse(line)
+
+    def prefilter(self, line: str) -> bool:
+        """
+        Cheaply rule out lines that cannot be in this format.
+
+        Non-ASCII first characters always pass, since regex ``\\d`` and ``\\w``
+        also match Unicode digits and letters.
+
+        Args:
+            line: Raw log line to check
+
+        Returns:
+            False if try_parse() would certainly return None
+        """
+        if self.FIRST_CHARS is not None:
+            first = line.lstrip()[:1]
+            if not first or (first not in self.FIRST_CHARS and first < "\x80"):
+                return False
+        return self.REQUIRED_LITERAL is None or self.REQUIRED_LITERAL in line
+
+    def fresh(self) -> "BaseParser":
+        """
+        Get a parser for one analysis run over one file (or one worker's part of it).
+
+        Parsers that learn from the lines they see, such as a JSON field
+        schema or a timestamp layout, return a copy with nothing learned, so
+        what one file taught them never applies to the next file and worker
+        threads never share it. Stateless parsers return themselves.
+
+        Returns:
+            A parser with no learned state
+        """
+        return self
+
+    def for_file(self, filepath: Union[str, os.PathLike]) -> "BaseParser":
+        """
+        Get a fresh() parser for one file, dating year-less timestamps by its modification time.
+
+        Args:
+            filepath: Path to the file about to be parsed
+
+        Returns:
+            A parser with no learned state, and reference_time set unless the
+            file cannot be stat'ed
+        """
+        try:
+            reference = datetime.fromtimestamp(os.path.getmtime(filepath))
+        except OSError:
+            reference = None
+        return self.with_reference_time(reference)
+
+    def with_reference_time(self, reference: Optional[datetime]) -> "BaseParser":
+        """
+        Get a fresh() copy of this parser with the given reference_time.
+
+        Args:
+            reference: When the parsed log was last written, or None if unknown
+
+        Returns:
+            A parser with no learned state
+        """
+        parser = copy.copy(self.fresh())
+        parser.reference_time = reference
+        return parser
+
+    def parse_batch(self, lines: Iterable[str]) -> ParsedBatch:
+        """
+        Parse a chunk of lines into columnar arrays.
+
+        The default parses each line with parse() and records its fields.
+        Override it to fill the columns without building a LogEntry per
+        line; the result must aggregate exactly like the default.
+
+        Args:
+            lines: Lines to parse
+
+        Returns:
+            ParsedBatch with one row per successfully parsed line
+        """
+        return ParsedBatch.from_lines(lines, self.parse)
+
+
+def _parse_access_batch(parser: BaseParser, lines: Iterable[str]) -> ParsedBatch:
+    """Fill a batch straight from access log regex matches, without LogEntry objects."""
+    batch = ParsedBatch(parser.parse)
+    match_line = parser.PATTERN.match
+    status_level = parser._status_level
+    add = batch.add
+    add_user = batch.users.add
+    size_rows, sizes = array("i"), array("d")
+    row = 0
+    for line in lines:
+        batch.total_lines += 1
+        if not line.strip():
+            continue
+        match = match_line(line)
+        if match is None:
+            batch.failed_lines += 1
+            continue
+        ip, timestamp, request, status, user, size = match.group("ip", "timestamp", "request", "status", "user", "size")
+        status = int(status)
+        add(line, parse_clf(timestamp), status_level(status), ip, status, request)
+        add_user(user)
+        if size.isdigit():
+            size_rows.append(row)
+            sizes.append(float(size))
+        row += 1
+    batch.users.discard("-")
+    if sizes:
+        batch.values["size"] = (size_rows, sizes)
+    # Requests repeat far more than lines do, so split each distinct one once
+    batch.paths.update(filter(None, map(request_path, set(batch.messages))))
+    return batch
+
 
 # ============================================================================
 # Cloud Provider Parsers
@@ -240,9 +556,15 @@ class AWSCloudWatchParser(BaseParser):
 
     name = "aws_cloudwatch"
 
+    # Lines are JSON objects or start with an ISO timestamp
+    FIRST_CHARS = "{0123456789"
+
     # JSON keys that identify CloudWatch logs
     JSON_KEYS = {"logEvents", "logGroup", "logStream"}
 
+    # Decodes only the keys of batches and single events that are read
+    DECODER = KeyDecoder(["logEvents", "logGroup", "logStream", "message", "timestamp"])
+
     # Plain text pattern for CloudWatch exports
     PATTERN = re.compile(
         r"^(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z)\s+"
@@ -257,7 +579,7 @@ class AWSCloudWatchParser(BaseParser):
         # Try JSON format first
         if line.startswith("{"):
             try:
-                data = json.loads(line)
+                data = self.DECODER.decode(line)
                 return any(key in data for key in self.JSON_KEYS)
             except (json.JSONDecodeError, ValueError):
                 pass
@@ -272,37 +594,68 @@ class AWSCloudWatchParser(BaseParser):
         # Try JSON format first
         if line.startswith("{"):
             try:
-                data = json.loads(line)
-                if "logEvents" in data:
-                    # Batch format - parse first event
-                    events = data.get("logEvents", [])
-                    if events:
-                        return self._parse_event(
-                            events[0], log_group=data.get("logGroup"), log_stream=data.get("logStream")
-                        )
-                elif "message" in data:
-                    # Single event format
-                    return self._parse_event(data)
+                entry = self._parse_json(self.DECODER.decode(line))
+                if entry:
+                    return entry
             except (json.JSONDecodeError, ValueError, KeyError):
                 pass
 
         # Try plain text format
         match = self.PATTERN.match(line)
         if match:
-            data = match.groupdict()
-            timestamp = parse_cloud_timestamp(data["timestamp"])
-            level = data.get("level") or extract_level_from_message(data["message"])
+            return self._parse_text(match, line)
 
-            return LogEntry(
-                raw=line,
-                timestamp=timestamp,
-                level=level.upper() if level else "INFO",
-                message=data["message"],
-                metadata={"parser_type": "aws_cloudwatch_text"},
-            )
+        return None
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse AWS CloudWatch log line, decoding or matching it once."""
+        line = line.strip()
+
+        if line.startswith("{"):
+            try:
+                data = self.DECODER.decode(line)
+            except (json.JSONDecodeError, ValueError):
+                data = None
+            if data is not None:
+                if not any(key in data for key in self.JSON_KEYS):
+                    return None
+                try:
+                    return self._parse_json(data)
+                except KeyError:
+                    return None
+
+        match = self.PATTERN.match(line)
+        if match:
+            return self._parse_text(match, line)
 
         return None
 
+    def _parse_json(self, data: dict) -> Optional[LogEntry]:
+        """Parse decoded CloudWatch JSON (batch or single event)."""
+        if "logEvents" in data:
+            # Batch format - parse first event
+            events = data.get("logEvents", [])
+            if events:
+                return self._parse_event(events[0], log_group=data.get("logGroup"), log_stream=data.get("logStream"))
+        elif "message" in data:
+            # Single event format
+            return self._parse_event(data)
+        return None
+
+    def _parse_text(self, match: re.Match, line: str) -> LogEntry:
+        """Parse matched plain text export line."""
+        data = match.groupdict()
+        timestamp = parse_cloud_timestamp(data["timestamp"])
+        level = data.get("level") or extract_level_from_message(data["message"])
+
+        return LogEntry(
+            raw=line,
+            timestamp=timestamp,
+            level=level.upper() if level else "INFO",
+            message=data["message"],
+            metadata={"parser_type": "aws_cloudwatch_text"},
+        )
+
     def _parse_event(self, event: dict, log_group=None, log_stream=None) -> Optional[LogEntry]:
         """Parse CloudWatch event object."""
         message = event.get("message", "")
@@ -345,9 +698,17 @@ class GCPCloudLoggingParser(BaseParser):
 
     name = "gcp_logging"
 
+    # Lines are JSON objects
+    FIRST_CHARS = "{"
+
     # Required/identifying fields for GCP logs
     GCP_KEYS = {"severity", "timestamp"}
 
+    # Decodes only the keys that are read, skipping payloads such as httpRequest or protoPayload
+    DECODER = KeyDecoder(
+        ["severity", "timestamp", "textPayload", "jsonPayload", "resource", "labels", "logName", "trace", "spanId"]
+    )
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches GCP Cloud Logging format."""
         line = line.strip()
@@ -355,16 +716,22 @@ class GCPCloudLoggingParser(BaseParser):
             return False
 
         try:
-            data = json.loads(line)
+            data = self.DECODER.decode(line)
             # Must have severity and timestamp fields
             return all(key in data for key in self.GCP_KEYS)
         except (json.JSONDecodeError, ValueError):
             return False
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse GCP Cloud Logging log line; parse() already checks the identifying fields."""
+        if not line.strip().startswith("{"):
+            return None
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse GCP Cloud Logging log line."""
         try:
-            data = json.loads(line.strip())
+            data = self.DECODER.decode(line.strip())
         except (json.JSONDecodeError, ValueError):
             return None
 
@@ -453,10 +820,30 @@ class AzureMonitorParser(BaseParser):
 
     name = "azure_monitor"
 
+    # Lines are JSON objects or arrays
+    FIRST_CHARS = "[{"
+
     # Identifying field combinations
     TIME_FIELDS = {"time", "TimeGenerated"}
     LEVEL_FIELDS = {"level", "SeverityLevel"}
 
+    # Decodes only the keys that are read (arrays are decoded whole)
+    DECODER = KeyDecoder(
+        [
+            "time",
+            "TimeGenerated",
+            "level",
+            "SeverityLevel",
+            "message",
+            "Message",
+            "Computer",
+            "category",
+            "operationName",
+            "properties",
+            "AdditionalContext",
+        ]
+    )
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches Azure Monitor format."""
         line = line.strip()
@@ -464,7 +851,7 @@ class AzureMonitorParser(BaseParser):
         # Handle JSON array format
         if line.startswith("["):
             try:
-                data = json.loads(line)
+                data = self.DECODER.decode(line)
                 if isinstance(data, list) and data:
                     # Check first element
                     item = data[0]
@@ -475,7 +862,7 @@ class AzureMonitorParser(BaseParser):
         # Handle single JSON object
         if line.startswith("{"):
             try:
-                data = json.loads(line)
+                data = self.DECODER.decode(line)
                 return self._has_azure_fields(data)
             except (json.JSONDecodeError, ValueError):
                 return False
@@ -498,7 +885,7 @@ class AzureMonitorParser(BaseParser):
         # Handle JSON array (take first element)
         if line.startswith("["):
             try:
-                data = json.loads(line)
+                data = self.DECODER.decode(line)
                 if isinstance(data, list) and data:
                     return self._parse_entry(data[0])
             except (json.JSONDecodeError, ValueError):
@@ -507,13 +894,34 @@ class AzureMonitorParser(BaseParser):
         # Handle single JSON object
         if line.startswith("{"):
             try:
-                data = json.loads(line)
+                data = self.DECODER.decode(line)
                 return self._parse_entry(data)
             except (json.JSONDecodeError, ValueError):
                 return None
 
         return None
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse Azure Monitor log line, decoding it once."""
+        line = line.strip()
+        if not line.startswith(("[", "{")):
+            return None
+
+        try:
+            data = self.DECODER.decode(line)
+        except (json.JSONDecodeError, ValueError):
+            return None
+
+        # Handle JSON array (take first element)
+        if line.startswith("["):
+            if not isinstance(data, list) or not data:
+                return None
+            data = data[0]
+
+        if not self._has_azure_fields(data):
+            return None
+        return self._parse_entry(data)
+
     def _parse_entry(self, data: dict) -> Optional[LogEntry]:
         """Parse single Azure Monitor entry."""
         if not isinstance(data, dict):
@@ -595,6 +1003,9 @@ class DockerJSONParser(BaseParser):
 
     name = "docker_json"
 
+    # Lines are JSON objects
+    FIRST_CHARS = "{"
+
     # Required fields for Docker JSON logs
     DOCKER_KEYS = {"log", "stream", "time"}
 
@@ -605,7 +1016,7 @@ class DockerJSONParser(BaseParser):
             return False
 
         try:
-            data = json.loads(line)
+            data = json_loads(line)
             return all(key in data for key in self.DOCKER_KEYS)
         except (json.JSONDecodeError, ValueError):
             return False
@@ -613,10 +1024,29 @@ class DockerJSONParser(BaseParser):
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse Docker JSON log line."""
         try:
-            data = json.loads(line.strip())
+            data = json_loads(line.strip())
         except (json.JSONDecodeError, ValueError):
             return None
 
+        return self._parse_data(data)
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse Docker JSON log line, decoding it once."""
+        line = line.strip()
+        if not line.startswith("{"):
+            return None
+
+        try:
+            data = json_loads(line)
+        except (json.JSONDecodeError, ValueError):
+            return None
+
+        if not all(key in data for key in self.DOCKER_KEYS):
+            return None
+        return self._parse_data(data)
+
+    def _parse_data(self, data: dict) -> LogEntry:
+        """Build an entry from a decoded Docker JSON log record."""
         # Extract fields
         log_message = data.get("log", "").rstrip("\n")
         stream = data.get("stream", "stdout")
@@ -653,6 +1083,9 @@ class KubernetesParser(BaseParser):
 
     name = "kubernetes"
 
+    # Lines start with a CRI timestamp or are Docker JSON objects
+    FIRST_CHARS = "{0123456789"
+
     # CRI format pattern
     CRI_PATTERN = re.compile(
         r"^(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z)\s+"
@@ -680,6 +1113,10 @@ class KubernetesParser(BaseParser):
 
         return False
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse Kubernetes log line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse Kubernetes log line."""
         line = line.strip()
@@ -748,6 +1185,9 @@ class ContainerdParser(BaseParser):
 
     name = "containerd"
 
+    # Lines start with a CRI timestamp
+    FIRST_CHARS = "0123456789"
+
     # CRI format pattern (same as Kubernetes, but containerd-specific)
     CRI_PATTERN = re.compile(
         r"^(?P<timestamp>\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d+Z)\s+"
@@ -764,21 +1204,8 @@ class ContainerdParser(BaseParser):
         match = self.CRI_PATTERN.match(line)
         if match:
             # This is CRI format - could be containerd or kubernetes
-            # Containerd logs often have JSON payloads or [INFO] style messages
             message = match.group("message")
-            # Heuristic: if message looks like structured JSON or has component field,
-            # likely containerd. Otherwise, might be generic CRI.
-            if message.strip().startswith("{"):
-                try:
-                    data = json.loads(message.strip())
-                    # Common containerd JSON fields
-                    if any(k in data for k in ["component", "level", "msg"]):
-                        return True
-                except (json.JSONDecodeError, ValueError):
-                    pass
-            # Also match if it has [INFO] style prefix or specific patterns
-            if "[INFO]" in message or "plugin/" in message or "component" in message:
-                return True
+            return self._is_containerd_message(message, self._decode_message(message))
 
         return False
 
@@ -790,6 +1217,44 @@ class ContainerdParser(BaseParser):
         if not match:
             return None
 
+        return self._parse_match(match, self._decode_message(match.group("message")))
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse containerd CRI log line, matching it and decoding its payload once."""
+        match = self.CRI_PATTERN.match(line.strip())
+        if not match:
+            return None
+
+        message = match.group("message")
+        json_msg = self._decode_message(message)
+        if not self._is_containerd_message(message, json_msg):
+            return None
+        return self._parse_match(match, json_msg)
+
+    @staticmethod
+    def _decode_message(message: str) -> Any:
+        """Decode a JSON message payload, or return None if it is not JSON."""
+        message = message.strip()
+        if message.startswith("{"):
+            try:
+                return json.loads(message)
+            except (json.JSONDecodeError, ValueError):
+                pass
+        return None
+
+    @staticmethod
+    def _is_containerd_message(message: str, json_msg: Any) -> bool:
+        """Heuristic: does a CRI message look like it came from containerd rather than a pod?"""
+        # Containerd logs often have JSON payloads or [INFO] style messages.
+        # If message looks like structured JSON with common containerd fields,
+        # likely containerd. Otherwise, might be generic CRI.
+        if json_msg is not None and any(k in json_msg for k in ["component", "level", "msg"]):
+            return True
+        # Also match if it has [INFO] style prefix or specific patterns
+        return "[INFO]" in message or "plugin/" in message or "component" in message
+
+    def _parse_match(self, match: re.Match, json_msg: Any) -> LogEntry:
+        """Build an entry from a CRI match and its decoded JSON payload (if any)."""
         data = match.groupdict()
         timestamp = parse_cloud_timestamp(data["timestamp"])
         stream = data["stream"]
@@ -804,30 +1269,25 @@ class ContainerdParser(BaseParser):
             "flag": flag,
         }
 
-        # Try to parse message as JSON
-        if message.strip().startswith("{"):
-            try:
-                json_msg = json.loads(message.strip())
-                if isinstance(json_msg, dict):
-                    # Extract level from JSON
-                    if "level" in json_msg:
-                        level_str = json_msg["level"].upper()
-                        if level_str in ["INFO", "DEBUG", "WARN", "WARNING", "ERROR", "CRITICAL"]:
-                            level = "WARNING" if level_str == "WARN" else level_str
-
-                    # Extract component as source
-                    if "component" in json_msg:
-                        source = json_msg["component"]
-                        metadata["component"] = json_msg["component"]
-
-                    # Use 'msg' field as message if present
-                    if "msg" in json_msg:
-                        message = json_msg["msg"]
-
-                    # Store full JSON in metadata
-                    metadata["json_data"] = json_msg
-            except (json.JSONDecodeError, ValueError):
-                pass
+        # Use fields from a JSON message
+        if isinstance(json_msg, dict):
+            # Extract level from JSON
+            if "level" in json_msg:
+                level_str = json_msg["level"].upper()
+                if level_str in ["INFO", "DEBUG", "WARN", "WARNING", "ERROR", "CRITICAL"]:
+                    level = "WARNING" if level_str == "WARN" else level_str
+
+            # Extract component as source
+            if "component" in json_msg:
+                source = json_msg["component"]
+                metadata["component"] = json_msg["component"]
+
+            # Use 'msg' field as message if present
+            if "msg" in json_msg:
+                message = json_msg["msg"]
+
+            # Store full JSON in metadata
+            metadata["json_data"] = json_msg
 
         # If level not found in JSON, extract from message text
         if not level:
@@ -852,6 +1312,9 @@ class ApacheAccessParser(BaseParser):
 
     name = "apache_access"
 
+    # Lines start with an IPv4 address
+    FIRST_CHARS = "0123456789."
+
     # Regex pattern for Apache Combined Log Format
     PATTERN = re.compile(
         r"^(?P<ip>[\d.]+)\s+"  # IP address
@@ -865,10 +1328,29 @@ class ApacheAccessParser(BaseParser):
         r'"(?P<user_agent>[^"]*)")?'  # User Agent (optional)
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches Apache access log format."""
         return bool(self.PATTERN.match(line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an Apache access log line with a single match."""
+        return self.parse(line)
+
+    def parse_batch(self, lines: Iterable[str]) -> ParsedBatch:
+        """Parse access log lines into columns without building entries."""
+        return _parse_access_batch(self, lines)
+
+    @staticmethod
+    def _status_level(status: int) -> str:
+        """Determine the level from the HTTP status code."""
+        if status >= 500:
+            return "ERROR"
+        if status >= 400:
+            return "WARNING"
+        return "INFO"
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse an Apache access log line."""
         match = self.PATTERN.match(line)
@@ -878,22 +1360,13 @@ class ApacheAccessParser(BaseParser):
         data = match.groupdict()
 
         # Parse timestamp
-        timestamp = None
-        with contextlib.suppress(ValueError, TypeError):
-            timestamp = datetime.strptime(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
+        timestamp = parse_clf(data["timestamp"])
 
-        # Determine level based on status code
         status = int(data.get("status", 0))
-        if status >= 500:
-            level = "ERROR"
-        elif status >= 400:
-            level = "WARNING"
-        else:
-            level = "INFO"
 
         return LogEntry(
             timestamp=timestamp,
-            level=level,
+            level=self._status_level(status),
             message=data.get("request", ""),
             source=data.get("ip"),
             metadata={
@@ -916,6 +1389,9 @@ class ApacheErrorParser(BaseParser):
 
     name = "apache_error"
 
+    # Lines start with a bracketed timestamp
+    FIRST_CHARS = "["
+
     # Modern format with module:level
     PATTERN = re.compile(
         r"^\[(?P<timestamp>[^\]]+)\]\s+"  # Timestamp
@@ -932,6 +1408,8 @@ class ApacheErrorParser(BaseParser):
         r"(?P<message>.+)$"  # Message
     )
 
+    LINE_PATTERNS = (PATTERN, PATTERN_LEGACY)
+
     LEVEL_MAP = {
         "emerg": "CRITICAL",
         "alert": "CRITICAL",
@@ -947,6 +1425,10 @@ class ApacheErrorParser(BaseParser):
         """Check if line matches Apache error log format."""
         return bool(self.PATTERN.match(line) or self.PATTERN_LEGACY.match(line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an Apache error log line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse an Apache error log line."""
         # Try modern format first
@@ -987,6 +1469,9 @@ class NginxAccessParser(BaseParser):
 
     name = "nginx_access"
 
+    # Lines start with an IPv4 or IPv6 address
+    FIRST_CHARS = "0123456789.:abcdefABCDEF"
+
     # nginx uses same format as Apache by default
     PATTERN = re.compile(
         r"^(?P<ip>[\d.:a-fA-F]+)\s+"  # IP address (v4 or v6)
@@ -1001,10 +1486,31 @@ class NginxAccessParser(BaseParser):
         r'(?:\s+"(?P<forwarded>[^"]*)")?'  # X-Forwarded-For (optional)
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches nginx access log format."""
         return bool(self.PATTERN.match(line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an nginx access log line with a single match."""
+        return self.parse(line)
+
+    def parse_batch(self, lines: Iterable[str]) -> ParsedBatch:
+        """Parse access log lines into columns without building entries."""
+        return _parse_access_batch(self, lines)
+
+    @staticmethod
+    def _status_level(status: int) -> str:
+        """Determine the level from the HTTP status code."""
+        if status >= 500:
+            return "ERROR"
+        if status >= 400:
+            return "WARNING"
+        if status >= 300:
+            return "INFO"
+        return "DEBUG"
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse an nginx access log line."""
         match = self.PATTERN.match(line)
@@ -1014,24 +1520,13 @@ class NginxAccessParser(BaseParser):
         data = match.groupdict()
 
         # Parse timestamp
-        timestamp = None
-        with contextlib.suppress(ValueError, TypeError):
-            timestamp = datetime.strptime(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
+        timestamp = parse_clf(data["timestamp"])
 
-        # Determine level based on status code
         status = int(data.get("status", 0))
-        if status >= 500:
-            level = "ERROR"
-        elif status >= 400:
-            level = "WARNING"
-        elif status >= 300:
-            level = "INFO"
-        else:
-            level = "DEBUG"
 
         return LogEntry(
             timestamp=timestamp,
-            level=level,
+            level=self._status_level(status),
             message=data.get("request", ""),
             source=data.get("ip"),
             metadata={
@@ -1061,33 +1556,119 @@ class JSONLogParser(BaseParser):
 
     name = "json"
 
+    # Lines are JSON objects
+    FIRST_CHARS = "{"
+
     # Common timestamp field names
     TIMESTAMP_FIELDS = ["timestamp", "time", "@timestamp", "ts", "datetime"]
     LEVEL_FIELDS = ["level", "severity", "lvl", "log_level", "loglevel"]
     MESSAGE_FIELDS = ["message", "msg", "text", "log"]
     SOURCE_FIELDS = ["source", "host", "hostname", "server", "ip"]
 
+    # Decodes only the candidate fields and the projected metadata; the rest is
+    # decoded again if the full metadata is requested
+    DECODER = KeyDecoder(
+        TIMESTAMP_FIELDS + LEVEL_FIELDS + MESSAGE_FIELDS + SOURCE_FIELDS + list(PROJECTED_METADATA_KEYS)
+    )
+
     def can_parse(self, line: str) -> bool:
         """Check if line is valid JSON."""
         line = line.strip()
         return line.startswith("{") and line.endswith("}")
 
+    # strptime layouts tried after ISO 8601, in order
+    TIMESTAMP_FORMATS = [
+        "%Y-%m-%dT%H:%M:%S.%fZ",
+        "%Y-%m-%dT%H:%M:%SZ",
+        "%Y-%m-%dT%H:%M:%S%z",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%d %H:%M:%S.%f",
+    ]
+
+    LEVEL_MAP = {
+        "FATAL": "CRITICAL",
+        "ERR": "ERROR",
+        "WARN": "WARNING",
+        "INFORMATION": "INFO",
+        "DBG": "DEBUG",
+        "TRACE": "DEBUG",
+    }
+
+    def __init__(self):
+        # Field mapping and timestamp converter learned from the current file's records
+        self._schema: Optional[_FieldSchema] = None
+
+    def fresh(self) -> "JSONLogParser":
+        """Get a copy of this parser with no learned field schema."""
+        parser = copy.copy(self)
+        parser._schema = None
+        return parser
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a JSON log line; only JSON objects decode to an entry."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a JSON log line."""
         try:
-            data = json.loads(line)
+            data = self.DECODER.decode(line)
         except json.JSONDecodeError:
             return None
 
         if not isinstance(data, dict):
             return None
 
-        # Extract timestamp
+        fields = self._lookup(data)
+        if fields is None:
+            fields = self._probe(data)
+        timestamp, level, message, source = fields
+
+        # The decoded object can be large; keep only what the analyzer reads and
+        # decode the line again if the full metadata is ever requested
+        projected = {key: data[key] for key in PROJECTED_METADATA_KEYS if key in data} or None
+        return LogEntry(
+            timestamp=timestamp,
+            level=self._normalize_level(level),
+            message=message,
+            source=source,
+            metadata=projected,
+            metadata_factory=partial(json_loads, line),
+        )
+
+    def _lookup(self, data: dict) -> Optional[tuple]:
+        """
+        Extract (timestamp, level, message, source) with the learned schema.
+
+        Returns:
+            The fields, or None if there is no schema yet or the record does
+            not fit it (including a timestamp the learned converter rejects)
+        """
+        schema = self._schema
+        if schema is None or not schema.matches(data):
+            return None
+        timestamp_field, level_field, message_field, source_field = schema.fields
+        try:
+            timestamp = None
+            if timestamp_field is not None:
+                timestamp = schema.timestamp(data[timestamp_field])
+                if timestamp is None:
+                    return None
+            level = None if level_field is None else str(data[level_field]).upper()
+            message = "" if message_field is None else str(data[message_field])
+            source = None if source_field is None else str(data[source_field])
+        except KeyError:
+            return None
+        return timestamp, level, message, source
+
+    def _probe(self, data: dict) -> tuple:
+        """Extract (timestamp, level, message, source) by trying every candidate field, and learn the schema."""
+        # Extract timestamp, noting the converter of each field tried
         timestamp = None
+        converters = []
         for field in self.TIMESTAMP_FIELDS:
             if field in data:
-                ts_value = data[field]
-                timestamp = self._parse_timestamp(ts_value)
+                timestamp, converter = self._detect_timestamp(data[field])
+                converters.append(converter if timestamp is not None else None)
                 if timestamp:
                     break
 
@@ -1098,9 +1679,6 @@ class JSONLogParser(BaseParser):
                 level = str(data[field]).upper()
                 break
 
-        # Normalize level
-        level = self._normalize_level(level)
-
         # Extract message
         message = ""
         for field in self.MESSAGE_FIELDS:
@@ -1115,49 +1693,40 @@ class JSONLogParser(BaseParser):
                 source = str(data[field])
                 break
 
-        return LogEntry(timestamp=timestamp, level=level, message=message, source=source, metadata=data)
+        # The schema reads the first timestamp field present, so that one has to convert
+        if not converters or converters[0] is not None:
+            roles = (self.TIMESTAMP_FIELDS, self.LEVEL_FIELDS, self.MESSAGE_FIELDS, self.SOURCE_FIELDS)
+            self._schema = _FieldSchema(data, roles, converters[0] if converters else None)
+        return timestamp, level, message, source
 
     def _parse_timestamp(self, value: Any) -> Optional[datetime]:
         """Attempt to parse various timestamp formats."""
+        return self._detect_timestamp(value)[0]
+
+    def _detect_timestamp(self, value: Any) -> tuple[Optional[datetime], Optional[Callable[[Any], Optional[datetime]]]]:
+        """Parse a timestamp value, returning it with the converter that handled its format."""
         if isinstance(value, (int, float)):
             # Unix timestamp
-            try:
-                return datetime.fromtimestamp(value)
-            except (ValueError, OSError):
-                pass
+            return _epoch_timestamp(value), _epoch_timestamp
 
         if isinstance(value, str):
+            timestamp = _iso_timestamp(value)
+            if timestamp is not None:
+                return timestamp, _iso_timestamp
+
             # Try common formats
-            formats = [
-                "%Y-%m-%dT%H:%M:%S.%fZ",
-                "%Y-%m-%dT%H:%M:%SZ",
-                "%Y-%m-%dT%H:%M:%S%z",
-                "%Y-%m-%d %H:%M:%S",
-                "%Y-%m-%d %H:%M:%S.%f",
-            ]
-            for fmt in formats:
-                try:
-                    return datetime.strptime(value, fmt)
-                except ValueError:
-                    continue
+            for fmt in self.TIMESTAMP_FORMATS:
+                timestamp = parse_with_format(value, fmt)
+                if timestamp is not None:
+                    return timestamp, partial(_format_timestamp, fmt)
 
-        return None
+        return None, None
 
     def _normalize_level(self, level: Optional[str]) -> str:
         """Normalize log level to standard values."""
         if not level:
             return "INFO"
-
-        level_map = {
-            "FATAL": "CRITICAL",
-            "ERR": "ERROR",
-            "WARN": "WARNING",
-            "INFORMATION": "INFO",
-            "DBG": "DEBUG",
-            "TRACE": "DEBUG",
-        }
-
-        return level_map.get(level, level)
+        return self.LEVEL_MAP.get(level, level)
 
 
 class SyslogParser(BaseParser):
@@ -1170,6 +1739,9 @@ class SyslogParser(BaseParser):
 
     name = "syslog"
 
+    # Lines start with a priority or a month name
+    FIRST_CHARS = "<JFMASOND"
+
     # RFC 3164 pattern
     PATTERN_3164 = re.compile(
         r"^<(?P<priority>\d+)>"  # Priority
@@ -1200,6 +1772,8 @@ class SyslogParser(BaseParser):
         r"(?P<message>.*)$"  # Message
     )
 
+    LINE_PATTERNS = (PATTERN_5424, PATTERN_3164, PATTERN_BSD)
+
     # Syslog severity levels (from priority)
     SEVERITY_MAP = {
         0: "CRITICAL",  # Emergency
@@ -1223,6 +1797,12 @@ class SyslogParser(BaseParser):
             and line[:3] in ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
         )
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a syslog line; can_parse() is a cheap prefix check with no regex."""
+        if not self.can_parse(line):
+            return None
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a syslog line."""
         # Try RFC 5424 first (has version number)
@@ -1258,7 +1838,7 @@ class SyslogParser(BaseParser):
             level = "DEBUG"
 
         return LogEntry(
-            timestamp=None,  # BSD timestamps need current year
+            timestamp=parse_syslog(data["timestamp"], reference=self.reference_time),
             level=level,
             message=message,
             source=data.get("hostname"),
@@ -1277,7 +1857,7 @@ class SyslogParser(BaseParser):
         facility = priority // 8
 
         return LogEntry(
-            timestamp=None,  # 3164 timestamps need current year
+            timestamp=parse_syslog(data["timestamp"], reference=self.reference_time),
             level=self.SEVERITY_MAP.get(severity, "INFO"),
             message=data.get("message", ""),
             source=data.get("hostname"),
@@ -1301,8 +1881,10 @@ class SyslogParser(BaseParser):
         timestamp = None
         ts_str = data.get("timestamp", "")
         if ts_str and ts_str != "-":
-            with contextlib.suppress(ValueError):
-                timestamp = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
+            timestamp = parse_iso8601(ts_str)
+            if timestamp is None:
+                with contextlib.suppress(ValueError):
+                    timestamp = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
 
         return LogEntry(
             timestamp=timestamp,
@@ -1329,6 +1911,9 @@ class AndroidParser(BaseParser):
 
     name = "android"
 
+    # Lines start with the MM-DD date
+    FIRST_CHARS = "0123456789"
+
     PATTERN = re.compile(
         r"^(?P<month>\d{2})-(?P<day>\d{2})\s+"
         r"(?P<time>\d{2}:\d{2}:\d{2}\.\d{3})\s+"
@@ -1338,6 +1923,8 @@ class AndroidParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     LEVEL_MAP = {
         "V": "DEBUG",
         "D": "DEBUG",
@@ -1351,6 +1938,10 @@ class AndroidParser(BaseParser):
         """Check if line matches Android logcat format."""
         return bool(re.match(r"^\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d{3}", line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an Android logcat line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse an Android logcat line."""
         match = self.PATTERN.match(line)
@@ -1385,6 +1976,9 @@ class JavaLogParser(BaseParser):
 
     name = "java_log"
 
+    # Lines start with the date
+    FIRST_CHARS = "0123456789"
+
     # Full timestamp format (Hadoop, Zookeeper)
     PATTERN_FULL = re.compile(
         r"^(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}[,\.]\d{3})\s*"
@@ -1403,6 +1997,8 @@ class JavaLogParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN_FULL, PATTERN_SHORT)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches Java log format."""
         # Check for full timestamp
@@ -1411,6 +2007,10 @@ class JavaLogParser(BaseParser):
         # Check for short timestamp (Spark)
         return bool(re.match(r"^\d{2}/\d{2}/\d{2}\s+\d{2}:\d{2}:\d{2}", line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a Java log line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a Java log line."""
         # Try full format first
@@ -1434,8 +2034,15 @@ class JavaLogParser(BaseParser):
         elif level == "FATAL":
             level = "CRITICAL"
 
+        # The full format may separate date and time with several spaces
+        ts_str = " ".join(data["timestamp"].split())
+        if "-" in ts_str:
+            timestamp = parse_iso8601(ts_str)
+        else:
+            timestamp = parse_with_format(ts_str, "%y/%m/%d %H:%M:%S")
+
         return LogEntry(
-            timestamp=None,
+            timestamp=timestamp,
             level=level,
             message=data.get("message", ""),
             source=data.get("class"),
@@ -1455,6 +2062,9 @@ class HDFSParser(BaseParser):
 
     name = "hdfs"
 
+    # Lines start with the YYMMDD date
+    FIRST_CHARS = "0123456789"
+
     PATTERN = re.compile(
         r"^(?P<date>\d{6})\s+"
         r"(?P<time>\d{6})\s+"
@@ -1464,6 +2074,8 @@ class HDFSParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches HDFS format."""
         return bool(re.match(r"^\d{6}\s+\d{6}\s+\d+\s+(?:INFO|WARN|ERROR|DEBUG)", line))
@@ -1473,14 +2085,25 @@ class HDFSParser(BaseParser):
         match = self.PATTERN.match(line)
         if not match:
             return None
+        return self._parse_match(match)
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an HDFS log line with a single match."""
+        match = self.PATTERN.match(line)
+        # can_parse() does not accept the TRACE and FATAL levels
+        if not match or match.group("level") in ("TRACE", "FATAL"):
+            return None
+        return self._parse_match(match)
 
+    def _parse_match(self, match: re.Match) -> LogEntry:
+        """Build an entry from a PATTERN match."""
         data = match.groupdict()
         level = data.get("level", "INFO").upper()
         if level == "WARN":
             level = "WARNING"
 
         return LogEntry(
-            timestamp=None,
+            timestamp=parse_with_format(f"{data['date']} {data['time']}", "%y%m%d %H%M%S"),
             level=level,
             message=data.get("message", ""),
             source=data.get("class"),
@@ -1500,6 +2123,9 @@ class SupercomputerParser(BaseParser):
 
     name = "supercomputer"
 
+    # Lines start with "-"
+    FIRST_CHARS = "-"
+
     # BGL format
     PATTERN_BGL = re.compile(
         r"^-\s+"
@@ -1523,10 +2149,18 @@ class SupercomputerParser(BaseParser):
         r"(?P<syslog_data>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN_BGL, PATTERN_THUNDER)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches supercomputer format."""
         return line.startswith("- ") and re.match(r"^-\s+\d+\s+\d{4}\.\d{2}\.\d{2}", line)
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a supercomputer log line; both patterns imply can_parse() after its prefix."""
+        if not line.startswith("- "):
+            return None
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a supercomputer log line."""
         # Try BGL format first
@@ -1575,6 +2209,10 @@ class WindowsEventParser(BaseParser):
 
     name = "windows"
 
+    # Lines start with the date; the timestamp is followed by a comma
+    FIRST_CHARS = "0123456789"
+    REQUIRED_LITERAL = ","
+
     PATTERN = re.compile(
         r"^(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}),\s*"
         r"(?P<level>\w+)\s+"
@@ -1582,10 +2220,16 @@ class WindowsEventParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches Windows event format."""
         return bool(re.match(r"^\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2},\s*\w+", line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a Windows event log line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a Windows event log line."""
         match = self.PATTERN.match(line)
@@ -1604,7 +2248,7 @@ class WindowsEventParser(BaseParser):
             level = "INFO"
 
         return LogEntry(
-            timestamp=None,
+            timestamp=parse_iso8601(" ".join(data["timestamp"].split())),
             level=level,
             message=data.get("message", ""),
             source=data.get("component"),
@@ -1623,16 +2267,25 @@ class ProxifierParser(BaseParser):
 
     name = "proxifier"
 
+    # Lines start with a bracketed timestamp
+    FIRST_CHARS = "["
+
     PATTERN = re.compile(
         r"^\[(?P<date>\d+\.\d+)\s+(?P<time>\d{2}:\d{2}:\d{2})\]\s+"
         r"(?P<process>\S+)(?:\s+\*\d+)?\s+-\s+"
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches Proxifier format."""
         return line.startswith("[") and bool(re.match(r"^\[\d+\.\d+\s+\d{2}:\d{2}:\d{2}\]", line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a Proxifier log line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a Proxifier log line."""
         match = self.PATTERN.match(line)
@@ -1669,6 +2322,9 @@ class HPCParser(BaseParser):
 
     name = "hpc"
 
+    # Lines start with the numeric record ID
+    FIRST_CHARS = "0123456789"
+
     PATTERN = re.compile(
         r"^(?P<id>\d+)\s+"
         r"(?P<node>\S+)\s+"
@@ -1679,6 +2335,12 @@ class HPCParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
+    # Node and category restrictions applied by can_parse()
+    NODE_PATTERN = re.compile(r"node-\d+|gige\d+")
+    CATEGORY_PATTERN = re.compile(r"\w")
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches HPC format."""
         # Matches: ID node/gige category.subcategory timestamp flag message
@@ -1689,7 +2351,22 @@ class HPCParser(BaseParser):
         match = self.PATTERN.match(line)
         if not match:
             return None
+        return self._parse_match(match)
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an HPC log line with a single match."""
+        match = self.PATTERN.match(line)
+        # Same restrictions as can_parse(): a node-N/gigeN node and a word-like category
+        if (
+            not match
+            or not self.NODE_PATTERN.fullmatch(match.group("node"))
+            or not self.CATEGORY_PATTERN.match(match.group("category"))
+        ):
+            return None
+        return self._parse_match(match)
 
+    def _parse_match(self, match: re.Match) -> LogEntry:
+        """Build an entry from a PATTERN match."""
         data = match.groupdict()
         event = data.get("event", "")
 
@@ -1723,6 +2400,10 @@ class HealthAppParser(BaseParser):
 
     name = "healthapp"
 
+    # Lines start with the date; fields are pipe-separated
+    FIRST_CHARS = "0123456789"
+    REQUIRED_LITERAL = "|"
+
     PATTERN = re.compile(
         r"^(?P<timestamp>\d{8}-\d{1,2}:\d{1,2}:\d{1,2}:\d{1,3})\|"
         r"(?P<component>[^|]+)\|"
@@ -1730,10 +2411,16 @@ class HealthAppParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches HealthApp format."""
         return bool(re.match(r"^\d{8}-\d{1,2}:\d{1,2}:\d{1,2}:\d{1,3}\|", line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a HealthApp log line; parse() only accepts lines can_parse() accepts."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a HealthApp log line."""
         match = self.PATTERN.match(line)
@@ -1743,12 +2430,7 @@ class HealthAppParser(BaseParser):
         data = match.groupdict()
 
         # Parse timestamp: 20171223-22:15:29:606
-        timestamp = None
-        try:
-            ts_str = data["timestamp"]
-            timestamp = datetime.strptime(ts_str, "%Y%m%d-%H:%M:%S:%f")
-        except (ValueError, KeyError):
-            pass
+        timestamp = parse_with_format(data["timestamp"], "%Y%m%d-%H:%M:%S:%f")
 
         return LogEntry(
             timestamp=timestamp,
@@ -1772,6 +2454,9 @@ class OpenStackParser(BaseParser):
 
     name = "openstack"
 
+    # Lines contain the request ID marker
+    REQUIRED_LITERAL = "[req-"
+
     PATTERN = re.compile(
         r"^(?P<filename>\S+)\s+"
         r"(?P<timestamp>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+"
@@ -1782,6 +2467,8 @@ class OpenStackParser(BaseParser):
         r"(?P<message>.*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches OpenStack format."""
         # Look for the characteristic [req-uuid] pattern
@@ -1792,16 +2479,22 @@ class OpenStackParser(BaseParser):
         match = self.PATTERN.match(line)
         if not match:
             return None
+        return self._parse_match(match)
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse an OpenStack log line with a single match."""
+        match = self.PATTERN.match(line)
+        # can_parse() also requires a [req-...] marker after the timestamp
+        if not match or "[req-" not in line[match.end("timestamp") :]:
+            return None
+        return self._parse_match(match)
 
+    def _parse_match(self, match: re.Match) -> LogEntry:
+        """Build an entry from a PATTERN match."""
         data = match.groupdict()
 
         # Parse timestamp
-        timestamp = None
-        try:
-            ts_str = data["timestamp"]
-            timestamp = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S.%f")
-        except (ValueError, KeyError):
-            pass
+        timestamp = parse_iso8601(" ".join(data["timestamp"].split()))
 
         level = data.get("level", "INFO").upper()
 
@@ -1828,6 +2521,9 @@ class SquidParser(BaseParser):
 
     name = "squid"
 
+    # Lines start with the epoch timestamp
+    FIRST_CHARS = "0123456789"
+
     PATTERN = re.compile(
         r"^(?P<timestamp>\d+(?:\.\d+)?)\s+"
         r"(?P<duration>-?\d+)\s+"
@@ -1841,6 +2537,11 @@ class SquidParser(BaseParser):
         r"(?P<content_type>\S*)$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
+    # Result code restriction applied by can_parse()
+    RESULT_CODE_PATTERN = re.compile(r"\w+[_/]")
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches Squid format."""
         # Squid lines start with epoch timestamp (10 digits, optional decimal) followed by duration
@@ -1851,7 +2552,22 @@ class SquidParser(BaseParser):
         match = self.PATTERN.match(line)
         if not match:
             return None
+        return self._parse_match(match)
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a Squid log line with a single match."""
+        match = self.PATTERN.match(line)
+        # Same restrictions as can_parse(): a 10-digit epoch and a CODE/ or CODE_ result
+        if (
+            not match
+            or len(match.group("timestamp").partition(".")[0]) != 10
+            or not self.RESULT_CODE_PATTERN.match(match.group("result_code"))
+        ):
+            return None
+        return self._parse_match(match)
+
+    def _parse_match(self, match: re.Match) -> LogEntry:
+        """Build an entry from a PATTERN match."""
         data = match.groupdict()
 
         # Parse epoch timestamp
@@ -1893,6 +2609,9 @@ class NginxParser(BaseParser):
 
     name = "nginx"
 
+    # Lines contain the quoted request
+    REQUIRED_LITERAL = '"'
+
     # Standard nginx combined format with optional extensions
     PATTERN = re.compile(
         r"^(?P<client_ip>\S+)\s+"
@@ -1907,10 +2626,16 @@ class NginxParser(BaseParser):
         r"(?:\s+(?P<extra>.*))?$"
     )
 
+    LINE_PATTERNS = (PATTERN,)
+
     def can_parse(self, line: str) -> bool:
         """Check if line matches nginx format."""
         return bool(self.PATTERN.match(line))
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a nginx log line with a single match."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """Parse a nginx log line."""
         match = self.PATTERN.match(line)
@@ -1920,13 +2645,10 @@ class NginxParser(BaseParser):
         data = match.groupdict()
 
         # Parse timestamp
-        timestamp = None
-        try:
-            ts_str = data["timestamp"]
-            timestamp = datetime.strptime(ts_str, "%d/%b/%Y:%H:%M:%S %z")
-        except (ValueError, KeyError):
-            with contextlib.suppress(ValueError, KeyError):
-                timestamp = datetime.strptime(ts_str.split()[0], "%d/%b/%Y:%H:%M:%S")
+        ts_str = data["timestamp"]
+        timestamp = parse_clf(ts_str)
+        if timestamp is None:
+            timestamp = parse_with_format(ts_str.split()[0], "%d/%b/%Y:%H:%M:%S")
 
         # Infer level from status code
         status = int(data.get("status", 200))
@@ -1945,6 +2667,7 @@ class NginxParser(BaseParser):
             metadata={
                 "status": status,
                 "bytes": data.get("bytes"),
+                "user": data.get("user"),
                 "user_agent": data.get("user_agent"),
                 "referer": data.get("referer"),
             },
@@ -1959,30 +2682,38 @@ class UniversalFallbackParser(BaseParser):
     from any text-based log format. It should be used as the LAST parser in the chain
     when no specific format is detected.
 
+    Each line is scanned once by a precompiled pattern that combines every
+    timestamp layout with the level tokens; the first timestamp and the first
+    level token are used. Once the first FALLBACK_LEARN_MATCHES timestamps of
+    a file share a layout and position, that layout is tried directly at that
+    position, and the scan only runs for lines it does not match.
+
     The parser indicates that it used fallback/heuristic parsing via metadata.
     """
 
     name = "universal"
 
-    # Common timestamp patterns (ordered by specificity)
+    # Common timestamp layouts. The combined scanner takes the leftmost match; no
+    # two layouts can match at the same position.
     TIMESTAMP_PATTERNS = [
         # ISO 8601 format
         (r"(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)", "iso"),
-        # Common log format
-        (r"(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2})", "clf"),
+        # Common log format, with the offset when present
+        (r"(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2}(?: [+-]\d{4})?)", "clf"),
         # US date format
         (r"(\d{2}/\d{2}/\d{4}\s+\d{2}:\d{2}:\d{2})", "us_date"),
         # Syslog BSD format
-        (r"(\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})", "syslog"),
+        (r"\b((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})", "syslog"),
         # Unix timestamp (epoch)
         (r"\b(\d{10})\b", "epoch"),
-        # Short date format
+        # Short date format (MM-DD, no year)
         (r"(\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})", "short"),
     ]
 
     # Common log level patterns
+    # (the lookahead on first letters lets the regex engine skip ahead between candidates)
     LEVEL_PATTERN = re.compile(
-        r"\b(FATAL|CRITICAL|CRIT|ERROR|ERR|WARNING|WARN|INFO|DEBUG|DBG|TRACE|NOTICE)\b", re.IGNORECASE
+        r"(?=[CDEFINTW])\b(FATAL|CRITICAL|CRIT|ERROR|ERR|WARNING|WARN|INFO|DEBUG|DBG|TRACE|NOTICE)\b", re.IGNORECASE
     )
 
     # Level normalization map
@@ -2001,6 +2732,34 @@ class UniversalFallbackParser(BaseParser):
         "notice": "INFO",
     }
 
+    # One pattern per layout, for the learned fast path
+    _LAYOUTS = {fmt: re.compile(pattern) for pattern, fmt in TIMESTAMP_PATTERNS}
+    # Lookaheads on the possible first characters, as in LEVEL_PATTERN
+    _TIMESTAMP_SCANNER = re.compile(
+        r"(?=[\dADFJMNOS])(?:" + "|".join(f"(?P<{fmt}>{pattern})" for pattern, fmt in TIMESTAMP_PATTERNS) + ")"
+    )
+    # Timestamps and level tokens in one pass; a timestamp wins where both start
+    _SCANNER = re.compile(
+        r"(?=[\dACDEFIJMNOSTWcdefintw])(?:"
+        + "|".join(f"(?P<{fmt}>{pattern})" for pattern, fmt in TIMESTAMP_PATTERNS)
+        + f"|(?P<level>(?i:{LEVEL_PATTERN.pattern})))"
+    )
+    # Text allowed before a learned timestamp: no word characters, so no layout can start in it
+    _PREFIX = re.compile(r"\W{0,8}")
+
+    def __init__(self):
+        # (layout pattern, layout name, text before the timestamp) once learned
+        self._learned: Optional[tuple[re.Pattern, str, str]] = None
+        # (layout name, prefix) of the current run of matches, and its length
+        self._candidate: Optional[tuple[str, str]] = None
+        self._streak = 0
+
+    def fresh(self) -> "UniversalFallbackParser":
+        """Get a copy of this parser with no learned timestamp layout."""
+        parser = copy.copy(self)
+        parser._learned, parser._candidate, parser._streak = None, None, 0
+        return parser
+
     def can_parse(self, line: str) -> bool:
         """
         Universal parser can attempt to parse ANY line.
@@ -2009,6 +2768,10 @@ class UniversalFallbackParser(BaseParser):
         """
         return True
 
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse any line heuristically; can_parse() accepts everything."""
+        return self.parse(line)
+
     def parse(self, line: str) -> Optional[LogEntry]:
         """
         Parse a log line using heuristic pattern detection.
@@ -2018,36 +2781,31 @@ class UniversalFallbackParser(BaseParser):
         if not line.strip():
             return None
 
+        timestamp_match, timestamp_format, level_match = self._scan(line)
+
+        timestamp = None
         timestamp_str = None
-        timestamp_format = None
         level = "INFO"  # Default level
         message = line
 
-        # Try to extract timestamp
-        for pattern, fmt in self.TIMESTAMP_PATTERNS:
-            match = re.search(pattern, line)
-            if match:
-                timestamp_str = match.group(1)
-                timestamp_format = fmt
-                # Remove timestamp from message extraction
-                message = line[match.end() :].strip()
-                if message.startswith("-") or message.startswith(":"):
-                    message = message[1:].strip()
-                break
-
-        # Try to extract log level
-        level_match = self.LEVEL_PATTERN.search(line)
-        if level_match:
-            found_level = level_match.group(1).lower()
-            level = self.LEVEL_MAP.get(found_level, "INFO")
+        if timestamp_match is not None:
+            timestamp_str = timestamp_match.group()
+            timestamp = self._convert(timestamp_str, timestamp_format)
+            # Remove timestamp from message extraction
+            message = line[timestamp_match.end() :].strip()
+            if message.startswith("-") or message.startswith(":"):
+                message = message[1:].strip()
+
+        if level_match is not None:
+            found_level = level_match.group()
+            level = self.LEVEL_MAP.get(found_level.lower(), "INFO")
             # Try to clean level from message if it appears at the start
-            if message.upper().startswith(level_match.group(1).upper()):
-                message = message[len(level_match.group(1)) :].strip()
+            if message.upper().startswith(found_level.upper()):
+                message = message[len(found_level) :].strip()
                 if message.startswith("-") or message.startswith(":") or message.startswith("|"):
                     message = message[1:].strip()
-
-        # Infer level from message keywords if not found
-        if not level_match:
+        else:
+            # Infer level from message keywords
             msg_lower = line.lower()
             if "error" in msg_lower or "fail" in msg_lower or "exception" in msg_lower:
                 level = "ERROR"
@@ -2057,7 +2815,7 @@ class UniversalFallbackParser(BaseParser):
                 level = "DEBUG"
 
         return LogEntry(
-            timestamp=None,  # Would need parsing logic for each format
+            timestamp=timestamp,
             level=level,
             message=message if message else line,
             source=None,
@@ -2067,3 +2825,87 @@ class UniversalFallbackParser(BaseParser):
                 "timestamp_format": timestamp_format,
             },
         )
+
+    def _scan(self, line: str) -> tuple[Optional[re.Match], Optional[str], Optional[re.Match]]:
+        """Find the first timestamp (with its layout) and the first level token of a line."""
+        learned = self._learned
+        if learned is not None:
+            layout, timestamp_format, prefix = learned
+            if line.startswith(prefix):
+                timestamp_match = layout.match(line, len(prefix))
+                if timestamp_match is not None:
+                    if self._streak:
+                        # Misses must be consecutive to replace the learned layout
+                        self._candidate, self._streak = None, 0
+                    # Nothing can precede the timestamp
+                    return timestamp_match, timestamp_format, self.LEVEL_PATTERN.search(line, timestamp_match.start())
+
+        timestamp_match = level_match = None
+        timestamp_format = None
+        match = self._SCANNER.search(line)
+        if match is not None:
+            if match.lastgroup == "level":
+                level_match = match
+                timestamp_match = self._TIMESTAMP_SCANNER.search(line, match.end())
+            else:
+                timestamp_match = match
+                # From the start: a syslog month position may hold a level token instead
+                level_match = self.LEVEL_PATTERN.search(line, match.start())
+        if timestamp_match is not None:
+            timestamp_format = timestamp_match.lastgroup
+            self._learn(timestamp_format, line[: timestamp_match.start()])
+        else:
+            self._learn(None, "")
+        return timestamp_match, timestamp_format, level_match
+
+    def _learn(self, timestamp_format: Optional[str], prefix: str) -> None:
+        """
+        Count a scanned line towards learning its timestamp layout.
+
+        A run of FALLBACK_LEARN_MATCHES scanned lines with a timestamp in the
+        same layout and position is learned, replacing any earlier layout. As
+        many lines in a row without a usable timestamp (``timestamp_format``
+        None, or text other than punctuation before it) forget the layout.
+        """
+        if timestamp_format is None or not self._PREFIX.fullmatch(prefix):
+            candidate = None
+        else:
+            candidate = (timestamp_format, prefix)
+        if candidate != self._candidate:
+            self._candidate, self._streak = candidate, 0
+        self._streak += 1
+        if self._streak >= FALLBACK_LEARN_MATCHES:
+            self._learned = None if candidate is None else (self._LAYOUTS[candidate[0]], *candidate)
+            self._candidate, self._streak = None, 0
+
+    def _convert(self, value: str, timestamp_format: str) -> Optional[datetime]:
+        """
+        Convert timestamp text in one of the TIMESTAMP_PATTERNS layouts to a datetime.
+
+        Layouts without an offset are taken as UTC, so every timestamp from one
+        file is UTC-aware and they can be compared with each other.
+        """
+        timestamp = self._convert_layout(value, timestamp_format)
+        if timestamp is not None and timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp
+
+    def _convert_layout(self, value: str, timestamp_format: str) -> Optional[datetime]:
+        if timestamp_format == "iso":
+            return parse_iso8601(value)
+        if timestamp_format == "clf":
+            return parse_clf(value) if len(value) > 20 else parse_with_format(value, "%d/%b/%Y:%H:%M:%S")
+        if timestamp_format == "syslog":
+            return parse_syslog(value, reference=self.reference_time)
+        if timestamp_format == "epoch":
+            return datetime.fromtimestamp(int(value), tz=timezone.utc)
+        date, time = value.split()
+        if timestamp_format == "us_date":
+            # Month first, unless the first field can only be a day
+            fmt = "%d/%m/%Y %H:%M:%S" if int(value[:2]) > 12 else "%m/%d/%Y %H:%M:%S"
+            return parse_with_format(f"{date} {time}", fmt)
+        # short: MM-DD, with the year taken from reference_time like syslog's
+        month = int(date[:2])
+        if not 1 <= month <= 12:
+            return None
+        return parse_syslog(f"{_MONTH_ABBREVIATIONS[month - 1]} {date[3:]} {time}", reference=self.reference_time)
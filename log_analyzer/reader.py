@@ -3,31 +3,147 @@ Core log file reader functionality.
 
 Provides basic file reading and line iteration with encoding detection
 and error handling for common log file scenarios.
+
+Compressed files (gzip, bzip2, xz and, when the optional ``zstandard``
+package is installed, zstd) are detected by their magic bytes and
+decompressed transparently while streaming.
 """
 
+import bz2
+import gzip
+import io
+import logging
+import lzma
+import mmap
 import os
+import zlib
+from collections import deque
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
 from pathlib import Path
+from typing import BinaryIO, Optional
+
+from .constants import DECOMPRESS_READ_SIZE, GZIP_PARALLEL_SEGMENT_SIZE, RANGE_READ_SIZE
+
+# Try to import zstandard, but make it optional
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+# Magic bytes identifying supported compression formats
+COMPRESSION_MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+# Start of a gzip member header: magic + CM=8 (deflate)
+_GZIP_MEMBER_HEADER = b"\x1f\x8b\x08"
+
+
+def detect_compression(filepath: str) -> Optional[str]:
+    """
+    Detect the compression format of a file from its magic bytes.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        "gzip", "bzip2", "xz" or "zstd", or None for uncompressed files
+    """
+    with open(filepath, "rb") as f:
+        head = f.read(6)
+    for name, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _inflate_gzip_members(data: bytes) -> bytes:
+    """
+    Decompress a buffer holding one or more complete gzip members.
+
+    Raises:
+        zlib.error: If the buffer does not start at a member header or
+                    ends partway through a member
+    """
+    output = []
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        output.append(decompressor.decompress(data))
+        if not decompressor.eof:
+            raise zlib.error("gzip member is truncated")
+        data = decompressor.unused_data
+    return b"".join(output)
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only raw stream over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            close = getattr(self._chunks, "close", None)
+            if close is not None:
+                close()
+        super().close()
 
 
 class LogReader:
     """
     Reads log files with proper encoding handling and error recovery.
 
-    Supports reading from files, stdin, or compressed files (gzip).
+    Supports plain text files and compressed files (gzip, bzip2, xz, zstd),
+    which are detected by magic bytes and decompressed while streaming.
     """
 
-    def __init__(self, filepath: str, encoding: str = "utf-8"):
+    def __init__(self, filepath: str, encoding: str = "utf-8", decompress_workers: int = 1):
         """
         Initialize the log reader.
 
         Args:
             filepath: Path to the log file to read
             encoding: Character encoding (default: utf-8)
+            decompress_workers: Threads used to inflate multi-member gzip files
+                               (e.g. from pigz or concatenated rotations) in
+                               parallel. 1 means plain sequential decompression.
         """
         self.filepath = Path(filepath)
         self.encoding = encoding
+        self.decompress_workers = decompress_workers
         self._validate_file()
+        self.compression = detect_compression(self.filepath)
+
+    @property
+    def is_compressed(self) -> bool:
+        """Whether the file is compressed (byte offsets then refer to compressed data)."""
+        return self.compression is not None
 
     def _validate_file(self) -> None:
         """Validate that the file exists and is readable."""
@@ -40,27 +156,263 @@ class LogReader:
 
     def read_lines(self) -> Iterator[str]:
         """
-        Iterate over lines in the log file.
+        Iterate over lines in the log file, decompressing if needed.
 
         Yields:
             Each line from the log file, stripped of trailing newlines.
         """
         try:
-            with open(self.filepath, encoding=self.encoding, errors="replace") as f:
+            if not self.is_compressed:
+                with open(self.filepath, encoding=self.encoding, errors="replace") as f:
+                    for line in f:
+                        yield line.rstrip("\n\r")
+                return
+
+            with io.TextIOWrapper(self.open_binary(), encoding=self.encoding, errors="replace") as f:
                 for line in f:
                     yield line.rstrip("\n\r")
         except UnicodeDecodeError as e:
             raise ValueError(f"Encoding error: {e}") from e
 
+    def open_binary(self) -> BinaryIO:
+        """
+        Open the file as a binary stream of (decompressed) content.
+
+        Returns:
+            Readable binary file object; the caller must close it.
+
+        Raises:
+            ImportError: If the file is zstd-compressed and zstandard is not installed
+        """
+        if self.compression is None:
+            return open(self.filepath, "rb")  # noqa: SIM115 - caller closes
+        if self.compression == "gzip":
+            if self.decompress_workers > 1:
+                return io.BufferedReader(_ChunkStream(self._iter_gzip_parallel()), DECOMPRESS_READ_SIZE)
+            return gzip.open(self.filepath, "rb")
+        if self.compression == "bzip2":
+            return bz2.open(self.filepath, "rb")
+        if self.compression == "xz":
+            return lzma.open(self.filepath, "rb")
+
+        # zstd
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is required to read .zst files. Run: pip install zstandard")
+        raw = open(self.filepath, "rb")  # noqa: SIM115 - closed by the zstd reader
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True, read_across_frames=True)
+        return io.BufferedReader(stream, DECOMPRESS_READ_SIZE)
+
+    def _iter_gzip_parallel(self) -> Iterator[bytes]:
+        """
+        Inflate a multi-member gzip file with a thread pool.
+
+        The compressed file is cut at plausible member headers roughly every
+        GZIP_PARALLEL_SEGMENT_SIZE bytes. zlib releases the GIL, so segments
+        inflate concurrently; output is yielded in file order with a bounded
+        number of segments in flight.
+
+        A segment only decodes cleanly if it starts and ends exactly on member
+        boundaries, so a false header match (or a single-member file) makes
+        its segment fail. Everything before that point is known-good, and the
+        rest of the file is then decompressed sequentially from the failing
+        segment's start, which is a real member boundary.
+
+        Yields:
+            Decompressed byte chunks in file order
+        """
+        with open(self.filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            starts = [0]
+            position = GZIP_PARALLEL_SEGMENT_SIZE
+            while position < size:
+                candidate = mm.find(_GZIP_MEMBER_HEADER, position)
+                # Reserved FLG bits must be zero in a real header
+                while candidate != -1 and (candidate + 3 >= size or mm[candidate + 3] & 0xE0):
+                    candidate = mm.find(_GZIP_MEMBER_HEADER, candidate + 1)
+                if candidate == -1:
+                    break
+                starts.append(candidate)
+                position = candidate + GZIP_PARALLEL_SEGMENT_SIZE
+            bounds = list(zip(starts, starts[1:] + [size]))
+
+            if len(bounds) == 1:
+                logger.debug("No gzip member boundaries found, decompressing sequentially")
+            else:
+                logger.debug(f"Inflating {len(bounds)} gzip segments with {self.decompress_workers} threads")
+
+            fallback_start = None
+            with ThreadPoolExecutor(max_workers=self.decompress_workers) as executor:
+                pending = deque()
+                next_index = 0
+                while next_index < len(bounds) or pending:
+                    while next_index < len(bounds) and len(pending) < self.decompress_workers * 2:
+                        start, end = bounds[next_index]
+                        pending.append((start, executor.submit(_inflate_gzip_members, mm[start:end])))
+                        next_index += 1
+                    start, future = pending.popleft()
+                    try:
+                        data = future.result()
+                    except (zlib.error, EOFError):
+                        fallback_start = start
+                        for _, remaining in pending:
+                            remaining.cancel()
+                        break
+                    yield data
+
+        if fallback_start is not None:
+            logger.debug(f"Falling back to sequential gzip decompression at offset {fallback_start}")
+            with open(self.filepath, "rb") as raw:
+                raw.seek(fallback_start)
+                with gzip.GzipFile(fileobj=raw, mode="rb") as stream:
+                    while chunk := stream.read(DECOMPRESS_READ_SIZE):
+                        yield chunk
+
+    def _require_uncompressed(self, operation: str) -> None:
+        """Raise ValueError for byte-offset operations on compressed files."""
+        if self.is_compressed:
+            raise ValueError(f"{operation} is not supported for {self.compression}-compressed file: {self.filepath}")
+
+    def split_byte_ranges(self, range_size: int, start: int = 0, end: Optional[int] = None) -> list[tuple[int, int]]:
+        """
+        Split the file (or a span of it) into newline-aligned byte ranges.
+
+        Only seeks and reads up to the next newline at each boundary, so the
+        cost is independent of file size.
+
+        Args:
+            range_size: Approximate size of each range in bytes
+            start: Byte offset where the span starts (must be at a line start)
+            end: Byte offset where the span ends (default: end of file)
+
+        Returns:
+            List of (start, end) byte offsets covering the span. Every range
+            starts at the beginning of a line and ends just after a newline
+            (or at the end of the span).
+        """
+        if range_size <= 0:
+            raise ValueError(f"range_size must be positive, got {range_size}")
+        self._require_uncompressed("Byte-range splitting")
+
+        file_size = self.filepath.stat().st_size
+        if end is None or end > file_size:
+            end = file_size
+        span_end = end
+        ranges = []
+
+        with open(self.filepath, "rb") as f:
+            while start < span_end:
+                end = start + range_size
+                if end >= span_end:
+                    end = span_end
+                else:
+                    # Extend the range to the end of the line it lands in
+                    f.seek(end)
+                    f.readline()
+                    end = f.tell()
+                ranges.append((start, end))
+                start = end
+
+        return ranges
+
+    def read_range(self, start: int, end: int) -> Iterator[str]:
+        """
+        Iterate over the lines contained in a byte range.
+
+        Args:
+            start: Byte offset of the first line (must be at a line start)
+            end: Byte offset where the range stops (exclusive)
+
+        Yields:
+            Each line in the range, stripped of trailing newlines.
+        """
+        self._require_uncompressed("Byte-range reading")
+        for lines, _ in self.read_blocks(start, end):
+            yield from lines
+
+    def read_blocks(self, start: int = 0, end: Optional[int] = None) -> Iterator[tuple[list[str], list[int]]]:
+        """
+        Iterate over the lines of the file, or of a byte range of it, a block at a time.
+
+        The content is read and decoded RANGE_READ_SIZE bytes at a time, cut at
+        the last newline of each block, rather than line by line. A line that
+        starts before end is read to its end, as with readline(). Only "\n"
+        ends a line; a "\r" before it is stripped.
+
+        Compressed files are read from the start to the end of their
+        decompressed content, and offsets count decompressed bytes.
+
+        Args:
+            start: Byte offset of the first line (must be at a line start)
+            end: Byte offset where to stop (exclusive, default: end of file)
+
+        Yields:
+            (lines, offsets) per block: the lines stripped of trailing newlines,
+            and the byte offset where each of them starts.
+
+        Raises:
+            ValueError: If start or end is given for a compressed file
+        """
+        if start or end is not None:
+            self._require_uncompressed("Byte-range reading")
+        encoding = self.encoding
+        with self.open_binary() as f:
+            if start:
+                f.seek(start)
+            position = start
+            # Offset of the first byte of tail, the unfinished line carried over
+            line_start = start
+            tail = b""
+            while end is None or position < end:
+                block = f.read(RANGE_READ_SIZE if end is None else min(RANGE_READ_SIZE, end - position))
+                if not block:
+                    break
+                position += len(block)
+                if tail:
+                    block = tail + block
+                cut = block.rfind(b"\n") + 1
+                tail = block[cut:]
+                if not cut:
+                    continue
+                head = block[:cut]
+                text = head.decode(encoding, errors="replace")
+                lines = text.split("\n")
+                lines.pop()
+                # Decoded lengths are byte lengths for ASCII; otherwise measure the raw lines
+                raw_lines = lines
+                if not head.isascii():
+                    raw_lines = head.split(b"\n")
+                    raw_lines.pop()
+                # Each line starts one byte (its "\n") after the previous one ends
+                offsets = list(accumulate(map((1).__add__, map(len, raw_lines)), initial=line_start))
+                line_start = offsets.pop()
+                if "\r" in text:
+                    lines = [line.rstrip("\r") for line in lines]
+                yield lines, offsets
+            if tail:
+                if end is not None and position >= end:
+                    tail += f.readline()
+                yield [tail.decode(encoding, errors="replace").rstrip("\n\r")], [line_start]
+
     def count_lines(self) -> int:
         """
         Count total lines in the file without loading into memory.
 
         Returns:
-            Total number of lines in the file.
+            Total number of lines in the file (after decompression).
         """
         count = 0
-        with open(self.filepath, "rb") as f:
-            for _ in f:
-                count += 1
+        if not self.is_compressed:
+            with open(self.filepath, "rb") as f:
+                for _ in f:
+                    count += 1
+            return count
+
+        # Count newlines block by block; a final unterminated line also counts
+        last = b""
+        with self.open_binary() as f:
+            while block := f.read(DECOMPRESS_READ_SIZE):
+                count += block.count(b"\n")
+                last = block
+        if last and not last.endswith(b"\n"):
+            count += 1
         return count
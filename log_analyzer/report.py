@@ -462,12 +462,28 @@ class ReportGenerator:
                 {"source": src, "count": count}
                 for src, count in r.top_sources[:20]
             ],
+            "top_error_templates": [
+                {"template": template, "count": count, "example": example}
+                for template, count, example in r.top_error_templates[:20]
+            ],
         }
 
         # HTTP Status codes (if present)
         if r.status_codes:
             data["status_codes"] = {str(code): count for code, count in r.status_codes.items()}
 
+        # Lines parsed per format (mixed-format routing)
+        if r.format_counts:
+            data["format_counts"] = r.format_counts
+
+        # Estimated distinct values (HyperLogLog)
+        if r.distinct_counts:
+            data["distinct_counts"] = r.distinct_counts
+
+        # Quantiles of numeric fields, overall and per status class
+        if r.quantiles:
+            data["quantiles"] = r.quantiles
+
         # Analytics (if available)
         if r.analytics:
             data["analytics"] = r.analytics.to_dict()
@@ -0,0 +1,200 @@
+"""
+Per-line routing for files that mix several log formats.
+
+Container hosts often interleave Docker JSON, plain Java stack traces and
+syslog lines in one file. A single detected parser rejects every line in
+the other formats, so MixedFormatParser picks a parser per line instead:
+
+1. the parser that accepted the previous line, since formats come in runs
+   (never the fallback, which would accept nearly every line after it);
+2. otherwise the classifier's candidates for the line (see
+   log_analyzer.classifier), ranked by how many sample lines each format
+   accepted during detection;
+3. optionally a fallback parser, such as the universal one.
+
+Lines parsed per format are counted in ParsedBatch.format_counts and end up
+in AnalysisResult.format_counts. Formats disagree on whether timestamps
+carry an offset, so naive timestamps are taken to be UTC (as everywhere
+else in the analyzer) and made timezone-aware, keeping every entry of a
+mixed file comparable.
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from .classifier import FormatClassifier, classifier_for
+from .columnar import ParsedBatch
+from .parsers import BaseParser, LogEntry
+
+__all__ = [
+    "MixedFormatParser",
+]
+
+
+class MixedFormatParser(BaseParser):
+    """
+    Parse each line with whichever registered format accepts it.
+
+    The instance remembers the last parser that succeeded in parse(), and
+    parse_batch() keeps its own for the batch, so worker threads sharing an
+    instance only ever lose the head start, never a line.
+
+    The classifier is built over the registry parsers passed in, but lines
+    are parsed with each one's fresh() copy, so a router never shares learned
+    state (such as a JSON field schema) with other routers or files.
+    """
+
+    name = "mixed"
+
+    def __init__(self, parsers: Sequence[BaseParser], fallback: Optional[BaseParser] = None):
+        """
+        Create a router over a ranked list of parsers.
+
+        Args:
+            parsers: Parsers to route between, most likely format first
+            fallback: Parser for lines no format in parsers accepts
+        """
+        self.parsers = tuple(parsers)
+        self.fallback = fallback
+        self._working = {parser: parser.fresh() for parser in self.parsers}
+        self._fallback = fallback.fresh() if fallback is not None else None
+        self._last: Optional[BaseParser] = None
+
+    @classmethod
+    def from_counts(
+        cls, parsers: Sequence[BaseParser], parse_counts: Counter, fallback: Optional[BaseParser] = None
+    ) -> "MixedFormatParser":
+        """
+        Rank parsers by the lines each accepted during format detection.
+
+        Args:
+            parsers: Parsers in registry order
+            parse_counts: Successful sample parses by parser name
+            fallback: Parser for lines no format accepts
+
+        Returns:
+            Router trying the most common formats first, then the remaining
+            parsers in registry order
+        """
+        ranked = sorted(parsers, key=lambda parser: -parse_counts.get(parser.name, 0))
+        return cls(ranked, fallback)
+
+    @property
+    def classifier(self) -> FormatClassifier:
+        """Combined classifier for the ranked parsers (cached, so not pickled)."""
+        return classifier_for(self.parsers)
+
+    def fresh(self) -> "MixedFormatParser":
+        """Get a router over the same parsers with nothing learned."""
+        return self.with_reference_time(self.reference_time)
+
+    def with_reference_time(self, reference: Optional[datetime]) -> "MixedFormatParser":
+        """Get a fresh router whose parsers all use the given reference_time."""
+        router = type(self)(self.parsers, self.fallback)
+        router._bind(reference)
+        return router
+
+    def _bind(self, reference: Optional[datetime]) -> None:
+        """Give this router and its working parsers a reference_time."""
+        self.reference_time = reference
+        self._working = {parser: parser.with_reference_time(reference) for parser in self.parsers}
+        if self.fallback is not None:
+            self._fallback = self.fallback.with_reference_time(reference)
+
+    def __getstate__(self) -> dict:
+        return {"parsers": self.parsers, "fallback": self.fallback, "reference_time": self.reference_time}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["parsers"], state["fallback"])
+        if state["reference_time"] is not None:
+            self._bind(state["reference_time"])
+
+    def route(
+        self, line: str, last: Optional[BaseParser] = None
+    ) -> tuple[Optional[BaseParser], Optional[LogEntry]]:
+        """
+        Find the parser for one line and parse it.
+
+        Args:
+            line: Raw log line
+            last: Parser to try before the ranked candidates
+
+        Returns:
+            (parser, entry), or (None, None) if no parser accepts the line
+        """
+        parser, entry = self._find(line, last)
+        if entry is not None and entry.timestamp is not None and entry.timestamp.tzinfo is None:
+            entry.timestamp = entry.timestamp.replace(tzinfo=timezone.utc)
+        return parser, entry
+
+    def _find(self, line: str, last: Optional[BaseParser]) -> tuple[Optional[BaseParser], Optional[LogEntry]]:
+        if last is not None and last.prefilter(line):
+            entry = last.try_parse(line)
+            if entry is not None:
+                return last, entry
+        working = self._working
+        for candidate in self.classifier.candidates(line):
+            parser = working[candidate]
+            if parser is not last and parser.prefilter(line):
+                entry = parser.try_parse(line)
+                if entry is not None:
+                    return parser, entry
+        if self._fallback is not None:
+            entry = self._fallback.parse(line)
+            if entry is not None:
+                return self._fallback, entry
+        return None, None
+
+    def parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a line in whichever format accepts it."""
+        parser, entry = self.route(line, self._last)
+        if parser is not None and parser is not self._fallback:
+            self._last = parser
+        return entry
+
+    def try_parse(self, line: str) -> Optional[LogEntry]:
+        """Parse a line in whichever format accepts it, in a single pass."""
+        return self.parse(line)
+
+    def can_parse(self, line: str) -> bool:
+        """Check if any format accepts the line."""
+        return self.route(line, self._last)[1] is not None
+
+    def parse_batch(
+        self, lines: Iterable[str], on_entry: Optional[Callable[[LogEntry], None]] = None
+    ) -> ParsedBatch:
+        """
+        Route a chunk of lines and count the lines parsed per format.
+
+        Args:
+            lines: Lines to parse
+            on_entry: Called with every parsed entry, as in ParsedBatch.from_lines()
+
+        Returns:
+            ParsedBatch with format_counts filled in
+        """
+        batch = ParsedBatch(self.parse)
+        add_entry = batch.add_entry
+        route = self.route
+        fallback = self._fallback
+        formats = Counter()
+        last = None
+        for line in lines:
+            batch.total_lines += 1
+            if not line.strip():
+                continue
+            parser, entry = route(line, last)
+            if entry is None:
+                batch.failed_lines += 1
+                continue
+            if parser is not fallback:
+                last = parser
+            formats[parser] += 1
+            add_entry(line, entry)
+            if on_entry is not None:
+                on_entry(entry)
+        for parser, count in formats.items():
+            batch.format_counts[parser.name] += count
+        return batch
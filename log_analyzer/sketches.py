@@ -0,0 +1,729 @@
+"""
+Bounded-memory, mergeable summaries for high-cardinality log fields.
+
+The summaries here answer questions an unbounded Counter or set would (top
+values, number of distinct values, quantiles, representative samples) in fixed
+memory, with documented error bounds, and merge
+across chunks, byte ranges and checkpoints the same way the aggregators
+that use them do (see log_analyzer.aggregators).
+"""
+
+import base64
+import heapq
+import math
+from collections import Counter
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from hashlib import blake2b
+from typing import Any, Callable, Optional, Union
+
+from .constants import DDSKETCH_MAX_BUCKETS, DDSKETCH_RELATIVE_ACCURACY, HEAVY_HITTERS_CAPACITY, HLL_PRECISION
+
+# Optional NumPy for merging sketch registers
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+__all__ = [
+    "DDSketch",
+    "HyperLogLog",
+    "SpaceSaving",
+    "WeightedReservoir",
+]
+
+
+class SpaceSaving(Mapping):
+    """
+    Space-Saving heavy-hitters summary (Metwally, Agrawal & El Abbadi, 2005).
+
+    Monitors at most ``capacity`` distinct keys. While there are no more
+    distinct keys than that, counts are exact. Beyond it, a new key replaces
+    the key with the smallest count and inherits that count as its error,
+    so for a stream of N items:
+
+    - every reported count over-estimates the true count by at most
+      ``error(key)`` (itself at most N / capacity), and
+    - every key whose true count exceeds N / capacity is monitored.
+
+    Updates take amortized constant time; the min-heap used for evictions
+    is only built once a key has to be evicted. Reads go through the Mapping
+    interface (``summary[key]``, ``dict(summary)``) and most_common().
+    """
+
+    def __init__(self, capacity: int = HEAVY_HITTERS_CAPACITY):
+        """
+        Create an empty summary.
+
+        Args:
+            capacity: Maximum number of distinct keys to monitor
+
+        Raises:
+            ValueError: If capacity is not positive
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._counts: dict[Hashable, int] = {}
+        # Only keys that were let in by an eviction have a non-zero error
+        self._errors: dict[Hashable, int] = {}
+        # (count, sequence, key) for every monitored key, built on the first
+        # eviction; counts in it may be stale (low)
+        self._heap: Optional[list[tuple[int, int, Hashable]]] = None
+        self._sequence = 0
+
+    def __getitem__(self, key: Hashable) -> int:
+        return self._counts[key]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._counts
+
+    def __repr__(self) -> str:
+        return f"SpaceSaving(capacity={self.capacity}, {self._counts!r})"
+
+    def error(self, key: Hashable) -> int:
+        """Get how much the count for a key may over-estimate its true count."""
+        return self._errors.get(key, 0)
+
+    def add(self, key: Hashable, count: int = 1) -> None:
+        """
+        Count ``count`` occurrences of a key.
+
+        Args:
+            key: Value to count
+            count: Number of occurrences (a positive weight)
+        """
+        counts = self._counts
+        if key in counts:
+            counts[key] += count
+        elif len(counts) < self.capacity:
+            counts[key] = count
+            if self._heap is not None:
+                self._push(key, count)
+        else:
+            floor = self._pop_min()
+            counts[key] = floor + count
+            self._errors[key] = floor
+            self._push(key, floor + count)
+
+    def update(self, values: Union[Mapping[Hashable, int], Iterable[Hashable]]) -> None:
+        """Count values like Counter.update(): a mapping of counts, or an iterable of keys."""
+        if not isinstance(values, Mapping):
+            values = Counter(values)
+        add = self.add
+        for key, count in values.items():
+            if count > 0:
+                add(key, count)
+
+    def most_common(self, n: Optional[int] = None) -> list[tuple[Hashable, int]]:
+        """
+        List the keys with the highest counts, like Counter.most_common().
+
+        Ties keep the order in which keys were first monitored.
+        """
+        if n is None:
+            return sorted(self._counts.items(), key=_by_count, reverse=True)
+        return heapq.nlargest(n, self._counts.items(), key=_by_count)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """
+        Fold in the summary of another part of the stream, in place.
+
+        A key missing from a full summary may still have occurred there up
+        to that summary's smallest count, so it is added as both count and
+        error. The merged counts keep over-estimating by at most the merged
+        errors. The result is exact when neither side was full and the union
+        fits in the capacity.
+
+        Args:
+            other: Summary to merge in
+        """
+        floor, other_floor = self._floor(), other._floor()
+        counts, errors = self._counts, self._errors
+        other_counts, other_errors = other._counts, other._errors
+
+        if other_floor:
+            for key in counts.keys() - other_counts.keys():
+                counts[key] += other_floor
+                errors[key] = errors.get(key, 0) + other_floor
+        get = counts.get
+        for key, count in other_counts.items():
+            current = get(key)
+            if current is None:
+                counts[key] = count + floor
+                error = other_errors.get(key, 0) + floor
+            else:
+                counts[key] = current + count
+                error = errors.get(key, 0) + other_errors.get(key, 0)
+            if error:
+                errors[key] = error
+
+        if len(counts) > self.capacity:
+            # Keep the largest counts; ties at the cut-off go to the earliest keys
+            threshold = sorted(counts.values(), reverse=True)[self.capacity - 1]
+            ties = self.capacity - sum(1 for count in counts.values() if count > threshold)
+            kept = {}
+            for key, count in counts.items():
+                if count > threshold:
+                    kept[key] = count
+                elif count == threshold and ties:
+                    kept[key] = count
+                    ties -= 1
+            self._counts = kept
+            self._errors = {key: error for key, error in errors.items() if key in kept}
+        self._heap = None
+
+    def to_state(self) -> dict[str, Any]:
+        """Convert the summary to JSON-safe data (keys must be JSON-safe)."""
+        return {
+            "capacity": self.capacity,
+            "counts": [[key, count, self.error(key)] for key, count in self._counts.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "SpaceSaving":
+        """Rebuild a summary from the output of to_state()."""
+        summary = cls(state["capacity"])
+        for key, count, error in state["counts"]:
+            summary._counts[key] = count
+            if error:
+                summary._errors[key] = error
+        return summary
+
+    def _build_heap(self) -> None:
+        self._heap = [(count, i, key) for i, (key, count) in enumerate(self._counts.items())]
+        self._sequence = len(self._heap)
+        heapq.heapify(self._heap)
+
+    def _push(self, key: Hashable, count: int) -> None:
+        heapq.heappush(self._heap, (count, self._sequence, key))
+        self._sequence += 1
+
+    def _settle(self) -> None:
+        """Refresh stale heap entries until the top one holds its key's current count."""
+        heap = self._heap
+        counts = self._counts
+        while True:
+            count, _, key = heap[0]
+            current = counts[key]
+            if current == count:
+                return
+            heapq.heapreplace(heap, (current, self._sequence, key))
+            self._sequence += 1
+
+    def _pop_min(self) -> int:
+        """Stop monitoring the key with the smallest count and return that count."""
+        if self._heap is None:
+            self._build_heap()
+        self._settle()
+        count, _, key = heapq.heappop(self._heap)
+        del self._counts[key]
+        self._errors.pop(key, None)
+        return count
+
+    def _floor(self) -> int:
+        """Upper bound on the count of any key that is not monitored."""
+        if len(self._counts) < self.capacity:
+            return 0
+        if self._heap is None:
+            return min(self._counts.values())
+        self._settle()
+        return self._heap[0][0]
+
+
+def _by_count(item: tuple[Hashable, int]) -> int:
+    return item[1]
+
+
+def _to_bytes(value: Any) -> bytes:
+    """Encode a value for hashing; the built-in hash() is salted per process, so sketches hash bytes."""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("utf-8", "surrogatepass")
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-value counter (Flajolet et al., 2007).
+
+    Each value is hashed to 64 bits; the first ``precision`` bits pick one of
+    2**precision one-byte registers, which keeps the longest run of leading
+    zeros seen in the remaining bits. Memory is fixed at 2**precision bytes
+    (4 KB at the default precision of 12) however many values are added, and
+    count() is within about 1.04 / sqrt(2**precision) of the true number of
+    distinct values (1.6% at precision 12). Small counts use linear counting
+    and are close to exact.
+
+    Adding a value twice has no effect, so callers can deduplicate cheaply
+    before adding, and merging two sketches counts the union of their values.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        """
+        Create an empty sketch.
+
+        Args:
+            precision: Number of hash bits used to pick a register (4-16)
+
+        Raises:
+            ValueError: If precision is out of range
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision must be between 4 and 16, got {precision}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def __repr__(self) -> str:
+        return f"HyperLogLog(precision={self.precision}, count={self.count()})"
+
+    def add(self, value: Any) -> None:
+        """Add one value (str, bytes, or anything with a stable str())."""
+        self.update((value,))
+
+    def update(self, values: Iterable[Any]) -> None:
+        """Add every value of an iterable."""
+        registers = self.registers
+        shift = 64 - self.precision
+        mask = (1 << shift) - 1
+        from_bytes = int.from_bytes
+        for value in values:
+            data = value.encode("utf-8", "surrogatepass") if value.__class__ is str else _to_bytes(value)
+            hashed = from_bytes(blake2b(data, digest_size=8).digest(), "big")
+            index = hashed >> shift
+            # Position of the first 1 bit after the index bits
+            rank = shift - (hashed & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Fold in another sketch, in place; the result counts the union of both.
+
+        Raises:
+            ValueError: If the sketches have different precisions
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog sketches of precision {self.precision} and {other.precision}")
+        if other.registers.count(0) == len(other.registers):
+            # Nothing was added to the other sketch
+            return
+        if NUMPY_AVAILABLE:
+            np.maximum(
+                np.frombuffer(self.registers, dtype=np.uint8),
+                np.frombuffer(other.registers, dtype=np.uint8),
+                out=np.frombuffer(self.registers, dtype=np.uint8),
+            )
+        else:
+            self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        registers = self.registers
+        m = len(registers)
+        zeros = registers.count(0)
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        estimate = alpha * m * m / math.fsum(2.0**-rank for rank in registers)
+        if zeros and estimate <= 2.5 * m:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def to_state(self) -> dict[str, Any]:
+        """Convert the sketch to JSON-safe data."""
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(self.registers).decode("ascii"),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "HyperLogLog":
+        """Rebuild a sketch from the output of to_state()."""
+        sketch = cls(state["precision"])
+        registers = base64.b64decode(state["registers"])
+        if len(registers) != len(sketch.registers):
+            raise ValueError("HyperLogLog state does not match its precision")
+        sketch.registers = bytearray(registers)
+        return sketch
+
+
+class DDSketch:
+    """
+    DDSketch quantile summary (Masson, Rim & Lee, 2019).
+
+    Values are counted in logarithmically sized buckets, so every quantile
+    estimate is within ``relative_accuracy`` of the true value at that rank
+    (1% by default) whatever the distribution, and two sketches merge
+    exactly by adding bucket counts. At most ``max_buckets`` buckets are
+    kept; past that the buckets for the smallest magnitudes are collapsed,
+    which only affects the accuracy of the lowest quantiles. Zero and
+    negative values are supported; NaN and infinities are ignored.
+    """
+
+    # Magnitudes below this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = DDSKETCH_RELATIVE_ACCURACY, max_buckets: int = DDSKETCH_MAX_BUCKETS):
+        """
+        Create an empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates (0-1)
+            max_buckets: Maximum number of buckets to keep
+
+        Raises:
+            ValueError: If an argument is out of range
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"relative_accuracy must be between 0 and 1, got {relative_accuracy}")
+        if max_buckets < 2:
+            raise ValueError(f"max_buckets must be at least 2, got {max_buckets}")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.zero_count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        # Bucket index -> count, for positive values and for negated negative values
+        self._positive: dict[int, int] = {}
+        self._negative: dict[int, int] = {}
+
+    def __repr__(self) -> str:
+        return f"DDSketch(relative_accuracy={self.relative_accuracy}, count={self.count})"
+
+    def _key(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket (gamma**(key-1), gamma**key] in relative terms
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+        Count ``count`` occurrences of a value.
+
+        Args:
+            value: Value to count
+            count: Number of occurrences (a positive weight)
+        """
+        if not math.isfinite(value):
+            return
+        if value > self.MIN_VALUE:
+            key = self._key(value)
+            self._positive[key] = self._positive.get(key, 0) + count
+        elif value < -self.MIN_VALUE:
+            key = self._key(-value)
+            self._negative[key] = self._negative.get(key, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self._collapse()
+
+    def update(self, values: Iterable[float]) -> None:
+        """Count every value of an iterable (or NumPy array) of numbers."""
+        if NUMPY_AVAILABLE:
+            self._update_array(np.asarray(values, dtype=np.float64))
+            return
+        values = [value for value in values if math.isfinite(value)]
+        if not values:
+            return
+        positive, negative = self._positive, self._negative
+        key = self._key
+        minimum = self.MIN_VALUE
+        for value in values:
+            if value > minimum:
+                k = key(value)
+                positive[k] = positive.get(k, 0) + 1
+            elif value < -minimum:
+                k = key(-value)
+                negative[k] = negative.get(k, 0) + 1
+            else:
+                self.zero_count += 1
+        self._include(len(values), min(values), max(values))
+
+    def _update_array(self, values: "np.ndarray") -> None:
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return
+        for store, magnitudes in (
+            (self._positive, values[values > self.MIN_VALUE]),
+            (self._negative, -values[values < -self.MIN_VALUE]),
+        ):
+            if magnitudes.size:
+                keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma), return_counts=True)
+                for key, count in zip(keys.astype(np.int64).tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+        self.zero_count += int(np.count_nonzero(np.abs(values) <= self.MIN_VALUE))
+        self._include(int(values.size), float(values.min()), float(values.max()))
+
+    def _include(self, count: int, minimum: float, maximum: float) -> None:
+        self.count += count
+        if self.min is None or minimum < self.min:
+            self.min = minimum
+        if self.max is None or maximum > self.max:
+            self.max = maximum
+        self._collapse()
+
+    def merge(self, other: "DDSketch") -> None:
+        """
+        Fold in another sketch, in place.
+
+        Raises:
+            ValueError: If the sketches have different relative accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                f"Cannot merge DDSketches with relative accuracy {self.relative_accuracy} and {other.relative_accuracy}"
+            )
+        if not other.count:
+            return
+        for store, other_store in ((self._positive, other._positive), (self._negative, other._negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self._include(other.count, other.min, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the value at quantile ``q``.
+
+        Args:
+            q: Quantile between 0 and 1 (0.5 for the median)
+
+        Returns:
+            The estimate, or None if the sketch is empty
+
+        Raises:
+            ValueError: If q is out of range
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"q must be between 0 and 1, got {q}")
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        estimate = None
+        # Most negative values first: largest negative magnitudes
+        for key in sorted(self._negative, reverse=True):
+            seen += self._negative[key]
+            if seen > rank:
+                estimate = -self._value(key)
+                break
+        else:
+            seen += self.zero_count
+            if seen > rank:
+                estimate = 0.0
+            else:
+                for key in sorted(self._positive):
+                    seen += self._positive[key]
+                    if seen > rank:
+                        estimate = self._value(key)
+                        break
+        if estimate is None:
+            estimate = self.max
+        return min(max(estimate, self.min), self.max)
+
+    def _collapse(self) -> None:
+        """Fold the buckets for the smallest magnitudes together while there are too many."""
+        excess = len(self._positive) + len(self._negative) - self.max_buckets
+        for store in (self._negative, self._positive):
+            if excess <= 0:
+                return
+            keys = sorted(store)
+            folded = keys[: min(excess, len(keys) - 1)]
+            if not folded:
+                continue
+            target = keys[len(folded)]
+            store[target] += sum(store.pop(key) for key in folded)
+            excess -= len(folded)
+
+    def to_state(self) -> dict[str, Any]:
+        """Convert the sketch to JSON-safe data."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "count": self.count,
+            "zero_count": self.zero_count,
+            "min": self.min,
+            "max": self.max,
+            "positive": [[key, count] for key, count in self._positive.items()],
+            "negative": [[key, count] for key, count in self._negative.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "DDSketch":
+        """Rebuild a sketch from the output of to_state()."""
+        sketch = cls(state["relative_accuracy"], state["max_buckets"])
+        sketch.count = state["count"]
+        sketch.zero_count = state["zero_count"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        sketch._positive = {key: count for key, count in state["positive"]}
+        sketch._negative = {key: count for key, count in state["negative"]}
+        return sketch
+
+
+_TWO_TO_MINUS_64 = 2.0**-64
+
+
+class WeightedReservoir:
+    """
+    Weighted random sample without replacement (A-Res, Efraimidis & Spirakis, 2006).
+
+    Each item gets the key ``u ** (1 / weight)`` for a uniform ``u`` and the
+    ``size`` items with the largest keys are kept, which samples items with
+    probability proportional to their weight. ``u`` comes from hashing the
+    item's identity rather than a random generator, so:
+
+    - an item has the same key in every chunk, process and run, and merging
+      samples of consecutive parts keeps exactly the items a single pass over
+      all of them would have kept, and
+    - items with the same identity are sampled at most once.
+
+    Keys are stored as ``log(u) / weight``, which orders the same way and
+    does not underflow for large weights.
+    """
+
+    def __init__(self, size: int):
+        """
+        Create an empty sample.
+
+        Args:
+            size: Maximum number of items to keep
+
+        Raises:
+            ValueError: If size is not positive
+        """
+        if size < 1:
+            raise ValueError(f"size must be positive, got {size}")
+        self.size = size
+        # Min-heap of (key, identity); the smallest kept key is evicted first
+        self._heap: list[tuple[float, Union[str, int]]] = []
+        self._items: dict[Union[str, int], Any] = {}
+        self.best = -math.inf
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __repr__(self) -> str:
+        return f"WeightedReservoir(size={self.size}, {len(self._heap)} items)"
+
+    @staticmethod
+    def key(identity: str, weight: float = 1.0) -> float:
+        """
+        Compute the sampling key of an item; larger keys are kept first.
+
+        Args:
+            identity: Stable identity of the item
+            weight: Positive sampling weight
+
+        Returns:
+            The key, or -inf if the weight is not positive
+        """
+        if weight <= 0:
+            return -math.inf
+        data = identity.encode("utf-8", "surrogatepass") if identity.__class__ is str else _to_bytes(identity)
+        hashed = int.from_bytes(blake2b(data, digest_size=8).digest(), "big")
+        return math.log((hashed + 0.5) * _TWO_TO_MINUS_64) / weight
+
+    @property
+    def threshold(self) -> float:
+        """Key an item must beat to be kept: the smallest kept key once the sample is full."""
+        return self._heap[0][0] if len(self._heap) >= self.size else -math.inf
+
+    def add(self, identity: str, item: Any, weight: float = 1.0) -> bool:
+        """
+        Offer one item to the sample.
+
+        Args:
+            identity: Stable identity of the item (hashed to draw its key)
+            item: Value to keep
+            weight: Positive sampling weight
+
+        Returns:
+            True if the item is now in the sample
+        """
+        return self.offer(self.key(identity, weight), identity, item)
+
+    def offer(self, key: float, identity: Union[str, int], item: Any) -> bool:
+        """
+        Offer an item whose key was already computed with key().
+
+        Callers with many candidates can compare keys against threshold and
+        only build the items that may be kept. The identity only has to tell
+        items apart (a stream position works), since the key is given.
+
+        Returns:
+            True if the item is now in the sample
+        """
+        if identity in self._items:
+            return True
+        if key == -math.inf or key <= self.threshold:
+            return False
+        if len(self._heap) >= self.size:
+            _, evicted = heapq.heapreplace(self._heap, (key, identity))
+            del self._items[evicted]
+        else:
+            heapq.heappush(self._heap, (key, identity))
+        self._items[identity] = item
+        if key > self.best:
+            self.best = key
+        return True
+
+    def entries(self) -> list[tuple[float, str, Any]]:
+        """List ``(key, identity, item)`` for the sampled items, largest key first."""
+        return [(key, identity, self._items[identity]) for key, identity in sorted(self._heap, reverse=True)]
+
+    def items(self) -> list[Any]:
+        """List the sampled items, largest key first."""
+        return [item for _, _, item in self.entries()]
+
+    def merge(self, other: "WeightedReservoir") -> None:
+        """
+        Fold in the sample of another part of the stream, in place.
+
+        The result is the sample a single pass over both parts would keep.
+        """
+        for key, identity, item in other.entries():
+            self.offer(key, identity, item)
+
+    def to_state(self, encode: Callable[[Any], Any] = lambda item: item) -> dict[str, Any]:
+        """
+        Convert the sample to JSON-safe data.
+
+        Args:
+            encode: Converts an item to JSON-safe data
+        """
+        return {
+            "size": self.size,
+            "items": [[key, identity, encode(item)] for key, identity, item in self.entries()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any], decode: Callable[[Any], Any] = lambda item: item) -> "WeightedReservoir":
+        """
+        Rebuild a sample from the output of to_state().
+
+        Args:
+            state: Saved sample
+            decode: Inverse of the encode function passed to to_state()
+        """
+        reservoir = cls(state["size"])
+        for key, identity, item in state["items"]:
+            reservoir.offer(key, identity, decode(item))
+        return reservoir
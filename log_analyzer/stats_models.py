@@ -33,6 +33,9 @@ class AnalyticsData:
     peak_period: Optional[str] = None
     """Time period with highest activity"""
 
+    level_distribution: dict[str, dict[str, int]] = field(default_factory=dict)
+    """Per-level distribution across time buckets, for every parsed entry (level -> {timestamp: count})"""
+
     def to_dict(self) -> dict:
         """
         Convert analytics data to dictionary for serialization.
@@ -45,4 +48,5 @@ class AnalyticsData:
             "hourly_distribution": self.hourly_distribution,
             "trend_direction": self.trend_direction,
             "peak_period": self.peak_period,
+            "level_distribution": self.level_distribution,
         }
@@ -0,0 +1,323 @@
+"""
+Online log template mining.
+
+TemplateMiner clusters messages into templates with parameter slots
+("Connection to <IP> timed out after <NUM> ms", "Block <*> not found")
+in one pass, following Drain (He et al., "Drain: An Online Log Parsing
+Approach with Fixed Depth Tree", ICWS 2017):
+
+1. Obvious parameters (UUIDs, IP addresses, hex and decimal numbers) are
+   masked with fixed placeholders; messages that are identical after
+   masking share a cache entry and skip the tree.
+2. The masked message is routed through a fixed-depth prefix tree keyed on
+   its token count and leading tokens.
+3. It joins the most similar template at that leaf if enough tokens match,
+   turning the differing tokens into ``<*>`` slots, or starts a new one.
+
+Memory is bounded: the tree stops branching past TEMPLATE_MAX_CHILDREN per
+node, at most TEMPLATE_MAX_CLUSTERS templates are kept (the least recently
+matched is evicted), and a bounded cache of exact messages skips the tree
+for repeated messages. Miners for different chunks merge by feeding one's
+templates through the other, like the other aggregator summaries.
+"""
+
+import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from .constants import (
+    TEMPLATE_CACHE_SIZE,
+    TEMPLATE_MAX_CHILDREN,
+    TEMPLATE_MAX_CLUSTERS,
+    TEMPLATE_SIMILARITY,
+    TEMPLATE_TREE_DEPTH,
+)
+
+__all__ = [
+    "WILDCARD",
+    "TemplateMiner",
+    "mask_message",
+]
+
+
+# Token standing for a parameter that varies between messages of a template
+WILDCARD = "<*>"
+
+# Applied in order; earlier masks protect their matches from later ones. Other
+# hex IDs are partly masked as numbers and otherwise left to the tree.
+_UUID = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b")
+_MASKS = (
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b0[xX][0-9a-fA-F]+\b"), "<HEX>"),
+    (re.compile(r"\d+(?:\.\d+)*"), "<NUM>"),
+)
+
+
+def mask_message(message: str) -> str:
+    """
+    Replace obvious parameters in a message with placeholders.
+
+    Args:
+        message: Log message
+
+    Returns:
+        The message with UUIDs, IP addresses, hex and decimal numbers masked
+    """
+    # UUIDs need four dashes; skip the expensive scan for messages without them
+    if message.count("-") >= 4:
+        message = _UUID.sub("<UUID>", message)
+    for pattern, placeholder in _MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def _has_digit(token: str) -> bool:
+    return any(char.isdigit() for char in token)
+
+
+class _Node:
+    """Prefix tree node: children by token, or the template ids at a leaf."""
+
+    __slots__ = ("children", "cluster_ids")
+
+    def __init__(self):
+        self.children: dict[Any, _Node] = {}
+        self.cluster_ids: list[int] = []
+
+
+class _Cluster:
+    """One template with its count and the first message that produced it."""
+
+    __slots__ = ("tokens", "count", "example")
+
+    def __init__(self, tokens: list[str], count: int, example: str):
+        self.tokens = tokens
+        self.count = count
+        self.example = example
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+
+class TemplateMiner:
+    """
+    Streaming Drain template miner with bounded memory.
+
+    Feed messages with add(); read the templates with most_common(), which
+    returns ``(template, count, example)`` tuples. Counts are exact unless
+    a template was evicted (more than ``max_clusters`` templates in play),
+    in which case messages that join it again start a new count.
+    """
+
+    def __init__(
+        self,
+        depth: int = TEMPLATE_TREE_DEPTH,
+        similarity: float = TEMPLATE_SIMILARITY,
+        max_children: int = TEMPLATE_MAX_CHILDREN,
+        max_clusters: int = TEMPLATE_MAX_CLUSTERS,
+        cache_size: int = TEMPLATE_CACHE_SIZE,
+    ):
+        """
+        Create an empty miner.
+
+        Args:
+            depth: Prefix tree depth (at least 3); depth - 3 leading tokens route a message
+            similarity: Fraction of matching tokens needed to join a template (0-1)
+            max_children: Distinct tokens per tree node before new ones share the wildcard branch
+            max_clusters: Templates kept before the least recently matched is evicted
+            cache_size: Exact messages remembered with their template
+
+        Raises:
+            ValueError: If an argument is out of range
+        """
+        if depth < 3:
+            raise ValueError(f"depth must be at least 3, got {depth}")
+        if not 0 <= similarity <= 1:
+            raise ValueError(f"similarity must be between 0 and 1, got {similarity}")
+        if max_clusters < 1:
+            raise ValueError(f"max_clusters must be positive, got {max_clusters}")
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.cache_size = cache_size
+        self._root = _Node()
+        # Least recently matched first
+        self._clusters: OrderedDict[int, _Cluster] = OrderedDict()
+        self._next_id = 0
+        # Exact and masked messages -> template id, oldest first
+        self._cache: OrderedDict[str, int] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._clusters)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TemplateMiner):
+            return NotImplemented
+        return self.most_common() == other.most_common()
+
+    def __repr__(self) -> str:
+        return f"TemplateMiner({len(self._clusters)} templates)"
+
+    def add(self, message: str, count: int = 1) -> str:
+        """
+        Count ``count`` occurrences of a message.
+
+        Args:
+            message: Log message
+            count: Number of occurrences (a positive weight)
+
+        Returns:
+            The template the message now belongs to
+        """
+        cluster_id = self._cached(message)
+        if cluster_id is None:
+            masked = mask_message(message)
+            cluster_id = self._cached(masked)
+            if cluster_id is None:
+                cluster_id = self._absorb(masked.split(), count, message)
+                self._remember(masked, cluster_id)
+            else:
+                self._count(cluster_id, count)
+            self._remember(message, cluster_id)
+        else:
+            self._count(cluster_id, count)
+        return self._clusters[cluster_id].template
+
+    def update(self, messages: Iterable[str]) -> None:
+        """Count every message of an iterable."""
+        add = self.add
+        for message in messages:
+            add(message)
+
+    def most_common(self, n: Optional[int] = None) -> list[tuple[str, int, str]]:
+        """
+        List the templates with the highest counts.
+
+        Ties keep the order in which templates were created.
+
+        Returns:
+            ``(template, count, example message)`` tuples
+        """
+        clusters = sorted(self._clusters.items(), key=lambda item: (-item[1].count, item[0]))
+        return [(cluster.template, cluster.count, cluster.example) for _, cluster in clusters[:n]]
+
+    def merge(self, other: "TemplateMiner") -> None:
+        """
+        Fold in the templates of another miner, in place.
+
+        Each of the other miner's templates is routed like a message with its
+        count, so identical or similar templates combine.
+        """
+        for _, cluster in sorted(other._clusters.items()):
+            self._absorb(list(cluster.tokens), cluster.count, cluster.example)
+
+    def to_state(self) -> dict[str, Any]:
+        """Convert the templates to JSON-safe data."""
+        return {
+            "depth": self.depth,
+            "similarity": self.similarity,
+            "max_children": self.max_children,
+            "max_clusters": self.max_clusters,
+            "cache_size": self.cache_size,
+            # Creation order, so restoring keeps tie order
+            "templates": [
+                [cluster.tokens, cluster.count, cluster.example] for _, cluster in sorted(self._clusters.items())
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "TemplateMiner":
+        """Rebuild a miner from the output of to_state()."""
+        miner = cls(
+            state["depth"], state["similarity"], state["max_children"], state["max_clusters"], state["cache_size"]
+        )
+        for tokens, count, example in state["templates"]:
+            miner._create(miner._leaf(tokens), tokens, count, example)
+        return miner
+
+    def _cached(self, text: str) -> Optional[int]:
+        """Get the template id a message was last added to, unless it was evicted since."""
+        cluster_id = self._cache.get(text)
+        if cluster_id is not None and cluster_id in self._clusters:
+            return cluster_id
+        return None
+
+    def _remember(self, text: str, cluster_id: int) -> None:
+        cache = self._cache
+        if len(cache) >= self.cache_size:
+            cache.popitem(last=False)
+        cache[text] = cluster_id
+
+    def _count(self, cluster_id: int, count: int) -> None:
+        # A cached message already matches its template; only the count changes
+        self._clusters[cluster_id].count += count
+        self._clusters.move_to_end(cluster_id)
+
+    def _leaf(self, tokens: list[str]) -> _Node:
+        """Find (or grow) the leaf for a token list."""
+        node = self._root.children.get(len(tokens))
+        if node is None:
+            node = self._root.children[len(tokens)] = _Node()
+        for token in tokens[: self.depth - 3]:
+            children = node.children
+            child = children.get(token)
+            if child is None:
+                # Tokens with digits are usually parameters; past max_children, share the wildcard branch
+                if token != WILDCARD and (_has_digit(token) or len(children) >= self.max_children):
+                    token = WILDCARD
+                child = children.get(token)
+                if child is None:
+                    child = children[token] = _Node()
+            node = child
+        return node
+
+    def _absorb(self, tokens: list[str], count: int, example: str) -> int:
+        """Add a tokenized message or template to its best matching template, or a new one; return its id."""
+        leaf = self._leaf(tokens)
+        best_id, best = None, (-1.0, -1)
+        live = []
+        for cluster_id in leaf.cluster_ids:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None:
+                # Evicted
+                continue
+            live.append(cluster_id)
+            score = self._score(cluster.tokens, tokens)
+            if score > best:
+                best_id, best = cluster_id, score
+        leaf.cluster_ids = live
+
+        if best_id is None or best[0] < self.similarity:
+            return self._create(leaf, tokens, count, example)
+
+        cluster = self._clusters[best_id]
+        cluster.tokens = [
+            template if template == token else WILDCARD for template, token in zip(cluster.tokens, tokens)
+        ]
+        self._count(best_id, count)
+        return best_id
+
+    @staticmethod
+    def _score(template: list[str], tokens: list[str]) -> tuple[float, int]:
+        """Similarity of tokens to a template of the same length, then its number of slots."""
+        if not template:
+            return (1.0, 0)
+        matches = slots = 0
+        for expected, token in zip(template, tokens):
+            if expected == WILDCARD:
+                slots += 1
+            elif expected == token:
+                matches += 1
+        return (matches / len(template), slots)
+
+    def _create(self, leaf: _Node, tokens: list[str], count: int, example: str) -> int:
+        if len(self._clusters) >= self.max_clusters:
+            self._clusters.popitem(last=False)
+        cluster_id = self._next_id
+        self._next_id += 1
+        self._clusters[cluster_id] = _Cluster(tokens, count, example)
+        leaf.cluster_ids.append(cluster_id)
+        return cluster_id
@@ -0,0 +1,302 @@
+"""
+Fast, memoized timestamp parsing shared by the log parsers.
+
+Log timestamps come in a few fixed layouts, and consecutive lines usually
+share the same second: a busy access log writes thousands of lines stamped
+with the same ``10/Oct/2023:13:55:36 -0700``. The parsers here read each
+layout at fixed offsets instead of going through ``datetime.strptime()``,
+and cache the datetime built for every seconds-resolution prefix, so a
+repeated second costs one dict lookup. Fractional seconds are applied to
+the cached value with ``replace()``.
+
+Every function returns None for input it does not recognise so callers
+can fall back to a slower, more permissive parse.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .constants import TIMESTAMP_CACHE_SIZE
+
+__all__ = [
+    "clear_cache",
+    "parse_clf",
+    "parse_iso8601",
+    "parse_syslog",
+    "parse_with_format",
+]
+
+
+# strptime's %b is locale-dependent; log files use the C locale names
+_MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), start=1
+    )
+}
+
+_CLF_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+
+# Validation only runs on a cache miss; hits never touch a regex
+_CLF_PATTERN = re.compile(r"(\d{2})/([A-Z][a-z]{2})/(\d{4}):(\d{2}):(\d{2}):(\d{2}) ([+-]\d{4})", re.ASCII)
+_ISO_PREFIX_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})", re.ASCII)
+_ISO_TAIL_PATTERN = re.compile(r"(?:[.,](\d+))?(Z|z|[+-]\d{2}(?::?\d{2})?)?", re.ASCII)
+_SYSLOG_PATTERN = re.compile(r"([A-Z][a-z]{2})\s+(\d{1,2})\s+(\d{2}):(\d{2}):(\d{2})", re.ASCII)
+
+# One cache for every layout; keys are tuples tagged with the layout name
+_cache: dict[tuple, Optional[datetime]] = {}
+_offsets: dict[str, timezone] = {}
+# strptime layout -> (pattern splitting off the fraction, layout before it), or None
+_fraction_layouts: dict[str, Optional[tuple[re.Pattern, str]]] = {}
+
+
+def clear_cache() -> None:
+    """Drop every memoized timestamp."""
+    _cache.clear()
+    _offsets.clear()
+    _fraction_layouts.clear()
+
+
+def _remember(key: tuple, value: Optional[datetime]) -> Optional[datetime]:
+    """Store a parsed value, starting over once the cache is full."""
+    if len(_cache) >= TIMESTAMP_CACHE_SIZE:
+        _cache.clear()
+    _cache[key] = value
+    return value
+
+
+def _offset(text: str) -> Optional[timezone]:
+    """
+    Convert a numeric UTC offset (+0000, +05:30, -07) to a timezone.
+
+    Produces the same tzinfo strptime's %z does, so results compare and
+    print identically.
+    """
+    tz = _offsets.get(text)
+    if tz is None:
+        digits = text[1:].replace(":", "")
+        if text[:1] not in ("+", "-") or len(digits) not in (2, 4) or not digits.isdigit():
+            return None
+        hours, minutes = int(digits[:2]), int(digits[2:] or 0)
+        if hours > 23 or minutes > 59:
+            return None
+        delta = timedelta(hours=hours, minutes=minutes)
+        tz = timezone.utc if not delta else timezone(-delta if text[0] == "-" else delta)
+        _offsets[text] = tz
+    return tz
+
+
+def _fraction(digits: str) -> int:
+    """Microseconds for the digits after the decimal point; extra precision is truncated."""
+    return int(digits[:6].ljust(6, "0"))
+
+
+def parse_clf(value: str) -> Optional[datetime]:
+    """
+    Parse a Common Log Format timestamp (``10/Oct/2023:13:55:36 -0700``).
+
+    Equivalent to ``datetime.strptime(value, "%d/%b/%Y:%H:%M:%S %z")``,
+    which it falls back to for anything off the fixed layout.
+
+    Args:
+        value: Timestamp text without the surrounding brackets
+
+    Returns:
+        Timezone-aware datetime, or None if the value is not a valid timestamp
+    """
+    key = ("clf", value)
+    try:
+        return _cache[key]
+    except KeyError:
+        pass
+
+    dt = None
+    match = _CLF_PATTERN.fullmatch(value)
+    month = _MONTHS.get(match.group(2)) if match else None
+    tz = _offset(match.group(7)) if match else None
+    if month is not None and tz is not None:
+        day, year, hour, minute, second = (int(match.group(i)) for i in (1, 3, 4, 5, 6))
+        try:
+            dt = datetime(year, month, day, hour, minute, second, tzinfo=tz)
+        except ValueError:
+            dt = None
+    else:
+        try:
+            dt = datetime.strptime(value, _CLF_FORMAT)
+        except (ValueError, TypeError):
+            dt = None
+    return _remember(key, dt)
+
+
+def parse_iso8601(value: str, z_is_utc: bool = True) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 / RFC 3339 timestamp.
+
+    Accepts ``YYYY-MM-DD`` followed by ``T`` or a space, ``HH:MM:SS``, an
+    optional fraction after ``.`` or ``,`` (nanoseconds are truncated to
+    microseconds) and an optional ``Z`` or numeric offset.
+
+    Args:
+        value: Timestamp text
+        z_is_utc: Return UTC-aware datetimes for a ``Z`` suffix; when False
+            ``Z`` yields a naive datetime, like strptime with a literal Z
+
+    Returns:
+        datetime (naive when the value has no offset), or None if the value
+        is not in this layout
+    """
+    if len(value) < 19:
+        return None
+    tail = value[19:]
+    if tail[:1] in (".", ","):
+        match = _ISO_TAIL_PATTERN.fullmatch(tail)
+        if match is None:
+            return None
+        zone = match.group(2) or ""
+        micro = _fraction(match.group(1)) if match.group(1) else 0
+    else:
+        zone = tail
+        micro = 0
+
+    # Fractional seconds are not part of the key; they are applied to the cached value
+    key = ("iso", value[:19], zone, z_is_utc)
+    try:
+        dt = _cache[key]
+    except KeyError:
+        dt = _remember(key, _build_iso(value[:19], zone, z_is_utc))
+    if dt is not None and micro:
+        return dt.replace(microsecond=micro)
+    return dt
+
+
+def _build_iso(prefix: str, zone: str, z_is_utc: bool) -> Optional[datetime]:
+    """Build the whole-second datetime for an ISO 8601 prefix and zone suffix."""
+    match = _ISO_PREFIX_PATTERN.fullmatch(prefix)
+    if match is None:
+        return None
+    if not zone:
+        tz = None
+    elif zone in ("Z", "z"):
+        tz = timezone.utc if z_is_utc else None
+    else:
+        tz = _offset(zone)
+        if tz is None:
+            return None
+    try:
+        return datetime(*(int(part) for part in match.groups()), tzinfo=tz)
+    except ValueError:
+        return None
+
+
+def parse_syslog(
+    value: str, year: Optional[int] = None, reference: Optional[datetime] = None
+) -> Optional[datetime]:
+    """
+    Parse a BSD syslog (RFC 3164) timestamp such as ``Oct 11 22:14:15``.
+
+    The layout carries no year, and it is never guessed from the clock. It
+    is either given, or taken from a reference time, which the parsers set
+    to the modification time of the file being read (see
+    BaseParser.for_file()). A log is written before it is last modified, so
+    the year of the reference is used, unless that would put the timestamp
+    more than a day after the reference; then the line is from the year
+    before (December lines in a file last written in January). With neither
+    a year nor a reference the year is unknown and None is returned.
+
+    Args:
+        value: Timestamp text
+        year: Year of the timestamp, if known
+        reference: Time the log was last written, used when year is None
+
+    Returns:
+        Naive datetime, or None if the value is not a valid timestamp or its
+        year is unknown
+    """
+    if year is None and reference is None:
+        return None
+    key = ("syslog", value, year, reference)
+    try:
+        return _cache[key]
+    except KeyError:
+        pass
+
+    dt = None
+    match = _SYSLOG_PATTERN.fullmatch(value)
+    month = _MONTHS.get(match.group(1)) if match else None
+    if month is not None:
+        day, hour, minute, second = (int(match.group(i)) for i in (2, 3, 4, 5))
+        try:
+            if year is not None:
+                dt = datetime(year, month, day, hour, minute, second)
+            else:
+                reference = reference.replace(tzinfo=None)
+                dt = datetime(reference.year, month, day, hour, minute, second)
+                if dt > reference + timedelta(days=1):
+                    dt = dt.replace(year=reference.year - 1)
+        except ValueError:
+            # Feb 29 outside a leap year
+            dt = None
+    return _remember(key, dt)
+
+
+def _split_fraction(fmt: str) -> Optional[tuple[re.Pattern, str]]:
+    """
+    Prepare a strptime layout with fractional seconds for whole-second caching.
+
+    Only layouts with one ``%f`` that follows a literal separator (as in
+    ``%H:%M:%S.%f``) and precedes nothing but literal text qualify, so the
+    fraction is the run of one to six ASCII digits (what ``%f`` accepts)
+    right before that text.
+
+    Returns:
+        (pattern matching the text before the fraction, the fraction and the
+        trailing text; layout of the text before the fraction), or None
+    """
+    head, found, tail = fmt.partition("%f")
+    if not found or "%" in tail or len(head) < 2 or head[-1].isalnum() or head[-2] == "%":
+        return None
+    return re.compile(rf"(.*[^0-9])([0-9]{{1,6}}){re.escape(tail)}", re.DOTALL), head
+
+
+def parse_with_format(value: str, fmt: str) -> Optional[datetime]:
+    """
+    Memoized ``datetime.strptime()`` for layouts without a fast path.
+
+    For layouts with fractional seconds (see _split_fraction()) the cache is
+    keyed on the text up to whole seconds, like the fixed layouts, and the
+    fraction is applied to the cached value. Other layouts are keyed on the
+    whole value.
+
+    Args:
+        value: Timestamp text
+        fmt: strptime format string
+
+    Returns:
+        Parsed datetime, or None if the value does not match the format
+    """
+    try:
+        fraction = _fraction_layouts[fmt]
+    except KeyError:
+        fraction = _fraction_layouts[fmt] = _split_fraction(fmt)
+    if fraction is not None and isinstance(value, str):
+        pattern, head = fraction
+        match = pattern.fullmatch(value)
+        if match is not None:
+            dt = _strptime(match.group(1), head)
+            return dt.replace(microsecond=_fraction(match.group(2))) if dt is not None else None
+    return _strptime(value, fmt)
+
+
+def _strptime(value: str, fmt: str) -> Optional[datetime]:
+    """Memoized ``datetime.strptime()`` returning None on a mismatch."""
+    key = ("strptime", fmt, value)
+    try:
+        return _cache[key]
+    except KeyError:
+        pass
+    try:
+        dt = datetime.strptime(value, fmt)
+    except (ValueError, TypeError):
+        dt = None
+    return _remember(key, dt)
@@ -0,0 +1,328 @@
+"""
+Tests for the mergeable aggregator framework.
+"""
+
+import json
+import pickle
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+from log_analyzer.aggregators import (
+    DEFAULT_AGGREGATOR_NAMES,
+    Aggregator,
+    AnalysisState,
+    ErrorSamples,
+    LevelCounts,
+    TimeRange,
+)
+from log_analyzer.analyzer import LogAnalyzer, _aggregate_lines
+from log_analyzer.checkpoint import AnalysisCheckpoint
+from log_analyzer.parsers import ApacheAccessParser, JSONLogParser, LogEntry
+
+
+class SourceErrorRate(Aggregator):
+    """Entry-only aggregator: fraction of ERROR entries per source."""
+
+    name = "source_error_rate"
+
+    def __init__(self):
+        self.totals = Counter()
+        self.errors = Counter()
+
+    def update(self, entry):
+        if entry.source:
+            self.totals[entry.source] += 1
+            if entry.level == "ERROR":
+                self.errors[entry.source] += 1
+
+    def merge(self, other):
+        self.totals.update(other.totals)
+        self.errors.update(other.errors)
+
+    def finalize(self):
+        return {self.name: {source: self.errors[source] / total for source, total in self.totals.items()}}
+
+    def to_state(self):
+        return {"totals": dict(self.totals), "errors": dict(self.errors)}
+
+    def load_state(self, state):
+        self.totals = Counter(state["totals"])
+        self.errors = Counter(state["errors"])
+
+
+def _lines(count):
+    levels = ["INFO", "ERROR", "WARNING", "INFO"]
+    return [
+        json.dumps(
+            {
+                "timestamp": f"2020-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z",
+                "level": levels[i % 4] if i % 3 else "ERROR",
+                "message": f"event {i % 5}",
+                "host": f"host{i % 3}",
+            }
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(_lines(300)) + "\n")
+    return str(path)
+
+
+def _expected_rates(lines):
+    state = AnalysisState([SourceErrorRate()])
+    parser = JSONLogParser()
+    for line in lines:
+        state.update(parser.parse(line))
+    return state.extra_results()["source_error_rate"]
+
+
+class TestAnalysisState:
+    def test_merge_matches_single_pass(self):
+        lines = _lines(100)
+        parser = JSONLogParser()
+        whole = _aggregate_lines(lines, parser, 5)
+        merged = AnalysisState.create(5)
+        for start in range(0, 100, 7):
+            merged.merge(_aggregate_lines(lines[start : start + 7], parser, 5))
+        merged_results, whole_results = merged.results(), whole.results()
+        # Without offsets, samples are drawn per part, so only their size is independent of the split
+        for name in ("errors", "warnings"):
+            assert len(merged_results.pop(name)) == len(whole_results.pop(name)) == 5
+        assert merged_results == whole_results
+        assert merged.total_lines == 100
+
+    def test_offsets_make_samples_independent_of_split(self):
+        lines = _lines(100)
+        offsets = range(0, 1000, 10)
+        parser = JSONLogParser()
+        whole = _aggregate_lines(lines, parser, 5, offsets=offsets)
+        merged = AnalysisState.create(5)
+        for start in range(0, 100, 7):
+            merged.merge(_aggregate_lines(lines[start : start + 7], parser, 5, offsets=offsets[start : start + 7]))
+        assert merged.results() == whole.results()
+        assert merged.total_lines == 100
+
+    @pytest.mark.parametrize("aggregators", [(), (SourceErrorRate,)])
+    def test_small_batches_match_one_batch(self, aggregators):
+        lines = _lines(100) + ["", "not json"]
+        parser = JSONLogParser()
+        whole = _aggregate_lines(lines, parser, 5, aggregators=aggregators, batch_size=len(lines))
+        batched = _aggregate_lines(iter(lines), parser, 5, aggregators=aggregators, batch_size=7)
+        whole_results, batched_results = whole.results(), batched.results()
+        for name in ("errors", "warnings"):
+            assert [e.message for e in batched_results.pop(name)] == [e.message for e in whole_results.pop(name)]
+        assert batched_results == whole_results
+        assert batched.extra_results() == whole.extra_results()
+        assert _aggregate_lines([], parser, 5).total_lines == 0
+
+    def test_entry_updates_match_batch(self):
+        lines = _lines(50) + ["", "not json"]
+        parser = JSONLogParser()
+        state = AnalysisState.create(3)
+        for line in lines:
+            if line.strip():
+                state.update(parser.parse(line))
+            else:
+                state.total_lines += 1
+        assert state.results() == _aggregate_lines(lines, parser, 3).results()
+
+    def test_samples_merge_in_file_order(self):
+        entries = [LogEntry(level="ERROR", message=f"failure {i}") for i in range(200)]
+        parts = []
+        for start in range(0, 200, 30):
+            part = ErrorSamples(10)
+            for entry in entries[start : start + 30]:
+                part.update(entry)
+            parts.append(part)
+        merged, left, right = ErrorSamples(10), ErrorSamples(10), ErrorSamples(10)
+        for part in parts:
+            merged.merge(part)
+        for part in parts[:3]:
+            left.merge(part)
+        for part in parts[3:]:
+            right.merge(part)
+        left.merge(right)
+        samples = merged.finalize()["errors"]
+        # Merging is associative: any grouping of the same parts keeps the same entries
+        assert [e.message for e in samples] == [e.message for e in left.finalize()["errors"]]
+        assert len(samples) == 10
+        assert samples == sorted(samples, key=lambda e: int(e.message.split()[1]))
+        # Drawn from the whole stream, not its first entries
+        assert int(samples[-1].message.split()[1]) >= 30
+
+    @pytest.mark.parametrize("max_errors, count", [(10, 41), (50, 41), (5, 3)])
+    def test_repeated_lines_are_separate_samples(self, max_errors, count):
+        lines = ['{"timestamp": "2020-01-01T00:00:00Z", "level": "ERROR", "message": "disk full"}'] * count
+        entries = [LogEntry(level="ERROR", message="disk full") for _ in range(count)]
+        batched = _aggregate_lines(lines, JSONLogParser(), max_errors)["errors"]
+        per_entry = ErrorSamples(max_errors)
+        for entry in entries:
+            per_entry.update(entry)
+        merged = ErrorSamples(max_errors)
+        for start in range(0, count, 7):
+            part = ErrorSamples(max_errors)
+            for entry in entries[start : start + 7]:
+                part.update(entry)
+            merged.merge(part)
+        for samples in (batched, per_entry.finalize()["errors"], merged.finalize()["errors"]):
+            assert len(samples) == min(max_errors, count)
+
+    def test_samples_stratified_by_template(self):
+        entries = [LogEntry(level="ERROR", message=f"timeout after {i} ms") for i in range(500)]
+        entries += [LogEntry(level="ERROR", message=f"disk {name} full") for name in ("sda", "sdb")]
+        entries.append(LogEntry(level="CRITICAL", message="out of memory"))
+        plain, stratified = ErrorSamples(5), ErrorSamples(5, stratify=True)
+        for entry in entries:
+            plain.update(entry)
+            stratified.update(entry)
+        messages = {e.message for e in stratified.finalize()["errors"]}
+        assert "out of memory" in messages
+        assert {"disk sda full", "disk sdb full"} & messages
+        assert len(messages) == 5
+        assert sum(e.message.startswith("timeout") for e in plain.finalize()["errors"]) >= 3
+
+        restored = ErrorSamples(5)
+        restored.load_state(json.loads(json.dumps(stratified.to_state())))
+        assert restored.stratify
+        assert restored.finalize() == stratified.finalize()
+
+    def test_sample_weights(self):
+        entries = [LogEntry(level="ERROR", message=f"e{i}") for i in range(300)]
+        entries += [LogEntry(level="CRITICAL", message=f"c{i}") for i in range(300)]
+        counts = Counter()
+        for size in range(20, 40):
+            samples = ErrorSamples(size, weights={"CRITICAL": 4.0})
+            for entry in entries:
+                samples.update(entry)
+            counts.update(e.level for e in samples.finalize()["errors"])
+        assert counts["CRITICAL"] > 2 * counts["ERROR"]
+
+    def test_time_range(self):
+        aggregator = TimeRange()
+        aggregator.update(LogEntry(timestamp=datetime(2020, 1, 2)))
+        aggregator.update(LogEntry())
+        other = TimeRange()
+        other.update(LogEntry(timestamp=datetime(2020, 1, 1)))
+        aggregator.merge(other)
+        assert aggregator.finalize() == {"earliest": datetime(2020, 1, 1), "latest": datetime(2020, 1, 2)}
+
+    def test_duplicate_names_rejected(self):
+        with pytest.raises(ValueError, match="Duplicate"):
+            AnalysisState([LevelCounts(), LevelCounts()])
+
+    def test_merge_requires_same_aggregators(self):
+        with pytest.raises(ValueError):
+            AnalysisState.create(5).merge(AnalysisState.create(5, [SourceErrorRate]))
+
+    def test_dict_round_trip(self):
+        state = _aggregate_lines(
+            [*_lines(40), '{"level": "info", "status": 404, "message": "x"}'],
+            JSONLogParser(),
+            3,
+            aggregators=[SourceErrorRate],
+        )
+        data = json.loads(json.dumps(state.to_dict(), default=str))
+        restored = AnalysisState.create(3, [SourceErrorRate])
+        restored.load_dict(data)
+        assert restored.results() == state.results()
+        assert restored["status_codes"] == {404: 1}
+
+    def test_load_dict_requires_every_aggregator(self):
+        data = AnalysisState.create(3).to_dict()
+        with pytest.raises(ValueError, match="source_error_rate"):
+            AnalysisState.create(3, [SourceErrorRate]).load_dict(data)
+
+    def test_pickles(self):
+        state = _aggregate_lines(_lines(20), JSONLogParser(), 3, aggregators=[SourceErrorRate])
+        assert pickle.loads(pickle.dumps(state)).results() == state.results()
+
+    def test_default_names(self):
+        assert set(DEFAULT_AGGREGATOR_NAMES) == set(AnalysisState.create(1).aggregators)
+
+
+class TestBatchedAggregators:
+    def test_builtins_read_columns(self):
+        assert all(aggregator.batched for aggregator in AnalysisState.create(5).aggregators.values())
+        assert not SourceErrorRate().batched
+
+    def test_entry_aggregator_parses_once(self):
+        parser = ApacheAccessParser()
+        calls = []
+        original = parser.parse
+        parser.parse = lambda line: calls.append(line) or original(line)
+        lines = [f'10.0.0.{i} - - [10/Oct/2023:13:55:36 -0700] "GET / HTTP/1.1" 500 1' for i in range(10)]
+
+        state = _aggregate_lines(lines, parser, 5, aggregators=[SourceErrorRate])
+        assert len(calls) == 10
+        assert state.extra_results()["source_error_rate"]["10.0.0.1"] == 1.0
+        assert state["level_counts"] == {"ERROR": 10}
+
+
+class TestAnalyzerAggregators:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"use_threading": False},
+            {"chunk_size": 17},
+            {"use_byte_ranges": True, "byte_range_size": 2048},
+            {"use_threading": False, "parser": JSONLogParser(), "chunk_size": 50},
+        ],
+        ids=["sequential", "threaded", "byte-ranges", "sequential-chunks"],
+    )
+    def test_extra_aggregator_results(self, log_file, kwargs):
+        result = LogAnalyzer(max_workers=2, aggregators=[SourceErrorRate]).analyze(log_file, **kwargs)
+        assert result.aggregates == {"source_error_rate": _expected_rates(_lines(300))}
+        assert result.total_lines == 300
+        assert result.distinct_counts == {"sources": 3, "users": 0, "paths": 0, "error_messages": 5}
+
+    def test_process_executor(self, log_file):
+        analyzer = LogAnalyzer(max_workers=2, executor="process", aggregators=[SourceErrorRate])
+        result = analyzer.analyze(log_file, byte_range_size=2048)
+        assert result.aggregates == {"source_error_rate": _expected_rates(_lines(300))}
+
+    def test_no_extra_aggregators(self, log_file):
+        assert LogAnalyzer().analyze(log_file, use_threading=False).aggregates == {}
+
+    def test_checkpoint_resume(self, log_file):
+        analyzer = LogAnalyzer(aggregators=[SourceErrorRate])
+        analyzer.analyze(log_file, incremental=True, use_threading=False)
+        checkpoint = AnalysisCheckpoint.load_for(log_file, [SourceErrorRate])
+        assert checkpoint.state.aggregators["source_error_rate"].totals
+
+        with open(log_file, "a") as f:
+            f.write("\n".join(_lines(360)[300:]) + "\n")
+        result = analyzer.analyze(log_file, incremental=True, use_threading=False)
+        assert result.aggregates == {"source_error_rate": _expected_rates(_lines(300) + _lines(360)[300:])}
+
+    def test_checkpoint_without_aggregator_state_rescans(self, log_file):
+        LogAnalyzer().analyze(log_file, incremental=True, use_threading=False)
+        assert AnalysisCheckpoint.load_for(log_file, [SourceErrorRate]) is None
+        result = LogAnalyzer(aggregators=[SourceErrorRate]).analyze(log_file, incremental=True, use_threading=False)
+        assert result.aggregates == {"source_error_rate": _expected_rates(_lines(300))}
+
+    def test_stratified_samples(self, log_file):
+        analyzer = LogAnalyzer(max_workers=2, stratify_samples=True)
+        single = analyzer.analyze(log_file, use_threading=False, max_errors=8)
+        ranged = analyzer.analyze(log_file, use_byte_ranges=True, byte_range_size=2048, max_errors=8)
+        assert [e.message for e in ranged.errors] == [e.message for e in single.errors]
+        assert len(single.errors) == 8
+
+        analyzer.analyze(log_file, incremental=True, use_threading=False)
+        assert AnalysisCheckpoint.load_for(log_file).stratify_samples
+        resumed = LogAnalyzer().analyze(log_file, incremental=True, use_threading=False)
+        assert [e.message for e in resumed.errors] == [
+            e.message for e in LogAnalyzer().analyze(log_file, use_threading=False).errors
+        ]
+
+    def test_inline_detection_on_short_file(self, tmp_path):
+        path = tmp_path / "short.log"
+        path.write_text("\n".join(_lines(5)) + "\n")
+        result = LogAnalyzer().analyze(str(path), use_threading=False)
+        assert result.detected_format == "json"
+        assert result.parsed_lines == 5
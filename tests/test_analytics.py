@@ -2,13 +2,17 @@
 Unit tests for analytics module.
 """
 
-from datetime import datetime, timedelta
+import json
+from datetime import datetime, timedelta, timezone
 
 from log_analyzer.analytics import (
     compute_analytics,
     compute_temporal_distribution,
     detect_trend,
+    rollup_time_series,
+    time_series_hourly_distribution,
 )
+from log_analyzer.analyzer import LogAnalyzer
 from log_analyzer.parsers import LogEntry
 from log_analyzer.stats_models import AnalyticsData
 
@@ -111,3 +115,55 @@ class TestComputeAnalytics:
         assert isinstance(analytics, AnalyticsData)
         # No temporal data since there are no timestamps
         assert len(analytics.hourly_distribution) == 0
+
+
+def _epoch(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+class TestTimeSeries:
+    """Tests for analytics computed from the full per-level time series."""
+
+    def test_rollup_fills_gaps(self):
+        counts = {_epoch(2020, 1, 1, 12, 5): 2, _epoch(2020, 1, 1, 12, 55): 3, _epoch(2020, 1, 1, 15): 1}
+        assert rollup_time_series(counts, "1h") == {
+            "2020-01-01T12:00:00": 5,
+            "2020-01-01T13:00:00": 0,
+            "2020-01-01T14:00:00": 0,
+            "2020-01-01T15:00:00": 1,
+        }
+        assert rollup_time_series(counts, "1day") == {"2020-01-01T00:00:00": 6}
+        assert rollup_time_series({}, "1h") == {}
+        assert time_series_hourly_distribution(counts) == {12: 5, 15: 1}
+
+    def test_compute_analytics_uses_time_series(self):
+        time_series = {
+            "ERROR": {_epoch(2020, 1, 1, 10): 1, _epoch(2020, 1, 1, 12): 40},
+            "WARNING": {_epoch(2020, 1, 1, 11): 20},
+            "INFO": {_epoch(2020, 1, 1, 10): 500},
+        }
+        # The sampled entries alone would point at 10:00
+        samples = [LogEntry(timestamp=datetime(2020, 1, 1, 10), level="ERROR")] * 3
+        analytics = compute_analytics(samples, [], {}, {}, time_series=time_series)
+        assert analytics.temporal_distribution == {
+            "2020-01-01T10:00:00": 1,
+            "2020-01-01T11:00:00": 20,
+            "2020-01-01T12:00:00": 40,
+        }
+        assert analytics.peak_period == "2020-01-01T12:00:00"
+        assert analytics.trend_direction == "increasing"
+        assert analytics.level_distribution["INFO"] == {"2020-01-01T10:00:00": 500}
+
+    def test_analyzer_counts_every_entry(self, tmp_path):
+        path = tmp_path / "app.log"
+        lines = [
+            json.dumps({"timestamp": f"2020-01-01T{i // 60:02d}:{i % 60:02d}:00Z", "level": "error" if i % 2 else "info"})
+            for i in range(600)
+        ]
+        path.write_text("\n".join(lines) + "\n")
+        for kwargs in ({"use_threading": False}, {"chunk_size": 64}, {"use_byte_ranges": True, "byte_range_size": 4096}):
+            result = LogAnalyzer(max_workers=2).analyze(str(path), max_errors=5, enable_analytics=True, **kwargs)
+            assert sum(result.time_series["ERROR"].values()) == 300
+            assert sum(result.time_series["INFO"].values()) == 300
+            assert result.analytics.temporal_distribution == {f"2020-01-01T{hour:02d}:00:00": 30 for hour in range(10)}
+            assert result.analytics.trend_direction == "stable"
@@ -2,7 +2,6 @@
 Unit tests for LogAnalyzer and AnalysisResult.
 """
 
-from collections import Counter
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
@@ -62,22 +61,6 @@ class TestAnalysisResult:
         assert result.time_span is None
 
 
-class TestPruneCounter:
-    """Tests for LogAnalyzer._prune_counter static method."""
-
-    def test_prune_when_over_limit(self):
-        c = Counter({f"key{i}": i for i in range(150)})
-        LogAnalyzer._prune_counter(c, max_size=100, prune_to=50)
-        assert len(c) == 50
-        # Top items should be preserved
-        assert c["key149"] == 149
-
-    def test_no_prune_when_under_limit(self):
-        c = Counter({"a": 1, "b": 2})
-        LogAnalyzer._prune_counter(c, max_size=100, prune_to=50)
-        assert len(c) == 2
-
-
 class TestLogAnalyzer:
     """Tests for LogAnalyzer analysis methods."""
 
@@ -92,6 +75,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = []
+            mock_instance.read_blocks.return_value = []
             mock_instance.count_lines.return_value = 0
             analyzer = LogAnalyzer()
             result = analyzer.analyze("empty.log")
@@ -108,6 +92,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 3
             analyzer = LogAnalyzer()
             result = analyzer.analyze("test.log")
@@ -119,6 +104,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 1
             analyzer = LogAnalyzer()
             parser = UniversalFallbackParser()
@@ -131,6 +117,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 2
             analyzer = LogAnalyzer()
             result = analyzer.analyze("test.log")
@@ -145,6 +132,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 2
             analyzer = LogAnalyzer()
             result = analyzer.analyze("test.log")
@@ -160,6 +148,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 3
             analyzer = LogAnalyzer()
             result = analyzer.analyze("error.log")
@@ -175,6 +164,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 2
             analyzer = LogAnalyzer()
             parser = UniversalFallbackParser()
@@ -219,6 +209,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 5
             analyzer = LogAnalyzer()
             parser = UniversalFallbackParser()
@@ -238,6 +229,7 @@ class TestLogAnalyzer:
         with patch('log_analyzer.analyzer.LogReader') as mock_reader_cls:
             mock_instance = mock_reader_cls.return_value
             mock_instance.read_lines.return_value = lines
+            mock_instance.read_blocks.return_value = [(lines, list(range(len(lines))))]
             mock_instance.count_lines.return_value = 2
             analyzer = LogAnalyzer()
             parser = UniversalFallbackParser()
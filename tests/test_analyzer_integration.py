@@ -7,7 +7,7 @@ and single-threaded paths) with temp files containing realistic log data.
 
 import os
 import tempfile
-from datetime import datetime
+from datetime import datetime, timezone
 
 import pytest
 
@@ -189,11 +189,277 @@ class TestAnalyzerMultithreaded:
         )
         assert isinstance(result, AnalysisResult)
 
+    def test_multithreaded_bounds_lines_in_flight(self, large_log_file, monkeypatch):
+        from log_analyzer import analyzer as analyzer_module
+        from log_analyzer.reader import LogReader
+
+        read = 0
+        parsed = 0
+        max_ahead = 0
+        largest_block = 0
+        original_read_blocks = LogReader.read_blocks
+
+        def counting_read_blocks(self, start=0, end=None):
+            nonlocal read, max_ahead, largest_block
+            for lines, offsets in original_read_blocks(self, start, end):
+                read += len(lines)
+                max_ahead = max(max_ahead, read - parsed)
+                largest_block = max(largest_block, len(lines))
+                yield lines, offsets
+
+        def counting_process_chunk(self, lines, parser, max_errors, offsets=None):
+            nonlocal parsed
+            result = analyzer_module._aggregate_lines(lines, parser, max_errors, offsets=offsets)
+            parsed += len(lines)
+            return result
+
+        monkeypatch.setattr("log_analyzer.reader.RANGE_READ_SIZE", 64)
+        monkeypatch.setattr(LogReader, "read_blocks", counting_read_blocks)
+        monkeypatch.setattr(LogAnalyzer, "_process_chunk", counting_process_chunk)
+
+        analyzer = LogAnalyzer(max_workers=2)
+        result = analyzer.analyze(large_log_file, parser=UniversalFallbackParser(), chunk_size=10)
+        assert result.total_lines == 200
+        # max_in_flight chunks plus the one being filled and the block being regrouped
+        assert max_ahead <= (2 * analyzer_module.PIPELINE_QUEUE_DEPTH_PER_WORKER + 1) * 10 + largest_block
+
+    def test_multithreaded_keeps_file_order(self, large_log_file):
+        analyzer = LogAnalyzer(max_workers=4)
+        result = analyzer.analyze(large_log_file, chunk_size=7, max_errors=6)
+        single = analyzer.analyze(large_log_file, use_threading=False, max_errors=6)
+        assert [e.message for e in result.errors] == [e.message for e in single.errors]
+        assert [e.message for e in result.warnings] == [e.message for e in single.warnings]
+        assert len(result.errors) == 6
+
+    def test_multithreaded_progress_counts_every_line(self, large_log_file):
+        from unittest.mock import MagicMock
+        callback = MagicMock()
+        with open(large_log_file, "a") as f:
+            f.write("\n\n")
+        LogAnalyzer(max_workers=2).analyze(large_log_file, chunk_size=16, progress_callback=callback)
+        assert sum(call.kwargs["advance"] for call in callback.update.call_args_list) == 202
+
+
+# ---------------------------------------------------------------------------
+# Byte-range analysis
+# ---------------------------------------------------------------------------
+
+class TestAnalyzerByteRanges:
+    def test_byte_ranges_match_line_chunks(self, large_log_file):
+        analyzer = LogAnalyzer(max_workers=3)
+        chunked = analyzer.analyze(large_log_file, use_threading=True)
+        ranged = analyzer.analyze(large_log_file, use_threading=True, use_byte_ranges=True, byte_range_size=512)
+
+        assert ranged.detected_format == chunked.detected_format
+        assert ranged.total_lines == chunked.total_lines == 200
+        assert ranged.parsed_lines == chunked.parsed_lines
+        assert ranged.failed_lines == chunked.failed_lines
+        assert ranged.level_counts == chunked.level_counts
+        assert ranged.earliest_timestamp == chunked.earliest_timestamp
+        assert ranged.latest_timestamp == chunked.latest_timestamp
+
+    def test_byte_ranges_keep_file_order(self, large_log_file):
+        analyzer = LogAnalyzer(max_workers=4)
+        result = analyzer.analyze(large_log_file, use_byte_ranges=True, byte_range_size=256, max_errors=5)
+        assert [e.message for e in result.errors] == sorted(
+            (e.message for e in result.errors), key=lambda m: int(m.rsplit(" ", 1)[-1])
+        )
+        assert len(result.errors) == 5
+
+    def test_samples_match_every_executor(self, large_log_file, tmp_path):
+        analyzer = LogAnalyzer(max_workers=3)
+        single = analyzer.analyze(large_log_file, use_threading=False, max_errors=4)
+        chunked = analyzer.analyze(large_log_file, chunk_size=7, max_errors=4)
+        ranged = analyzer.analyze(large_log_file, use_byte_ranges=True, byte_range_size=256, max_errors=4)
+
+        with open(large_log_file) as f:
+            lines = f.readlines()
+        resumed_path = tmp_path / "resumed.log"
+        resumed_path.write_text("".join(lines[:90]))
+        analyzer.analyze(str(resumed_path), incremental=True, use_threading=False, max_errors=4)
+        with open(resumed_path, "a") as f:
+            f.writelines(lines[90:])
+        resumed = analyzer.analyze(str(resumed_path), incremental=True, byte_range_size=256, max_errors=4)
+
+        for result in (chunked, ranged, resumed):
+            assert [e.message for e in result.errors] == [e.message for e in single.errors]
+            assert [e.message for e in result.warnings] == [e.message for e in single.warnings]
+        assert len(single.errors) == len(single.warnings) == 4
+
+    def test_byte_ranges_bound_in_flight(self, large_log_file, monkeypatch):
+        import log_analyzer.analyzer as analyzer_module
+
+        running, peak = 0, 0
+        original = analyzer_module._process_byte_range
+
+        def tracked(*args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                running -= 1
+
+        submitted = []
+        real_submit = analyzer_module.ThreadPoolExecutor.submit
+
+        def submit(self, fn, *args, **kwargs):
+            future = real_submit(self, fn, *args, **kwargs)
+            submitted.append(future)
+            assert sum(not f.done() for f in submitted) <= 2 * analyzer_module.PIPELINE_QUEUE_DEPTH_PER_WORKER
+            return future
+
+        monkeypatch.setattr(analyzer_module, "_process_byte_range", tracked)
+        monkeypatch.setattr(analyzer_module.ThreadPoolExecutor, "submit", submit)
+        result = LogAnalyzer(max_workers=2).analyze(large_log_file, use_byte_ranges=True, byte_range_size=64)
+        assert len(submitted) > 8
+        assert peak <= 2
+        assert result.total_lines == 200
+
+    def test_byte_ranges_count_blank_lines(self, syslog_file):
+        with open(syslog_file, "a") as f:
+            f.write("\n\n")
+        analyzer = LogAnalyzer()
+        parser = UniversalFallbackParser()
+        single = analyzer.analyze(syslog_file, parser=parser, use_threading=False)
+        ranged = analyzer.analyze(syslog_file, parser=parser, use_byte_ranges=True, byte_range_size=64)
+        assert ranged.total_lines == single.total_lines == 14
+        assert ranged.parsed_lines == single.parsed_lines
+
+    def test_compressed_file_falls_back_to_line_chunks(self, large_log_file, tmp_path):
+        import gzip
+
+        compressed = tmp_path / "large.log.gz"
+        with open(large_log_file, "rb") as f:
+            compressed.write_bytes(gzip.compress(f.read()))
+
+        analyzer = LogAnalyzer(max_workers=2)
+        plain = analyzer.analyze(large_log_file)
+        for kwargs in ({}, {"use_byte_ranges": True}, {"use_threading": False}):
+            result = analyzer.analyze(str(compressed), **kwargs)
+            assert result.total_lines == plain.total_lines == 200
+            assert result.parsed_lines == plain.parsed_lines
+            assert result.level_counts == plain.level_counts
+
+    def test_byte_ranges_progress(self, large_log_file):
+        from unittest.mock import MagicMock
+        callback = MagicMock()
+        analyzer = LogAnalyzer(max_workers=2)
+        analyzer.analyze(large_log_file, use_byte_ranges=True, byte_range_size=1024, progress_callback=callback)
+        advanced = sum(call.kwargs["advance"] for call in callback.update.call_args_list)
+        assert advanced == 200
+
+
+# ---------------------------------------------------------------------------
+# Process-pool backend
+# ---------------------------------------------------------------------------
+
+class CustomFallbackParser(UniversalFallbackParser):
+    """Unregistered parser subclass; must be pickled to reach process workers."""
+
+
+class TestAnalyzerProcessExecutor:
+    def test_invalid_executor(self):
+        with pytest.raises(ValueError, match="Unknown executor"):
+            LogAnalyzer(executor="fibers")
+
+    def test_process_matches_thread(self, large_log_file):
+        threaded = LogAnalyzer(max_workers=2).analyze(large_log_file)
+        processed = LogAnalyzer(max_workers=2, executor="process").analyze(large_log_file, byte_range_size=1024)
+
+        assert processed.detected_format == threaded.detected_format
+        assert processed.total_lines == threaded.total_lines == 200
+        assert processed.parsed_lines == threaded.parsed_lines
+        assert processed.level_counts == threaded.level_counts
+        assert len(processed.errors) == len(threaded.errors)
+
+    def test_process_with_unregistered_parser_instance(self, syslog_file):
+        analyzer = LogAnalyzer(max_workers=2, executor="process")
+        result = analyzer.analyze(syslog_file, parser=CustomFallbackParser(), byte_range_size=128)
+        assert result.total_lines == 12
+        assert result.parsed_lines > 0
+
 
 # ---------------------------------------------------------------------------
 # Format detection
 # ---------------------------------------------------------------------------
 
+class TestLearnedParserState:
+    @pytest.mark.parametrize(
+        "options",
+        [{"use_threading": False}, {"chunk_size": 7}, {"use_byte_ranges": True, "byte_range_size": 256}],
+    )
+    def test_json_schema_is_per_analysis(self, tmp_path, options):
+        import json
+
+        from log_analyzer.parsers import JSONLogParser
+
+        first = tmp_path / "first.log"
+        first.write_text(
+            "".join(json.dumps({"ts": 1577836800 + i, "lvl": "warn", "msg": f"a{i}"}) + "\n" for i in range(30))
+        )
+        second = tmp_path / "second.log"
+        second.write_text(
+            "".join(
+                json.dumps({"time": f"2020-01-01 00:00:{i:02d}", "lvl": "info", "level": "error", "message": f"b{i}"})
+                + "\n"
+                for i in range(30)
+            )
+        )
+
+        parser = JSONLogParser()
+        analyzer = LogAnalyzer(max_workers=2)
+        analyzer.analyze(str(first), parser=parser, **options)
+        result = analyzer.analyze(str(second), parser=parser, **options)
+        alone = LogAnalyzer(max_workers=2).analyze(str(second), parser=JSONLogParser(), **options)
+
+        # The shared instance never learns; each run worked on its own copy
+        assert parser._schema is None
+        assert result.level_counts == alone.level_counts == {"ERROR": 30}
+        assert result.earliest_timestamp == alone.earliest_timestamp == datetime(2020, 1, 1)
+        assert [e.message for e in result.errors] == [e.message for e in alone.errors]
+
+    @pytest.mark.parametrize("options", [{"use_threading": False}, {"chunk_size": 7}])
+    def test_fallback_layout_is_per_analysis(self, tmp_path, options):
+        first = tmp_path / "first.log"
+        first.write_text("".join(f"Jan  2 00:00:{i:02d} host app: request {i}\n" for i in range(30)))
+        second = tmp_path / "second.log"
+        second.write_text("".join(f"2020-01-01 00:00:{i:02d} ERROR job {i} failed\n" for i in range(30)))
+
+        parser = UniversalFallbackParser()
+        analyzer = LogAnalyzer(max_workers=2)
+        analyzer.analyze(str(first), parser=parser, **options)
+        result = analyzer.analyze(str(second), parser=parser, **options)
+        alone = LogAnalyzer(max_workers=2).analyze(str(second), parser=UniversalFallbackParser(), **options)
+
+        assert parser._learned is None
+        assert result.level_counts == alone.level_counts == {"ERROR": 30}
+        assert result.latest_timestamp == alone.latest_timestamp == datetime(2020, 1, 1, 0, 0, 29, tzinfo=timezone.utc)
+
+
+class TestYearLessTimestamps:
+    @pytest.mark.parametrize(
+        "executor, options",
+        [
+            ("thread", {"use_threading": False}),
+            ("thread", {"chunk_size": 50}),
+            ("process", {"byte_range_size": 2000}),
+            ("process", {"mixed_formats": True, "byte_range_size": 2000}),
+        ],
+    )
+    def test_syslog_year_from_file_mtime(self, tmp_path, executor, options):
+        path = tmp_path / "messages"
+        lines = [f"Dec 3{i % 2} 23:59:{i % 60:02d} host sshd[1]: failed password {i}\n" for i in range(300)]
+        path.write_text("".join(lines))
+        os.utime(path, (datetime(2006, 1, 2).timestamp(),) * 2)
+
+        result = LogAnalyzer(max_workers=2, executor=executor).analyze(str(path), **options)
+        assert result.parsed_lines == 300
+        assert result.earliest_timestamp.replace(tzinfo=None) == datetime(2005, 12, 30, 23, 59, 0)
+        assert result.latest_timestamp.replace(tzinfo=None) == datetime(2005, 12, 31, 23, 59, 59)
+
+
 class TestFormatDetection:
     def test_detect_json_format(self, json_log_file):
         analyzer = LogAnalyzer()
@@ -213,6 +479,47 @@ class TestFormatDetection:
         finally:
             os.remove(path)
 
+    def test_detection_stops_early_on_clear_winner(self, tmp_path):
+        from log_analyzer.constants import DETECTION_MIN_SAMPLES
+        from log_analyzer.parsers import HealthAppParser
+
+        path = tmp_path / "health.log"
+        path.write_text("20171223-22:15:29:606|Step_LSC|30002312|onStandStepChanged 3579\n" * 100)
+
+        seen = []
+        parser = HealthAppParser()
+        original = parser.try_parse
+        parser.try_parse = lambda line: seen.append(line) or original(line)
+
+        assert LogAnalyzer(parsers=[parser]).detect_format(str(path)) is parser
+        assert len(seen) == DETECTION_MIN_SAMPLES
+
+    def test_detection_keeps_sampling_without_clear_winner(self, tmp_path):
+        from log_analyzer.parsers import ApacheAccessParser, NginxAccessParser
+
+        line = '192.168.1.1 - - [10/Oct/2023:13:55:36 -0700] "GET / HTTP/1.1" 200 2326\n'
+        path = tmp_path / "access.log"
+        path.write_text(line * 60)
+
+        apache = ApacheAccessParser()
+        seen = []
+        original = apache.try_parse
+        apache.try_parse = lambda line: seen.append(line) or original(line)
+
+        # Both formats accept every line, so neither ever leads
+        assert LogAnalyzer(parsers=[apache, NginxAccessParser()]).detect_format(str(path)) is apache
+        assert len(seen) == 60
+
+    def test_prefilter_skips_try_parse(self, tmp_path):
+        from log_analyzer.parsers import GCPCloudLoggingParser
+
+        path = tmp_path / "plain.log"
+        path.write_text("plain text line\n" * 10)
+
+        gcp = GCPCloudLoggingParser()
+        gcp.try_parse = lambda line: pytest.fail("prefilter should have rejected the line")
+        assert LogAnalyzer(parsers=[gcp]).detect_format(str(path)) is None
+
 
 # ---------------------------------------------------------------------------
 # AnalysisResult properties
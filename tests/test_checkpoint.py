@@ -0,0 +1,199 @@
+"""
+Tests for checkpointed incremental analysis.
+"""
+
+import json
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from log_analyzer.analyzer import LogAnalyzer, get_parser
+from log_analyzer.checkpoint import AnalysisCheckpoint, checkpoint_path_for, committed_length
+from log_analyzer.parsers import UniversalFallbackParser
+
+
+def _lines(start, count):
+    levels = ["INFO", "WARNING", "ERROR", "DEBUG"]
+    return "".join(
+        json.dumps(
+            {
+                "timestamp": f"2020-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+                "level": levels[i % 4],
+                "message": f"event {i}",
+                "host": f"host{i % 3}",
+            }
+        )
+        + "\n"
+        for i in range(start, start + count)
+    )
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(_lines(0, 120))
+    return str(path)
+
+
+def _assert_same(result, expected):
+    assert result.detected_format == expected.detected_format
+    assert result.total_lines == expected.total_lines
+    assert result.parsed_lines == expected.parsed_lines
+    assert result.failed_lines == expected.failed_lines
+    assert result.level_counts == expected.level_counts
+    assert result.top_sources == expected.top_sources
+    assert result.top_errors == expected.top_errors
+    assert result.earliest_timestamp == expected.earliest_timestamp
+    assert result.latest_timestamp == expected.latest_timestamp
+    assert [e.message for e in result.errors] == [e.message for e in expected.errors]
+    assert [e.message for e in result.warnings] == [e.message for e in expected.warnings]
+
+
+class TestCommittedLength:
+    def test_stops_after_last_newline(self, tmp_path):
+        path = tmp_path / "partial.log"
+        path.write_bytes(b"one\ntwo\nthr")
+        assert committed_length(str(path)) == 8
+        assert committed_length(str(path), size=5) == 4
+
+    def test_no_newline(self, tmp_path):
+        path = tmp_path / "single.log"
+        path.write_bytes(b"no newline here")
+        assert committed_length(str(path)) == 0
+
+
+class TestAnalysisCheckpoint:
+    def test_round_trip(self, log_file):
+        analyzer = LogAnalyzer()
+        analyzer.analyze(log_file, incremental=True, use_threading=False)
+
+        checkpoint = AnalysisCheckpoint.load_for(log_file)
+        assert checkpoint is not None
+        assert checkpoint.offset == os.path.getsize(log_file)
+        assert checkpoint.state["total_lines"] == 120
+        assert checkpoint.state["level_counts"]["ERROR"] == 30
+        assert checkpoint.state["errors"][0].timestamp is not None
+        assert checkpoint.state["latest"] is not None
+
+    def test_invalid_after_rotation(self, log_file):
+        LogAnalyzer().analyze(log_file, incremental=True)
+        os.replace(log_file, log_file + ".1")
+        with open(log_file, "w") as f:
+            f.write(_lines(0, 200))
+        assert checkpoint_path_for(log_file).exists()
+        assert AnalysisCheckpoint.load_for(log_file) is None
+
+    def test_invalid_after_truncation(self, log_file):
+        LogAnalyzer().analyze(log_file, incremental=True)
+        with open(log_file, "w") as f:
+            f.write(_lines(500, 10))
+        assert AnalysisCheckpoint.load_for(log_file) is None
+
+    def test_unreadable_checkpoint_ignored(self, log_file):
+        checkpoint_path_for(log_file).write_text("{not json")
+        assert AnalysisCheckpoint.load_for(log_file) is None
+
+
+class TestIncrementalAnalysis:
+    @pytest.mark.parametrize("use_threading", [True, False])
+    def test_append_matches_full_scan(self, log_file, use_threading):
+        analyzer = LogAnalyzer(max_workers=2)
+        first = analyzer.analyze(log_file, incremental=True, use_threading=use_threading, byte_range_size=512)
+        assert first.total_lines == 120
+
+        with open(log_file, "a") as f:
+            f.write(_lines(120, 80))
+
+        resumed = analyzer.analyze(log_file, incremental=True, use_threading=use_threading, byte_range_size=512)
+        _assert_same(resumed, analyzer.analyze(log_file))
+        assert resumed.total_lines == 200
+
+    def test_resume_parses_only_new_lines(self, log_file, monkeypatch):
+        analyzer = LogAnalyzer()
+        parser = analyzer.analyze(log_file, incremental=True).detected_format
+        with open(log_file, "a") as f:
+            f.write(_lines(120, 5))
+
+        parsed = []
+        detected = get_parser(parser)
+        original = detected.parse
+        monkeypatch.setattr(detected, "parse", lambda line: parsed.append(line) or original(line))
+        result = analyzer.analyze(log_file, incremental=True)
+        assert len(parsed) == 5
+        assert result.total_lines == 125
+
+    def test_different_parser_rescans(self, log_file, monkeypatch):
+        analyzer = LogAnalyzer()
+        analyzer.analyze(log_file, incremental=True)
+
+        parsed = []
+        fallback = UniversalFallbackParser()
+        original = fallback.parse
+        monkeypatch.setattr(fallback, "parse", lambda line: parsed.append(line) or original(line))
+        result = analyzer.analyze(log_file, parser=fallback, incremental=True)
+        assert len(parsed) == 120
+        assert result.detected_format == fallback.name
+        assert AnalysisCheckpoint.load_for(log_file).parser_name == fallback.name
+
+    def test_partial_line_not_checkpointed(self, log_file):
+        analyzer = LogAnalyzer()
+        line = _lines(120, 1)
+        with open(log_file, "a") as f:
+            f.write(line[:20])
+        result = analyzer.analyze(log_file, incremental=True)
+        assert result.total_lines == 121
+        assert AnalysisCheckpoint.load_for(log_file).state["total_lines"] == 120
+
+        with open(log_file, "a") as f:
+            f.write(line[20:])
+        resumed = analyzer.analyze(log_file, incremental=True)
+        assert resumed.total_lines == 121
+        _assert_same(resumed, analyzer.analyze(log_file))
+
+    def test_rotation_falls_back_to_full_scan(self, log_file):
+        analyzer = LogAnalyzer()
+        analyzer.analyze(log_file, incremental=True)
+        checkpoint = checkpoint_path_for(log_file).read_bytes()
+
+        os.remove(log_file)
+        with open(log_file, "w") as f:
+            f.write(_lines(1000, 40))
+        checkpoint_path_for(log_file).write_bytes(checkpoint)
+
+        result = analyzer.analyze(log_file, incremental=True)
+        _assert_same(result, analyzer.analyze(log_file))
+        assert result.total_lines == 40
+
+    def test_truncation_falls_back_to_full_scan(self, log_file):
+        analyzer = LogAnalyzer()
+        analyzer.analyze(log_file, incremental=True)
+        with open(log_file, "r+") as f:
+            f.truncate(0)
+            f.write(_lines(7, 10))
+
+        result = analyzer.analyze(log_file, incremental=True)
+        assert result.total_lines == 10
+        _assert_same(result, analyzer.analyze(log_file))
+
+    def test_progress_counts_checkpointed_lines(self, log_file):
+        analyzer = LogAnalyzer()
+        analyzer.analyze(log_file, incremental=True)
+        with open(log_file, "a") as f:
+            f.write(_lines(120, 30))
+
+        callback = MagicMock()
+        analyzer.analyze(log_file, incremental=True, progress_callback=callback)
+        advanced = sum(call.kwargs["advance"] for call in callback.update.call_args_list)
+        assert advanced == 150
+
+    def test_compressed_file_ignores_incremental(self, log_file, tmp_path):
+        import gzip
+
+        compressed = tmp_path / "app.log.gz"
+        with open(log_file, "rb") as f:
+            compressed.write_bytes(gzip.compress(f.read()))
+
+        result = LogAnalyzer().analyze(str(compressed), incremental=True)
+        assert result.total_lines == 120
+        assert not checkpoint_path_for(str(compressed)).exists()
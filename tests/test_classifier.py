@@ -0,0 +1,92 @@
+"""
+Tests for the combined format classifier.
+"""
+
+import re
+
+import pytest
+
+from log_analyzer.analyzer import AVAILABLE_PARSERS, LogAnalyzer
+from log_analyzer.classifier import FormatClassifier, _without_groups, classifier_for
+from log_analyzer.parsers import BaseParser, LogEntry, NginxParser
+from tests.test_parsers_comprehensive import _try_parse_corpus
+
+CORPUS = _try_parse_corpus()
+
+
+class _PrefixParser(BaseParser):
+    """Accepts lines starting with its prefix; optionally without LINE_PATTERNS."""
+
+    def __init__(self, name, prefix, patterns=True):
+        self.name = name
+        self.prefix = prefix
+        if patterns:
+            self.LINE_PATTERNS = (re.compile(rf"(?P<tag>{re.escape(prefix)})(\d+)"),)
+
+    def can_parse(self, line):
+        return re.match(rf"{re.escape(self.prefix)}\d", line) is not None
+
+    def parse(self, line):
+        return LogEntry(timestamp=None, level="INFO", message=line) if self.can_parse(line) else None
+
+
+class TestWithoutGroups:
+    @pytest.mark.parametrize(
+        "pattern, expected",
+        [
+            (r"^(?P<a>\d+)\s(b|c)", r"^(?:\d+)\s(?:b|c)"),
+            (r"\((?P<x>[(\]])\)", r"\((?:[(\]])\)"),
+            (r"[^]()](?:x)(?=y)(?!z)", r"[^]()](?:x)(?=y)(?!z)"),
+        ],
+    )
+    def test_rewrites_capturing_groups_only(self, pattern, expected):
+        assert _without_groups(pattern) == expected
+        assert re.compile(expected).groups == 0
+
+
+class TestFormatClassifier:
+    @pytest.mark.parametrize("parsers", [AVAILABLE_PARSERS, [*AVAILABLE_PARSERS, NginxParser()]])
+    def test_candidates_keep_every_accepting_parser(self, parsers):
+        classifier = FormatClassifier(parsers)
+        for line in CORPUS:
+            expected = [parser for parser in parsers if parser.prefilter(line) and parser.try_parse(line)]
+            candidates = classifier.candidates(line)
+            assert [parser for parser in candidates if parser.prefilter(line) and parser.try_parse(line)] == expected
+
+    def test_one_group_per_format(self):
+        classifier = FormatClassifier(AVAILABLE_PARSERS)
+        assert classifier.pattern.groups == len(classifier.formats)
+        assert {"apache_access", "syslog", "java_log", "squid", "json"} <= set(classifier.formats)
+
+    def test_match_reports_overlapping_formats(self):
+        classifier = FormatClassifier(AVAILABLE_PARSERS)
+        line = '192.168.1.1 - - [10/Oct/2023:13:55:36 -0700] "GET / HTTP/1.1" 200 2326 "-" "curl/8.0"'
+        assert {"apache_access", "nginx_access", "nginx"} <= set(classifier.match(line))
+        assert classifier.match("plain text") == []
+
+    def test_uncombinable_parsers_are_always_candidates(self):
+        plain = _PrefixParser("plain", "p", patterns=False)
+        flagged = _PrefixParser("flagged", "f")
+        flagged.LINE_PATTERNS = (re.compile("f", re.IGNORECASE),)
+        classifier = FormatClassifier([_PrefixParser("tagged", "t"), plain, flagged])
+        assert classifier.formats == ["tagged"]
+        assert [parser.name for parser in classifier.candidates("t1")] == ["tagged", "plain", "flagged"]
+        assert [parser.name for parser in classifier.candidates("x1")] == ["plain", "flagged"]
+
+    def test_rebuilt_when_registry_grows(self):
+        registry = [_PrefixParser("alpha", "a")]
+        first = classifier_for(registry)
+        assert classifier_for(registry) is first
+        registry.append(_PrefixParser("beta", "b"))
+        rebuilt = classifier_for(registry)
+        assert rebuilt is not first
+        assert [parser.name for parser in rebuilt.candidates("b7")] == ["beta"]
+
+    def test_detection_uses_added_parser(self, tmp_path):
+        log = tmp_path / "custom.log"
+        log.write_text("".join(f"zz{i} custom record\n" for i in range(30)))
+        registry = list(AVAILABLE_PARSERS)
+        analyzer = LogAnalyzer(parsers=registry)
+        assert analyzer.detect_format(str(log)) is None
+        registry.append(_PrefixParser("custom", "zz"))
+        assert analyzer.detect_format(str(log)).name == "custom"
@@ -143,6 +143,72 @@ class TestAnalyzeCommand:
             ])
             assert result.exit_code == 0
 
+    @patch('log_analyzer.cli.LogAnalyzer')
+    @patch('log_analyzer.reader.LogReader')
+    def test_analyze_process_executor(self, mock_reader_cls, mock_analyzer_cls, runner):
+        """Analyze with --executor process and --max-workers."""
+        mock_reader = mock_reader_cls.return_value
+        mock_reader.count_lines.return_value = 5
+
+        mock_analyzer = mock_analyzer_cls.return_value
+        mock_analyzer.analyze.return_value = _make_result()
+
+        with runner.isolated_filesystem():
+            with open("test.log", "w") as f:
+                f.write("line\n" * 5)
+            result = runner.invoke(cli, [
+                "analyze", "test.log", "--executor", "process", "--max-workers", "3",
+            ])
+            assert result.exit_code == 0
+            mock_analyzer_cls.assert_called_once_with(max_workers=3, executor="process")
+
+    @patch('log_analyzer.cli.LogAnalyzer')
+    @patch('log_analyzer.reader.LogReader')
+    def test_analyze_quantile_fields(self, mock_reader_cls, mock_analyzer_cls, runner):
+        """Analyze with --quantile-field shows a percentile table."""
+        mock_reader_cls.return_value.count_lines.return_value = 5
+        summary = {"count": 5, "min": 1.0, "max": 90.0, "p50": 10.0, "p90": 80.0, "p99": 90.0, "p999": 90.0}
+        mock_analyzer_cls.return_value.analyze.return_value = _make_result(quantiles={"latency_ms": summary})
+
+        with runner.isolated_filesystem():
+            with open("test.log", "w") as f:
+                f.write("line\n" * 5)
+            result = runner.invoke(cli, [
+                "analyze", "test.log", "--quantile-field", "latency_ms", "--quantile-field", "db_ms",
+            ])
+            assert result.exit_code == 0
+            assert mock_analyzer_cls.call_args.kwargs["quantile_fields"] == ["latency_ms", "db_ms"]
+            assert "Percentiles" in result.output
+
+    @patch('log_analyzer.cli.LogAnalyzer')
+    @patch('log_analyzer.reader.LogReader')
+    def test_analyze_stratify_samples(self, mock_reader_cls, mock_analyzer_cls, runner):
+        """Analyze with --stratify-samples samples errors per template."""
+        mock_reader_cls.return_value.count_lines.return_value = 5
+        mock_analyzer_cls.return_value.analyze.return_value = _make_result()
+
+        with runner.isolated_filesystem():
+            with open("test.log", "w") as f:
+                f.write("line\n" * 5)
+            result = runner.invoke(cli, ["analyze", "test.log", "--stratify-samples"])
+            assert result.exit_code == 0
+            assert mock_analyzer_cls.call_args.kwargs["stratify_samples"] is True
+
+    @patch('log_analyzer.cli.LogAnalyzer')
+    @patch('log_analyzer.reader.LogReader')
+    def test_analyze_incremental(self, mock_reader_cls, mock_analyzer_cls, runner):
+        """Analyze with --incremental passes the flag through."""
+        mock_reader_cls.return_value.count_lines.return_value = 5
+        mock_analyzer = mock_analyzer_cls.return_value
+        mock_analyzer.analyze.return_value = _make_result()
+
+        with runner.isolated_filesystem():
+            with open("test.log", "w") as f:
+                f.write("line\n" * 5)
+            result = runner.invoke(cli, ["analyze", "test.log", "--incremental"])
+            assert result.exit_code == 0
+            assert mock_analyzer.analyze.call_args.kwargs["incremental"] is True
+
     @patch('log_analyzer.cli.LogAnalyzer')
     @patch('log_analyzer.reader.LogReader')
     def test_analyze_markdown_report(self, mock_reader_cls, mock_analyzer_cls, runner):
@@ -302,6 +368,52 @@ class TestErrorsCommand:
             assert "showing first 5" in result.output
 
 
+    @patch('log_analyzer.cli.LogAnalyzer')
+    def test_errors_time_window(self, mock_analyzer_cls, runner):
+        from log_analyzer.parsers import LogEntry
+        entries = [LogEntry(timestamp=datetime(2020, 1, 1, 14, 3), level="ERROR", message="In window")]
+        mock_analyzer_cls.return_value.parse_time_range.return_value = iter(entries)
+
+        with runner.isolated_filesystem():
+            with open("test.log", "w") as f:
+                f.write("dummy\n")
+            result = runner.invoke(cli, [
+                "errors", "test.log", "--since", "2020-01-01 14:02", "--until", "2020-01-01T14:07:00",
+            ])
+            assert result.exit_code == 0
+            assert "In window" in result.output
+            mock_analyzer_cls.return_value.parse_time_range.assert_called_once_with(
+                "test.log", since=datetime(2020, 1, 1, 14, 2), until=datetime(2020, 1, 1, 14, 7)
+            )
+            mock_analyzer_cls.return_value.parse_file.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# index command
+# ---------------------------------------------------------------------------
+
+class TestIndexCommand:
+    def test_index_builds_sidecar(self, runner):
+        import os
+
+        with runner.isolated_filesystem():
+            with open("access.log", "w") as f:
+                for i in range(50):
+                    f.write(f'10.0.0.1 - - [10/Oct/2023:14:{i:02d}:00 +0000] "GET /{i} HTTP/1.1" 500 1\n')
+            result = runner.invoke(cli, ["index", "access.log"])
+            assert result.exit_code == 0
+            assert "Indexed 50 lines" in result.output
+            assert os.path.exists("access.log.idx.json")
+
+            result = runner.invoke(cli, [
+                "errors", "access.log", "--since", "2023-10-10 14:02", "--until", "2023-10-10 14:04",
+            ])
+            assert result.exit_code == 0
+            assert "GET /2 " in result.output
+            assert "GET /4 " in result.output
+            assert "GET /5 " not in result.output
+
+
 # ---------------------------------------------------------------------------
 # formats command
 # ---------------------------------------------------------------------------
@@ -0,0 +1,198 @@
+"""
+Tests for columnar batch parsing and aggregation.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from log_analyzer import columnar
+from log_analyzer.analyzer import _aggregate_lines
+from log_analyzer.columnar import (
+    NO_ID,
+    TIMESTAMP_MISSING,
+    ParsedBatch,
+    count_ids,
+    count_statuses,
+    count_time_buckets,
+    entry_path,
+    entry_user,
+    epoch_micros,
+    request_path,
+    rows_with,
+    to_number,
+    values_by_status_class,
+)
+from log_analyzer.parsers import ApacheAccessParser, JSONLogParser, LogEntry, NginxAccessParser
+
+
+def _access_lines():
+    lines = []
+    for i in range(60):
+        status = (200, 301, 404, 500, 503)[i % 5]
+        lines.append(f'10.0.0.{i % 4} - - [10/Oct/2023:13:55:{i % 7:02d} -0700] "GET /p{i % 3} HTTP/1.1" {status} 12')
+    lines[10] = ""
+    lines[20] = "not an access log line"
+    return lines
+
+
+def _sequential(lines, parser, max_errors):
+    """Aggregate entry by entry, as the analyzer did before batches."""
+    return _aggregate_lines(lines, parser, max_errors, parse_line=parser.parse)
+
+
+def _comparable(state):
+    result = state.results()
+    for key in ("level_counts", "status_codes", "source_counts", "error_messages"):
+        result[key] = list(result[key].items())
+    return result
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "stdlib"])
+def numpy_mode(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(columnar, "NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+class TestParsedBatch:
+    def test_columns(self):
+        batch = ParsedBatch.from_lines(_access_lines(), ApacheAccessParser().parse)
+        assert batch.total_lines == 60
+        assert batch.failed_lines == 1
+        assert len(batch) == 58
+        assert batch.source_names == ["10.0.0.0", "10.0.0.1", "10.0.0.2", "10.0.0.3"]
+        assert batch.level_names[batch.levels[0]] == "INFO"
+        assert batch.statuses[0] == 200
+        assert batch.messages[1] == "GET /p1 HTTP/1.1"
+        assert batch.timestamps[0] == epoch_micros(datetime(2023, 10, 10, 20, 55, tzinfo=timezone.utc))
+
+    def test_missing_fields(self):
+        batch = ParsedBatch(lambda line: None)
+        batch.add("x", None, None, None, None, "message")
+        batch.add("y", datetime(2020, 1, 1), "INFO", "host", "200", "other")
+        assert list(batch.timestamps)[0] == TIMESTAMP_MISSING
+        assert list(batch.levels)[0] == NO_ID
+        assert list(batch.sources)[0] == NO_ID
+        assert list(batch.statuses) == [0, 0]
+        assert batch.other_statuses == {"200": 1}
+
+    def test_reductions(self, numpy_mode):
+        batch = ParsedBatch.from_lines(_access_lines(), ApacheAccessParser().parse)
+        assert count_ids(batch.sources, batch.source_names) == {
+            "10.0.0.0": 14,
+            "10.0.0.1": 15,
+            "10.0.0.2": 14,
+            "10.0.0.3": 15,
+        }
+        assert list(count_statuses(batch)) == [200, 301, 404, 500, 503]
+        assert rows_with(batch.levels, batch.level_names, ("ERROR",), limit=2) == [3, 4]
+        assert rows_with(batch.levels, batch.level_names, ("CRITICAL",)) == []
+
+    def test_time_buckets(self, numpy_mode):
+        lines = [
+            json.dumps({"timestamp": f"2020-01-01T00:{minute:02d}:00Z", "level": level})
+            for minute, level in [(1, "info"), (4, "error"), (5, "info"), (59, "info")]
+        ]
+        lines.append(json.dumps({"level": "info", "message": "no timestamp"}))
+        batch = ParsedBatch.from_lines(lines, JSONLogParser().parse)
+        start = int(datetime(2020, 1, 1, tzinfo=timezone.utc).timestamp())
+        assert count_time_buckets(batch, 300) == {
+            "INFO": {start: 1, start + 300: 1, start + 3300: 1},
+            "ERROR": {start: 1},
+        }
+        assert count_time_buckets(batch, 3600) == {"INFO": {start: 3}, "ERROR": {start: 1}}
+
+    def test_on_entry(self):
+        seen = []
+        batch = ParsedBatch.from_lines(_access_lines(), ApacheAccessParser().parse, seen.append)
+        assert len(seen) == len(batch)
+
+    def test_users_and_paths(self):
+        lines = _access_lines()
+        lines[0] = '10.0.0.9 - alice [10/Oct/2023:13:55:36 -0700] "POST /login?next=/ HTTP/1.1" 302 0'
+        batch = ApacheAccessParser().parse_batch(lines)
+        assert batch.users == {"alice"}
+        assert batch.paths == {"/login", "/p0", "/p1", "/p2"}
+        generic = ParsedBatch.from_lines(lines, ApacheAccessParser().parse)
+        assert (generic.users, generic.paths) == (batch.users, batch.paths)
+
+    def test_values(self, numpy_mode):
+        lines = _access_lines()
+        lines[1] = lines[1].rsplit(" ", 1)[0] + " -"
+        batch = ApacheAccessParser().parse_batch(lines)
+        generic = ParsedBatch.from_lines(lines, ApacheAccessParser().parse)
+        rows, sizes = batch.values["size"]
+        assert (list(rows), list(sizes)) == tuple(list(column) for column in generic.values["size"])
+        assert 1 not in rows and len(rows) == len(batch) - 1
+        groups = values_by_status_class(batch, "size")
+        assert list(groups) == ["2xx", "3xx", "4xx", "5xx"]
+        assert sum(len(values) for values in groups.values()) == len(rows)
+        assert values_by_status_class(batch, "duration_ms") == {}
+
+    def test_to_number(self):
+        assert to_number("12") == 12.0
+        assert to_number(3) == 3.0
+        assert to_number("-") is None
+        assert to_number(True) is None
+        assert to_number(float("nan")) is None
+        assert to_number({"a": 1}) is None
+
+    def test_request_path(self):
+        assert request_path("GET /a/b?x=1 HTTP/1.1") == "/a/b"
+        assert request_path("CONNECT example.com:443 HTTP/1.1") == "example.com:443"
+        assert request_path("Connection reset by peer") is None
+        assert request_path("GET") is None
+        assert entry_path(LogEntry(message="x", metadata={"path": "/api"})) == "/api"
+        assert entry_user(LogEntry(metadata={"user": "-"})) is None
+        assert entry_user(LogEntry(metadata={"user": 42})) == "42"
+
+    def test_epoch_micros(self):
+        assert epoch_micros(datetime(1970, 1, 1, 0, 0, 1, 5)) == 1_000_005
+        aware = datetime(1970, 1, 1, 1, tzinfo=timezone(timedelta(hours=1)))
+        assert epoch_micros(aware) == 0
+
+
+class TestAggregateBatch:
+    @pytest.mark.parametrize("parser_cls", [ApacheAccessParser, NginxAccessParser])
+    def test_access_override_matches_sequential(self, parser_cls, numpy_mode):
+        parser = parser_cls()
+        lines = _access_lines()
+        batched = _aggregate_lines(lines, parser, 5)
+        expected = _sequential(lines, parser, 5)
+        assert _comparable(batched) == _comparable(expected)
+        assert batched["status_codes"] == {200: 10, 301: 12, 404: 12, 500: 12, 503: 12}
+        assert list(batched["status_codes"]) == [200, 301, 404, 500, 503]
+
+    def test_json_batch(self, numpy_mode):
+        lines = [
+            json.dumps(
+                {"level": ("info", "error", "warning")[i % 3], "message": f"m{i % 2}", "host": "h", "status": 500}
+            )
+            for i in range(9)
+        ]
+        result = _aggregate_lines(lines, JSONLogParser(), 2)
+        assert result["level_counts"] == {"INFO": 3, "ERROR": 3, "WARNING": 3}
+        assert result["error_messages"] == {"m1": 2, "m0": 1}
+        assert result["status_codes"] == {500: 9}
+        assert [e.message for e in result["errors"]] == ["m1", "m0"]
+        assert len(result["warnings"]) == 2
+
+    def test_empty(self, numpy_mode):
+        result = _aggregate_lines([], ApacheAccessParser(), 5)
+        assert result["parsed_lines"] == 0
+        assert result["earliest"] is None
+        assert not result["level_counts"]
+
+    def test_override_builds_entries_only_for_samples(self):
+        parser = ApacheAccessParser()
+        built = []
+        original = parser.parse
+        parser.parse = lambda line: built.append(line) or original(line)
+
+        result = _aggregate_lines(_access_lines(), parser, 3)
+        assert len(built) == 6
+        assert all(isinstance(entry, LogEntry) for entry in result["errors"] + result["warnings"])
+        assert all(entry.get("status") in (500, 503) for entry in result["errors"])
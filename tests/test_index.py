@@ -0,0 +1,242 @@
+"""
+Unit tests for the sparse line-offset index.
+"""
+
+import gzip
+import os
+
+import pytest
+
+from log_analyzer.index import LineIndex, index_path_for
+from log_analyzer.reader import LogReader
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Create a log file with 2,345 numbered lines, a blank line and no trailing newline."""
+    lines = [f"line {i} café" for i in range(2345)]
+    lines[1500] = ""
+    path = tmp_path / "app.log"
+    path.write_bytes("\n".join(lines).encode("utf-8"))
+    return str(path), lines
+
+
+class TestLineIndex:
+    def test_build(self, log_file):
+        path, lines = log_file
+        index = LineIndex.build(path, interval=100)
+        assert index.total_lines == len(lines) == LogReader(path).count_lines()
+        assert len(index.offsets) == 24
+        assert index.offsets[0] == 0
+        with open(path, "rb") as f:
+            f.seek(index.offsets[7])
+            assert f.readline().decode("utf-8").rstrip("\n") == lines[700]
+
+    def test_locate(self, log_file):
+        path, _ = log_file
+        index = LineIndex.build(path, interval=100)
+        assert index.locate(0) == (0, 0)
+        assert index.locate(99) == (0, 0)
+        assert index.locate(250)[1] == 200
+        # Past the end maps to the last block
+        assert index.locate(10_000)[1] == 2300
+
+    def test_iter_lines_from_offset(self, log_file):
+        path, lines = log_file
+        index = LineIndex.build(path, interval=100)
+        for start in (0, 99, 100, 1499, 2344):
+            assert list(index.iter_lines(path, start)) == lines[start:]
+        assert list(index.iter_lines(path, 5000)) == []
+
+    def test_save_and_load_for(self, log_file):
+        path, _ = log_file
+        index = LineIndex.build(path, interval=100)
+        index.save(index_path_for(path))
+        assert index_path_for(path).name == "app.log.idx.json"
+        assert LineIndex.load_for(path) == index
+
+    def test_stale_index_is_ignored(self, log_file):
+        path, _ = log_file
+        LineIndex.build(path).save(index_path_for(path))
+        with open(path, "a") as f:
+            f.write("\nappended")
+        assert LineIndex.load_for(path) is None
+
+    def test_missing_or_corrupt_index(self, log_file):
+        path, _ = log_file
+        assert LineIndex.load_for(path) is None
+        index_path_for(path).write_text("{not json")
+        assert LineIndex.load_for(path) is None
+        index_path_for(path).write_text('{"version": 999}')
+        assert LineIndex.load_for(path) is None
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.log"
+        path.write_bytes(b"")
+        index = LineIndex.build(str(path))
+        assert index.total_lines == 0
+        assert index.offsets == []
+        assert list(index.iter_lines(str(path), 0)) == []
+
+    def test_compressed_file_rejected(self, tmp_path):
+        path = tmp_path / "app.log.gz"
+        path.write_bytes(gzip.compress(b"a\nb\n"))
+        with pytest.raises(ValueError, match="compressed"):
+            LineIndex.build(str(path))
+
+    def test_invalid_interval(self, log_file):
+        path, _ = log_file
+        with pytest.raises(ValueError):
+            LineIndex.build(path, interval=0)
+        assert os.path.exists(path)
+
+
+@pytest.fixture
+def timed_log(tmp_path):
+    """Create an Apache access log with one line per second for 50 minutes."""
+    from datetime import datetime, timedelta, timezone
+
+    start = datetime(2023, 10, 10, 14, 0, 0, tzinfo=timezone.utc)
+    lines = []
+    for i in range(3000):
+        ts = (start + timedelta(seconds=i)).strftime("%d/%b/%Y:%H:%M:%S +0000")
+        lines.append(f'10.0.0.{i % 255} - - [{ts}] "GET /item/{i} HTTP/1.1" 200 {i}')
+    path = tmp_path / "access.log"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path), start
+
+
+class TestTimeIndex:
+    def test_build_records_block_timestamps(self, timed_log):
+        from log_analyzer.parsers import ApacheAccessParser
+
+        path, start = timed_log
+        index = LineIndex.build(path, interval=100, parser=ApacheAccessParser())
+        assert index.has_timestamps
+        assert len(index.timestamps) == len(index.offsets) == 30
+        assert index.timestamps[0] == start.timestamp()
+        assert index.timestamps[5] == start.timestamp() + 500
+
+    def test_build_without_parser_has_no_timestamps(self, timed_log):
+        path, _ = timed_log
+        assert not LineIndex.build(path).has_timestamps
+
+    def test_time_window(self, timed_log):
+        from datetime import timedelta
+
+        from log_analyzer.parsers import ApacheAccessParser
+
+        path, start = timed_log
+        index = LineIndex.build(path, interval=100, parser=ApacheAccessParser())
+        offset, line_number, end_offset = index.time_window(
+            start + timedelta(seconds=1234), start + timedelta(seconds=1300)
+        )
+        assert line_number == 1200
+        assert offset == index.offsets[12]
+        assert end_offset == index.offsets[14]
+        assert index.time_window(None, None) == (0, 0, None)
+
+    @pytest.mark.parametrize("use_index", [True, False])
+    def test_iter_time_range(self, timed_log, use_index):
+        from datetime import timedelta
+
+        from log_analyzer.index import iter_time_range
+        from log_analyzer.parsers import ApacheAccessParser
+
+        path, start = timed_log
+        parser = ApacheAccessParser()
+        index = LineIndex.build(path, interval=100, parser=parser) if use_index else None
+        since = start + timedelta(seconds=1234)
+        until = start + timedelta(seconds=1300)
+        results = list(iter_time_range(path, parser, since, until, index=index))
+        assert [line_number for line_number, _, _ in results] == list(range(1234, 1301))
+        assert results[0][1].endswith('"GET /item/1234 HTTP/1.1" 200 1234')
+        assert results[0][2].timestamp == since
+
+    def test_iter_time_range_naive_bounds_are_utc(self, timed_log):
+        from datetime import timedelta
+
+        from log_analyzer.index import iter_time_range
+        from log_analyzer.parsers import ApacheAccessParser
+
+        path, start = timed_log
+        parser = ApacheAccessParser()
+        index = LineIndex.build(path, interval=100, parser=parser)
+        naive = start.replace(tzinfo=None) + timedelta(seconds=2999)
+        results = list(iter_time_range(path, parser, naive, None, index=index))
+        assert [line_number for line_number, _, _ in results] == [2999]
+
+
+class TestLineIndexBuilder:
+    @pytest.mark.parametrize("options", [{"use_threading": False, "chunk_size": 500}, {"chunk_size": 500}])
+    def test_analysis_collects_the_built_index(self, timed_log, options):
+        from dataclasses import replace
+        from functools import partial
+
+        from log_analyzer.analyzer import LogAnalyzer
+        from log_analyzer.index import LineIndexBuilder
+        from log_analyzer.parsers import ApacheAccessParser
+
+        path, _ = timed_log
+        analyzer = LogAnalyzer(max_workers=2, aggregators=[partial(LineIndexBuilder, 100)])
+        collected = analyzer.analyze(path, parser=ApacheAccessParser(), **options).aggregates["line_index"]
+        built = LineIndex.build(path, interval=100, parser=ApacheAccessParser())
+        assert collected == replace(built, file_size=0, file_mtime_ns=0)
+
+    def test_byte_ranges_start_blocks(self, timed_log):
+        from datetime import timedelta
+        from functools import partial
+
+        from log_analyzer.analyzer import LogAnalyzer
+        from log_analyzer.index import LineIndexBuilder, iter_time_range
+        from log_analyzer.parsers import ApacheAccessParser
+
+        path, start = timed_log
+        analyzer = LogAnalyzer(max_workers=2, aggregators=[partial(LineIndexBuilder, 100)])
+        result = analyzer.analyze(path, parser=ApacheAccessParser(), use_byte_ranges=True, byte_range_size=5000)
+        index = result.aggregates["line_index"]
+        assert index.total_lines == 3000
+        assert len(index.offsets) > 30
+        assert all(0 < b - a <= 100 for a, b in zip(index.lines, index.lines[1:] + [3000]))
+        with open(path, "rb") as f:
+            for offset, line_number, timestamp in zip(index.offsets, index.lines, index.timestamps):
+                f.seek(offset)
+                assert f"/item/{line_number} " in f.readline().decode()
+                assert timestamp == start.timestamp() + line_number
+        offset, line_number = index.locate(1234)
+        assert line_number <= 1234 < line_number + 100
+        assert offset == index.offsets[index.lines.index(line_number)]
+        assert list(index.iter_lines(path, 1234))[0].endswith('"GET /item/1234 HTTP/1.1" 200 1234')
+
+        since = start + timedelta(seconds=1234)
+        results = list(iter_time_range(path, ApacheAccessParser(), since, since + timedelta(seconds=66), index=index))
+        assert [line_number for line_number, _, _ in results] == list(range(1234, 1301))
+
+    def test_probe_lines_span_batches(self, tmp_path):
+        from dataclasses import replace
+
+        from log_analyzer.analyzer import _aggregate_lines
+        from log_analyzer.index import LineIndexBuilder
+        from log_analyzer.parsers import JSONLogParser
+
+        # Blank and unparsed lines at block starts push the timestamp into the next batch
+        lines = [f'{{"timestamp": {1_700_000_000 + i}, "level": "INFO"}}' for i in range(95)]
+        for i in range(0, 95, 20):
+            lines[i], lines[i + 1] = "", "not json"
+        path = tmp_path / "app.log"
+        path.write_text("\n".join(lines) + "\n")
+        blocks = list(LogReader(str(path)).read_blocks())
+        offsets = [offset for _, block_offsets in blocks for offset in block_offsets]
+        state = _aggregate_lines(
+            lines, JSONLogParser(), 5, aggregators=[lambda: LineIndexBuilder(10)], batch_size=7, offsets=offsets
+        )
+        built = LineIndex.build(str(path), interval=10, parser=JSONLogParser())
+        assert state.extra_results()["line_index"] == replace(built, file_size=0, file_mtime_ns=0)
+
+    def test_entries_without_offsets_give_no_index(self):
+        from log_analyzer.index import LineIndexBuilder
+        from log_analyzer.parsers import LogEntry
+
+        builder = LineIndexBuilder()
+        builder.update(LogEntry(message="no offset"))
+        assert builder.finalize() == {"line_index": None}
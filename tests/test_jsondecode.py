@@ -0,0 +1,115 @@
+"""
+Tests for the pluggable JSON decoding backends.
+"""
+
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from log_analyzer import jsondecode
+from log_analyzer.jsondecode import KeyDecoder, json_backend, loads
+from log_analyzer.parsers import (
+    AWSCloudWatchParser,
+    AzureMonitorParser,
+    DockerJSONParser,
+    GCPCloudLoggingParser,
+    JSONLogParser,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "real"
+
+DOCUMENTS = [
+    '{"a": 1, "b": [1.5, -0.0, 1e5, "x"], "c": {"d": null, "e": true}}',
+    '{"big": 123456789012345678901234567890, "neg": -9223372036854775809, "u64": 18446744073709551615}',
+    '{"nan": NaN, "inf": Infinity, "huge": 1e400}',
+    '{"surrogate": "\\ud800", "escaped": "\\u00e9\\n"}',
+    '{"a": 1, "a": 2}',
+    '[{"a": 1}]',
+    '"text"',
+    " {} \n",
+]
+
+INVALID = ["", "{", '{"a": 1,}', "{'a': 1}", '{"a": 1} x', "plain text"]
+
+
+@pytest.fixture(params=["msgspec", "orjson", "json"])
+def backend(request, monkeypatch):
+    """Run a test with each JSON backend that is installed."""
+    name = request.param
+    if name == "msgspec" and not jsondecode.MSGSPEC_AVAILABLE:
+        pytest.skip("msgspec not installed")
+    if name == "orjson" and not jsondecode.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(jsondecode, "MSGSPEC_AVAILABLE", name == "msgspec")
+    monkeypatch.setattr(jsondecode, "ORJSON_AVAILABLE", name == "orjson")
+    assert json_backend() == name
+    return name
+
+
+def _same(a, b):
+    # NaN compares unequal to itself; compare representations
+    return repr(a) == repr(b)
+
+
+class TestLoads:
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    def test_matches_stdlib(self, backend, document):
+        assert _same(loads(document), json.loads(document))
+
+    @pytest.mark.parametrize("document", INVALID)
+    def test_invalid_raises_stdlib_error(self, backend, document):
+        with pytest.raises(json.JSONDecodeError):
+            loads(document)
+
+
+class TestKeyDecoder:
+    def test_requested_keys(self, backend):
+        decoder = KeyDecoder(["a", "@timestamp", "missing"], min_length=0)
+        document = json.dumps({"a": {"n": [1, 2]}, "@timestamp": 5, "skipped": {"deep": "x" * 100}})
+        data = decoder.decode(document)
+        assert {key: data[key] for key in decoder.keys if key in data} == {"a": {"n": [1, 2]}, "@timestamp": 5}
+
+    @pytest.mark.parametrize("document", DOCUMENTS)
+    def test_matches_stdlib(self, backend, document):
+        decoder = KeyDecoder(["a", "big", "nan", "surrogate"], min_length=0)
+        data, expected = decoder.decode(document), json.loads(document)
+        if isinstance(expected, dict):
+            assert _same(
+                {k: data[k] for k in decoder.keys if k in data}, {k: expected[k] for k in decoder.keys if k in expected}
+            )
+        else:
+            assert _same(data, expected)
+
+    @pytest.mark.parametrize("document", INVALID)
+    def test_invalid_raises_stdlib_error(self, backend, document):
+        with pytest.raises(json.JSONDecodeError):
+            KeyDecoder(["a"], min_length=0).decode(document)
+
+    def test_pickle(self):
+        decoder = pickle.loads(pickle.dumps(KeyDecoder(["a", "b"], min_length=10)))
+        assert (decoder.keys, decoder.min_length) == (("a", "b"), 10)
+        assert decoder.decode('{"a": 1, "b": 2, "c": 3}')["b"] == 2
+
+
+class TestParsersIdentical:
+    @pytest.mark.parametrize(
+        "parser_class",
+        [JSONLogParser, DockerJSONParser, GCPCloudLoggingParser, AzureMonitorParser, AWSCloudWatchParser],
+    )
+    def test_real_fixtures(self, backend, monkeypatch, parser_class):
+        lines = []
+        for path in sorted(FIXTURES.glob("*.log")):
+            lines.extend(path.read_text().splitlines())
+        lines.append(json.dumps({"time": "2020-01-01T00:00:00Z", "level": "error", "msg": "x", "pad": "y" * 500}))
+        lines.append(
+            '{"timestamp": "2020-01-01T00:00:00Z", "severity": "ERROR", "labels": {"id": 123456789012345678901234},'
+            ' "status": 123456789012345678901234, "message": "big numbers"}'
+        )
+
+        parsed = [(parser_class().can_parse(line), parser_class().try_parse(line)) for line in lines]
+        monkeypatch.setattr(jsondecode, "MSGSPEC_AVAILABLE", False)
+        monkeypatch.setattr(jsondecode, "ORJSON_AVAILABLE", False)
+        assert parsed == [(parser_class().can_parse(line), parser_class().try_parse(line)) for line in lines]
+        assert any(entry is not None for _, entry in parsed)
@@ -3,7 +3,8 @@ Unit tests for log parsers.
 """
 
 import json
-from datetime import timezone
+import pickle
+from datetime import datetime, timezone
 
 import pytest
 
@@ -13,11 +14,102 @@ from log_analyzer.parsers import (
     ContainerdParser,
     DockerJSONParser,
     GCPCloudLoggingParser,
+    JSONLogParser,
     KubernetesParser,
+    LogEntry,
     extract_level_from_message,
     parse_cloud_timestamp,
 )
 
+# ============================================================================
+# LogEntry Tests
+# ============================================================================
+
+class TestLogEntry:
+    """Tests for the slotted LogEntry and its lazy metadata."""
+
+    def test_defaults(self):
+        entry = LogEntry(message="hello")
+        assert entry.metadata == {}
+        assert entry.get("status") is None
+        assert not hasattr(entry, "__dict__")
+
+    def test_metadata_factory_runs_on_first_access(self):
+        calls = []
+        entry = LogEntry(message="x", metadata_factory=lambda: calls.append(1) or {"a": 1})
+        assert calls == []
+        assert entry.metadata == {"a": 1}
+        assert entry.metadata is entry.metadata
+        assert calls == [1]
+
+    def test_projected_keys_do_not_build_metadata(self):
+        entry = LogEntry(metadata={"status": 500}, metadata_factory=lambda: pytest.fail("metadata built"))
+        assert entry.get("status") == 500
+
+    def test_metadata_assignment(self):
+        entry = LogEntry(metadata_factory=lambda: {"a": 1})
+        entry.metadata = {"b": 2}
+        assert entry.metadata == {"b": 2}
+        entry.metadata["c"] = 3
+        assert entry.get("c") == 3
+
+    def test_equality_and_pickle(self):
+        entry = LogEntry(timestamp=datetime(2020, 1, 1), level="ERROR", message="m", metadata_factory=lambda: {"k": "v"})
+        copy = pickle.loads(pickle.dumps(entry))
+        assert copy == entry
+        assert copy.metadata == {"k": "v"}
+        assert copy != LogEntry(level="ERROR", message="m")
+        assert "metadata={'k': 'v'}" in repr(entry)
+
+    def test_json_metadata_is_lazy(self):
+        line = json.dumps({"level": "error", "message": "boom", "status": 503, "user": {"id": 7}})
+        entry = JSONLogParser().parse(line)
+        assert entry.get("status") == 503
+        assert entry._metadata == {"status": 503, "user": {"id": 7}}
+        assert entry.metadata == json.loads(line)
+
+
+class TestJSONLogParser:
+    """Tests for the learned field schema of the JSON parser."""
+
+    RECORDS = [
+        *({"ts": 1577836800 + i, "lvl": "warn", "msg": f"m{i}", "host": "a"} for i in range(5)),
+        {"ts": 1577836800, "level": "error", "msg": "earlier level key appears"},
+        {"ts": "2020-01-01T00:00:00Z", "lvl": "info", "msg": "timestamp type changes", "host": "a"},
+        *({"time": "2020-01-01 00:00:0" + str(i), "severity": "err", "text": i} for i in range(5)),
+        {"time": "not a time", "ts": 1577836800, "severity": "debug", "text": "first timestamp field unparseable"},
+        {"time": "2020-01-01T00:00:00.5", "severity": "debug", "text": "other layout"},
+        {"severity": "info"},
+    ]
+
+    def test_learned_schema_matches_probing(self):
+        learning = JSONLogParser()
+        for record in self.RECORDS:
+            line = json.dumps(record)
+            assert learning.parse(line) == JSONLogParser().parse(line)
+
+    def test_relearns_on_miss(self):
+        parser = JSONLogParser()
+        parser.parse(json.dumps({"ts": 1577836800, "lvl": "warn", "msg": "a"}))
+        schema = parser._schema
+        assert schema.fields == ("ts", "lvl", "msg", None)
+        parser.parse(json.dumps({"ts": 1577836801, "lvl": "error", "msg": "b"}))
+        assert parser._schema is schema
+        entry = parser.parse(json.dumps({"time": "2020/01/01", "ts": 1577836802, "lvl": "error", "msg": "c"}))
+        assert entry.timestamp == datetime.fromtimestamp(1577836802)
+        assert parser._schema is schema
+        parser.parse(json.dumps({"time": "2020-01-01 00:00:00", "level": "error", "message": "d"}))
+        assert parser._schema.fields == ("time", "level", "message", None)
+
+    def test_fresh_copy_forgets_schema(self):
+        parser = JSONLogParser()
+        parser.parse(json.dumps({"ts": 1577836800, "lvl": "warn", "msg": "a"}))
+        copy = parser.fresh()
+        assert type(copy) is JSONLogParser and copy is not parser
+        assert copy._schema is None
+        assert parser._schema is not None
+
+
 # ============================================================================
 # Utilities Tests
 # ============================================================================
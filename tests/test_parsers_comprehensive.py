@@ -7,15 +7,18 @@ parsers to close the gap in parsers.py coverage.
 """
 
 import json
+from datetime import datetime, timezone
 
 import pytest
 
+from log_analyzer.analyzer import ALL_PARSERS_WITH_FALLBACK
 from log_analyzer.parsers import (
     AndroidParser,
     ApacheAccessParser,
     ApacheErrorParser,
     AWSCloudWatchParser,
     AzureMonitorParser,
+    BaseParser,
     ContainerdParser,
     DockerJSONParser,
     GCPCloudLoggingParser,
@@ -657,3 +660,152 @@ class TestUniversalFallbackParser:
     def test_parse_empty_line(self, parser):
         result = parser.parse("")
         assert result is not None or result is None  # Either behavior is OK
+
+    @pytest.mark.parametrize(
+        "line, fmt, expected",
+        [
+            ("2020-01-01T12:00:00.5Z ERROR x", "iso", datetime(2020, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc)),
+            ("[10/Oct/2023:13:55:36 +0000] GET /", "clf", datetime(2023, 10, 10, 13, 55, 36, tzinfo=timezone.utc)),
+            ("10/25/2023 13:55:36 WARN disk", "us_date", datetime(2023, 10, 25, 13, 55, 36, tzinfo=timezone.utc)),
+            ("25/10/2023 13:55:36 WARN disk", "us_date", datetime(2023, 10, 25, 13, 55, 36, tzinfo=timezone.utc)),
+            ("2020-01-01 12:00:00 ERROR x", "iso", datetime(2020, 1, 1, 12, 0, 0, tzinfo=timezone.utc)),
+            ("1700000000 INFO started", "epoch", datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)),
+        ],
+    )
+    def test_timestamps_converted(self, parser, line, fmt, expected):
+        result = parser.parse(line)
+        assert result.metadata["timestamp_format"] == fmt
+        assert result.timestamp == expected
+
+    def test_year_less_timestamps(self, parser):
+        assert parser.parse("host app: Oct 11 22:14:15 something failed").timestamp is None
+        parser = parser.with_reference_time(datetime(2024, 3, 5))
+        syslog = parser.parse("host app: Oct 11 22:14:15 something failed")
+        short = parser.parse("10-11 22:14:15.123 D/foo: debug")
+        assert (syslog.metadata["timestamp_format"], syslog.level) == ("syslog", "ERROR")
+        assert (short.metadata["timestamp_format"], short.level) == ("short", "DEBUG")
+        assert syslog.timestamp == short.timestamp == datetime(2023, 10, 11, 22, 14, 15, tzinfo=timezone.utc)
+
+    def test_leftmost_timestamp_and_level(self, parser):
+        result = parser.parse("WARN 1700000000 at 2020-01-01 00:00:00 retry ERROR")
+        assert result.metadata["timestamp_format"] == "epoch"
+        assert result.level == "WARNING"
+        assert result.message == "at 2020-01-01 00:00:00 retry ERROR"
+
+    def test_learned_layout_matches_scan(self):
+        lines = [f"[2020-01-01 00:00:{i:02d}] INFO request {i}" for i in range(20)]
+        lines += ["[2020-01-01 00:01:00 worker ERROR", "1700000000 [2020-01-01 00:01:01] WARN", "no timestamp DEBUG"]
+        lines += [f"Jan  2 00:00:{i:02d} host[1]: warning {i}" for i in range(20)]
+        learning = UniversalFallbackParser()
+        parsed = [learning.parse(line) for line in lines]
+        assert learning._learned[1:] == ("syslog", "")
+        for line, entry in zip(lines, parsed):
+            fresh = UniversalFallbackParser().parse(line)
+            assert (entry.timestamp, entry.level, entry.message) == (fresh.timestamp, fresh.level, fresh.message)
+            assert entry.metadata == fresh.metadata
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"use_threading": False}, {"chunk_size": 7}, {"use_byte_ranges": True, "byte_range_size": 200}],
+    )
+    def test_mixed_aware_and_naive_timestamps(self, tmp_path, options):
+        from log_analyzer.analyzer import LogAnalyzer
+
+        lines = [
+            "2024-01-01T10:00:00Z INFO a",
+            "2024-01-01 10:00:01 ERROR b",
+            "1704103202 WARN c",
+            "[01/Jan/2024:11:00:03 +0100] INFO d",
+            "2024-01-01T10:00:04+00:00 INFO e",
+        ]
+        path = tmp_path / "mixed.log"
+        path.write_text("".join(f"{line}\n" for line in lines * 8))
+
+        result = LogAnalyzer(max_workers=2).analyze(str(path), parser=UniversalFallbackParser(), **options)
+        assert result.parsed_lines == 40
+        assert result.earliest_timestamp == datetime(2024, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+        assert result.latest_timestamp == datetime(2024, 1, 1, 10, 0, 4, tzinfo=timezone.utc)
+
+    def test_fresh_copy_forgets_layout(self):
+        learning = UniversalFallbackParser()
+        for i in range(20):
+            learning.parse(f"Jan  2 00:00:{i:02d} host[1]: warning {i}")
+        copy = learning.fresh()
+        assert copy is not learning
+        assert (copy._learned, copy._candidate, copy._streak) == (None, None, 0)
+        assert learning._learned[1:] == ("syslog", "")
+
+
+# ---------------------------------------------------------------------------
+# Single-pass try_parse
+# ---------------------------------------------------------------------------
+
+def _try_parse_corpus():
+    from pathlib import Path
+
+    root = Path(__file__).parent.parent
+    lines = []
+    for path in sorted(
+        [*(root / "datasets" / "real_logs").glob("*.log"), *(root / "tests" / "fixtures" / "real").glob("*.log")]
+    ):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines.extend(line.rstrip("\n") for _, line in zip(range(40), f))
+    # Lines that one of the patterns accepts but can_parse() rejects
+    lines += [
+        "081109 203615 148 TRACE dfs.DataNode: trace level",
+        "134681 switch-9 unix.hw state_change.unavailable 1077804742 1 msg",
+        "134681 node-246 -cat state_change.unavailable 1077804742 1 msg",
+        "1157689312.049 5006 10.105.21.199 TCP_MISS/200 19763 CONNECT host:443 - DIRECT/1.2.3.4 -",
+        "11576893120.049 5006 10.105.21.199 TCP_MISS/200 19763 CONNECT host:443 - DIRECT/1.2.3.4 -",
+        "1157689312.049 5006 10.105.21.199 200 19763 CONNECT host:443 - DIRECT/1.2.3.4 -",
+        "nova-api.log 2017-05-16 00:00:00.008 25746 INFO nova.api [abc-123] no request id",
+        '{"message": "single CloudWatch event"}',
+        '{"log": "missing stream and time"}',
+        '{"time": "2020-01-01T00:00:00Z", "message": "no level"}',
+        '[{"time": "2020-01-01T00:00:00Z", "level": "Error", "message": "array"}]',
+        "2020-01-01T00:00:00.000000000Z stdout F plain pod output",
+        '2020-01-01T00:00:00.000000000Z stdout F {"msg": "containerd json"}',
+        "<1234>Oct 11 22:14:15 host su: five digit priority",
+        "-\t1117838570 2005.06.03 R02 tab-separated dash",
+        "",
+        "   ",
+    ]
+    return lines
+
+
+class TestTryParse:
+    CORPUS = _try_parse_corpus()
+
+    @pytest.mark.parametrize("parser", [*ALL_PARSERS_WITH_FALLBACK, NginxParser()], ids=lambda p: p.name)
+    def test_matches_can_parse_then_parse(self, parser):
+        for line in self.CORPUS:
+            expected = parser.parse(line) if parser.can_parse(line) else None
+            assert parser.try_parse(line) == expected, line
+
+    @pytest.mark.parametrize("parser", [*ALL_PARSERS_WITH_FALLBACK, NginxParser()], ids=lambda p: p.name)
+    def test_prefilter_never_rejects_parseable_lines(self, parser):
+        for line in [*self.CORPUS, "\u0661\u0662 Arabic-Indic digits", "  " + self.CORPUS[0]]:
+            if not parser.prefilter(line):
+                assert parser.try_parse(line) is None, line
+
+    def test_prefilter_rejects_by_first_char_and_literal(self):
+        assert not GCPCloudLoggingParser().prefilter("2020-01-01 plain text")
+        assert GCPCloudLoggingParser().prefilter('  {"severity": "INFO"}')
+        assert not HealthAppParser().prefilter("20171223-22:15:29:606 no pipes")
+        assert not OpenStackParser().prefilter("nova-api.log 2017-05-16 00:00:00.008 no marker")
+        assert not ApacheAccessParser().prefilter("")
+        assert UniversalFallbackParser().prefilter("anything")
+
+    def test_default_uses_can_parse(self):
+        class OnlyDigits(BaseParser):
+            name = "digits"
+
+            def can_parse(self, line):
+                return line.isdigit()
+
+            def parse(self, line):
+                return LogEntry(message=line)
+
+        parser = OnlyDigits()
+        assert parser.try_parse("123").message == "123"
+        assert parser.try_parse("abc") is None
@@ -2,13 +2,17 @@
 Unit tests for LogReader.
 """
 
+import bz2
+import gzip
+import lzma
 import os
 import tempfile
 from pathlib import Path
 
 import pytest
 
-from log_analyzer.reader import LogReader
+from log_analyzer import reader as reader_module
+from log_analyzer.reader import LogReader, detect_compression
 
 
 class TestLogReader:
@@ -85,3 +89,145 @@ class TestLogReader:
         finally:
             if os.path.exists(tf_path):
                 os.remove(tf_path)
+
+    def test_split_byte_ranges_newline_aligned(self):
+        """Test byte ranges start at line boundaries and cover the file."""
+        content = "".join(f"line {i}\n" for i in range(50))
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as tf:
+            tf.write(content.encode("utf-8"))
+            tf_path = tf.name
+
+        try:
+            reader = LogReader(tf_path)
+            ranges = reader.split_byte_ranges(37)
+            assert ranges[0][0] == 0
+            assert ranges[-1][1] == len(content)
+            for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+                assert end == next_start
+                assert content[end - 1] == "\n"
+
+            lines = [line for start, end in ranges for line in reader.read_range(start, end)]
+            assert lines == list(reader.read_lines())
+
+            with pytest.raises(ValueError):
+                reader.split_byte_ranges(0)
+        finally:
+            if os.path.exists(tf_path):
+                os.remove(tf_path)
+
+    def test_read_range_without_trailing_newline(self):
+        """Test the final range includes a last line with no newline."""
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as tf:
+            tf.write(b"alpha\r\nbeta\ngamma")
+            tf_path = tf.name
+
+        try:
+            reader = LogReader(tf_path)
+            ranges = reader.split_byte_ranges(4)
+            lines = [line for start, end in ranges for line in reader.read_range(start, end)]
+            assert lines == ["alpha", "beta", "gamma"]
+        finally:
+            if os.path.exists(tf_path):
+                os.remove(tf_path)
+
+    def test_read_range_decodes_in_blocks(self, tmp_path, monkeypatch):
+        """Test lines spanning read blocks, multi-byte characters and a range ending mid-line."""
+        monkeypatch.setattr(reader_module, "RANGE_READ_SIZE", 5)
+        path = tmp_path / "blocks.log"
+        path.write_bytes("héllo wörld\r\n\nshort\nlast line".encode("utf-8"))
+        reader = LogReader(str(path))
+        assert list(reader.read_range(0, path.stat().st_size)) == ["héllo wörld", "", "short", "last line"]
+        # A line that starts inside the range is read to its end
+        assert list(reader.read_range(16, 18)) == ["short"]
+
+    @pytest.mark.parametrize("block_size", [5, 1 << 20])
+    def test_read_blocks_offsets(self, tmp_path, monkeypatch, block_size):
+        """Test that every line comes with the byte offset where it starts."""
+        monkeypatch.setattr(reader_module, "RANGE_READ_SIZE", block_size)
+        path = tmp_path / "blocks.log"
+        path.write_bytes("héllo wörld\r\n\nshort\nlast line".encode("utf-8"))
+        reader = LogReader(str(path))
+        pairs = [pair for lines, offsets in reader.read_blocks() for pair in zip(lines, offsets)]
+        assert pairs == [("héllo wörld", 0), ("", 15), ("short", 16), ("last line", 22)]
+        assert [pair for lines, offsets in reader.read_blocks(15, 20) for pair in zip(lines, offsets)] == pairs[1:3]
+
+
+class TestCompressedLogReader:
+    """Tests for transparent decompression in LogReader."""
+
+    LINES = [f"2020-01-01T00:00:{i % 60:02d}Z [INFO] event {i} caf\u00e9" for i in range(500)]
+
+    @pytest.fixture
+    def content(self):
+        return ("\n".join(self.LINES) + "\n").encode("utf-8")
+
+    def _write(self, tmp_path, name, data):
+        path = tmp_path / name
+        path.write_bytes(data)
+        return str(path)
+
+    @pytest.mark.parametrize(
+        "name,compress,expected",
+        [
+            ("app.log.gz", gzip.compress, "gzip"),
+            ("app.log.bz2", bz2.compress, "bzip2"),
+            ("app.log.xz", lzma.compress, "xz"),
+        ],
+    )
+    def test_read_and_count_compressed(self, tmp_path, content, name, compress, expected):
+        path = self._write(tmp_path, name, compress(content))
+        reader = LogReader(path)
+        assert detect_compression(path) == expected
+        assert reader.is_compressed
+        assert list(reader.read_lines()) == self.LINES
+        assert reader.count_lines() == len(self.LINES)
+
+    def test_compression_detected_by_magic_not_extension(self, tmp_path, content):
+        path = self._write(tmp_path, "rotated.1", gzip.compress(content))
+        assert LogReader(path).compression == "gzip"
+        plain = self._write(tmp_path, "plain.gz", content)
+        assert LogReader(plain).compression is None
+
+    def test_count_lines_without_trailing_newline(self, tmp_path):
+        path = self._write(tmp_path, "app.gz", gzip.compress(b"a\nb\nc"))
+        assert LogReader(path).count_lines() == 3
+
+    def test_parallel_multi_member_gzip(self, tmp_path, content, monkeypatch):
+        monkeypatch.setattr(reader_module, "GZIP_PARALLEL_SEGMENT_SIZE", 64)
+        # Members split mid-line and mid-character, as concatenated rotations can be
+        members = [content[i : i + 997] for i in range(0, len(content), 997)]
+        path = self._write(tmp_path, "multi.gz", b"".join(gzip.compress(m) for m in members))
+
+        reader = LogReader(path, decompress_workers=4)
+        assert list(reader.read_lines()) == self.LINES
+        assert reader.count_lines() == len(self.LINES)
+
+    def test_parallel_gzip_falls_back_on_false_boundaries(self, tmp_path, content, monkeypatch):
+        monkeypatch.setattr(reader_module, "GZIP_PARALLEL_SEGMENT_SIZE", 16)
+        # Single member with header-like bytes embedded in the (stored) payload
+        noisy = content + b"\x1f\x8b\x08\x00 not a header\n"
+        path = self._write(tmp_path, "single.gz", gzip.compress(noisy, compresslevel=0))
+
+        reader = LogReader(path, decompress_workers=3)
+        assert list(reader.read_lines()) == self.LINES + ["\x1f\ufffd\x08\x00 not a header"]
+
+    def test_parallel_gzip_with_trailing_padding(self, tmp_path, content, monkeypatch):
+        monkeypatch.setattr(reader_module, "GZIP_PARALLEL_SEGMENT_SIZE", 64)
+        data = gzip.compress(content[:3000]) + gzip.compress(content[3000:]) + b"\x00" * 16
+        path = self._write(tmp_path, "padded.gz", data)
+        assert list(LogReader(path, decompress_workers=2).read_lines()) == self.LINES
+
+    def test_byte_ranges_rejected_for_compressed(self, tmp_path, content):
+        reader = LogReader(self._write(tmp_path, "app.gz", gzip.compress(content)))
+        with pytest.raises(ValueError, match="compressed"):
+            reader.split_byte_ranges(1024)
+        with pytest.raises(ValueError, match="compressed"):
+            list(reader.read_range(0, 10))
+
+    def test_zstd_requires_optional_dependency(self, tmp_path, monkeypatch):
+        path = self._write(tmp_path, "app.zst", b"\x28\xb5\x2f\xfd" + b"\x00" * 8)
+        monkeypatch.setattr(reader_module, "ZSTD_AVAILABLE", False)
+        reader = LogReader(path)
+        assert reader.compression == "zstd"
+        with pytest.raises(ImportError, match="zstandard"):
+            list(reader.read_lines())
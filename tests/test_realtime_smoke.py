@@ -9,3 +9,39 @@ def test_realtime_import_and_init():
     tailer = LogTailer(mock_ws, "test.log")
     assert tailer.file_path.name == "test.log"
     assert tailer.filter_pattern is None
+
+
+def test_replayer_jump_uses_line_index(tmp_path):
+    """Replay jumps seek through the sparse line index instead of rescanning."""
+    import asyncio
+
+    from backend.api.realtime import LogReplayer
+    from log_analyzer.index import LineIndex, index_path_for
+    from log_analyzer.parsers import UniversalFallbackParser
+
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"2020-01-01 00:00:00 INFO line {i}\n" for i in range(2500)))
+    LineIndex.build(str(path), interval=1000).save(index_path_for(str(path)))
+
+    class FakeWebSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, data):
+            self.sent.append(data)
+
+        async def receive_text(self):
+            await asyncio.Event().wait()
+
+    ws = FakeWebSocket()
+    replayer = LogReplayer(ws, str(path), UniversalFallbackParser())
+    replayer._speed = 0
+    replayer._jump_target = 2100
+    asyncio.run(replayer.start())
+
+    assert ws.sent[0] == {"type": "meta", "total_lines": 2500, "file": "app.log"}
+    logs = [m for m in ws.sent if m["type"] == "log"]
+    assert logs[0]["line_num"] == 2100
+    assert logs[0]["line"].endswith("line 2100")
+    assert len(logs) == 400
+    assert ws.sent[-1]["type"] == "complete"
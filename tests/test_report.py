@@ -176,6 +176,22 @@ class TestJSONReport:
         assert data["metadata"]["total_lines"] == 1000
         assert "severity" in data
 
+    def test_json_distinct_counts(self, basic_result):
+        assert "distinct_counts" not in json.loads(ReportGenerator(basic_result).to_json())
+        basic_result.distinct_counts = {"sources": 3, "users": 0, "paths": 2, "error_messages": 1}
+        data = json.loads(ReportGenerator(basic_result).to_json())
+        assert data["distinct_counts"]["sources"] == 3
+
+    def test_json_error_templates(self, basic_result):
+        basic_result.top_error_templates = [("job <NUM> failed", 3, "job 7 failed")]
+        data = json.loads(ReportGenerator(basic_result).to_json())
+        assert data["top_error_templates"] == [{"template": "job <NUM> failed", "count": 3, "example": "job 7 failed"}]
+
+    def test_json_quantiles(self, basic_result):
+        basic_result.quantiles = {"size": {"count": 2, "p50": 10.0, "by_status_class": {}}}
+        data = json.loads(ReportGenerator(basic_result).to_json())
+        assert data["quantiles"]["size"]["p50"] == 10.0
+
     def test_json_is_valid(self, full_result):
         report = ReportGenerator(full_result).to_json()
         # Should not raise
@@ -0,0 +1,107 @@
+"""
+Tests for per-line mixed-format routing.
+"""
+
+import json
+import pickle
+from collections import Counter
+
+import pytest
+
+from log_analyzer.analyzer import AVAILABLE_PARSERS, LogAnalyzer
+from log_analyzer.parsers import DockerJSONParser, JavaLogParser, SyslogParser, UniversalFallbackParser
+from log_analyzer.router import MixedFormatParser
+
+DOCKER = json.dumps({"log": "request served\n", "stream": "stdout", "time": "2024-01-15T10:30:00.000000000Z"})
+JAVA = "2024-01-15 10:30:01,123 ERROR [main] com.example.App: Connection refused"
+SYSLOG = "Jan 15 10:30:02 web01 sshd[4242]: Accepted publickey for deploy"
+TRACE = "\tat com.example.App.main(App.java:42)"
+
+
+def _mixed_lines(repeat):
+    return [DOCKER, DOCKER, JAVA, TRACE, SYSLOG, "", DOCKER] * repeat
+
+
+@pytest.fixture
+def mixed_file(tmp_path):
+    path = tmp_path / "host.log"
+    path.write_text("\n".join(_mixed_lines(20)) + "\n")
+    return str(path)
+
+
+class TestMixedFormatParser:
+    def test_routes_each_line_to_its_format(self):
+        router = MixedFormatParser(AVAILABLE_PARSERS)
+        batch = router.parse_batch(_mixed_lines(3))
+        assert batch.total_lines == 21
+        assert len(batch) == 15
+        assert batch.failed_lines == 3
+        assert batch.format_counts == Counter(docker_json=9, java_log=3, syslog=3)
+
+    def test_fallback_takes_unknown_lines(self):
+        router = MixedFormatParser(AVAILABLE_PARSERS, UniversalFallbackParser())
+        batch = router.parse_batch(_mixed_lines(2))
+        assert batch.failed_lines == 0
+        assert batch.format_counts["universal"] == 2
+
+    def test_sticky_parser_tried_first(self, monkeypatch):
+        java, syslog = JavaLogParser(), SyslogParser()
+        router = MixedFormatParser([syslog, java])
+        calls = []
+        monkeypatch.setattr(syslog, "try_parse", lambda line: calls.append(line) or SyslogParser.try_parse(syslog, line))
+        router.parse_batch([JAVA, JAVA, JAVA])
+        # The classifier rules syslog out for Java lines, so it is never tried
+        assert calls == []
+        parser, entry = router.route(SYSLOG, last=java)
+        assert parser is syslog and entry is not None
+
+    def test_ranked_by_detection_counts(self):
+        router = MixedFormatParser.from_counts(AVAILABLE_PARSERS, Counter(syslog=5, java_log=9))
+        assert [parser.name for parser in router.parsers[:2]] == ["java_log", "syslog"]
+        assert len(router.parsers) == len(AVAILABLE_PARSERS)
+
+    def test_pickles_without_classifier(self):
+        router = MixedFormatParser([DockerJSONParser(), JavaLogParser()], UniversalFallbackParser())
+        router.parse(JAVA)
+        restored = pickle.loads(pickle.dumps(router))
+        assert [parser.name for parser in restored.parsers] == ["docker_json", "java_log"]
+        assert restored.parse(DOCKER).message == "request served"
+
+
+class TestMixedFormatAnalysis:
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"use_threading": False},
+            {"use_threading": True, "chunk_size": 10},
+            {"use_threading": True, "use_byte_ranges": True, "byte_range_size": 256},
+        ],
+    )
+    def test_reports_per_format_counts(self, mixed_file, options):
+        result = LogAnalyzer(max_workers=2).analyze(mixed_file, mixed_formats=True, use_fallback=False, **options)
+        assert result.detected_format == "mixed"
+        assert result.format_counts == {"docker_json": 60, "java_log": 20, "syslog": 20}
+        assert result.parsed_lines == 100
+        assert result.failed_lines == 20
+        assert result.level_counts["ERROR"] == 20
+
+    def test_process_executor(self, mixed_file):
+        result = LogAnalyzer(max_workers=2, executor="process").analyze(
+            mixed_file, mixed_formats=True, byte_range_size=512
+        )
+        assert result.format_counts == {"docker_json": 60, "java_log": 20, "syslog": 20, "universal": 20}
+        assert result.failed_lines == 0
+
+    def test_single_parser_has_no_format_counts(self, mixed_file):
+        result = LogAnalyzer().analyze(mixed_file, use_threading=False)
+        assert result.detected_format == "docker_json"
+        assert result.format_counts == {}
+
+    def test_incremental_keeps_format_counts(self, mixed_file):
+        analyzer = LogAnalyzer()
+        analyzer.analyze(mixed_file, mixed_formats=True, incremental=True)
+        with open(mixed_file, "a") as f:
+            f.write(f"{SYSLOG}\n")
+        result = analyzer.analyze(mixed_file, mixed_formats=True, incremental=True)
+        assert result.format_counts["syslog"] == 21
+        assert result.format_counts["docker_json"] == 60
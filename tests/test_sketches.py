@@ -0,0 +1,335 @@
+"""
+Tests for the bounded-memory summaries.
+"""
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from log_analyzer import sketches
+from log_analyzer.aggregators import DistinctCounts, FieldQuantiles, SourceCounts
+from log_analyzer.analyzer import LogAnalyzer, _aggregate_lines
+from log_analyzer.parsers import ApacheAccessParser, JSONLogParser, LogEntry
+from log_analyzer.sketches import DDSketch, HyperLogLog, SpaceSaving, WeightedReservoir
+
+
+def _skewed_stream(n, seed=7):
+    rng = random.Random(seed)
+    # A few heavy keys over a long tail of rare ones
+    return [f"heavy{rng.randrange(5)}" if rng.random() < 0.4 else f"tail{rng.randrange(5000)}" for _ in range(n)]
+
+
+def _assert_bounds(summary, stream):
+    truth = Counter(stream)
+    for key, count in summary.items():
+        assert count - summary.error(key) <= truth[key] <= count
+        assert summary.error(key) <= len(stream) / summary.capacity
+    for key, count in truth.items():
+        if count > len(stream) / summary.capacity:
+            assert key in summary
+
+
+class TestSpaceSaving:
+    def test_exact_below_capacity(self):
+        summary = SpaceSaving(10)
+        summary.update(["a", "b", "a", "c", "a", "b"])
+        assert summary == {"a": 3, "b": 2, "c": 1}
+        assert summary.most_common(2) == [("a", 3), ("b", 2)]
+        assert summary.error("a") == 0
+
+    def test_most_common_ties_keep_first_seen_order(self):
+        summary = SpaceSaving(10)
+        summary.update(["x", "y", "z", "y"])
+        assert summary.most_common() == Counter(["x", "y", "z", "y"]).most_common()
+
+    def test_error_bounds(self):
+        stream = _skewed_stream(20000)
+        summary = SpaceSaving(100)
+        for key in stream:
+            summary.add(key)
+        assert len(summary) == 100
+        _assert_bounds(summary, stream)
+        assert [key for key, _ in summary.most_common(5)] == [key for key, _ in Counter(stream).most_common(5)]
+
+    def test_weighted_update(self):
+        summary = SpaceSaving(3)
+        summary.update({"a": 5, "b": 1, "c": 1})
+        summary.update({"d": 2})
+        assert "d" in summary and summary["d"] == 3 and summary.error("d") == 1
+        assert summary["a"] == 5
+
+    def test_merge_exact_when_small(self):
+        first, second = SpaceSaving(10), SpaceSaving(10)
+        first.update(["a", "b", "a"])
+        second.update(["c", "a"])
+        first.merge(second)
+        assert first == {"a": 3, "b": 1, "c": 1}
+        assert list(first) == ["a", "b", "c"]
+
+    def test_merge_bounds(self):
+        stream = _skewed_stream(30000, seed=3)
+        merged = SpaceSaving(200)
+        for start in range(0, len(stream), 4000):
+            part = SpaceSaving(200)
+            part.update(stream[start : start + 4000])
+            merged.merge(part)
+        assert len(merged) <= 200
+        truth = Counter(stream)
+        for key, count in merged.items():
+            assert count - merged.error(key) <= truth[key] <= count
+        assert {key for key, _ in merged.most_common(5)} == {f"heavy{i}" for i in range(5)}
+
+    def test_adds_after_merge_and_state_round_trip(self):
+        summary = SpaceSaving(50)
+        summary.update(_skewed_stream(2000))
+        restored = SpaceSaving.from_state(json.loads(json.dumps(summary.to_state())))
+        assert restored == summary
+        assert all(restored.error(key) == summary.error(key) for key in summary)
+        for key in _skewed_stream(500, seed=1):
+            restored.add(key)
+        assert len(restored) == 50
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            SpaceSaving(0)
+
+
+class TestHeavyHittersAggregator:
+    def test_top_sources_across_chunks(self):
+        stream = _skewed_stream(12000, seed=11)
+        merged = SourceCounts(capacity=64)
+        for start in range(0, len(stream), 1000):
+            part = SourceCounts(capacity=64)
+            for source in stream[start : start + 1000]:
+                part.update(LogEntry(source=source))
+            merged.merge(part)
+        top = merged.finalize()["source_counts"].most_common(5)
+        assert [key for key, _ in top] == [key for key, _ in Counter(stream).most_common(5)]
+
+
+class TestHyperLogLog:
+    def test_small_counts_exact(self):
+        sketch = HyperLogLog()
+        assert sketch.count() == 0
+        sketch.update(["a", "b", "a", "c", 7, b"d"])
+        assert sketch.count() == 5
+
+    def test_accuracy(self):
+        sketch = HyperLogLog()
+        sketch.update(f"10.{i >> 16}.{i >> 8 & 255}.{i & 255}" for i in range(100_000))
+        assert abs(sketch.count() - 100_000) < 100_000 * 0.05
+        assert len(sketch.registers) == 4096
+
+    @pytest.mark.parametrize("use_numpy", [True, False], ids=["numpy", "stdlib"])
+    def test_merge_is_union(self, use_numpy, monkeypatch):
+        if use_numpy:
+            pytest.importorskip("numpy")
+        monkeypatch.setattr(sketches, "NUMPY_AVAILABLE", use_numpy)
+        first, second, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        first.update(f"v{i}" for i in range(0, 6000))
+        second.update(f"v{i}" for i in range(4000, 10000))
+        whole.update(f"v{i}" for i in range(10000))
+        first.merge(second)
+        first.merge(HyperLogLog())
+        assert first.registers == whole.registers
+
+    def test_state_round_trip(self):
+        sketch = HyperLogLog(10)
+        sketch.update(range(500))
+        restored = HyperLogLog.from_state(json.loads(json.dumps(sketch.to_state())))
+        assert restored.precision == 10
+        assert restored.registers == sketch.registers
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(3)
+        with pytest.raises(ValueError, match="precision"):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+
+class TestDistinctCountsAggregator:
+    def test_access_log(self):
+        lines = [
+            f'10.0.0.{i % 7} - {("-", "alice", "bob")[i % 3]} [10/Oct/2023:13:55:36 -0700] '
+            f'"GET /p{i % 4}?q={i} HTTP/1.1" {(200, 500)[i % 2]} 1'
+            for i in range(40)
+        ]
+        parser = ApacheAccessParser()
+        expected = {"sources": 7, "users": 2, "paths": 4, "error_messages": 20}
+        assert _aggregate_lines(lines, parser, 5)["distinct_counts"] == expected
+        assert _aggregate_lines(lines, parser, 5, parse_line=parser.parse)["distinct_counts"] == expected
+
+        aggregator = DistinctCounts()
+        for line in lines:
+            aggregator.update(parser.parse(line))
+        assert aggregator.finalize() == {"distinct_counts": expected}
+
+    def test_json_fields(self):
+        lines = [
+            json.dumps({"level": "error", "message": "boom", "host": "h1", "user": {"id": 7}, "path": "/a"}),
+            json.dumps({"level": "info", "message": "ok", "user": "carol", "path": "/b"}),
+        ]
+        result = _aggregate_lines(lines, JSONLogParser(), 5)["distinct_counts"]
+        assert result == {"sources": 1, "users": 1, "paths": 2, "error_messages": 1}
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "stdlib"])
+def numpy_mode(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("numpy")
+    monkeypatch.setattr(sketches, "NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+def _assert_relative(sketch, values, accuracy=0.01):
+    ordered = sorted(values)
+    for q in (0, 0.1, 0.5, 0.9, 0.99, 0.999, 1):
+        truth = ordered[int(q * (len(ordered) - 1))]
+        assert abs(sketch.quantile(q) - truth) <= accuracy * abs(truth) + 1e-9
+
+
+class TestDDSketch:
+    def test_relative_accuracy(self, numpy_mode):
+        rng = random.Random(3)
+        values = [rng.lognormvariate(4, 2) for _ in range(20000)]
+        sketch = DDSketch()
+        sketch.update(values)
+        assert sketch.count == 20000
+        assert (sketch.min, sketch.max) == (min(values), max(values))
+        _assert_relative(sketch, values)
+
+    def test_merge_matches_single_sketch(self, numpy_mode):
+        rng = random.Random(5)
+        values = [rng.expovariate(0.01) for _ in range(9000)]
+        whole, merged = DDSketch(), DDSketch()
+        whole.update(values)
+        for start in range(0, len(values), 1000):
+            part = DDSketch()
+            for value in values[start : start + 1000]:
+                part.add(value)
+            merged.merge(part)
+        merged.merge(DDSketch())
+        assert [merged.quantile(q) for q in (0.5, 0.9, 0.99)] == [whole.quantile(q) for q in (0.5, 0.9, 0.99)]
+
+    def test_zero_negative_and_non_finite(self, numpy_mode):
+        values = [-50.0, -5.0, 0.0, 0.0, 5.0, 50.0, 500.0]
+        sketch = DDSketch()
+        sketch.update([*values, float("nan"), float("inf")])
+        assert sketch.count == 7
+        _assert_relative(sketch, values)
+
+    def test_collapses_smallest_buckets(self):
+        sketch = DDSketch(max_buckets=50)
+        values = [1.05**i for i in range(400)]
+        sketch.update(values)
+        assert len(sketch._positive) <= 50
+        assert abs(sketch.quantile(0.99) - values[395]) <= 0.01 * values[395]
+
+    def test_state_round_trip_and_empty(self):
+        sketch = DDSketch(0.02)
+        assert sketch.quantile(0.5) is None
+        sketch.update([1, 2, 3, -4, 0])
+        restored = DDSketch.from_state(json.loads(json.dumps(sketch.to_state())))
+        assert [restored.quantile(q) for q in (0, 0.5, 1)] == [sketch.quantile(q) for q in (0, 0.5, 1)]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            DDSketch(1.5)
+        with pytest.raises(ValueError):
+            DDSketch().quantile(2)
+        with pytest.raises(ValueError, match="relative accuracy"):
+            DDSketch(0.01).merge(DDSketch(0.02))
+
+
+class TestWeightedReservoir:
+    def test_weighted_inclusion(self):
+        picks = Counter()
+        for run in range(200):
+            reservoir = WeightedReservoir(5)
+            for i in range(50):
+                reservoir.add(f"{run}:{i}", i, weight=10.0 if i < 5 else 1.0)
+            picks.update("heavy" if item < 5 else "light" for item in reservoir.items())
+        # Five heavy items carry half the total weight; unweighted they would fill a tenth of the sample
+        assert 0.35 < picks["heavy"] / 1000 < 0.65
+
+    def test_merge_matches_single_pass(self):
+        whole, merged = WeightedReservoir(20), WeightedReservoir(20)
+        for i in range(1000):
+            whole.add(str(i), i, weight=1 + i % 3)
+        for start in range(0, 1000, 90):
+            part = WeightedReservoir(20)
+            for i in range(start, min(start + 90, 1000)):
+                part.add(str(i), i, weight=1 + i % 3)
+            merged.merge(part)
+        assert merged.entries() == whole.entries()
+        assert len(merged) == 20
+
+    def test_same_identity_sampled_once(self):
+        reservoir = WeightedReservoir(3)
+        for _ in range(10):
+            reservoir.add("same", "x")
+        assert reservoir.add("other", "y")
+        assert sorted(reservoir.items()) == ["x", "y"]
+        assert not reservoir.add("zero", "z", weight=0)
+
+    def test_state_round_trip(self):
+        reservoir = WeightedReservoir(4)
+        for i in range(30):
+            reservoir.add(str(i), {"n": i})
+        restored = WeightedReservoir.from_state(json.loads(json.dumps(reservoir.to_state())))
+        assert restored.entries() == reservoir.entries()
+        assert restored.threshold == reservoir.threshold
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            WeightedReservoir(0)
+
+
+def _sized_access_lines(count):
+    return [
+        f'10.0.0.{i % 5} - - [10/Oct/2023:13:55:36 -0700] "GET /p HTTP/1.1" {(200, 404, 503)[i % 3]} '
+        f"{i * 10 if i % 7 else '-'}"
+        for i in range(count)
+    ]
+
+
+class TestFieldQuantilesAggregator:
+    def test_access_sizes_by_status_class(self, numpy_mode, monkeypatch):
+        monkeypatch.setattr("log_analyzer.columnar.NUMPY_AVAILABLE", numpy_mode)
+        lines = _sized_access_lines(300)
+        parser = ApacheAccessParser()
+        batched = _aggregate_lines(lines, parser, 5)["quantiles"]
+        assert batched == _aggregate_lines(lines, parser, 5, parse_line=parser.parse)["quantiles"]
+
+        sizes = batched["size"]
+        assert sizes["count"] == len([i for i in range(300) if i % 7])
+        assert sizes["max"] == 2990.0
+        assert abs(sizes["p50"] - 1500) <= 30
+        assert set(sizes["by_status_class"]) == {"2xx", "4xx", "5xx"}
+        assert sum(group["count"] for group in sizes["by_status_class"].values()) == sizes["count"]
+
+    def test_state_round_trip(self):
+        aggregator = FieldQuantiles()
+        aggregator.update(LogEntry(metadata={"bytes": "120", "status": 200}))
+        aggregator.update(LogEntry(metadata={"duration_ms": 35, "status": "500"}))
+        restored = FieldQuantiles()
+        restored.load_state(json.loads(json.dumps(aggregator.to_state())))
+        assert restored.finalize() == aggregator.finalize()
+        assert restored.finalize()["quantiles"]["duration_ms"]["by_status_class"] == {}
+
+    @pytest.mark.parametrize("kwargs", [{"use_threading": False}, {"chunk_size": 40}], ids=["sequential", "threaded"])
+    def test_json_fields(self, tmp_path, kwargs):
+        path = tmp_path / "app.log"
+        lines = [
+            json.dumps({"level": "info", "message": "req", "status": (200, 500)[i % 2], "latency_ms": i})
+            for i in range(1, 201)
+        ]
+        path.write_text("\n".join(lines) + "\n")
+        result = LogAnalyzer(quantile_fields=["latency_ms"]).analyze(str(path), **kwargs)
+        latency = result.quantiles["latency_ms"]
+        assert latency["count"] == 200
+        assert abs(latency["p90"] - 180) <= 2
+        assert latency["by_status_class"]["5xx"]["count"] == 100
+        assert result.aggregates == {}
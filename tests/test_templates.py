@@ -0,0 +1,123 @@
+"""
+Tests for online log template mining.
+"""
+
+import json
+import random
+
+import pytest
+
+from log_analyzer.aggregators import ErrorTemplates
+from log_analyzer.analyzer import LogAnalyzer
+from log_analyzer.parsers import LogEntry
+from log_analyzer.templates import WILDCARD, TemplateMiner, mask_message
+
+_TEMPLATES = [
+    "Receiving block blk_{} src: /10.250.7.{}:50010",
+    "PacketResponder {} for block blk_{} terminating",
+    "Exception in receiveBlock for block blk_{}: Connection reset by peer",
+    "User {} not found",
+]
+
+
+def _messages(count, seed=1):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        template = rng.choice(_TEMPLATES)
+        if template.startswith("User"):
+            messages.append(template.format(rng.choice(["alice", "bob", "carol"])))
+        else:
+            messages.append(template.format(*(rng.randrange(256) for _ in range(template.count("{}")))))
+    return messages
+
+
+class TestMaskMessage:
+    def test_masks(self):
+        assert mask_message("conn 10.0.0.1:8080 failed after 1.5s") == "conn <IP> failed after <NUM>s"
+        assert mask_message("ptr 0x7ffd at blk_-42") == "ptr <HEX> at blk_-<NUM>"
+        assert mask_message("job 123e4567-e89b-12d3-a456-426614174000 done") == "job <UUID> done"
+        assert mask_message("no parameters here") == "no parameters here"
+
+
+class TestTemplateMiner:
+    def test_clusters_by_template(self):
+        miner = TemplateMiner()
+        messages = _messages(2000)
+        miner.update(messages)
+        templates = {template: count for template, count, _ in miner.most_common()}
+
+        def starting(prefix):
+            return sum(1 for message in messages if message.startswith(prefix))
+
+        assert templates == {
+            "Receiving block blk_<NUM> src: /<IP>": starting("Receiving"),
+            "PacketResponder <NUM> for block blk_<NUM> terminating": starting("Packet"),
+            "Exception in receiveBlock for block blk_<NUM>: Connection reset by peer": starting("Exception"),
+            f"User {WILDCARD} not found": starting("User"),
+        }
+
+    def test_example_and_returned_template(self):
+        miner = TemplateMiner()
+        assert miner.add("User alice not found") == "User alice not found"
+        assert miner.add("User bob not found", count=3) == "User <*> not found"
+        assert miner.most_common() == [("User <*> not found", 4, "User alice not found")]
+
+    def test_dissimilar_messages_stay_apart(self):
+        miner = TemplateMiner()
+        miner.update(["disk full on sda", "disk quota exceeded for root", "disk full on sdb"])
+        assert [template for template, _, _ in miner.most_common()] == [
+            "disk full on <*>",
+            "disk quota exceeded for root",
+        ]
+
+    def test_bounded(self):
+        miner = TemplateMiner(max_clusters=10, cache_size=20)
+        miner.update(f"event kind{chr(97 + i % 26)}{chr(97 + i // 26 % 26)} happened" for i in range(500))
+        miner.update(f"{chr(97 + i % 26)}{chr(97 + i // 26 % 26)} {i % 3} " * (i % 5 + 1) for i in range(500))
+        assert len(miner) <= 10
+        assert len(miner._cache) <= 20
+
+    def test_merge_matches_single_pass(self):
+        messages = _messages(3000, seed=4)
+        whole, merged = TemplateMiner(), TemplateMiner()
+        whole.update(messages)
+        for start in range(0, len(messages), 250):
+            part = TemplateMiner()
+            part.update(messages[start : start + 250])
+            merged.merge(part)
+        assert merged == whole
+
+    def test_state_round_trip(self):
+        miner = TemplateMiner(similarity=0.5)
+        miner.update(_messages(500))
+        restored = TemplateMiner.from_state(json.loads(json.dumps(miner.to_state())))
+        assert restored == miner
+        assert restored.similarity == 0.5
+        assert restored.add("User dave not found") == "User <*> not found"
+        assert len(restored) == len(miner)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TemplateMiner(depth=2)
+        with pytest.raises(ValueError):
+            TemplateMiner(similarity=1.5)
+
+
+class TestErrorTemplates:
+    def test_only_errors(self):
+        aggregator = ErrorTemplates()
+        aggregator.update(LogEntry(level="INFO", message="started job 1"))
+        aggregator.update(LogEntry(level="ERROR", message="job 1 failed"))
+        aggregator.update(LogEntry(level="CRITICAL", message="job 2 failed"))
+        assert aggregator.finalize()["error_templates"].most_common() == [("job <NUM> failed", 2, "job 1 failed")]
+
+    @pytest.mark.parametrize("kwargs", [{"use_threading": False}, {"chunk_size": 64}], ids=["sequential", "threaded"])
+    def test_analyzer_result(self, tmp_path, kwargs):
+        messages = _messages(400, seed=9)
+        path = tmp_path / "app.log"
+        path.write_text("\n".join(json.dumps({"level": "error", "message": message}) for message in messages) + "\n")
+        result = LogAnalyzer().analyze(str(path), **kwargs)
+        assert len(result.top_error_templates) == 4
+        assert sum(count for _, count, _ in result.top_error_templates) == 400
+        assert all(example in messages for _, _, example in result.top_error_templates)
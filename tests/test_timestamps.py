@@ -0,0 +1,177 @@
+"""
+Tests for the shared memoized timestamp parsers.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from log_analyzer import timestamps
+from log_analyzer.parsers import HDFSParser, JavaLogParser, SyslogParser, WindowsEventParser
+from log_analyzer.timestamps import clear_cache, parse_clf, parse_iso8601, parse_syslog, parse_with_format
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+class TestParseCLF:
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "10/Oct/2023:13:55:36 -0700",
+            "01/Jan/2020:00:00:00 +0000",
+            "29/Feb/2024:23:59:59 +0530",
+            "31/Dec/1999:12:00:00 -1200",
+            "1/Oct/2023:13:55:36 -0700",
+        ],
+    )
+    def test_matches_strptime(self, value):
+        expected = datetime.strptime(value, "%d/%b/%Y:%H:%M:%S %z")
+        result = parse_clf(value)
+        assert result == expected
+        assert result.utcoffset() == expected.utcoffset()
+
+    @pytest.mark.parametrize("value", ["", "garbage", "31/Feb/2023:00:00:00 +0000", "10/Foo/2023:13:55:36 -0700"])
+    def test_invalid(self, value):
+        assert parse_clf(value) is None
+
+    def test_repeated_second_is_cached(self):
+        first = parse_clf("10/Oct/2023:13:55:36 -0700")
+        assert parse_clf("10/Oct/2023:13:55:36 -0700") is first
+
+
+class TestParseISO8601:
+    @pytest.mark.parametrize(
+        ("value", "fmt"),
+        [
+            ("2020-01-01T12:00:00+00:00", "%Y-%m-%dT%H:%M:%S%z"),
+            ("2020-01-01T12:00:00.123456-07:00", "%Y-%m-%dT%H:%M:%S.%f%z"),
+            ("2020-01-01T12:00:00+0530", "%Y-%m-%dT%H:%M:%S%z"),
+            ("2020-01-01 12:00:00", "%Y-%m-%d %H:%M:%S"),
+            ("2017-05-16 00:00:00.008", "%Y-%m-%d %H:%M:%S.%f"),
+            ("2015-10-18 18:01:47,978", "%Y-%m-%d %H:%M:%S,%f"),
+        ],
+    )
+    def test_matches_strptime(self, value, fmt):
+        expected = datetime.strptime(value, fmt)
+        result = parse_iso8601(value)
+        assert result == expected
+        assert result.utcoffset() == expected.utcoffset()
+
+    def test_z_suffix(self):
+        assert parse_iso8601("2020-01-01T12:00:00Z") == datetime(2020, 1, 1, 12, tzinfo=timezone.utc)
+        assert parse_iso8601("2020-01-01T12:00:00Z", z_is_utc=False) == datetime(2020, 1, 1, 12)
+
+    def test_nanoseconds_truncated(self):
+        assert parse_iso8601("2020-01-01T00:00:00.123456789Z").microsecond == 123456
+
+    def test_fraction_applied_to_cached_second(self):
+        first = parse_iso8601("2020-01-01T00:00:00.100Z")
+        second = parse_iso8601("2020-01-01T00:00:00.250Z")
+        assert second - first == timedelta(milliseconds=150)
+        assert parse_iso8601("2020-01-01T00:00:00Z").microsecond == 0
+
+    @pytest.mark.parametrize(
+        "value", ["", "2020-01-01", "2020-13-01T00:00:00Z", "2020-01-01T00:00:00 trailing", "2020-01-01T00:00:00.Z"]
+    )
+    def test_invalid(self, value):
+        assert parse_iso8601(value) is None
+
+
+class TestParseSyslog:
+    def test_explicit_year(self):
+        assert parse_syslog("Oct 11 22:14:15", year=2003) == datetime(2003, 10, 11, 22, 14, 15)
+        assert parse_syslog("Jun  9 06:06:20", year=2005) == datetime(2005, 6, 9, 6, 6, 20)
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("Mar  1 10:00:00", datetime(2024, 3, 1, 10, 0, 0)),
+            ("Feb 29 00:00:00", datetime(2024, 2, 29, 0, 0, 0)),
+            # Up to a day after the reference is still this year (clock skew)
+            ("Mar  6 11:00:00", datetime(2024, 3, 6, 11, 0, 0)),
+            ("Dec 31 23:59:59", datetime(2023, 12, 31, 23, 59, 59)),
+        ],
+    )
+    def test_year_from_reference(self, value, expected):
+        assert parse_syslog(value, reference=datetime(2024, 3, 5, 12, 0, 0)) == expected
+        aware = datetime(2024, 3, 5, 12, 0, 0, tzinfo=timezone.utc)
+        assert parse_syslog(value, reference=aware) == expected
+
+    def test_unknown_year(self):
+        # The clock is never used to guess the year
+        assert parse_syslog("Oct 11 22:14:15") is None
+
+    def test_invalid(self):
+        assert parse_syslog("Foo 11 22:14:15") is None
+        assert parse_syslog("Feb 29 00:00:00", year=2023) is None
+
+
+class TestCache:
+    def test_parse_with_format(self):
+        assert parse_with_format("20171223-22:15:29:606", "%Y%m%d-%H:%M:%S:%f") == datetime(
+            2017, 12, 23, 22, 15, 29, 606000
+        )
+        assert parse_with_format("nope", "%Y") is None
+
+    @pytest.mark.parametrize(
+        "fmt, values",
+        [
+            ("%Y-%m-%d %H:%M:%S,%f", ["2015-10-18 18:01:47,978", "2015-10-18 18:01:47,9", "2015-10-18 18:01:47,01"]),
+            ("%Y-%m-%dT%H:%M:%S.%fZ", ["2020-01-01T00:00:00.5Z", "2020-01-01T00:00:00.123456Z"]),
+        ],
+    )
+    def test_fraction_cached_per_second(self, fmt, values):
+        for value in values:
+            assert parse_with_format(value, fmt) == datetime.strptime(value, fmt)
+        assert len(timestamps._cache) == 1
+
+    @pytest.mark.parametrize(
+        "value",
+        ["2015-10-18 18:01:47,1234567", "2015-10-18 18:01:47,", "2015-10-18 18:01:47,12x", "2015-02-30 18:01:47,1"],
+    )
+    def test_fraction_mismatch(self, value):
+        assert parse_with_format(value, "%Y-%m-%d %H:%M:%S,%f") is None
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(timestamps, "TIMESTAMP_CACHE_SIZE", 10)
+        for second in range(60):
+            parse_clf(f"10/Oct/2023:13:55:{second:02d} -0700")
+        assert len(timestamps._cache) <= 10
+
+
+class TestParserTimestamps:
+    def test_java_full_and_short(self):
+        parser = JavaLogParser()
+        entry = parser.parse("2015-10-18 18:01:47,978 INFO [main] org.apache.hadoop.Foo: started")
+        assert entry.timestamp == datetime(2015, 10, 18, 18, 1, 47, 978000)
+        entry = parser.parse("17/06/09 20:10:40 INFO executor.CoarseGrainedExecutorBackend: registered")
+        assert entry.timestamp == datetime(2017, 6, 9, 20, 10, 40)
+
+    def test_hdfs(self):
+        entry = HDFSParser().parse("081109 203615 148 INFO dfs.DataNode$PacketResponder: PacketResponder 1")
+        assert entry.timestamp == datetime(2008, 11, 9, 20, 36, 15)
+
+    def test_windows(self):
+        entry = WindowsEventParser().parse("2016-09-28 04:30:30, Info                  CBS    Loaded Servicing Stack")
+        assert entry.timestamp == datetime(2016, 9, 28, 4, 30, 30)
+
+    def test_syslog_bsd(self):
+        line = "Jun 14 15:16:01 combo sshd(pam_unix)[19939]: authentication failure"
+        assert SyslogParser().parse(line).timestamp is None
+        parser = SyslogParser().with_reference_time(datetime(2005, 7, 1))
+        assert parser.parse(line).timestamp == datetime(2005, 6, 14, 15, 16, 1)
+
+    def test_syslog_year_from_file(self, tmp_path):
+        import os
+
+        path = tmp_path / "messages"
+        path.write_text("Dec 31 23:59:59 combo kernel: shutdown\n")
+        os.utime(path, (datetime(2006, 1, 2).timestamp(),) * 2)
+        parser = SyslogParser().for_file(path)
+        assert parser.parse("Dec 31 23:59:59 combo kernel: shutdown").timestamp == datetime(2005, 12, 31, 23, 59, 59)
+        assert SyslogParser().for_file(tmp_path / "missing").reference_time is None